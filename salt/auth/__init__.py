@@ -16,10 +16,12 @@ so that any external authentication system can be used inside of Salt
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
 import collections
+import copy
 import time
 import logging
 import random
 import getpass
+import threading
 from salt.ext.six.moves import input
 from salt.ext import six
 
@@ -55,6 +57,61 @@ AUTH_INTERNAL_KEYWORDS = frozenset([
 ])
 
 
+class AuthCache(object):
+    '''
+    .. versionadded:: Neon
+
+    A cache of validated tokens and of calculated auth lists, shared by all of
+    the threads of a process. Entries expire ``eauth_cache_ttl`` seconds after
+    they were stored.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.next_prune = 0
+
+    def get(self, key):
+        '''
+        Return a copy of the cached value, or None
+        '''
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time():
+            return None
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, value, ttl):
+        '''
+        Cache a copy of the value for ttl seconds
+        '''
+        now = time.time()
+        with self.lock:
+            self.entries[key] = (now + ttl, copy.deepcopy(value))
+            if now >= self.next_prune:
+                self.next_prune = now + ttl
+                for expired in [key for key, entry in six.iteritems(self.entries)
+                                if entry[0] < now]:
+                    del self.entries[expired]
+
+    def invalidate(self, token):
+        '''
+        Drop everything cached for the token
+        '''
+        with self.lock:
+            self.entries.pop(('token', token), None)
+            self.entries.pop(('auth_list', 'token', token), None)
+
+    def clear(self):
+        '''
+        Drop all of the entries
+        '''
+        with self.lock:
+            self.entries.clear()
+
+
+AUTH_CACHE = AuthCache()
+
+
 class LoadAuth(object):
     '''
     Wrap the authentication system to handle peripheral components
@@ -66,6 +123,7 @@ class LoadAuth(object):
         self.auth = salt.loader.auth(opts)
         self.tokens = salt.loader.eauth_tokens(opts)
         self.ckminions = ckminions or salt.utils.minions.CkMinions(opts)
+        self.cache_ttl = opts.get('eauth_cache_ttl', 0)
 
     def load_name(self, load):
         '''
@@ -244,6 +302,11 @@ class LoadAuth(object):
         Return the name associated with the token, or False if the token is
         not valid
         '''
+        if self.cache_ttl:
+            tdata = AUTH_CACHE.get(('token', tok))
+            if tdata and tdata.get('expire', 0) >= time.time():
+                return tdata
+
         tdata = self.tokens["{0}.get_token".format(self.opts['eauth_tokens'])](self.opts, tok)
         if not tdata:
             return {}
@@ -256,6 +319,8 @@ class LoadAuth(object):
             rm_tok = True
         if rm_tok:
             self.rm_token(tok)
+        elif self.cache_ttl:
+            AUTH_CACHE.set(('token', tok), tdata, self.cache_ttl)
 
         return tdata
 
@@ -269,6 +334,7 @@ class LoadAuth(object):
         '''
         Remove the given token from token storage.
         '''
+        AUTH_CACHE.invalidate(tok)
         self.tokens["{0}.rm_token".format(self.opts['eauth_tokens'])](self.opts, tok)
 
     def authenticate_token(self, load):
@@ -365,6 +431,31 @@ class LoadAuth(object):
         # Get auth list from token
         if token and self.opts['keep_acl_in_token'] and 'auth_list' in token:
             return token['auth_list']
+
+        cache_key = None
+        if self.cache_ttl:
+            if token:
+                name = token.get('token', load.get('token'))
+                cache_key = ('auth_list', 'token', name)
+            else:
+                name = self.load_name(load)
+                cache_key = ('auth_list', 'eauth', load.get('eauth'), name)
+            if not name:
+                cache_key = None
+        if cache_key is not None:
+            cached = AUTH_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
+        auth_list = self.__get_auth_list(load, token)
+        if cache_key is not None and auth_list is not None:
+            AUTH_CACHE.set(cache_key, auth_list, self.cache_ttl)
+        return auth_list
+
+    def __get_auth_list(self, load, token):
+        '''
+        Calculate the access list of get_auth_list
+        '''
         # Get acl from eauth module.
         auth_list = self.__get_acl(load)
         if auth_list is not None:
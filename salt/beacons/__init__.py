@@ -10,8 +10,11 @@ import re
 
 # Import Salt libs
 import salt.loader
+import salt.utils.beacons
 import salt.utils.event
+import salt.utils.json
 import salt.utils.minion
+from salt.ext import six
 from salt.ext.six.moves import map
 from salt.exceptions import CommandExecutionError
 
@@ -27,6 +30,8 @@ class Beacon(object):
         self.functions = functions
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
+        # beacon -> {tag: set of the serialized data} of the events it fired last
+        self.last_events = dict()
 
     def process(self, config, grains):
         '''
@@ -45,89 +50,115 @@ class Beacon(object):
         b_config = copy.deepcopy(config)
         if 'enabled' in b_config and not b_config['enabled']:
             return
-        for mod in config:
-            if mod == 'enabled':
-                continue
-
-            # Convert beacons that are lists to a dict to make processing easier
-            current_beacon_config = None
-            if isinstance(config[mod], list):
-                current_beacon_config = {}
-                list(map(current_beacon_config.update, config[mod]))
-            elif isinstance(config[mod], dict):
-                current_beacon_config = config[mod]
-
-            if 'enabled' in current_beacon_config:
-                if not current_beacon_config['enabled']:
-                    log.trace('Beacon %s disabled', mod)
+        # the beacons share what they sample from the system on this loop
+        with salt.utils.beacons.shared_sample():
+            for mod in config:
+                if mod == 'enabled':
                     continue
-                else:
-                    # remove 'enabled' item before processing the beacon
-                    if isinstance(config[mod], dict):
-                        del config[mod]['enabled']
-                    else:
-                        self._remove_list_item(config[mod], 'enabled')
+                ret.extend(self._process_beacon(mod, config, b_config, grains))
+        return ret
 
-            log.trace('Beacon processing: %s', mod)
-            beacon_name = None
-            if self._determine_beacon_config(current_beacon_config, 'beacon_module'):
-                beacon_name = current_beacon_config['beacon_module']
+    def _process_beacon(self, mod, config, b_config, grains):
+        '''
+        Run a configured beacon, return the events it fires
+        '''
+        ret = []
+        # Convert beacons that are lists to a dict to make processing easier
+        current_beacon_config = None
+        if isinstance(config[mod], list):
+            current_beacon_config = {}
+            list(map(current_beacon_config.update, config[mod]))
+        elif isinstance(config[mod], dict):
+            current_beacon_config = config[mod]
+
+        if 'enabled' in current_beacon_config:
+            if not current_beacon_config['enabled']:
+                log.trace('Beacon %s disabled', mod)
+                return ret
             else:
-                beacon_name = mod
-            fun_str = '{0}.beacon'.format(beacon_name)
-            validate_str = '{0}.validate'.format(beacon_name)
-            if fun_str in self.beacons:
-                runonce = self._determine_beacon_config(current_beacon_config, 'run_once')
-                interval = self._determine_beacon_config(current_beacon_config, 'interval')
-                if interval:
-                    b_config = self._trim_config(b_config, mod, 'interval')
-                    if not self._process_interval(mod, interval):
-                        log.trace('Skipping beacon %s. Interval not reached.', mod)
-                        continue
-                if self._determine_beacon_config(current_beacon_config, 'disable_during_state_run'):
-                    log.trace('Evaluting if beacon %s should be skipped due to a state run.', mod)
-                    b_config = self._trim_config(b_config, mod, 'disable_during_state_run')
-                    is_running = False
-                    running_jobs = salt.utils.minion.running(self.opts)
-                    for job in running_jobs:
-                        if re.match('state.*', job['fun']):
-                            is_running = True
-                    if is_running:
-                        close_str = '{0}.close'.format(beacon_name)
-                        if close_str in self.beacons:
-                            log.info('Closing beacon %s. State run in progress.', mod)
-                            self.beacons[close_str](b_config[mod])
-                        else:
-                            log.info('Skipping beacon %s. State run in progress.', mod)
-                        continue
-                # Update __grains__ on the beacon
-                self.beacons[fun_str].__globals__['__grains__'] = grains
-
-                # Run the validate function if it's available,
-                # otherwise there is a warning about it being missing
-                if validate_str in self.beacons:
-                    valid, vcomment = self.beacons[validate_str](b_config[mod])
+                # remove 'enabled' item before processing the beacon
+                if isinstance(config[mod], dict):
+                    del config[mod]['enabled']
+                else:
+                    self._remove_list_item(config[mod], 'enabled')
 
-                    if not valid:
-                        log.info('Beacon %s configuration invalid, '
-                                 'not running.\n%s', mod, vcomment)
+        log.trace('Beacon processing: %s', mod)
+        beacon_name = None
+        if self._determine_beacon_config(current_beacon_config, 'beacon_module'):
+            beacon_name = current_beacon_config['beacon_module']
+        else:
+            beacon_name = mod
+        fun_str = '{0}.beacon'.format(beacon_name)
+        validate_str = '{0}.validate'.format(beacon_name)
+        if fun_str in self.beacons:
+            runonce = self._determine_beacon_config(current_beacon_config, 'run_once')
+            suppress_unchanged = self._determine_beacon_config(current_beacon_config,
+                                                               'suppress_unchanged')
+            if suppress_unchanged:
+                b_config = self._trim_config(b_config, mod, 'suppress_unchanged')
+            interval = self._determine_beacon_config(current_beacon_config, 'interval')
+            if interval:
+                b_config = self._trim_config(b_config, mod, 'interval')
+                if not self._process_interval(mod, interval):
+                    log.trace('Skipping beacon %s. Interval not reached.', mod)
+                    return ret
+            if self._determine_beacon_config(current_beacon_config, 'disable_during_state_run'):
+                log.trace('Evaluting if beacon %s should be skipped due to a state run.', mod)
+                b_config = self._trim_config(b_config, mod, 'disable_during_state_run')
+                is_running = False
+                running_jobs = salt.utils.minion.running(self.opts)
+                for job in running_jobs:
+                    if re.match('state.*', job['fun']):
+                        is_running = True
+                if is_running:
+                    close_str = '{0}.close'.format(beacon_name)
+                    if close_str in self.beacons:
+                        log.info('Closing beacon %s. State run in progress.', mod)
+                        self.beacons[close_str](b_config[mod])
+                    else:
+                        log.info('Skipping beacon %s. State run in progress.', mod)
+                    return ret
+            # Update __grains__ on the beacon
+            self.beacons[fun_str].__globals__['__grains__'] = grains
+
+            # Run the validate function if it's available,
+            # otherwise there is a warning about it being missing
+            if validate_str in self.beacons:
+                valid, vcomment = self.beacons[validate_str](b_config[mod])
+
+                if not valid:
+                    log.info('Beacon %s configuration invalid, '
+                             'not running.\n%s', mod, vcomment)
+                    return ret
+
+            # Fire the beacon!
+            raw = self.beacons[fun_str](b_config[mod])
+            last_events = self.last_events.get(mod, {})
+            events = {}
+            for data in raw:
+                tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
+                if 'tag' in data:
+                    tag += data.pop('tag')
+                if 'id' not in data:
+                    data['id'] = self.opts['id']
+                if suppress_unchanged:
+                    # A beacon can fire several events under the same tag,
+                    # all of them are remembered
+                    payload = salt.utils.json.dumps(data, sort_keys=True,
+                                                    default=six.text_type)
+                    events.setdefault(tag, set()).add(payload)
+                    if payload in last_events.get(tag, ()):
+                        log.trace('Suppressing unchanged event %s of beacon %s', tag, mod)
                         continue
-
-                # Fire the beacon!
-                raw = self.beacons[fun_str](b_config[mod])
-                for data in raw:
-                    tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
-                    if 'tag' in data:
-                        tag += data.pop('tag')
-                    if 'id' not in data:
-                        data['id'] = self.opts['id']
-                    ret.append({'tag': tag,
-                                'data': data,
-                                'beacon_name': beacon_name})
-                if runonce:
-                    self.disable_beacon(mod)
-            else:
-                log.warning('Unable to process beacon %s', mod)
+                ret.append({'tag': tag,
+                            'data': data,
+                            'beacon_name': beacon_name})
+            if suppress_unchanged:
+                self.last_events[mod] = events
+            if runonce:
+                self.disable_beacon(mod)
+        else:
+            log.warning('Unable to process beacon %s', mod)
         return ret
 
     def _trim_config(self, b_config, mod, key):
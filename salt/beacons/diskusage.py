@@ -12,6 +12,7 @@ from __future__ import absolute_import, unicode_literals
 import logging
 import re
 
+import salt.utils.beacons
 import salt.utils.platform
 
 # Import Third Party Libs
@@ -85,7 +86,8 @@ def beacon(config):
     it will override the previously defined threshold.
 
     '''
-    parts = psutil.disk_partitions(all=True)
+    sample = salt.utils.beacons.sample()
+    parts = sample.get('disk_partitions', psutil.disk_partitions, all=True)
     ret = []
     for mounts in config:
         mount = next(iter(mounts))
@@ -110,7 +112,7 @@ def beacon(config):
                 _mount = part.mountpoint
 
                 try:
-                    _current_usage = psutil.disk_usage(_mount)
+                    _current_usage = sample.get(('disk_usage', _mount), psutil.disk_usage, _mount)
                 except OSError:
                     log.warning('%s is not a valid mount point.', _mount)
                     continue
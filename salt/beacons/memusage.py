@@ -20,6 +20,9 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+# Import Salt libs
+import salt.utils.beacons
+
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'memusage'
@@ -69,7 +72,7 @@ def beacon(config):
     _config = {}
     list(map(_config.update, config))
 
-    _current_usage = psutil.virtual_memory()
+    _current_usage = salt.utils.beacons.sample().get('virtual_memory', psutil.virtual_memory)
 
     current_usage = _current_usage.percent
     monitor_usage = _config['percent']
@@ -19,6 +19,9 @@ from salt.ext.six.moves import map
 
 # pylint: enable=import-error
 
+# Import Salt libs
+import salt.utils.beacons
+
 log = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 __virtualname__ = 'ps'
@@ -50,6 +53,13 @@ def validate(config):
     return True, 'Valid beacon configuration'
 
 
+def _process_names():
+    '''
+    Return the names of the running processes
+    '''
+    return frozenset(proc.name() for proc in psutil.process_iter())
+
+
 def beacon(config):
     '''
     Scan for processes and fire events
@@ -68,11 +78,7 @@ def beacon(config):
     processes are running or stopped.
     '''
     ret = []
-    procs = []
-    for proc in psutil.process_iter():
-        _name = proc.name()
-        if _name not in procs:
-            procs.append(_name)
+    procs = salt.utils.beacons.sample().get('process_names', _process_names)
 
     _config = {}
     list(map(_config.update, config))
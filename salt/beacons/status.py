@@ -96,6 +96,7 @@ import datetime
 import salt.exceptions
 
 # Import salt libs
+import salt.utils.beacons
 import salt.utils.platform
 
 log = logging.getLogger(__name__)
@@ -141,7 +142,8 @@ def beacon(config):
         for func in entry:
             ret[func] = {}
             try:
-                data = __salt__['status.{0}'.format(func)]()
+                fun = 'status.{0}'.format(func)
+                data = salt.utils.beacons.sample().get(fun, __salt__[fun])
             except salt.exceptions.CommandExecutionError as exc:
                 log.debug('Status beacon attempted to process function %s '
                           'but encountered error: %s', func, exc)
@@ -11,6 +11,9 @@ import copy
 from datetime import datetime, timedelta
 
 # Import salt libs
+import salt.utils.event
+import salt.utils.jid
+import salt.utils.json
 import salt.utils.stringutils
 import salt.client
 import salt.output
@@ -25,6 +28,15 @@ import logging
 
 log = logging.getLogger(__name__)
 
+# The options of the window of a batch run, see BatchWindow
+BATCH_WINDOW_OPTS = (
+    'batch_adaptive',
+    'batch_max',
+    'batch_max_failures',
+    'batch_group_by',
+    'batch_group_size',
+)
+
 
 def get_bnum(opts, minions, quiet):
     '''
@@ -78,6 +90,9 @@ def batch_get_opts(
         opts['gather_job_timeout'] = kwargs['gather_job_timeout']
     if 'batch_wait' in kwargs:
         opts['batch_wait'] = int(kwargs['batch_wait'])
+    for key in BATCH_WINDOW_OPTS:
+        if key in kwargs:
+            opts[key] = kwargs[key]
 
     for key, val in six.iteritems(parent_opts):
         if key not in opts:
@@ -99,6 +114,166 @@ def batch_get_eauth(kwargs):
     return eauth
 
 
+def batch_failed(data):
+    '''
+    Return whether a return of a batch run is a failure: a non-zero retcode,
+    or no return at all
+    '''
+    if isinstance(data.get('data'), dict):
+        # Raw return event
+        data = data['data']
+    if 'retcode' in data:
+        try:
+            return int(data['retcode']) != 0
+        except (TypeError, ValueError):
+            return True
+    return not data.get('ret') and not data.get('return')
+
+
+class BatchWindow(object):
+    '''
+    Decide how many, and which, of the minions of a batch run are started
+    next.
+
+    The window is the batch size, fixed unless ``batch_adaptive`` is set. In
+    adaptive mode the window starts at the batch size and doubles every round
+    as long as the minions return fine and in time. After the first failure it
+    grows by one every round instead. It is halved, at most once per round,
+    when a minion fails or the average time the minions take to return grows
+    past twice the fastest seen. ``batch_max`` caps the window.
+
+    Minions stop being started once ``batch_max_failures`` (a number or a
+    percentage of the minions) of them failed, and ``batch_group_size`` caps
+    how many minions with the same value of the ``batch_group_by`` grain run
+    at the same time.
+    '''
+    LATENCY_FACTOR = 2.0
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(self, opts, size, total):
+        self.adaptive = bool(opts.get('batch_adaptive'))
+        self.max_size = int(opts.get('batch_max') or 0)
+        self._size = float(max(size or 1, 1))
+        if self.max_size:
+            self._size = min(self._size, self.max_size)
+        self.threshold = float(self.max_size or 'inf')
+        self.max_failures = self._parse_max_failures(opts.get('batch_max_failures'), total)
+        self.group_by = opts.get('batch_group_by')
+        self.group_size = int(opts.get('batch_group_size') or 0)
+        self.groups = {}
+        self.running = {}
+        self.done = 0
+        self.failed = 0
+        self.latency = None
+        self.min_latency = None
+        self.last_decrease = 0
+
+    @staticmethod
+    def _parse_max_failures(max_failures, total):
+        if not max_failures:
+            return 0
+        max_failures = six.text_type(max_failures)
+        if max_failures.endswith('%'):
+            return max(int(math.ceil(float(max_failures.strip('%')) / 100.0 * total)), 1)
+        return int(max_failures)
+
+    @property
+    def size(self):
+        '''
+        The number of minions to run at the same time
+        '''
+        return max(int(self._size), 1)
+
+    @property
+    def tripped(self):
+        '''
+        Whether too many minions failed to start any more
+        '''
+        return bool(self.max_failures) and self.failed >= self.max_failures
+
+    def _group_full(self, minion, groups):
+        if not self.group_size:
+            return False
+        group = self.groups.get(minion)
+        return groups.get(group, 0) >= self.group_size
+
+    def select(self, minions, slots):
+        '''
+        Remove up to ``slots`` minions from the list of ``minions`` left to run
+        and return them, leaving the minions which would exceed the size of
+        their group in the list
+        '''
+        groups = {}
+        for minion in self.running:
+            group = self.groups.get(minion)
+            groups[group] = groups.get(group, 0) + 1
+        ret = []
+        for minion in reversed(minions[:]):
+            if len(ret) >= slots:
+                break
+            if self._group_full(minion, groups):
+                continue
+            minions.remove(minion)
+            ret.append(minion)
+            group = self.groups.get(minion)
+            groups[group] = groups.get(group, 0) + 1
+        return ret
+
+    def start(self, minions):
+        '''
+        Record that the given minions were started
+        '''
+        now = time.time()
+        for minion in minions:
+            self.running[minion] = now
+
+    def finish(self, minion, failed=False):
+        '''
+        Record that a minion returned or timed out, and size the window
+        '''
+        started = self.running.pop(minion, None)
+        if started is None:
+            return
+        self.done += 1
+        slow = False
+        if failed:
+            self.failed += 1
+        else:
+            latency = time.time() - started
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.LATENCY_WEIGHT * (latency - self.latency)
+            if self.min_latency is None or latency < self.min_latency:
+                self.min_latency = latency
+            slow = self.latency > self.LATENCY_FACTOR * max(self.min_latency, 0.1)
+        if not self.adaptive:
+            return
+        if failed or slow:
+            # Only back off once for the minions started in the same round
+            if started >= self.last_decrease:
+                self.threshold = max(self._size / 2.0, 1.0)
+                self._size = self.threshold
+                self.last_decrease = time.time()
+        elif self._size < self.threshold:
+            self._size += 1
+        else:
+            self._size += 1.0 / self._size
+        if self.max_size:
+            self._size = min(self._size, self.max_size)
+
+    def stats(self):
+        '''
+        Return the state of the window, to report the progress of the run
+        '''
+        return {'size': self.size,
+                'running': len(self.running),
+                'done': self.done,
+                'failed': self.failed,
+                'latency': self.latency,
+                'tripped': self.tripped}
+
+
 class Batch(object):
     '''
     Manage the execution of batch runs
@@ -109,6 +284,7 @@ class Batch(object):
         self.pub_kwargs = eauth if eauth else {}
         self.quiet = quiet
         self.local = salt.client.get_local_client(opts['conf_file'])
+        self.groups = {}
         self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
         self.options = parser
 
@@ -121,6 +297,10 @@ class Batch(object):
                 [],
                 self.opts['timeout'],
                 ]
+        if self.opts.get('batch_group_by'):
+            # Get the grain the minions are grouped by in the same go
+            args[1] = 'grains.get'
+            args[2] = [self.opts['batch_group_by']]
 
         selected_target_option = self.opts.get('selected_target_option', None)
         if selected_target_option is not None:
@@ -150,8 +330,27 @@ class Batch(object):
                     break
                 if m is not None:
                     fret.add(m)
+                    self.__add_group(m, ret[m])
         return (list(fret), ping_gen, nret.difference(fret))
 
+    def __add_group(self, minion, data):
+        if self.opts.get('batch_group_by') and isinstance(data, dict):
+            group = data.get('ret')
+            if isinstance(group, (dict, list)):
+                group = salt.utils.json.dumps(group, sort_keys=True)
+            self.groups[minion] = group
+
+    def __fire_progress(self, jid, window, data):
+        '''
+        Fire an event reporting the progress of the batch run
+        '''
+        data.update(window.stats())
+        try:
+            self.local.event.fire_event(
+                data, salt.utils.event.tagify([jid, 'progress'], 'batch'))
+        except Exception as exc:
+            log.debug('Failed to fire the batch progress event: %s', exc)
+
     def get_bnum(self):
         return get_bnum(self.opts, self.minions, self.quiet)
 
@@ -177,6 +376,9 @@ class Batch(object):
         # No targets to run
         if not self.minions:
             return
+        window = BatchWindow(self.opts, bnum, len(self.minions))
+        window.groups = self.groups
+        batch_jid = salt.utils.jid.gen_jid(self.opts)
         to_run = copy.deepcopy(self.minions)
         active = []
         ret = {}
@@ -209,9 +411,25 @@ class Batch(object):
         # Iterate while we still have things to execute
         while len(ret) < len(self.minions):
             next_ = []
+            if window.tripped and to_run:
+                log.error(
+                    '%s minions failed, not running the job on the %s left',
+                    window.failed, len(to_run)
+                )
+                if not self.quiet:
+                    salt.utils.stringutils.print_cli(
+                        '\n{0} minions failed, not running the job on {1}\n'.format(
+                            window.failed, sorted(to_run)))
+                for minion in to_run:
+                    self.minions.remove(minion)
+                del to_run[:]
+                continue
+            bnum = window.size
             if bwait and wait:
                 self.__update_wait(wait)
-            if len(to_run) <= bnum - len(wait) and not active:
+            if window.group_size:
+                next_ = window.select(to_run, bnum - len(active) - len(wait))
+            elif len(to_run) <= bnum - len(wait) and not active:
                 # last bit of them, add them all to next iterator
                 while to_run:
                     next_.append(to_run.pop())
@@ -226,6 +444,7 @@ class Batch(object):
 
             active += next_
             args[0] = next_
+            window.start(next_)
 
             if next_:
                 if not self.quiet:
@@ -258,6 +477,7 @@ class Batch(object):
                 if m not in self.minions:
                     self.minions.append(m)
                     to_run.append(m)
+                    self.__add_group(m, ping_ret[m])
 
             for queue in iters:
                 try:
@@ -305,6 +525,7 @@ class Batch(object):
                     active.remove(minion)
                     if bwait:
                         wait.append(datetime.now() + timedelta(seconds=bwait))
+                window.finish(minion, batch_failed(data))
                 # Munge retcode into return data
                 failhard = False
                 if 'retcode' in data and isinstance(data['ret'], dict) and 'retcode' not in data['ret']:
@@ -336,6 +557,9 @@ class Batch(object):
                     )
                     raise StopIteration
 
+            if parts:
+                self.__fire_progress(batch_jid, window, {'minions': sorted(parts)})
+
             # remove inactive iterators from the iters list
             for queue in minion_tracker:
                 # only remove inactive queues
@@ -16,7 +16,8 @@ import fnmatch
 
 log = logging.getLogger(__name__)
 
-from salt.cli.batch import get_bnum, batch_get_opts, batch_get_eauth
+from salt.cli.batch import (
+    get_bnum, batch_get_opts, batch_get_eauth, batch_failed, BatchWindow, BATCH_WINDOW_OPTS)
 
 
 class BatchAsync(object):
@@ -32,6 +33,20 @@ class BatchAsync(object):
         - batch_presence_ping_timeout: time to wait for presence pings before starting the batch
         - gather_job_timeout: `find_job` timeout
         - timeout: time to wait before firing a `find_job`
+        - batch_adaptive, batch_max, batch_max_failures, batch_group_by,
+          batch_group_size: see :py:class:`salt.cli.batch.BatchWindow`
+
+    After every return of the job, a `progress` event is fired:
+        - tag: salt/batch/<batch-jid>/progress
+        - data: {
+             "minion": the minion which returned,
+             "size": the size of the window,
+             "running": number of running minions,
+             "done": number of minions done,
+             "failed": number of minions which failed,
+             "latency": average time the minions took to return,
+             "tripped": whether batch_max_failures was reached
+         }
 
     When the batch stars, a `start` event is fired:
          - tag: salt/batch/<batch-jid>/start
@@ -58,6 +73,9 @@ class BatchAsync(object):
             clear_load['gather_job_timeout'] = self.local.opts['gather_job_timeout']
         self.batch_presence_ping_timeout = clear_load['kwargs'].get('batch_presence_ping_timeout', None)
         self.batch_delay = clear_load['kwargs'].get('batch_delay', 1)
+        for key in BATCH_WINDOW_OPTS:
+            if key in clear_load['kwargs']:
+                clear_load[key] = clear_load['kwargs'].pop(key)
         self.opts = batch_get_opts(
             clear_load.pop('tgt'),
             clear_load.pop('fun'),
@@ -71,6 +89,9 @@ class BatchAsync(object):
         self.timedout_minions = set()
         self.done_minions = set()
         self.active = set()
+        self.skipped_minions = set()
+        self.groups = {}
+        self.window = None
         self.initialized = False
         self.ping_jid = jid_gen()
         self.batch_jid = jid_gen()
@@ -107,6 +128,8 @@ class BatchAsync(object):
             if fnmatch.fnmatch(mtag, pattern):
                 minion = data['id']
                 if op == 'ping_return':
+                    if self.opts.get('batch_group_by'):
+                        self.groups[minion] = data.get('return')
                     self.minions.add(minion)
                     self.down_minions.remove(minion)
                     if not self.down_minions:
@@ -117,21 +140,45 @@ class BatchAsync(object):
                     if minion in self.active:
                         self.active.remove(minion)
                         self.done_minions.add(minion)
+                        self.finish_minion(minion, batch_failed(data))
                         # call later so that we maybe gather more returns
                         self.event.io_loop.call_later(self.batch_delay, self.schedule_next)
 
-        if self.initialized and self.done_minions == self.minions.difference(self.timedout_minions):
+        if self.initialized and self.done_minions == self.minions.difference(
+                self.timedout_minions).difference(self.skipped_minions):
             self.end_batch()
 
+    def finish_minion(self, minion, failed):
+        '''
+        Size the window from how a minion returned and report the progress
+        '''
+        if self.window is None:
+            return
+        self.window.finish(minion, failed)
+        if self.window.adaptive:
+            self.batch_size = self.window.size
+        data = {'minion': minion, 'metadata': self.metadata}
+        data.update(self.window.stats())
+        self.event.fire_event(data, "salt/batch/{0}/progress".format(self.batch_jid))
+
     def _get_next(self):
         to_run = self.minions.difference(
             self.done_minions).difference(
             self.active).difference(
-            self.timedout_minions)
+            self.timedout_minions).difference(
+            self.skipped_minions)
+        if self.window is not None and self.window.tripped:
+            if to_run:
+                log.error('Batch %s: %s minions failed, skipping the %s left',
+                          self.batch_jid, self.window.failed, len(to_run))
+                self.skipped_minions.update(to_run)
+            return set()
         next_batch_size = min(
             len(to_run),                   # partial batch (all left)
             self.batch_size - len(self.active)  # full batch or available slots
         )
+        if self.window is not None and self.window.group_size:
+            return set(self.window.select(sorted(to_run), next_batch_size))
         return set(list(to_run)[:next_batch_size])
 
     @tornado.gen.coroutine
@@ -144,6 +191,7 @@ class BatchAsync(object):
                 if minion in self.active:
                     self.active.remove(minion)
                 self.timedout_minions.add(minion)
+                self.finish_minion(minion, True)
         running = minions.difference(did_not_return).difference(self.done_minions).difference(self.timedout_minions)
         if running:
             self.event.io_loop.add_callback(self.find_job, running)
@@ -171,10 +219,15 @@ class BatchAsync(object):
         self.event.io_loop.call_later(
             self.batch_presence_ping_timeout or self.opts['gather_job_timeout'],
             self.start_batch)
+        if self.opts.get('batch_group_by'):
+            # Get the grain the minions are grouped by in the same go
+            ping_fun, ping_arg = 'grains.get', [self.opts['batch_group_by']]
+        else:
+            ping_fun, ping_arg = 'test.ping', []
         ping_return = yield self.local.run_job_async(
             self.opts['tgt'],
-            'test.ping',
-            [],
+            ping_fun,
+            ping_arg,
             self.opts.get(
                 'selected_target_option',
                 self.opts.get('tgt_type', 'glob')
@@ -189,6 +242,9 @@ class BatchAsync(object):
     def start_batch(self):
         if not self.initialized:
             self.batch_size = get_bnum(self.opts, self.minions, True)
+            self.window = BatchWindow(self.opts, self.batch_size, len(self.minions))
+            self.window.groups = self.groups
+            self.batch_size = self.window.size
             self.initialized = True
             data = {
                 "available_minions": self.minions,
@@ -206,6 +262,8 @@ class BatchAsync(object):
             "timedout_minions": self.timedout_minions,
             "metadata": self.metadata
         }
+        if self.skipped_minions:
+            data["skipped_minions"] = self.skipped_minions
         self.event.fire_event(data, "salt/batch/{0}/done".format(self.batch_jid))
         self.event.remove_event_handler(self.__event_handler)
 
@@ -226,3 +284,5 @@ class BatchAsync(object):
                 **self.eauth)
             self.event.io_loop.call_later(self.opts['timeout'], self.find_job, set(next_batch))
             self.active = self.active.union(next_batch)
+            if self.window is not None:
+                self.window.start(next_batch)
@@ -68,7 +68,9 @@ except ImportError:
 # pylint: enable=import-error
 
 # Import tornado
+import tornado.concurrent  # pylint: disable=F0401
 import tornado.gen  # pylint: disable=F0401
+import tornado.ioloop  # pylint: disable=F0401
 
 log = logging.getLogger(__name__)
 
@@ -167,10 +169,12 @@ class LocalClient(object):
                 opts=self.opts,
                 listen=False,
                 io_loop=io_loop,
-                keep_loop=keep_loop)
+                keep_loop=keep_loop,
+                tags=['salt/job/', 'syndic/'])
         self.utils = salt.loader.utils(self.opts)
         self.functions = salt.loader.minion_mods(self.opts, utils=self.utils)
         self.returners = salt.loader.returners(self.opts, self.functions)
+        self._return_listener = None
 
     def __read_master_key(self):
         '''
@@ -552,6 +556,9 @@ class LocalClient(object):
             opts['gather_job_timeout'] = kwargs['gather_job_timeout']
         if 'batch_wait' in kwargs:
             opts['batch_wait'] = int(kwargs['batch_wait'])
+        for key in salt.cli.batch.BATCH_WINDOW_OPTS:
+            if key in kwargs:
+                opts[key] = kwargs[key]
 
         eauth = {}
         if 'eauth' in kwargs:
@@ -951,6 +958,79 @@ class LocalClient(object):
             if not was_listening:
                 self.event.close_pub()
 
+    @tornado.gen.coroutine
+    def cmd_iter_async(
+            self,
+            tgt,
+            fun,
+            arg=(),
+            timeout=None,
+            tgt_type='glob',
+            ret='',
+            kwarg=None,
+            callback=None,
+            io_loop=None,
+            **kwargs):
+        '''
+        .. versionadded:: Neon
+
+        Asynchronously execute a command and collect the minion returns as
+        they come in
+
+        The function signature is the same as :py:meth:`cmd_iter` with the
+        following exceptions.
+
+        :param callback: Called with each individual minion return, in the
+            same format as yielded by :py:meth:`cmd_iter`, as soon as it
+            arrives
+
+        :param IOLoop io_loop: The io_loop to collect the returns on, defaults
+            to the current io_loop
+
+        :return: A future resolving to a dict of all of the minion returns
+
+        .. code-block:: python
+
+            >>> ret = yield local.cmd_iter_async('*', 'test.ping', callback=print)
+            {'jerry': {'ret': True}}
+            {'dave': {'ret': True}}
+            >>> ret
+            {'jerry': {'ret': True}, 'dave': {'ret': True}}
+        '''
+        listener = self.return_listener(io_loop)
+        jid = kwargs.pop('jid', '') or salt.utils.jid.gen_jid(self.opts)
+        # start collecting the returns before the job is published, so that
+        # none of them can be missed
+        job = listener.watch(jid,
+                             timeout=self._get_timeout(timeout),
+                             callback=callback,
+                             raw=kwargs.get('raw', False),
+                             expect_minions=kwargs.get('expect_minions', False))
+        try:
+            pub_data = yield self.run_job_async(
+                tgt,
+                fun,
+                arg,
+                tgt_type,
+                ret,
+                timeout,
+                jid=jid,
+                kwarg=kwarg,
+                listen=False,
+                io_loop=listener.io_loop,
+                **kwargs)
+        except Exception:
+            listener.forget(jid)
+            raise
+
+        if not pub_data:
+            listener.forget(jid)
+            raise tornado.gen.Return({})
+
+        job.expect(pub_data['minions'])
+        returns = yield job.done
+        raise tornado.gen.Return(returns)
+
     def cmd_full_return(
             self,
             tgt,
@@ -1062,6 +1142,28 @@ class LocalClient(object):
                                        no_block=True, auto_reconnect=self.auto_reconnect)
             yield raw
 
+    def _get_returns_wait(
+            self,
+            tag,
+            match_type=None,
+            wait=None):
+        '''
+        Like :py:meth:`get_returns_no_block`, but block on the event bus for up
+        to the number of seconds returned by the ``wait`` callable for each
+        event, instead of polling it
+
+        Yield either the raw event data or None
+        '''
+        while True:
+            timeout = wait()
+            if timeout > 0:
+                raw = self.event.get_event(wait=timeout, tag=tag, match_type=match_type, full=True,
+                                           auto_reconnect=self.auto_reconnect)
+            else:
+                raw = self.event.get_event(wait=0.01, tag=tag, match_type=match_type, full=True,
+                                           no_block=True, auto_reconnect=self.auto_reconnect)
+            yield raw
+
     def get_iter_returns(
             self,
             jid,
@@ -1107,9 +1209,32 @@ class LocalClient(object):
         # iterator for this job's return
         if self.opts['order_masters']:
             # If we are a MoM, we need to gather expected minions from downstreams masters.
-            ret_iter = self.get_returns_no_block('(salt/job|syndic/.*)/{0}'.format(jid), 'regex')
+            ret_tag, ret_match = '(salt/job|syndic/.*)/{0}'.format(jid), 'regex'
         else:
-            ret_iter = self.get_returns_no_block('salt/job/{0}'.format(jid))
+            ret_tag, ret_match = 'salt/job/{0}'.format(jid), None
+
+        def next_wait():
+            '''
+            Return how long to wait for the next return, which is until the
+            next deadline or not at all if there is nothing left to wait for
+            '''
+            if len(found.intersection(minions)) >= len(minions):
+                if not self.opts['order_masters']:
+                    return 0
+                deadlines = [gather_syndic_wait]
+            else:
+                deadlines = [timeout_at]
+                deadlines.extend(minion_timeouts.get(id_, timeout_at) for id_ in minions - found)
+            now = time.time()
+            deadlines = [deadline for deadline in deadlines if deadline > now]
+            if not deadlines:
+                return 0
+            return min(deadlines) - now
+
+        if block:
+            ret_iter = self._get_returns_wait(ret_tag, ret_match, next_wait)
+        else:
+            ret_iter = self.get_returns_no_block(ret_tag, ret_match)
         # iterator for the info of this job
         jinfo_iter = []
         # open event jids that need to be un-subscribed from later
@@ -1291,6 +1416,54 @@ class LocalClient(object):
             for minion in missing:
                 yield {minion: {'failed': True}}
 
+    def return_listener(self, io_loop=None, event=None):
+        '''
+        .. versionadded:: Neon
+
+        Return the :py:class:`ReturnListener` collecting the returns of jobs on
+        the given io_loop, defaults to the current io_loop. ``event`` is the
+        event source of a new listener, defaults to its own subscription to
+        the master event bus.
+        '''
+        if io_loop is None:
+            io_loop = tornado.ioloop.IOLoop.current()
+        if self._return_listener is None or self._return_listener.io_loop is not io_loop:
+            if self._return_listener is not None:
+                self._return_listener.destroy()
+            self._return_listener = ReturnListener(self, io_loop, event=event)
+        return self._return_listener
+
+    @tornado.gen.coroutine
+    def get_returns_async(
+            self,
+            jid,
+            minions,
+            timeout=None,
+            callback=None,
+            expect_minions=False,
+            io_loop=None,
+            **kwargs):
+        '''
+        .. versionadded:: Neon
+
+        Asynchronously collect the returns of a published job, without polling
+        the event bus
+
+        :param callback: Called with each individual minion return as soon as
+            it arrives
+
+        :return: A future resolving to a dict of all of the minion returns
+        '''
+        job = self.return_listener(io_loop).watch(
+            jid,
+            minions,
+            timeout=self._get_timeout(timeout),
+            callback=callback,
+            raw=kwargs.get('raw', False),
+            expect_minions=expect_minions)
+        returns = yield job.done
+        raise tornado.gen.Return(returns)
+
     def get_returns(
             self,
             jid,
@@ -1916,6 +2089,8 @@ class LocalClient(object):
         # This IS really necessary!
         # When running tests, if self.events is not destroyed, we leak 2
         # threads per test case which uses self.client
+        if getattr(self, '_return_listener', None) is not None:
+            self._return_listener.destroy()
         if hasattr(self, 'event'):
             # The call below will take care of calling 'self.event.destroy()'
             del self.event
@@ -1926,6 +2101,355 @@ class LocalClient(object):
         self.event.unsubscribe('salt/job/{0}'.format(job_id))
 
 
+class JobReturns(object):
+    '''
+    .. versionadded:: Neon
+
+    The returns of a single job, collected by a :py:class:`ReturnListener`
+
+    ``futures`` maps every minion expected to return to a future which is
+    resolved with its return as soon as it arrives, in the same format as
+    yielded by :py:meth:`LocalClient.cmd_iter`. ``done`` is resolved with a
+    dict of all of the returns once every minion has returned, or once the job
+    is no longer running on the minions which did not.
+
+    With ``store`` set to False the returns are only passed to the
+    ``callback``, the futures are resolved with None and ``done`` with an
+    empty dict, so that memory does not grow with the number of minions.
+
+    ``subscribed`` is the future returned by the ``subscribe`` method of the
+    event source of the :py:class:`ReturnListener` for the tag of the job, if
+    any, which is resolved once the events of the job are delivered.
+    '''
+    def __init__(self, jid, minions=(), timeout=60, callback=None, raw=False,
+                 expect_minions=False, min_wait=0, store=True):
+        self.jid = jid
+        self.callback = callback
+        self.raw = raw
+        self.store = store
+        self.expect_minions = expect_minions
+        self.minions = set()
+        self.found = set()
+        self.missing = set()
+        # minions which reported the job as running in the last liveness check
+        self.running = set()
+        self.probing = False
+        self.returns = {}
+        self.futures = {}
+        self.done = tornado.concurrent.Future()
+        self.subscribed = None
+        now = time.time()
+        self.timeout_at = now + timeout
+        self.min_done_at = now + min_wait
+        self.expect(minions)
+
+    def expect(self, minions):
+        '''
+        Add minions to the minions expected to return
+        '''
+        for minion in minions:
+            if minion not in self.futures:
+                self.minions.add(minion)
+                self.futures[minion] = tornado.concurrent.Future()
+
+    def pending(self):
+        '''
+        Return the minions which have not returned yet
+        '''
+        return self.minions - self.found
+
+    def complete(self, now=None):
+        '''
+        Return True if every expected minion has returned
+        '''
+        if now is None:
+            now = time.time()
+        return bool(self.minions) and not self.pending() and now >= self.min_done_at
+
+    def add(self, tag, data):
+        '''
+        Process an event of the job
+        '''
+        if 'minions' in data:
+            # the minions expected by the job, or by a lower-level master
+            self.expect(data['minions'])
+            self.missing.update(data.get('missing', ()))
+            return
+        if 'return' not in data or 'id' not in data:
+            return
+        minion = data['id']
+        if minion in self.found:
+            return
+        if self.raw:
+            ret = {'tag': tag, 'data': data}
+            minion_ret = ret
+        else:
+            minion_ret = {'ret': data['return']}
+            for key in ('out', 'retcode', 'jid'):
+                if key in data:
+                    minion_ret[key] = data[key]
+            ret = {minion: minion_ret}
+        if self.store:
+            self.returns[minion] = minion_ret
+        log.debug('jid %s return from %s', self.jid, minion)
+        self.found.add(minion)
+        self.expect([minion])
+        self._resolve(minion, ret)
+
+    def _resolve(self, minion, ret):
+        self.futures[minion].set_result(ret if self.store else None)
+        if self.callback is not None:
+            try:
+                self.callback(ret)
+            except Exception:
+                log.exception('Return callback of jid %s failed', self.jid)
+
+    def finish(self):
+        '''
+        Stop waiting for returns and resolve ``done``
+        '''
+        if self.done.done():
+            return
+        failed = self.missing - self.found
+        if self.expect_minions:
+            failed.update(self.pending())
+        for minion in failed:
+            self.expect([minion])
+            if self.store:
+                self.returns[minion] = {'failed': True}
+            self._resolve(minion, {minion: {'failed': True}})
+        for future in six.itervalues(self.futures):
+            if not future.done():
+                future.set_result(None)
+        self.done.set_result(self.returns)
+
+
+class ReturnListener(object):
+    '''
+    .. versionadded:: Neon
+
+    Collect the returns of any number of jobs from a single asynchronous
+    subscription to the master event bus
+
+    Events are dispatched to the :py:class:`JobReturns` of their jid, so the
+    cost of an event does not grow with the number of jobs being waited on.
+    Once the timeout of a job has passed, the minions which did not return are
+    checked for still running it. The checks of all jobs due in the same
+    interval are sent in a single ``saltutil.running`` publish.
+
+    An event source shared with other listeners may be passed as ``event``.
+    If it has a ``subscribe`` method, it is called with the tag prefix of every
+    job waited on and ``unsubscribe`` once the job is done, so that the
+    source only needs to deliver the events of those jobs.
+    '''
+    # seconds between checks of the job timeouts
+    check_interval = 1
+
+    def __init__(self, local, io_loop, event=None):
+        self.local = local
+        self.opts = local.opts
+        self.io_loop = io_loop
+        # jid -> JobReturns
+        self.jobs = {}
+        # jid of a liveness check -> (time it expires, jids of the jobs checked)
+        self.probes = {}
+        self._timer = None
+        self._own_event = event is None
+        if event is None:
+            event = salt.utils.event.get_event(
+                'master',
+                self.opts['sock_dir'],
+                self.opts['transport'],
+                opts=self.opts,
+                listen=True,
+                io_loop=io_loop,
+                tags=['salt/job/', 'syndic/'])
+        self.event = event
+        self.event.set_event_handler(self._handle_event)
+        if self.opts.get('order_masters'):
+            self._subscribe('syndic/')
+
+    def watch(self, jid, minions=(), timeout=None, callback=None, raw=False, expect_minions=False,
+              store=True):
+        '''
+        Start collecting the returns of a job
+
+        :return: The :py:class:`JobReturns` of the job
+        '''
+        if jid in self.jobs:
+            return self.jobs[jid]
+        if timeout is None:
+            timeout = self.opts['timeout']
+        min_wait = self.opts['syndic_wait'] if self.opts.get('order_masters') else 0
+        job = JobReturns(jid, minions, timeout, callback=callback, raw=raw,
+                         expect_minions=expect_minions, min_wait=min_wait, store=store)
+        self.jobs[jid] = job
+        job.subscribed = self._subscribe('salt/job/{0}/'.format(jid))
+        self._schedule()
+        return job
+
+    def forget(self, jid):
+        '''
+        Stop collecting the returns of a job
+        '''
+        job = self.jobs.pop(jid, None)
+        if job is not None:
+            self._subscribe('salt/job/{0}/'.format(jid), False)
+            job.finish()
+
+    def _subscribe(self, tag, subscribe=True):
+        '''
+        Tell an event source which only delivers subscribed tags about a tag
+
+        :return: Whatever the event source returned, None without one
+        '''
+        if not hasattr(self.event, 'subscribe'):
+            return None
+        if subscribe:
+            return self.event.subscribe(tag)
+        return self.event.unsubscribe(tag)
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = self.io_loop.call_later(self.check_interval, self._check)
+
+    @staticmethod
+    def _tag_jid(tag):
+        '''
+        Return the jid of a job event tag
+        '''
+        if not tag.startswith(('salt/job/', 'syndic/')):
+            return None
+        parts = tag.split('/')
+        try:
+            return parts[parts.index('job') + 1]
+        except (ValueError, IndexError):
+            return None
+
+    def _handle_event(self, raw):
+        mtag, data = self.event.unpack(raw, self.event.serial)
+        jid = self._tag_jid(mtag)
+        if jid is None or not isinstance(data, dict):
+            return
+        job = self.jobs.get(jid)
+        if job is not None:
+            job.add(mtag, data)
+            if job.complete():
+                log.debug('jid %s found all minions %s', jid, job.found)
+                self.forget(jid)
+        elif jid in self.probes:
+            self._handle_probe(jid, data)
+
+    def _handle_probe(self, probe_jid, data):
+        running = data.get('return')
+        if 'id' not in data or not isinstance(running, list):
+            return
+        running = set(proc.get('jid') for proc in running if isinstance(proc, dict))
+        for jid in self.probes[probe_jid][1] & running:
+            job = self.jobs.get(jid)
+            if job is not None:
+                job.expect([data['id']])
+                job.running.add(data['id'])
+
+    def _check(self):
+        self._timer = None
+        now = time.time()
+        for probe_jid, (expires, jids) in list(self.probes.items()):
+            if now < expires:
+                continue
+            del self.probes[probe_jid]
+            self._subscribe('salt/job/{0}/'.format(probe_jid), False)
+            for jid in jids:
+                job = self.jobs.get(jid)
+                if job is None:
+                    continue
+                job.probing = False
+                if job.running:
+                    # still running somewhere, check again
+                    job.running = set()
+                    job.timeout_at = now
+                else:
+                    self.forget(jid)
+
+        due = []
+        for jid, job in list(self.jobs.items()):
+            if job.complete(now):
+                self.forget(jid)
+            elif now >= job.timeout_at and not job.probing:
+                due.append(job)
+        if due:
+            self.io_loop.spawn_callback(self._probe, due)
+        if self.jobs:
+            self._schedule()
+
+    @tornado.gen.coroutine
+    def _probe(self, jobs):
+        '''
+        Check whether the minions which did not return are still running the
+        jobs, with a single publish for all of them
+        '''
+        minions = set()
+        for job in jobs:
+            minions.update(job.pending())
+            job.probing = True
+        probe_jid = salt.utils.jid.gen_jid(self.opts)
+        gather_job_timeout = self.opts['gather_job_timeout']
+        if self.opts.get('order_masters'):
+            gather_job_timeout += self.opts.get('syndic_wait', 1)
+        self.probes[probe_jid] = (time.time() + gather_job_timeout,
+                                  set(job.jid for job in jobs))
+        subscribed = self._subscribe('salt/job/{0}/'.format(probe_jid))
+        log.debug('Checking whether jids %s are still running on %s',
+                  sorted(self.probes[probe_jid][1]), sorted(minions))
+        pub_data = {}
+        if minions:
+            # the replies of the minions are lost unless the events of the
+            # probe are delivered before it is published
+            if subscribed is not None:
+                try:
+                    yield tornado.gen.with_timeout(
+                        self.io_loop.time() + gather_job_timeout, subscribed)
+                except tornado.gen.TimeoutError:
+                    log.warning('The event source did not acknowledge the '
+                                'subscription to job %s, publishing it anyway',
+                                probe_jid)
+            try:
+                pub_data = yield self.local.run_job_async(
+                    list(minions),
+                    'saltutil.running',
+                    tgt_type='list',
+                    jid=probe_jid,
+                    timeout=gather_job_timeout,
+                    listen=False,
+                    io_loop=self.io_loop)
+            except Exception as exc:
+                log.error('Failed to check whether jobs are still running: %s', exc)
+        if 'jid' not in pub_data:
+            # nothing to wait for
+            del self.probes[probe_jid]
+            self._subscribe('salt/job/{0}/'.format(probe_jid), False)
+            for job in jobs:
+                self.forget(job.jid)
+
+    def destroy(self):
+        '''
+        Stop listening and resolve the jobs being waited on
+        '''
+        if self._timer is not None:
+            self.io_loop.remove_timeout(self._timer)
+            self._timer = None
+        for jid in list(self.jobs):
+            self.forget(jid)
+        for probe_jid in self.probes:
+            self._subscribe('salt/job/{0}/'.format(probe_jid), False)
+        self.probes = {}
+        if self.event is not None:
+            self.event.remove_event_handler(self._handle_event)
+            if self._own_event:
+                self.event.destroy()
+            self.event = None
+
+
 class FunctionWrapper(dict):
     '''
     Create a function wrapper that looks like the functions dict on the minion
@@ -14,10 +14,12 @@ import hashlib
 import tarfile
 import os
 import re
+import shutil
 import sys
 import time
 import uuid
 import tempfile
+import threading
 import binascii
 import sys
 import datetime
@@ -25,6 +27,7 @@ import datetime
 # Import salt libs
 import salt.output
 import salt.client.ssh.shell
+import salt.client.ssh.state
 import salt.client.ssh.wrapper
 import salt.config
 import salt.exceptions
@@ -55,6 +58,7 @@ from salt.template import compile_template
 # Import 3rd-party libs
 from salt.ext import six
 from salt.ext.six.moves import input  # pylint: disable=import-error,redefined-builtin
+from salt.ext.six.moves import queue  # pylint: disable=import-error
 try:
     import saltwinshell
     HAS_WINSHELL = True
@@ -325,7 +329,14 @@ class SSH(object):
                                              python2_bin=self.opts['python2_bin'],
                                              python3_bin=self.opts['python3_bin'],
                                              extended_cfg=self.opts.get('ssh_ext_alternatives'))
+        if self.opts.get('ssh_thin_components'):
+            # Split the thin once, before the processes of the targets start
+            salt.utils.thin.thin_components(self.opts['cachedir'], form='sha1')
         self.mods = mod_data(self.fsclient)
+        if self.opts.get('ssh_multiplex'):
+            mux_dir = os.path.join(self.opts['cachedir'], 'ssh_mux')
+            if not os.path.isdir(mux_dir):
+                os.makedirs(mux_dir, 0o700)
 
     def _get_roster(self):
         '''
@@ -505,7 +516,7 @@ class SSH(object):
             return {host: stderr}
         return {host: stdout}
 
-    def handle_routine(self, que, opts, host, target, mine=False):
+    def handle_routine(self, que, opts, host, target, mine=False, fsclient=None):
         '''
         Run the routine in a "Thread", put a dict on the queue
         '''
@@ -515,7 +526,7 @@ class SSH(object):
                 opts['argv'],
                 host,
                 mods=self.mods,
-                fsclient=self.fsclient,
+                fsclient=fsclient or self.fsclient,
                 thin=self.thin,
                 mine=mine,
                 **target)
@@ -540,11 +551,94 @@ class SSH(object):
             }
         que.put(ret)
 
+    def _prep_target(self, host):
+        '''
+        Apply the defaults to a target, return the return of the target if it
+        can not be run
+        '''
+        for default in self.defaults:
+            if default not in self.targets[host]:
+                self.targets[host][default] = self.defaults[default]
+        if 'host' not in self.targets[host]:
+            self.targets[host]['host'] = host
+        if self.targets[host].get('winrm') and not HAS_WINSHELL:
+            log_msg = 'Please contact sales@saltstack.com for access to the enterprise saltwinshell module.'
+            log.debug(log_msg)
+            return {'fun_args': [],
+                    'jid': None,
+                    'return': log_msg,
+                    'retcode': 1,
+                    'fun': '',
+                    'id': host}
+        return None
+
+    def handle_thread_routine(self, que, hosts, mine=False):
+        '''
+        Run the routines of the hosts in a thread, until there are no hosts
+        left. The modules loaded by the thread are kept apart from those of the
+        other threads, so that the globals packed into them for one target are
+        not seen by another, and the thread uses a file client of its own.
+        '''
+        namespace = '{0}.thread{1}'.format(
+            salt.loader.LOADED_BASE_NAME,
+            threading.current_thread().ident)
+        with salt.loader.thread_namespace(namespace):
+            fsclient = salt.fileclient.FSClient(self.opts)
+            while True:
+                try:
+                    host = hosts.get(False)
+                except queue.Empty:
+                    return
+                try:
+                    self.handle_routine(que, self.opts, host,
+                                        self.targets[host], mine,
+                                        fsclient=fsclient)
+                except Exception:
+                    error = ('Target \'{0}\' did not return any data, '
+                             'probably due to an error.').format(host)
+                    log.error(error, exc_info=True)
+                    que.put({'id': host, 'ret': error})
+
+    def handle_ssh_threads(self, mine=False):
+        '''
+        Execute the routines of all targets from a pool of ssh_max_procs
+        threads in this process, yielding the returns as they come in
+        '''
+        if not self.targets:
+            log.error('No matching targets found in roster.')
+            return
+        que = queue.Queue()
+        hosts = queue.Queue()
+        for host in self.targets:
+            no_ret = self._prep_target(host)
+            if no_ret is not None:
+                yield {host: no_ret}
+                continue
+            hosts.put(host)
+        pending = hosts.qsize()
+        workers = []
+        for _ in range(min(pending, self.opts.get('ssh_max_procs', 25))):
+            worker = threading.Thread(target=self.handle_thread_routine,
+                                      args=(que, hosts, mine))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        while pending:
+            ret = que.get()
+            pending -= 1
+            yield {ret['id']: ret['ret']}
+        for worker in workers:
+            worker.join()
+
     def handle_ssh(self, mine=False):
         '''
         Spin up the needed threads or processes and execute the subsequent
         routines
         '''
+        if self.opts.get('ssh_engine') == 'thread':
+            for ret in self.handle_ssh_threads(mine=mine):
+                yield ret
+            return
         que = multiprocessing.Queue()
         running = {}
         target_iter = self.targets.__iter__()
@@ -561,22 +655,10 @@ class SSH(object):
                 except StopIteration:
                     init = True
                     continue
-                for default in self.defaults:
-                    if default not in self.targets[host]:
-                        self.targets[host][default] = self.defaults[default]
-                if 'host' not in self.targets[host]:
-                    self.targets[host]['host'] = host
-                if self.targets[host].get('winrm') and not HAS_WINSHELL:
+                no_ret = self._prep_target(host)
+                if no_ret is not None:
                     returned.add(host)
                     rets.add(host)
-                    log_msg = 'Please contact sales@saltstack.com for access to the enterprise saltwinshell module.'
-                    log.debug(log_msg)
-                    no_ret = {'fun_args': [],
-                              'jid': None,
-                              'return': log_msg,
-                              'retcode': 1,
-                              'fun': '',
-                              'id': host}
                     yield {host: no_ret}
                     continue
                 args = (
@@ -673,6 +755,7 @@ class SSH(object):
         else:
             self.returners['{0}.save_load'.format(self.opts['master_job_cache'])](jid, job_load)
 
+        self._init_compile_cache(jid)
         for ret in self.handle_ssh(mine=mine):
             host = next(six.iterkeys(ret))
             self.cache_job(jid, host, ret[host], fun)
@@ -689,6 +772,32 @@ class SSH(object):
                         [jid, 'ret', host],
                         'job'))
             yield ret
+        self._clear_compile_cache()
+
+    def _init_compile_cache(self, jid):
+        '''
+        Set up the directory the targets of the run share compiled states in
+        '''
+        if not self.opts.get('ssh_compile_cache'):
+            return
+        cachedir = os.path.join(self.opts['cachedir'], 'ssh_compile')
+        if os.path.isdir(cachedir):
+            # Remove what runs which did not finish left behind
+            for name in os.listdir(cachedir):
+                path = os.path.join(cachedir, name)
+                if time.time() - os.stat(path).st_mtime > 86400:
+                    shutil.rmtree(path, ignore_errors=True)
+        self.opts['_ssh_compile_dir'] = os.path.join(cachedir, six.text_type(jid))
+        if not os.path.isdir(self.opts['_ssh_compile_dir']):
+            os.makedirs(self.opts['_ssh_compile_dir'], 0o700)
+
+    def _clear_compile_cache(self):
+        '''
+        Remove the states compiled for the run
+        '''
+        cachedir = self.opts.pop('_ssh_compile_dir', None)
+        if cachedir:
+            shutil.rmtree(cachedir, ignore_errors=True)
 
     def cache_job(self, jid, id_, ret, fun):
         '''
@@ -761,6 +870,7 @@ class SSH(object):
         sret = {}
         outputter = self.opts.get('output', 'nested')
         final_exit = 0
+        self._init_compile_cache(jid)
         for ret in self.handle_ssh():
             host = next(six.iterkeys(ret))
             if isinstance(ret[host], dict):
@@ -803,6 +913,7 @@ class SSH(object):
                     salt.utils.event.tagify(
                         [jid, 'ret', host],
                         'job'))
+        self._clear_compile_cache()
         if self.opts.get('static'):
             salt.output.display_output(
                     sret,
@@ -965,6 +1076,18 @@ class Single(object):
         self.deploy_ext()
         return True
 
+    def deploy_components(self, digests):
+        '''
+        Deploy the given component archives of salt-thin to the component
+        store of the target
+        '''
+        compdir = os.path.join(os.path.dirname(self.thin), 'components')
+        self.shell.send(
+            ' '.join(os.path.join(compdir, '{0}.tgz'.format(digest)) for digest in digests),
+            self.thin_dir + '_components/',
+        )
+        return True
+
     def deploy_ext(self):
         '''
         Deploy the ext_mods tarball
@@ -1129,6 +1252,12 @@ class Single(object):
             for grain in self.target['grains']:
                 opts['grains'][grain] = self.target['grains'][grain]
 
+        if self.opts.get('_ssh_compile_dir'):
+            # Record the grains and opts read while compiling states for the
+            # target, and the functions run on it
+            opts['grains'] = salt.client.ssh.state.GrainsTracker(opts['grains'])
+            opts = salt.client.ssh.state.OptsTracker(opts)
+
         opts['pillar'] = data.get('pillar')
         wrapper = salt.client.ssh.wrapper.FunctionWrapper(
             opts,
@@ -1205,6 +1334,11 @@ class Single(object):
         else:
             cachedir = self.opts['cachedir']
         thin_code_digest, thin_sum = salt.utils.thin.thin_sum(cachedir, 'sha1')
+        if self.opts.get('ssh_thin_components') and not self.winrm:
+            components = [[six.text_type(name), six.text_type(digest)] for name, digest in
+                          salt.utils.thin.thin_components(cachedir, thin_sum, 'sha1')]
+        else:
+            components = None
         debug = ''
         if not self.opts.get('log_level'):
             self.opts['log_level'] = 'info'
@@ -1225,6 +1359,8 @@ OPTIONS.wipe = {wipe}
 OPTIONS.tty = {tty}
 OPTIONS.cmd_umask = {cmd_umask}
 OPTIONS.code_checksum = {code_checksum}
+OPTIONS.components = {components}
+OPTIONS.component_dir = '{component_dir}'
 ARGS = {arguments}\n'''.format(config=self.minion_config,
                                delimeter=RSTR,
                                saltdir=self.thin_dir,
@@ -1236,6 +1372,8 @@ ARGS = {arguments}\n'''.format(config=self.minion_config,
                                tty=self.tty,
                                cmd_umask=self.cmd_umask,
                                code_checksum=thin_code_digest,
+                               components=components,
+                               component_dir=self.thin_dir + '_components',
                                arguments=self.argv)
         py_code = SSH_PY_SHIM.replace('#%%OPTS', arg_str)
         if six.PY2:
@@ -1393,6 +1531,13 @@ ARGS = {arguments}\n'''.format(config=self.minion_config,
                 else:
                     while re.search(RSTR_RE, stderr):
                         stderr = re.split(RSTR_RE, stderr, 1)[1].strip()
+            elif 'components' == shim_command and retcode == salt.defaults.exitcodes.EX_THIN_COMPONENTS:
+                if is_retry:
+                    return 'ERROR: Failure deploying thin components: {0}'.format(stdout), stderr, retcode
+                missing = (re.split(r'\r?\n', stdout.strip()) + [''])[1].split()
+                log.debug('Deploying thin components %s', missing)
+                self.deploy_components(missing)
+                return self.cmd_block(is_retry=True)
             elif 'ext_mods' == shim_command:
                 self.deploy_ext()
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
@@ -197,6 +197,26 @@ class Shell(object):
         return ' '.join(['-o {0}'.format(opt)
                           for opt in self.ssh_options])
 
+    def _mux_opts(self):
+        '''
+        Return the options to share a single connection to the target between
+        all of the ssh and scp commands run against it
+        '''
+        if not self.opts.get('ssh_multiplex'):
+            return ''
+        ssh_version = self.opts.get('_ssh_version', (0,))
+        if ssh_version < (5, 6):
+            # ControlPersist is not available
+            return ''
+        # %C is a hash of the connection, which keeps the socket path short
+        control_path = os.path.join(
+            self.opts['cachedir'],
+            'ssh_mux',
+            '%C' if ssh_version >= (6, 7) else '%r@%h:%p')
+        return '-o ControlMaster=auto -o ControlPath={0} -o ControlPersist={1}'.format(
+            control_path,
+            self.opts.get('ssh_control_persist', 60))
+
     def _copy_id_str_old(self):
         '''
         Return the string to execute ssh-copy-id
@@ -261,6 +281,9 @@ class Shell(object):
                                       for item in self.remote_port_forwards.split(',')]))
         if self.ssh_options:
             command.append(self._ssh_opts())
+        mux_opts = self._mux_opts()
+        if mux_opts:
+            command.append(mux_opts)
 
         command.append(cmd)
 
@@ -27,6 +27,7 @@ EX_THIN_DEPLOY = 11
 EX_THIN_CHECKSUM = 12
 EX_MOD_DEPLOY = 13
 EX_SCP_NOT_FOUND = 14
+EX_THIN_COMPONENTS = 15
 EX_CANTCREAT = 73
 
 
@@ -157,6 +158,75 @@ def get_hash(path, form='sha1', chunk_size=4096):
         return hash_obj.hexdigest()
 
 
+def need_components(missing):
+    '''
+    Signal that component archives of the thin need to be deployed to the
+    component store.
+    '''
+    sys.stdout.write("{0}\ncomponents\n{1}\n".format(OPTIONS.delimiter, ' '.join(missing)))
+    sys.exit(EX_THIN_COMPONENTS)
+
+
+def check_components():
+    '''
+    Make sure all of the component archives of the thin are in the component
+    store, and assemble the thin from them if it is out of date.
+    '''
+    store = OPTIONS.component_dir
+    if not os.path.isdir(store):
+        old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+        try:
+            os.makedirs(store)
+        finally:
+            os.umask(old_umask)  # pylint: disable=blacklisted-function
+    if not is_windows():
+        dstat = os.stat(store)
+        if dstat.st_uid != os.geteuid() or dstat.st_mode & 0o077:
+            sys.stderr.write('ERROR: thin component store "{0}" is not private\n'.format(store))
+            sys.exit(EX_CANTCREAT)
+    missing = [digest for _, digest in OPTIONS.components
+               if not os.path.isfile(os.path.join(store, digest + '.tgz'))]
+    if missing:
+        need_components(missing)
+
+    code_checksum_path = os.path.join(OPTIONS.saltdir, 'code-checksum')
+    if os.path.isfile(code_checksum_path):
+        with open(code_checksum_path, 'r') as vpo:
+            if vpo.readline().strip() == OPTIONS.code_checksum:
+                return
+
+    # The thin is missing or out of date, assemble it from the components
+    corrupt = []
+    for _, digest in OPTIONS.components:
+        archive = os.path.join(store, digest + '.tgz')
+        if get_hash(archive, OPTIONS.hashfunc) != digest:
+            os.unlink(archive)
+            corrupt.append(digest)
+    if corrupt:
+        need_components(corrupt)
+    if os.path.exists(OPTIONS.saltdir):
+        shutil.rmtree(OPTIONS.saltdir)
+    old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+    try:
+        os.makedirs(OPTIONS.saltdir)
+        for _, digest in OPTIONS.components:
+            tfile = tarfile.TarFile.gzopen(os.path.join(store, digest + '.tgz'))
+            tfile.extractall(path=OPTIONS.saltdir)
+            tfile.close()
+    finally:
+        os.umask(old_umask)  # pylint: disable=blacklisted-function
+    # Drop the archives of the previous thins from the store
+    current = set(digest + '.tgz' for _, digest in OPTIONS.components)
+    for fname in os.listdir(store):
+        if fname.endswith('.tgz') and fname not in current:
+            try:
+                os.unlink(os.path.join(store, fname))
+            except OSError:
+                pass
+    reset_time(OPTIONS.saltdir)
+    reset_time(store)
+
+
 def unpack_thin(thin_path):
     '''
     Unpack the Salt thin archive.
@@ -268,6 +338,9 @@ def main(argv):  # pylint: disable=W0613
             )
             sys.exit(EX_CANTCREAT)
 
+        if getattr(OPTIONS, 'components', None):
+            check_components()
+
         if not os.path.exists(OPTIONS.saltdir):
             need_deployment()
 
@@ -4,12 +4,14 @@ Create ssh executor system
 '''
 from __future__ import absolute_import, print_function
 # Import python libs
+import copy
+import hashlib
 import logging
 import os
 import tarfile
 import tempfile
 import shutil
-from contextlib import closing
+from contextlib import closing, contextmanager
 
 # Import salt libs
 import salt.client.ssh.shell
@@ -119,6 +121,306 @@ class SSHHighState(salt.state.BaseHighState):
         return ret
 
 
+class GrainsTracker(dict):
+    '''
+    The grains of a target, recording which of them are read. Copies share
+    the record, so the grains read through the copies of the opts made while
+    compiling are caught as well.
+    '''
+    def __init__(self, *args, **kwargs):
+        super(GrainsTracker, self).__init__(*args, **kwargs)
+        self.reads = set()
+        self.read_all = [False]
+
+    def reset(self):
+        '''
+        Forget the grains read so far
+        '''
+        self.reads.clear()
+        self.read_all[0] = False
+
+    def read(self):
+        '''
+        Return the names of the grains read, or None if all of them were
+        '''
+        if self.read_all[0]:
+            return None
+        return sorted(self.reads)
+
+    def _all(self):
+        self.read_all[0] = True
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return super(GrainsTracker, self).__getitem__(key)
+
+    def __contains__(self, key):
+        self.reads.add(key)
+        return super(GrainsTracker, self).__contains__(key)
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return super(GrainsTracker, self).get(key, default)
+
+    def __iter__(self):
+        self._all()
+        return super(GrainsTracker, self).__iter__()
+
+    def keys(self):
+        self._all()
+        return super(GrainsTracker, self).keys()
+
+    def values(self):
+        self._all()
+        return super(GrainsTracker, self).values()
+
+    def items(self):
+        self._all()
+        return super(GrainsTracker, self).items()
+
+    if six.PY2:
+        def iterkeys(self):
+            self._all()
+            return super(GrainsTracker, self).iterkeys()  # pylint: disable=no-member
+
+        def itervalues(self):
+            self._all()
+            return super(GrainsTracker, self).itervalues()  # pylint: disable=no-member
+
+        def iteritems(self):
+            self._all()
+            return super(GrainsTracker, self).iteritems()  # pylint: disable=no-member
+
+    def __eq__(self, other):
+        self._all()
+        return super(GrainsTracker, self).__eq__(other)
+
+    def __ne__(self, other):
+        self._all()
+        return super(GrainsTracker, self).__ne__(other)
+
+    def __repr__(self):
+        self._all()
+        return super(GrainsTracker, self).__repr__()
+
+    __str__ = __repr__
+
+    def data(self):
+        '''
+        Return the grains as a dict, without recording any of them as read
+        '''
+        return dict(dict.items(self))
+
+    def copy(self):
+        self._all()
+        return self.data()
+
+    def _share(self, data):
+        ret = GrainsTracker(data)
+        ret.reads = self.reads
+        ret.read_all = self.read_all
+        return ret
+
+    def __copy__(self):
+        return self._share(self.data())
+
+    def __deepcopy__(self, memo):
+        return self._share(copy.deepcopy(self.data(), memo))
+
+    def __reduce__(self):
+        return (GrainsTracker, (self.data(),))
+
+
+class OptsTracker(dict):
+    '''
+    The opts of a target, recording which of them are read by key, and
+    whether a function was run on the target. Unlike the grains, iterating
+    over the opts is not taken as reading all of them, the loaders and the
+    renderers do it to copy them or to look up their own options. Copies
+    share the record.
+    '''
+    # Not recorded, the grains are tracked on their own and the pillar is part
+    # of the key of the compile cache
+    UNTRACKED = ('grains', 'pillar')
+
+    def __init__(self, *args, **kwargs):
+        super(OptsTracker, self).__init__(*args, **kwargs)
+        self.reads = set()
+        self.remote = [False]
+
+    def reset(self):
+        '''
+        Forget the opts read and the functions run so far
+        '''
+        self.reads.clear()
+        self.remote[0] = False
+
+    def read(self):
+        '''
+        Return the names of the opts read, or None if a function was run on
+        the target, the result of which is specific to it
+        '''
+        if self.remote[0]:
+            return None
+        return sorted(self.reads)
+
+    def ran_remote(self):
+        '''
+        Record that a function was run on the target
+        '''
+        self.remote[0] = True
+
+    def _read(self, key):
+        if key not in self.UNTRACKED:
+            self.reads.add(key)
+
+    def __getitem__(self, key):
+        self._read(key)
+        return super(OptsTracker, self).__getitem__(key)
+
+    def __contains__(self, key):
+        self._read(key)
+        return super(OptsTracker, self).__contains__(key)
+
+    def get(self, key, default=None):
+        self._read(key)
+        return super(OptsTracker, self).get(key, default)
+
+    def data(self):
+        '''
+        Return the opts as a dict, without recording any of them as read
+        '''
+        return dict(dict.items(self))
+
+    def _share(self, data):
+        ret = OptsTracker(data)
+        ret.reads = self.reads
+        ret.remote = self.remote
+        return ret
+
+    def copy(self):
+        return self._share(self.data())
+
+    def __copy__(self):
+        return self._share(self.data())
+
+    def __deepcopy__(self, memo):
+        return self._share(copy.deepcopy(self.data(), memo))
+
+    def __reduce__(self):
+        return (OptsTracker, (self.data(),))
+
+
+def _digest(data):
+    '''
+    Return the hash of JSON serializable data
+    '''
+    return hashlib.sha256(salt.utils.stringutils.to_bytes(
+        salt.utils.json.dumps(data, sort_keys=True, default=repr))).hexdigest()
+
+
+def _grains_digest(grains, names):
+    '''
+    Return the hash of the given grains, or all of them if names is None
+    '''
+    if isinstance(grains, (GrainsTracker, OptsTracker)):
+        grains = grains.data()
+    if names is not None:
+        grains = dict((name, grains.get(name)) for name in names)
+    return _digest(grains)
+
+
+def _profile_digest(grains, names, opts, opt_names):
+    '''
+    Return the hash of the given grains and opts
+    '''
+    digest = _grains_digest(grains, names)
+    if opt_names:
+        digest = _digest([digest, _grains_digest(opts, opt_names)])
+    return digest
+
+
+class CompileCache(object):
+    '''
+    Share the low state compiled for a target, and the state tarball created
+    for it, with the other targets of a salt-ssh run having the same input.
+    The input is the given key data, and the values of the grains which were
+    read while compiling.
+    '''
+    def __init__(self, cachedir, key_data):
+        self.path = os.path.join(cachedir, _digest(key_data))
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                # Created by another target in the meantime
+                if not os.path.isdir(self.path):
+                    raise
+
+    def profiles(self):
+        '''
+        Return the profiles of the grains stored for this input so far
+        '''
+        ret = []
+        for fname in sorted(os.listdir(self.path)):
+            if not fname.endswith('.json'):
+                continue
+            try:
+                with salt.utils.files.fopen(os.path.join(self.path, fname), 'r') as fp_:
+                    ret.append(salt.utils.json.load(fp_))
+            except (IOError, OSError, ValueError):
+                continue
+        return ret
+
+    @contextmanager
+    def lock(self):
+        '''
+        Hold the lock of this input, used for the first compilation so that
+        targets started at the same time do not all compile it
+        '''
+        with salt.utils.files.flopen(os.path.join(self.path, '.lock'), 'w'):
+            yield
+
+    def fetch(self, grains, opts=None):
+        '''
+        Return the low state, a copy of the state tarball and its hash stored
+        for the given grains and opts, or None
+        '''
+        for profile in self.profiles():
+            digest = _profile_digest(grains, profile['grains'],
+                                     opts, profile.get('opts'))
+            if digest != profile['digest']:
+                continue
+            trans_tar = salt.utils.files.mkstemp(dir=self.path, suffix='.tgz')
+            os.remove(trans_tar)
+            try:
+                os.link(os.path.join(self.path, profile['tar']), trans_tar)
+            except OSError:
+                shutil.copy(os.path.join(self.path, profile['tar']), trans_tar)
+            return profile['chunks'], trans_tar, profile['sum']
+        return None
+
+    def store(self, grains, names, chunks, trans_tar, trans_tar_sum,
+              opts=None, opt_names=None):
+        '''
+        Store the low state and state tarball compiled for the given grains and
+        opts, of which only the named ones were read
+        '''
+        digest = _profile_digest(grains, names, opts, opt_names)
+        name = _digest([names, opt_names or [], digest])
+        profile = {'grains': names,
+                   'opts': opt_names or [],
+                   'digest': digest,
+                   'chunks': chunks,
+                   'tar': '{0}.tgz'.format(name),
+                   'sum': trans_tar_sum}
+        shutil.copy(trans_tar, os.path.join(self.path, profile['tar']))
+        path = os.path.join(self.path, '{0}.json'.format(name))
+        with salt.utils.files.fopen(path + '.tmp', 'w') as fp_:
+            salt.utils.json.dump(profile, fp_)
+        shutil.move(path + '.tmp', path)
+
+
 def lowstate_file_refs(chunks, extras=''):
     '''
     Create a list of file ref objects to reconcile
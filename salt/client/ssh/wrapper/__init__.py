@@ -15,6 +15,7 @@ import salt.loader
 import salt.utils.data
 import salt.utils.json
 import salt.client.ssh
+import salt.client.ssh.state
 
 # Import 3rd-party libs
 from salt.ext import six
@@ -102,6 +103,9 @@ class FunctionWrapper(object):
             '''
             The remote execution function
             '''
+            if isinstance(self.opts, salt.client.ssh.state.OptsTracker):
+                # The return is specific to the target
+                self.opts.ran_remote()
             argv = [cmd]
             argv.extend([salt.utils.json.dumps(arg) for arg in args])
             argv.extend(
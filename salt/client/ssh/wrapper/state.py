@@ -167,6 +167,104 @@ def _cleanup_slsmod_high_data(high_data):
                 stateconf_data['slsmod'] = None
 
 
+def _pack_state(compile_, opts, kwargs, roster_grains=None):
+    '''
+    Compile the low state and create the tar containing the state pkg and
+    relevant files for it
+    '''
+    chunks = compile_()
+    # Check for errors
+    for chunk in chunks:
+        if not isinstance(chunk, dict):
+            return chunks, None, None
+    file_refs = salt.client.ssh.state.lowstate_file_refs(
+            chunks,
+            _merge_extra_filerefs(
+                kwargs.get('extra_filerefs', ''),
+                opts.get('extra_filerefs', '')
+                )
+            )
+    _cleanup_slsmod_low_data(chunks)
+    trans_tar = salt.client.ssh.state.prep_trans_tar(
+            __context__['fileclient'],
+            chunks,
+            file_refs,
+            __pillar__,
+            __salt__.kwargs['id_'],
+            roster_grains)
+    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts['hash_type'])
+    return chunks, trans_tar, trans_tar_sum
+
+
+# The options changing how the states are compiled, which are part of the key
+# of the compile cache. The others, like the id of the target, are not.
+COMPILE_OPTS = (
+    'saltenv',
+    'pillarenv',
+    'file_roots',
+    'renderer',
+    'jinja_env',
+    'jinja_sls_env',
+    'state_top',
+    'state_top_saltenv',
+    'top_file_merging_strategy',
+    'env_order',
+    'default_top',
+    'state_auto_order',
+    'extra_filerefs',
+)
+
+
+def _compile_state(compile_, key_data, opts, kwargs, roster_grains=None):
+    '''
+    Compile the low state with ``compile_`` and create the state tarball for
+    it. With ``ssh_compile_cache`` enabled both are shared between the targets
+    of the run with the same key data, pillar, roster grains, compile options
+    and values of the grains and opts read while compiling. The states which
+    run functions on the target while compiling are not shared.
+
+    Returns the low state and the path and hash of the tarball, which are
+    None if the low state has errors.
+    '''
+    cachedir = __context__['master_opts'].get('_ssh_compile_dir')
+    if not cachedir \
+            or not isinstance(__grains__, salt.client.ssh.state.GrainsTracker) \
+            or not isinstance(__opts__, salt.client.ssh.state.OptsTracker):
+        return _pack_state(compile_, opts, kwargs, roster_grains)
+
+    cache = salt.client.ssh.state.CompileCache(
+            cachedir,
+            [key_data, __pillar__, roster_grains,
+             dict((name, opts.get(name)) for name in COMPILE_OPTS)])
+
+    def _compile():
+        __grains__.reset()
+        __opts__.reset()
+        ret = _pack_state(compile_, opts, kwargs, roster_grains)
+        opt_names = __opts__.read()
+        if opt_names is None:
+            # The states ran functions on the target while rendering, what they
+            # compile to is specific to this target
+            log.debug('Not sharing the state compiled with the functions run on the target')
+        elif ret[1] is not None:
+            cache.store(__grains__, __grains__.read(), *ret,
+                        opts=__opts__, opt_names=opt_names)
+        return ret
+
+    ret = cache.fetch(__grains__, __opts__)
+    if ret is not None:
+        log.debug('Using the state compiled for a target with the same input')
+        return ret
+    if cache.profiles():
+        # Compiled for other grains already, no need to wait for anyone
+        return _compile()
+    with cache.lock():
+        ret = cache.fetch(__grains__, __opts__)
+        if ret is not None:
+            return ret
+        return _compile()
+
+
 def _parse_mods(mods):
     '''
     Parse modules.
@@ -185,55 +283,50 @@ def sls(mods, saltenv='base', test=None, exclude=None, **kwargs):
     __opts__['grains'] = __grains__
     __pillar__.update(kwargs.get('pillar', {}))
     opts = salt.utils.state.get_sls_opts(__opts__, **kwargs)
-    st_ = salt.client.ssh.state.SSHHighState(
-            opts,
-            __pillar__,
-            __salt__,
-            __context__['fileclient'])
-    st_.push_active()
     mods = _parse_mods(mods)
-    high_data, errors = st_.render_highstate({saltenv: mods})
-    if exclude:
-        if isinstance(exclude, six.string_types):
-            exclude = exclude.split(',')
-        if '__exclude__' in high_data:
-            high_data['__exclude__'].extend(exclude)
-        else:
-            high_data['__exclude__'] = exclude
-    high_data, ext_errors = st_.state.reconcile_extend(high_data)
-    errors += ext_errors
-    errors += st_.state.verify_high(high_data)
-    if errors:
-        return errors
-    high_data, req_in_errors = st_.state.requisite_in(high_data)
-    errors += req_in_errors
-    high_data = st_.state.apply_exclude(high_data)
-    # Verify that the high data is structurally sound
-    if errors:
-        return errors
-    # Compile and verify the raw chunks
-    chunks = st_.state.compile_high_data(high_data)
-    file_refs = salt.client.ssh.state.lowstate_file_refs(
-            chunks,
-            _merge_extra_filerefs(
-                kwargs.get('extra_filerefs', ''),
-                opts.get('extra_filerefs', '')
-                )
-            )
+
+    def _compile():
+        st_ = salt.client.ssh.state.SSHHighState(
+                opts,
+                __pillar__,
+                __salt__,
+                __context__['fileclient'])
+        st_.push_active()
+        high_data, errors = st_.render_highstate({saltenv: mods})
+        excludes = exclude
+        if excludes:
+            if isinstance(excludes, six.string_types):
+                excludes = excludes.split(',')
+            if '__exclude__' in high_data:
+                high_data['__exclude__'].extend(excludes)
+            else:
+                high_data['__exclude__'] = excludes
+        high_data, ext_errors = st_.state.reconcile_extend(high_data)
+        errors += ext_errors
+        errors += st_.state.verify_high(high_data)
+        if errors:
+            return errors
+        high_data, req_in_errors = st_.state.requisite_in(high_data)
+        errors += req_in_errors
+        high_data = st_.state.apply_exclude(high_data)
+        # Verify that the high data is structurally sound
+        if errors:
+            return errors
+        # Compile and verify the raw chunks
+        return st_.state.compile_high_data(high_data)
 
     roster = salt.roster.Roster(opts, opts.get('roster', 'flat'))
     roster_grains = roster.opts['grains']
 
     # Create the tar containing the state pkg and relevant files.
-    _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-            __context__['fileclient'],
-            chunks,
-            file_refs,
-            __pillar__,
-            st_kwargs['id_'],
+    chunks, trans_tar, trans_tar_sum = _compile_state(
+            _compile,
+            ['sls', mods, saltenv, exclude, opts.get('pillarenv'), kwargs.get('extra_filerefs')],
+            opts,
+            kwargs,
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts['hash_type'])
+    if trans_tar is None:
+        return chunks
     cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
             opts['thin_dir'],
             test,
@@ -686,33 +779,23 @@ def highstate(test=None, **kwargs):
             __salt__,
             __context__['fileclient'])
     st_.push_active()
-    chunks = st_.compile_low_chunks()
-    file_refs = salt.client.ssh.state.lowstate_file_refs(
-            chunks,
-            _merge_extra_filerefs(
-                kwargs.get('extra_filerefs', ''),
-                opts.get('extra_filerefs', '')
-                )
-            )
-    # Check for errors
-    for chunk in chunks:
-        if not isinstance(chunk, dict):
-            __context__['retcode'] = 1
-            return chunks
+    # The top matches are part of the key of the compile cache, they are
+    # passed on so that the top file is only rendered once
+    matches = st_.top_matches(st_.get_top())
 
     roster = salt.roster.Roster(opts, opts.get('roster', 'flat'))
     roster_grains = roster.opts['grains']
 
     # Create the tar containing the state pkg and relevant files.
-    _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-            __context__['fileclient'],
-            chunks,
-            file_refs,
-            __pillar__,
-            st_kwargs['id_'],
+    chunks, trans_tar, trans_tar_sum = _compile_state(
+            lambda: st_.compile_low_chunks(matches=matches),
+            ['highstate', matches, opts.get('pillarenv'), kwargs.get('extra_filerefs')],
+            opts,
+            kwargs,
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts['hash_type'])
+    if trans_tar is None:
+        __context__['retcode'] = 1
+        return chunks
     cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
             opts['thin_dir'],
             test,
@@ -220,6 +220,10 @@ VALID_OPTS = immutabletypes.freeze({
     # Flag to cache jobs locally.
     'cache_jobs': bool,
 
+    # Keep a snapshot of the installed packages under the cachedir, reused by
+    # the pkg modules until the package database changes
+    'pkg_snapshot_cache': bool,
+
     # The path to the salt configuration file
     'conf_file': six.string_types,
 
@@ -286,6 +290,10 @@ VALID_OPTS = immutabletypes.freeze({
     # a master for remote execution.
     'use_master_when_local': bool,
 
+    # Store the files cached from the master once per content under cachedir/file_blobs, and
+    # hardlink the cache entries with the same content to it
+    'file_cache_dedup': bool,
+
     # A map of saltenvs and fileserver backend locations
     'file_roots': dict,
 
@@ -363,6 +371,13 @@ VALID_OPTS = immutabletypes.freeze({
     # before trying to generate a new process.
     'process_count_max_sleep_secs': int,
 
+    # The number of pre-forked processes running the jobs of the minion. With 0,
+    # a process is forked for each job.
+    'minion_job_workers': int,
+
+    # The number of jobs run by a process of minion_job_workers before it is replaced
+    'minion_job_worker_max_jobs': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -484,6 +499,17 @@ VALID_OPTS = immutabletypes.freeze({
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # Merge the pkg states which aren't ordered apart by requisites into one
+    # query and transaction of the package manager
+    'state_pkg_batch': bool,
+
+    # Reuse the return codes of the onlyif and unless commands of the states
+    # for state_check_cache_ttl seconds, until a state makes changes. Keep them
+    # in the cachedir between state runs with state_check_cache_persist.
+    'state_check_cache': bool,
+    'state_check_cache_ttl': int,
+    'state_check_cache_persist': bool,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -565,9 +591,32 @@ VALID_OPTS = immutabletypes.freeze({
     # Events matching a tag in this list should never be sent to an event returner.
     'event_return_blacklist': list,
 
+    # The maximum number of events held in memory for each event returner. When
+    # a returner falls behind, events beyond this limit are spilled to disk (if
+    # `event_return_spill` is set) or dropped, oldest first, with a warning.
+    # 0 means unbounded.
+    'event_return_max_queue_size': int,
+
+    # The number of times a failed event returner flush is retried, and the
+    # number of seconds to wait between retries
+    'event_return_retries': int,
+    'event_return_retry_interval': (int, float),
+
+    # Write batches of events that an event returner could not store to the
+    # master cachedir and replay them once the returner accepts events again
+    'event_return_spill': bool,
+
+    # The interval, in seconds, at which event returner queue statistics are
+    # fired on the event bus. 0 disables the statistics events.
+    'event_return_stats_interval': int,
+
     # default match type for filtering events tags: startswith, endswith, find, regex, fnmatch
     'event_match_type': six.string_types,
 
+    # Tag prefixes the master event bus is sharded on. Each prefix is served by
+    # its own event publisher process.
+    'event_publisher_shards': list,
+
     # This pidfile to write out to when a daemon starts
     'pidfile': six.string_types,
 
@@ -824,6 +873,10 @@ VALID_OPTS = immutabletypes.freeze({
     # filesystem
     'eauth_tokens': six.string_types,
 
+    # The number of seconds validated eauth tokens and the auth lists of users are kept in
+    # memory by every process checking them. 0 disables the cache.
+    'eauth_cache_ttl': int,
+
     # The number of open files a daemon is allowed to have open. Frequently needs to be increased
     # higher than the system default in order to account for the way zeromq consumes file handles.
     'max_open_files': int,
@@ -879,6 +932,12 @@ VALID_OPTS = immutabletypes.freeze({
     # The queue size for workers in the reactor
     'reactor_worker_hwm': int,
 
+    # Dedicated worker pools per reaction type (local, runner, wheel, caller)
+    'reactor_worker_pools': dict,
+
+    # The TTL for the cache of reactions rendered from identical events
+    'reactor_render_cache_ttl': int,
+
     # Defines engines. See https://docs.saltstack.com/en/latest/topics/engines/
     'engines': list,
 
@@ -1015,6 +1074,17 @@ VALID_OPTS = immutabletypes.freeze({
     # The length that the syndic event queue must hit before events are popped off and forwarded
     'syndic_jid_forward_cache_hwm': int,
 
+    # The number of minion returns aggregated by a syndic which are forwarded without waiting
+    # for syndic_event_forward_timeout
+    'syndic_forward_batch_size': int,
+
+    # The number of minion returns a syndic holds in memory before spilling them to disk
+    # when the masters of masters can't keep up
+    'syndic_max_buffered_returns': int,
+
+    # Compress the returns forwarded by a syndic
+    'syndic_forward_compress': bool,
+
     # Salt SSH configuration
     'ssh_passwd': six.string_types,
     'ssh_port': six.string_types,
@@ -1028,6 +1098,11 @@ VALID_OPTS = immutabletypes.freeze({
     'ssh_log_file': six.string_types,
     'ssh_config_file': six.string_types,
     'ssh_merge_pillar': bool,
+    'ssh_engine': six.string_types,
+    'ssh_multiplex': bool,
+    'ssh_control_persist': int,
+    'ssh_thin_components': bool,
+    'ssh_compile_cache': bool,
 
     'cluster_mode': bool,
     'sqlite_queue_dir': six.string_types,
@@ -1061,6 +1136,10 @@ VALID_OPTS = immutabletypes.freeze({
     # Can be set to override the python_shell=False default in the cmd module
     'cmd_safe': bool,
 
+    # Spawn the commands of the cmd module from a small helper process instead
+    # of forking the minion
+    'cmd_forkserver': bool,
+
     # Used by salt-api for master requests timeout
     'rest_timeout': int,
 
@@ -1251,6 +1330,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'cachedir': os.path.join(salt.syspaths.CACHE_DIR, 'minion'),
     'append_minionid_config_dirs': [],
     'cache_jobs': False,
+    'pkg_snapshot_cache': True,
     'grains_blacklist': [],
     'grains_cache': False,
     'grains_cache_expiration': 300,
@@ -1293,6 +1373,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'file_client': 'remote',
     'local': False,
     'use_master_when_local': False,
+    'file_cache_dedup': False,
     'file_roots': {
         'base': [salt.syspaths.BASE_FILE_ROOTS_DIR,
                  salt.syspaths.SPM_FORMULA_PATH]
@@ -1384,6 +1465,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'multiprocessing': True,
     'process_count_max': -1,
     'process_count_max_sleep_secs': 10,
+    'minion_job_workers': 0,
+    'minion_job_worker_max_jobs': 100,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
@@ -1421,6 +1504,10 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_pkg_batch': True,
+    'state_check_cache': False,
+    'state_check_cache_ttl': 300,
+    'state_check_cache_persist': False,
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1464,6 +1551,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_worker_pools': {},
+    'reactor_render_cache_ttl': 0,
     'engines': [],
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
@@ -1491,6 +1580,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'zmq_monitor': False,
     'cache_sreqs': True,
     'cmd_safe': True,
+    'cmd_forkserver': False,
     'sudo_user': '',
     'http_connect_timeout': 20.0,  # tornado default - 20 seconds
     'http_request_timeout': 1 * 60 * 60.0,  # 1 hour
@@ -1679,6 +1769,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'keep_acl_in_token': False,
     'eauth_acl_module': '',
     'eauth_tokens': 'localfs',
+    'eauth_cache_ttl': 0,
     'extension_modules': os.path.join(salt.syspaths.CACHE_DIR, 'master', 'extmods'),
     'module_dirs': [],
     'file_recv': False,
@@ -1740,11 +1831,20 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_worker_pools': {},
+    'reactor_render_cache_ttl': 0,
     'engines': [],
     'event_return': '',
     'event_return_queue': 0,
+    'event_return_queue_max_seconds': 0,
     'event_return_whitelist': [],
     'event_return_blacklist': [],
+    'event_return_max_queue_size': 0,
+    'event_return_retries': 3,
+    'event_return_retry_interval': 1,
+    'event_return_spill': False,
+    'event_return_stats_interval': 60,
+    'event_publisher_shards': [],
     'event_match_type': 'startswith',
     'runner_returns': True,
     'serial': 'msgpack',
@@ -1798,6 +1898,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'gather_job_timeout': 10,
     'syndic_event_forward_timeout': 0.5,
     'syndic_jid_forward_cache_hwm': 100,
+    'syndic_forward_batch_size': 1000,
+    'syndic_max_buffered_returns': 10000,
+    'syndic_forward_compress': False,
     'regen_thin': False,
     'ssh_passwd': '',
     'ssh_priv_passwd': '',
@@ -1811,6 +1914,11 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'ssh_identities_only': False,
     'ssh_log_file': os.path.join(salt.syspaths.LOGS_DIR, 'ssh'),
     'ssh_config_file': os.path.join(salt.syspaths.HOME_DIR, '.ssh', 'config'),
+    'ssh_engine': 'process',
+    'ssh_multiplex': False,
+    'ssh_control_persist': 60,
+    'ssh_thin_components': False,
+    'ssh_compile_cache': False,
     'cluster_mode': False,
     'sqlite_queue_dir': os.path.join(salt.syspaths.CACHE_DIR, 'master', 'queues'),
     'queue_dirs': [],
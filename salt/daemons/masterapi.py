@@ -475,6 +475,7 @@ class RemoteFuncs(object):
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
         self._file_list = fs_.file_list
+        self._file_manifest = fs_.file_manifest
         self._file_list_emptydirs = fs_.file_list_emptydirs
         self._dir_list = fs_.dir_list
         self._symlink_list = fs_.symlink_list
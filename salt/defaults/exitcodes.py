@@ -19,6 +19,7 @@ EX_THIN_DEPLOY = 11
 EX_THIN_CHECKSUM = 12
 EX_MOD_DEPLOY = 13
 EX_SCP_NOT_FOUND = 14
+EX_THIN_COMPONENTS = 15
 
 # One of a collection failed
 EX_AGGREGATE = 20
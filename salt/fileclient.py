@@ -31,6 +31,7 @@ import salt.utils.hashutils
 import salt.utils.http
 import salt.utils.path
 import salt.utils.platform
+import salt.utils.profile
 import salt.utils.stringutils
 import salt.utils.templates
 import salt.utils.url
@@ -298,6 +299,12 @@ class Client(object):
         '''
         return []
 
+    def file_manifest(self, saltenv='base', prefix=''):
+        '''
+        This function must be overwritten
+        '''
+        return {}
+
     def dir_list(self, saltenv='base', prefix=''):
         '''
         This function must be overwritten
@@ -1032,6 +1039,8 @@ class RemoteClient(Client):
         Client.__init__(self, opts)
         self._closing = False
         self.channel = salt.transport.client.ReqChannel.factory(self.opts)
+        # (saltenv, prefix) -> manifest of the files on the master
+        self.manifests = {}
         if hasattr(self.channel, 'auth'):
             self.auth = self.channel.auth
         else:
@@ -1077,7 +1086,12 @@ class RemoteClient(Client):
         if senv:
             saltenv = senv
 
-        if not salt.utils.platform.is_windows():
+        manifest_entry = self._manifest_entry(path, saltenv)
+        if manifest_entry is not None:
+            hash_server = {'hsum': manifest_entry['hsum'],
+                           'hash_type': manifest_entry['hash_type']}
+            mode_server = manifest_entry['mode']
+        elif not salt.utils.platform.is_windows():
             hash_server, stat_server = self.hash_and_stat_file(path, saltenv)
             try:
                 mode_server = stat_server[0]
@@ -1124,7 +1138,10 @@ class RemoteClient(Client):
             '\'%s\'', saltenv, dest2check, path
         )
 
-        if dest2check and os.path.isfile(dest2check):
+        if dest2check and os.path.isfile(dest2check) \
+                and (manifest_entry is None
+                     or manifest_entry['size'] is None
+                     or manifest_entry['size'] == os.path.getsize(dest2check)):
             if not salt.utils.platform.is_windows():
                 hash_local, stat_local = \
                     self.hash_and_stat_file(dest2check, saltenv)
@@ -1137,12 +1154,47 @@ class RemoteClient(Client):
                 mode_local = None
 
             if hash_local == hash_server:
+                salt.utils.profile.count('file_cache_hits')
+                return dest2check
+
+        # Reuse the content if it was already downloaded for another path or
+        # saltenv
+        blob = self._blob_path(hash_server)
+        if blob and dest2check and os.path.isfile(blob) \
+                and (makedirs or os.path.isdir(os.path.dirname(dest2check))):
+            try:
+                if not self._check_blob(blob, hash_server):
+                    os.remove(blob)
+                    raise IOError('the cached content does not match its hash')
+                if not os.path.isdir(os.path.dirname(dest2check)):
+                    os.makedirs(os.path.dirname(dest2check))
+                if dest:
+                    salt.utils.files.clonefile(blob, dest2check)
+                else:
+                    old_blob = self._linked_blob(dest2check, hash_server)
+                    self._link_blob(blob, dest2check)
+                    self._release_blob(old_blob)
+                log.debug(
+                    'In saltenv \'%s\', found the content of \'%s\' in the '
+                    'file cache', saltenv, path
+                )
+                salt.utils.profile.count('file_cache_hits')
                 return dest2check
+            except (IOError, OSError) as exc:
+                log.debug('Failed to reuse the cached content of %s: %s',
+                          path, exc)
 
         log.debug(
             'Fetching file from saltenv \'%s\', ** attempting ** \'%s\'',
             saltenv, path
         )
+        salt.utils.profile.count('file_fetches')
+        # Only the files of the cache are added to the content addressed
+        # cache, the files written to dest may be modified in place
+        to_cache = not dest
+        old_blob = None
+        if to_cache and dest2check:
+            old_blob = self._linked_blob(dest2check, hash_server)
         d_tries = 0
         transport_tries = 0
         path = self._check_proto(path)
@@ -1193,7 +1245,9 @@ class RemoteClient(Client):
                                 saltenv,
                                 cachedir=cachedir) as cache_dest:
                             dest = cache_dest
-                            with salt.utils.files.fopen(cache_dest, 'wb+') as ofile:
+                            # Replace the file instead of truncating it, it
+                            # may be linked to the content addressed cache
+                            with salt.utils.atomicfile.atomic_open(cache_dest, 'wb+') as ofile:
                                 ofile.write(data['data'])
                     if 'hsum' in data and d_tries < 3:
                         # Master has prompted a file verification, if the
@@ -1252,14 +1306,122 @@ class RemoteClient(Client):
                 'Fetching file from saltenv \'%s\', ** done ** \'%s\'',
                 saltenv, path
             )
+            if to_cache:
+                self._store_blob(dest, hash_server)
         else:
             log.debug(
                 'In saltenv \'%s\', we are ** missing ** the file \'%s\'',
                 saltenv, path
             )
+        if to_cache:
+            # The file of the cache was replaced by then
+            self._release_blob(old_blob)
 
         return dest
 
+    def _blob_path(self, hash_server):
+        '''
+        Return the location of the content with the hash reported by the
+        master in the content addressed cache, or None if it isn't enabled
+        '''
+        if not self.opts.get('file_cache_dedup'):
+            return None
+        try:
+            hsum = hash_server['hsum']
+            hash_type = hash_server['hash_type']
+        except (KeyError, TypeError):
+            return None
+        if not all(isinstance(x, six.string_types) and x.isalnum()
+                   for x in (hsum, hash_type)):
+            return None
+        return os.path.join(self.opts['cachedir'], 'file_blobs', hash_type,
+                            hsum[:2], hsum)
+
+    @staticmethod
+    def _link_blob(blob, dest):
+        '''
+        Atomically replace dest with a hardlink to blob, or with a copy of it
+        if it can't be linked
+        '''
+        tmp = salt.utils.files.mkstemp(dir=os.path.dirname(dest))
+        try:
+            os.remove(tmp)
+            try:
+                os.link(blob, tmp)
+            except (AttributeError, OSError):
+                salt.utils.files.clonefile(blob, tmp)
+            salt.utils.files.rename(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @staticmethod
+    def _check_blob(path, hash_server):
+        '''
+        Return whether the content of a file matches the hash reported by the
+        master
+        '''
+        try:
+            return salt.utils.hashutils.get_hash(
+                path, hash_server['hash_type']) == hash_server['hsum']
+        except (IOError, OSError, KeyError, TypeError, ValueError):
+            return False
+
+    def _store_blob(self, path, hash_server):
+        '''
+        Add a file of the cache to the content addressed cache
+        '''
+        blob = self._blob_path(hash_server)
+        if blob is None or os.path.isfile(blob):
+            return
+        try:
+            if not self._check_blob(path, hash_server):
+                # The file changed on the master since it was hashed
+                return
+            with salt.utils.files.set_umask(0o077):
+                if not os.path.isdir(os.path.dirname(blob)):
+                    os.makedirs(os.path.dirname(blob))
+            self._link_blob(path, blob)
+        except (IOError, OSError) as exc:
+            log.debug('Failed to add %s to the file cache: %s', path, exc)
+
+    def _linked_blob(self, path, hash_server):
+        '''
+        Return the blob a file of the cache about to be replaced is linked to,
+        or None
+        '''
+        if not self.opts.get('file_cache_dedup'):
+            return None
+        try:
+            stat_path = os.stat(path)
+            if stat_path.st_nlink < 2:
+                return None
+            blob = self._blob_path({
+                'hsum': salt.utils.hashutils.get_hash(path, hash_server['hash_type']),
+                'hash_type': hash_server['hash_type']})
+            if blob is None:
+                return None
+            stat_blob = os.stat(blob)
+            if (stat_blob.st_ino, stat_blob.st_dev) == \
+                    (stat_path.st_ino, stat_path.st_dev):
+                return blob
+        except (IOError, OSError, KeyError, TypeError):
+            pass
+        return None
+
+    @staticmethod
+    def _release_blob(blob):
+        '''
+        Remove a blob once no file of the cache links to it anymore
+        '''
+        if blob is None:
+            return
+        try:
+            if os.stat(blob).st_nlink == 1:
+                os.remove(blob)
+        except (IOError, OSError):
+            pass
+
     def file_list(self, saltenv='base', prefix=''):
         '''
         List the files on the master
@@ -1270,6 +1432,39 @@ class RemoteClient(Client):
         return salt.utils.data.decode(self.channel.send(load)) if six.PY2 \
             else self.channel.send(load)
 
+    def file_manifest(self, saltenv='base', prefix=''):
+        '''
+        Return the hash, mode and size of the files under prefix on the
+        master. The manifest is kept by the client, and the files it lists are
+        checked against it instead of asking the master for each of them.
+        '''
+        if (saltenv, prefix) not in self.manifests:
+            load = {'saltenv': saltenv,
+                    'prefix': prefix,
+                    'cmd': '_file_manifest'}
+            manifest = self.channel.send(load)
+            if not isinstance(manifest, dict):
+                # The master doesn't know about manifests
+                manifest = {}
+            self.manifests[(saltenv, prefix)] = \
+                salt.utils.data.decode(manifest) if six.PY2 else manifest
+        return self.manifests[(saltenv, prefix)]
+
+    def _manifest_entry(self, path, saltenv):
+        '''
+        Return the entry of a salt:// path in the manifests fetched from the
+        master, or None if it isn't in any of them
+        '''
+        if not self.manifests or not path.startswith('salt://'):
+            return None
+        path, senv = salt.utils.url.parse(path)
+        if senv:
+            saltenv = senv
+        for (menv, prefix), manifest in six.iteritems(self.manifests):
+            if menv == saltenv and path.startswith(prefix) and path in manifest:
+                return manifest[path]
+        return None
+
     def file_list_emptydirs(self, saltenv='base', prefix=''):
         '''
         List the empty dirs on the master
@@ -1304,6 +1499,10 @@ class RemoteClient(Client):
         '''
         Common code for hashing and stating files
         '''
+        manifest_entry = self._manifest_entry(path, saltenv)
+        if manifest_entry is not None:
+            return {'hsum': manifest_entry['hsum'],
+                    'hash_type': manifest_entry['hash_type']}
         try:
             path = self._check_proto(path)
         except MinionError as err:
@@ -1413,6 +1612,7 @@ class FSClient(RemoteClient):
         Client.__init__(self, opts)  # pylint: disable=W0233
         self._closing = False
         self.channel = salt.fileserver.FSChan(opts)
+        self.manifests = {}
         self.auth = DumbAuth()
 
 
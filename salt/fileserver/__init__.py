@@ -793,6 +793,35 @@ class Fileserver(object):
             ret = [f for f in ret if f.startswith(prefix)]
         return sorted(ret)
 
+    @ensure_unicode_args
+    def file_manifest(self, load):
+        '''
+        Return the hash, mode and size of the files under a prefix of an
+        environment, so that the files of a whole tree can be checked against
+        the master with a single request
+        '''
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if 'saltenv' not in load:
+            return {}
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        ret = {}
+        for path in self.file_list({'saltenv': load['saltenv'],
+                                    'prefix': load.get('prefix', '')}):
+            hash_result, stat_result = self.file_hash_and_stat(
+                {'path': path, 'saltenv': load['saltenv']})
+            if not hash_result:
+                continue
+            ret[path] = {'hsum': hash_result.get('hsum'),
+                         'hash_type': hash_result.get('hash_type'),
+                         'mode': stat_result[0] if stat_result else None,
+                         'size': stat_result[6] if stat_result else None}
+        return ret
+
     @ensure_unicode_args
     def file_list_emptydirs(self, load):
         '''
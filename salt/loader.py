@@ -10,6 +10,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 import os
 import re
 import sys
+import contextlib
 import time
 import logging
 import inspect
@@ -70,6 +71,9 @@ log = logging.getLogger(__name__)
 SALT_BASE_PATH = os.path.abspath(salt.syspaths.INSTALL_DIR)
 LOADED_BASE_NAME = 'salt.loaded'
 
+# The loaded base name of the loaders created by a thread, see thread_namespace
+_THREAD_NAMESPACE = threading.local()
+
 if USE_IMPORTLIB:
     # pylint: disable=no-member
     MODULE_KIND_SOURCE = 1
@@ -610,6 +614,22 @@ def log_handlers(opts):
     return FilterDictWrapper(ret, '.setup_handlers')
 
 
+@contextlib.contextmanager
+def thread_namespace(loaded_base_name):
+    '''
+    Load the modules of the loaders created by the current thread under
+    loaded_base_name, unless they are given another one. The loaded modules
+    and the globals packed into them are then not shared with the loaders of
+    the other threads.
+    '''
+    previous = getattr(_THREAD_NAMESPACE, 'loaded_base_name', None)
+    _THREAD_NAMESPACE.loaded_base_name = loaded_base_name
+    try:
+        yield
+    finally:
+        _THREAD_NAMESPACE.loaded_base_name = previous
+
+
 def ssh_wrapper(opts, functions=None, context=None):
     '''
     Returns the custom logging handler modules
@@ -1248,7 +1268,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         self.module_dirs = module_dirs
         self.tag = tag
-        self.loaded_base_name = loaded_base_name or LOADED_BASE_NAME
+        self.loaded_base_name = loaded_base_name \
+            or getattr(_THREAD_NAMESPACE, 'loaded_base_name', None) \
+            or LOADED_BASE_NAME
         self.mod_type_check = mod_type_check or _mod_type
 
         if '__context__' not in self.pack:
@@ -1556,6 +1578,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             self.context_dict['pillar'] = pillar
             self.pack['__pillar__'] = salt.utils.context.NamespacedDictWrapper(self.context_dict, 'pillar')
 
+        if isinstance(opts, dict):
+            # Keep the type of the opts, such as the salt-ssh opts recording
+            # which of them are read
+            mod_opts = opts.copy()
+            mod_opts.pop('logger', None)
+            return mod_opts
         mod_opts = {}
         for key, val in list(opts.items()):
             if key == 'logger':
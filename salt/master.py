@@ -19,6 +19,7 @@ import logging
 import collections
 import multiprocessing
 import threading
+import zlib
 import salt.serializers.msgpack
 
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
@@ -684,6 +685,12 @@ class Master(SMaster):
 
             log.info('Creating master event publisher process')
             self.process_manager.add_process(salt.utils.event.EventPublisher, args=(self.opts,))
+            for shard, prefix in enumerate(salt.utils.event.get_master_shards(self.opts)):
+                log.info('Creating master event publisher process for shard %s (%s)', shard, prefix)
+                self.process_manager.add_process(
+                    salt.utils.event.EventPublisher,
+                    args=(self.opts,),
+                    kwargs={'shard': shard})
 
             if self.opts.get('reactor'):
                 if isinstance(self.opts['engines'], list):
@@ -1185,6 +1192,7 @@ class AESFuncs(object):
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
         self._file_list = self.fs_.file_list
+        self._file_manifest = self.fs_.file_manifest
         self._file_list_emptydirs = self.fs_.file_list_emptydirs
         self._dir_list = self.fs_.dir_list
         self._symlink_list = self.fs_.symlink_list
@@ -1643,6 +1651,8 @@ class AESFuncs(object):
         :param dict load: The minion payload
         '''
         loads = load.get('load')
+        if load.get('compression') == 'zlib':
+            loads = self.serial.loads(zlib.decompress(salt.utils.stringutils.to_bytes(loads)))
         if not isinstance(loads, list):
             loads = [load]  # support old syndics not aggregating returns
         for load in loads:
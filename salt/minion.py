@@ -16,6 +16,7 @@ import logging
 import threading
 import traceback
 import contextlib
+import zlib
 import multiprocessing
 from random import randint, shuffle
 from stat import S_IMODE
@@ -74,6 +75,7 @@ import salt.payload
 import salt.pillar
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.error
@@ -415,6 +417,15 @@ def master_event(type, master=None):
     return event_map.get(type, None)
 
 
+def _deepcopy_opts(opts):
+    '''
+    Return a deep copy of the opts sharing their grains and pillar, which can
+    be large and are replaced rather than modified when they are refreshed
+    '''
+    memo = dict((id(opts[key]), opts[key]) for key in ('grains', 'pillar') if key in opts)
+    return copy.deepcopy(opts, memo)
+
+
 def service_name():
     '''
     Return the proper service name based on platform
@@ -1022,7 +1033,7 @@ class MinionManager(MinionBase):
         self.opts['master_list'] = copy.deepcopy(masters)
 
         for master in masters:
-            s_opts = copy.deepcopy(self.opts)
+            s_opts = _deepcopy_opts(self.opts)
             s_opts['master'] = master
             s_opts['multimaster'] = True
             minion = self._create_minion_object(s_opts,
@@ -1121,6 +1132,9 @@ class Minion(MinionBase):
     This class instantiates a minion, runs connections for a minion,
     and loads all of the functions into the minion
     '''
+    # True in the processes of the job pool
+    job_worker = False
+
     def __init__(self, opts, timeout=60, safe=True, loaded_base_name=None, io_loop=None, jid_queue=None):  # pylint: disable=W0231
         '''
         Pass in the options dict
@@ -1140,6 +1154,7 @@ class Minion(MinionBase):
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
         self.periodic_callbacks = {}
+        self.job_pool = None
 
         if io_loop is None:
             install_zmq()
@@ -1404,7 +1419,7 @@ class Minion(MinionBase):
         self.utils = salt.loader.utils(opts, proxy=proxy)
 
         if opts.get('multimaster', False):
-            s_opts = copy.deepcopy(opts)
+            s_opts = _deepcopy_opts(opts)
             functions = salt.loader.minion_mods(s_opts, utils=self.utils, proxy=proxy,
                                                 loaded_base_name=self.loaded_base_name, notify=notify)
         else:
@@ -1424,6 +1439,9 @@ class Minion(MinionBase):
         if opt_in:
             self.opts = opts
 
+        # The workers were forked with the previous modules and opts
+        self.recycle_job_pool()
+
         return functions, returners, errors, executors
 
     def _send_req_sync(self, load, timeout):
@@ -1555,6 +1573,9 @@ class Minion(MinionBase):
         # side.
         instance = self
         multiprocessing_enabled = self.opts.get('multiprocessing', True)
+        if multiprocessing_enabled and self.job_pool is not None:
+            if self.job_pool.dispatch(data):
+                return
         if multiprocessing_enabled:
             if sys.platform.startswith('win'):
                 # let python reconstruct the minion on the other side if we're
@@ -1603,6 +1624,26 @@ class Minion(MinionBase):
             exitstack.enter_context(self.executors.context_dict.clone())
             return exitstack
 
+    def _run_pooled_job(self, data):
+        '''
+        Run a job in a process of the job pool
+        '''
+        if not self.job_worker:
+            self.job_worker = True
+            # The jobs must not see the changes made to __context__ by the
+            # previous jobs of the process, copy it for each job like it is
+            # done for the threads
+            for loader in (self.functions, self.returners, self.executors):
+                loader.context_dict._threadsafe = True
+        try:
+            self._target(self, self.opts, data, self.connected)
+        finally:
+            # The process outlives the job, saltutil.running must not list it
+            try:
+                os.remove(os.path.join(self.proc_dir, data['jid']))
+            except OSError:
+                pass
+
     @classmethod
     def _target(cls, minion_instance, opts, data, connected):
         if not minion_instance:
@@ -1643,7 +1684,8 @@ class Minion(MinionBase):
         '''
         fn_ = os.path.join(minion_instance.proc_dir, data['jid'])
 
-        if opts['multiprocessing'] and not salt.utils.platform.is_windows():
+        if opts['multiprocessing'] and not salt.utils.platform.is_windows() \
+                and not minion_instance.job_worker:
             # Shutdown the multiprocessing before daemonizing
             salt.log.setup.shutdown_multiprocessing_logging()
 
@@ -1866,7 +1908,8 @@ class Minion(MinionBase):
         '''
         fn_ = os.path.join(minion_instance.proc_dir, data['jid'])
 
-        if opts['multiprocessing'] and not salt.utils.platform.is_windows():
+        if opts['multiprocessing'] and not salt.utils.platform.is_windows() \
+                and not minion_instance.job_worker:
             # Shutdown the multiprocessing before daemonizing
             salt.log.setup.shutdown_multiprocessing_logging()
 
@@ -2126,6 +2169,9 @@ class Minion(MinionBase):
 
         load = {'cmd': ret_cmd,
                 'load': list(six.itervalues(jids))}
+        if ret_cmd == '_syndic_return' and self.opts.get('syndic_forward_compress'):
+            load['load'] = zlib.compress(salt.payload.Serial(self.opts).dumps(load['load']))
+            load['compression'] = 'zlib'
 
         def timeout_handler(*_):
             log.warning(
@@ -2348,7 +2394,10 @@ class Minion(MinionBase):
         false_unsets = data.get('false_unsets', False)
         clear_all = data.get('clear_all', False)
         import salt.modules.environ as mod_environ
-        return mod_environ.setenv(environ, false_unsets, clear_all)
+        ret = mod_environ.setenv(environ, false_unsets, clear_all)
+        # The workers were forked with the previous environment
+        self.recycle_job_pool()
+        return ret
 
     def _pre_tune(self):
         '''
@@ -2493,6 +2542,7 @@ class Minion(MinionBase):
             # we are not connected anymore
             self.connected = False
             log.info('Connection to master %s lost', self.opts['master'])
+            self.recycle_job_pool()
 
             # we can't use the config default here because the default '0' value is overloaded
             # to mean 'if 0 disable the job', but when salt detects a timeout it also sets up
@@ -2599,6 +2649,7 @@ class Minion(MinionBase):
         if not self.connected and self.opts['master_type'] != 'failover':
             log.info('Connection to master %s re-established', self.opts['master'])
             self.connected = True
+            self.recycle_job_pool()
             # modify the __master_alive job to only fire,
             # if the connection is lost again
             if self.opts['transport'] != 'tcp':
@@ -2815,6 +2866,35 @@ class Minion(MinionBase):
 
         self.periodic_callbacks.update(new_periodic_callbacks)
 
+    def setup_job_pool(self):
+        '''
+        Start the processes running the jobs if minion_job_workers is set
+        '''
+        workers = self.opts.get('minion_job_workers', 0)
+        if not workers or self.job_pool is not None or salt.utils.platform.is_proxy():
+            return
+        if not self.opts.get('multiprocessing', True) or salt.utils.platform.is_windows():
+            log.warning('minion_job_workers requires multiprocessing and fork, '
+                        'running a process per job')
+            return
+        self.job_pool = salt.utils.minion.JobWorkerPool(
+            self._run_pooled_job,
+            workers,
+            self.opts.get('minion_job_worker_max_jobs', 0))
+        self.job_pool.check()
+        self.periodic_callbacks['job_pool'] = tornado.ioloop.PeriodicCallback(
+            self.job_pool.check, 1000)
+        self.periodic_callbacks['job_pool'].start()
+
+    def recycle_job_pool(self):
+        '''
+        Replace the job workers once they are done with their current job, so
+        that the next jobs run with the current opts, modules and connection
+        state of the minion instead of those the workers were forked with
+        '''
+        if getattr(self, 'job_pool', None) is not None:
+            self.job_pool.recycle()
+
     # Main Minion Tune In
     def tune_in(self, start=True):
         '''
@@ -2847,6 +2927,7 @@ class Minion(MinionBase):
 
         self.setup_beacons()
         self.setup_scheduler()
+        self.setup_job_pool()
 
         # schedule the stuff that runs every interval
         ping_interval = self.opts.get('ping_interval', 0) * 60
@@ -2951,6 +3032,9 @@ class Minion(MinionBase):
         if hasattr(self, 'periodic_callbacks'):
             for cb in six.itervalues(self.periodic_callbacks):
                 cb.stop()
+        if getattr(self, 'job_pool', None) is not None:
+            self.job_pool.close()
+            self.job_pool = None
 
     def __del__(self):
         self.destroy()
@@ -3116,6 +3200,8 @@ class SyndicManager(MinionBase):
     # time to connect to upstream master
     SYNDIC_CONNECT_TIMEOUT = 5
     SYNDIC_EVENT_TIMEOUT = 5
+    # keys of an aggregated job return which are not minion returns
+    JOB_RET_KEYS = frozenset(('__fun__', '__jid__', '__load__', '__master_id__'))
 
     def __init__(self, opts, io_loop=None):
         opts['loop_interval'] = 1
@@ -3146,6 +3232,18 @@ class SyndicManager(MinionBase):
         self.delayed = []
         # Active pub futures: {master_id: (future, [job_ret, ...]), ...}
         self.pub_futures = {}
+        # Number of minion returns aggregated since the last forward
+        self.pending_returns = 0
+        self._forward_scheduled = False
+        # Files of returns spilled to disk while the masters can't keep up,
+        # oldest first. Listed on the first forward to pick up the files of a
+        # previous run.
+        self.spool_dir = os.path.join(self.opts['cachedir'], 'syndic_spool')
+        self.spool_files = None
+        self.serial = salt.payload.Serial(self.opts)
+        # Forwarding statistics, fired with master_stats
+        self.stats = {}
+        self._reset_stats()
 
     def _spawn_syndics(self):
         '''
@@ -3298,6 +3396,8 @@ class SyndicManager(MinionBase):
                                                            timeout=self._return_retry_timer(),
                                                            sync=False)
             self.pub_futures[master] = (future, values)
+            future.add_done_callback(
+                functools.partial(self._forwarded, time.time(), self._count_returns(values)))
             return True
         # Loop done and didn't exit: wasn't sent, try again later
         return False
@@ -3376,7 +3476,8 @@ class SyndicManager(MinionBase):
                 return
 
             master = data.get('master_id')
-            jdict = self.job_rets.setdefault(master, {}).setdefault(mtag, {})
+            # aggregate the returns of a job so its load is forwarded once
+            jdict = self.job_rets.setdefault(master, {}).setdefault(data['jid'], {})
             if not jdict:
                 jdict['__fun__'] = data.get('fun')
                 jdict['__jid__'] = data['jid']
@@ -3391,9 +3492,7 @@ class SyndicManager(MinionBase):
                     self.jid_forward_cache.add(data['jid'])
                     if len(self.jid_forward_cache) > self.opts['syndic_jid_forward_cache_hwm']:
                         # Pop the oldest jid from the cache
-                        tmp = sorted(list(self.jid_forward_cache))
-                        tmp.pop(0)
-                        self.jid_forward_cache = set(tmp)
+                        self.jid_forward_cache.discard(min(self.jid_forward_cache))
             if master is not None:
                 # __'s to make sure it doesn't print out on the master cli
                 jdict['__master_id__'] = master
@@ -3401,7 +3500,14 @@ class SyndicManager(MinionBase):
             for key in 'return', 'retcode', 'success':
                 if key in data:
                     ret[key] = data[key]
+            if data['id'] not in jdict:
+                self.pending_returns += 1
             jdict[data['id']] = ret
+            batch_size = self.opts['syndic_forward_batch_size']
+            if batch_size and self.pending_returns >= batch_size and not self._forward_scheduled:
+                # don't wait for syndic_event_forward_timeout to forward a full batch
+                self._forward_scheduled = True
+                self.io_loop.spawn_callback(self._forward_events)
         else:
             # TODO: config to forward these? If so we'll have to keep track of who
             # has seen them
@@ -3413,6 +3519,8 @@ class SyndicManager(MinionBase):
 
     def _forward_events(self):
         log.trace('Forwarding events')  # pylint: disable=no-member
+        self._forward_scheduled = False
+        self.pending_returns = 0
         if self.raw_events:
             events = self.raw_events
             self.raw_events = []
@@ -3427,11 +3535,149 @@ class SyndicManager(MinionBase):
             res = self._return_pub_syndic(self.delayed)
             if res:
                 self.delayed = []
+        if not self.delayed:
+            self._unspool_returns()
         for master in list(six.iterkeys(self.job_rets)):
             values = list(six.itervalues(self.job_rets[master]))
             res = self._return_pub_syndic(values, master_id=master)
             if res:
                 del self.job_rets[master]
+        self._spool_returns()
+        self._post_stats()
+
+    def _count_returns(self, values):
+        '''
+        Return the number of minion returns in a list of aggregated job returns
+        '''
+        return sum(len(value) - len(self.JOB_RET_KEYS.intersection(value))
+                   for value in values)
+
+    def _buffered_returns(self):
+        '''
+        Return the number of minion returns waiting in memory to be forwarded
+        '''
+        count = self._count_returns(self.delayed)
+        for rets in six.itervalues(self.job_rets):
+            count += self._count_returns(six.itervalues(rets))
+        return count
+
+    def _list_spool(self):
+        if self.spool_files is None:
+            try:
+                self.spool_files = sorted(
+                    name for name in os.listdir(self.spool_dir)
+                    if name.endswith('.spool'))
+            except OSError:
+                self.spool_files = []
+        return self.spool_files
+
+    def _write_spool(self, name, batches):
+        path = os.path.join(self.spool_dir, name)
+        with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+            fp_.write(zlib.compress(self.serial.dumps(batches)))
+
+    def _spool_returns(self):
+        '''
+        Spill the returns waiting to be forwarded to disk once there are more
+        of them than syndic_max_buffered_returns, instead of holding them in
+        memory until the masters catch up
+        '''
+        limit = self.opts['syndic_max_buffered_returns']
+        if not limit:
+            return
+        count = self._buffered_returns()
+        if count <= limit:
+            return
+        # [[master_id, [job_ret, ...]], ...], the delayed returns go to any master
+        batches = [[None, self.delayed]] if self.delayed else []
+        for master, rets in six.iteritems(self.job_rets):
+            batches.append([master, list(six.itervalues(rets))])
+        spool_files = self._list_spool()
+        # named after the time in microseconds, so they sort oldest first
+        seq = int(time.time() * 1000000)
+        if spool_files:
+            seq = max(seq, int(spool_files[-1][:-len('.spool')]) + 1)
+        name = '{0:020d}.spool'.format(seq)
+        try:
+            if not os.path.isdir(self.spool_dir):
+                os.makedirs(self.spool_dir)
+            self._write_spool(name, batches)
+        except (IOError, OSError) as exc:
+            log.error('Unable to spool the returns to forward to %s: %s',
+                      self.spool_dir, exc)
+            return
+        log.warning('The masters are not keeping up, spooled %s returns to %s',
+                    count, self.spool_dir)
+        spool_files.append(name)
+        self.stats['spooled'] += count
+        self.delayed = []
+        self.job_rets = {}
+
+    def _unspool_returns(self):
+        '''
+        Forward the returns spilled to disk, oldest first
+        '''
+        spool_files = self._list_spool()
+        while spool_files:
+            name = spool_files[0]
+            path = os.path.join(self.spool_dir, name)
+            try:
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    batches = self.serial.loads(zlib.decompress(fp_.read()))
+            except (IOError, OSError, zlib.error) as exc:
+                log.error('Discarding unreadable spooled returns %s: %s', path, exc)
+                batches = []
+            sent = 0
+            for master, values in batches:
+                if not self._return_pub_syndic(values, master_id=master):
+                    break
+                sent += 1
+            if sent < len(batches):
+                if sent:
+                    self._write_spool(name, batches[sent:])
+                return
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            spool_files.pop(0)
+
+    def _forwarded(self, start, count, future):
+        '''
+        Account for a forward to a master once it is done
+        '''
+        if future.exception() is not None:
+            return
+        latency = time.time() - start
+        self.stats['forwarded'] += count
+        self.stats['forwards'] += 1
+        self.stats['latency'] += latency
+        self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+
+    def _reset_stats(self):
+        self.stat_clock = time.time()
+        self.stats.update(forwarded=0, forwards=0, latency=0.0, max_latency=0.0, spooled=0)
+
+    def _post_stats(self):
+        '''
+        Fire the forwarding statistics and queue depths on the event bus
+        every master_stats_event_iter seconds
+        '''
+        if not self.opts['master_stats']:
+            return
+        end_time = time.time()
+        if end_time - self.stat_clock <= self.opts['master_stats_event_iter']:
+            return
+        stats = dict(self.stats)
+        latency = stats.pop('latency')
+        stats['avg_latency'] = latency / stats['forwards'] if stats['forwards'] else 0.0
+        stats.update(buffered=self._buffered_returns(),
+                     raw_events=len(self.raw_events),
+                     spool_files=len(self._list_spool()))
+        self.local.event.fire_event(
+            {'time': end_time - self.stat_clock, 'stats': stats},
+            tagify('syndic', 'stats'))
+        self._reset_stats()
 
 
 class ProxyMinionManager(MinionManager):
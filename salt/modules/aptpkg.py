@@ -765,6 +765,7 @@ def install(name=None,
                 errors.append(out['stderr'])
 
         __context__.pop('pkg.list_pkgs', None)
+        salt.utils.pkg.clear_snapshot(__opts__, 'aptpkg')
         new = list_pkgs()
         ret = salt.utils.data.compare_dicts(old, new)
 
@@ -813,6 +814,7 @@ def _uninstall(action='remove', name=None, pkgs=None, **kwargs):
         errors = []
 
     __context__.pop('pkg.list_pkgs', None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'aptpkg')
     new = list_pkgs()
     new_removed = list_pkgs(removed=True)
 
@@ -885,6 +887,7 @@ def autoremove(list_only=False, purge=False):
         cmd.append('autoremove')
         _call_apt(cmd, ignore_retcode=True)
         __context__.pop('pkg.list_pkgs', None)
+        salt.utils.pkg.clear_snapshot(__opts__, 'aptpkg')
         new = list_pkgs()
         return salt.utils.data.compare_dicts(old, new)
 
@@ -1054,6 +1057,7 @@ def upgrade(refresh=True, dist_upgrade=False, **kwargs):
     cmd.append('dist-upgrade' if dist_upgrade else 'upgrade')
     result = _call_apt(cmd, env=DPKG_ENV_VARS.copy())
     __context__.pop('pkg.list_pkgs', None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'aptpkg')
     new = list_pkgs()
     ret = salt.utils.data.compare_dicts(old, new)
 
@@ -1249,6 +1253,15 @@ def list_pkgs(versions_as_list=False,
     removed = salt.utils.data.is_true(removed)
     purge_desired = salt.utils.data.is_true(purge_desired)
 
+    snapshot_key = [__grains__.get('cpuarch', ''), __grains__.get('osarch', '')]
+    if 'pkg.list_pkgs' not in __context__:
+        ret = salt.utils.pkg.read_snapshot(__opts__,
+                                           'aptpkg',
+                                           salt.utils.pkg.deb.DB_PATHS,
+                                           key=snapshot_key)
+        if ret is not None:
+            __context__['pkg.list_pkgs'] = ret
+
     if 'pkg.list_pkgs' in __context__:
         if removed:
             ret = copy.deepcopy(__context__['pkg.list_pkgs']['removed'])
@@ -1261,6 +1274,7 @@ def list_pkgs(versions_as_list=False,
         return ret
 
     ret = {'installed': {}, 'removed': {}, 'purge_desired': {}}
+    stamp = salt.utils.pkg.snapshot_stamp(salt.utils.pkg.deb.DB_PATHS)
     cmd = ['dpkg-query', '--showformat',
            '${Status} ${Package} ${Version} ${Architecture}\n', '-W']
 
@@ -1300,6 +1314,12 @@ def list_pkgs(versions_as_list=False,
     for pkglist_type in ('installed', 'removed', 'purge_desired'):
         __salt__['pkg_resource.sort_pkglist'](ret[pkglist_type])
 
+    salt.utils.pkg.write_snapshot(__opts__,
+                                  'aptpkg',
+                                  salt.utils.pkg.deb.DB_PATHS,
+                                  stamp,
+                                  ret,
+                                  key=snapshot_key)
     __context__['pkg.list_pkgs'] = copy.deepcopy(ret)
 
     if removed:
@@ -26,6 +26,7 @@ import tempfile
 import salt.utils.args
 import salt.utils.data
 import salt.utils.files
+import salt.utils.forkserver
 import salt.utils.json
 import salt.utils.path
 import salt.utils.platform
@@ -247,6 +248,95 @@ def _check_avail(cmd):
     return bret and wret
 
 
+def _use_forkserver():
+    '''
+    Return whether the commands are run by the fork server
+    '''
+    return bool(globals().get('__opts__', {}).get('cmd_forkserver', False))
+
+
+def _get_runas_env(runas, group, shell, use_sudo, log_callback):
+    '''
+    Return the environment of the runas user
+    '''
+    # Getting the environment for the runas user
+    # Use markers to thwart any stdout noise
+    # There must be a better way to do this.
+    import uuid
+    marker = '<<<' + str(uuid.uuid4()) + '>>>'
+    marker_b = marker.encode(__salt_system_encoding__)
+    py_code = (
+        'import sys, os, itertools; '
+        'sys.stdout.write(\"' + marker + '\"); '
+        'sys.stdout.write(\"\\0\".join(itertools.chain(*os.environ.items()))); '
+        'sys.stdout.write(\"' + marker + '\");'
+    )
+
+    if use_sudo or __grains__['os'] in ['MacOS', 'Darwin']:
+        env_cmd = ['sudo']
+        # runas is optional if use_sudo is set.
+        if runas:
+            env_cmd.extend(['-u', runas])
+        if group:
+            env_cmd.extend(['-g', group])
+        if shell != DEFAULT_SHELL:
+            env_cmd.extend(['-s', '--', shell, '-c'])
+        else:
+            env_cmd.extend(['-i', '--'])
+        env_cmd.extend([sys.executable])
+    elif __grains__['os'] in ['FreeBSD']:
+        env_cmd = ('su', '-', runas, '-c',
+                   "{0} -c {1}".format(shell, sys.executable))
+    elif __grains__['os_family'] in ['Solaris']:
+        env_cmd = ('su', '-', runas, '-c', sys.executable)
+    elif __grains__['os_family'] in ['AIX']:
+        env_cmd = ('su', '-', runas, '-c', sys.executable)
+    else:
+        env_cmd = ('su', '-s', shell, '-', runas, '-c', sys.executable)
+    msg = 'env command: {0}'.format(env_cmd)
+    log.debug(log_callback(msg))
+
+    env_bytes, env_encoded_err = subprocess.Popen(
+        env_cmd,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stdin=subprocess.PIPE
+    ).communicate(salt.utils.stringutils.to_bytes(py_code))
+    marker_count = env_bytes.count(marker_b)
+    if marker_count == 0:
+        # Possibly PAM prevented the login
+        log.error(
+            'Environment could not be retrieved for user \'%s\': '
+            'stderr=%r stdout=%r',
+            runas, env_encoded_err, env_bytes
+        )
+        # Ensure that we get an empty env_runas dict below since we
+        # were not able to get the environment.
+        env_bytes = b''
+    elif marker_count != 2:
+        raise CommandExecutionError(
+            'Environment could not be retrieved for user \'{0}\'',
+            info={'stderr': repr(env_encoded_err),
+                  'stdout': repr(env_bytes)}
+        )
+    else:
+        # Strip the marker
+        env_bytes = env_bytes.split(marker_b)[1]
+
+    if six.PY2:
+        import itertools
+        env_runas = dict(itertools.izip(*[iter(env_bytes.split(b'\0'))]*2))
+    elif six.PY3:
+        env_runas = dict(list(zip(*[iter(env_bytes.split(b'\0'))]*2)))
+
+    env_runas = dict(
+        (salt.utils.stringutils.to_str(k),
+         salt.utils.stringutils.to_str(v))
+        for k, v in six.iteritems(env_runas)
+    )
+    return env_runas
+
+
 def _run(cmd,
          cwd=None,
          stdin=None,
@@ -448,81 +538,16 @@ def _run(cmd,
 
     if runas or group:
         try:
-            # Getting the environment for the runas user
-            # Use markers to thwart any stdout noise
-            # There must be a better way to do this.
-            import uuid
-            marker = '<<<' + str(uuid.uuid4()) + '>>>'
-            marker_b = marker.encode(__salt_system_encoding__)
-            py_code = (
-                'import sys, os, itertools; '
-                'sys.stdout.write(\"' + marker + '\"); '
-                'sys.stdout.write(\"\\0\".join(itertools.chain(*os.environ.items()))); '
-                'sys.stdout.write(\"' + marker + '\");'
-            )
-
-            if use_sudo or __grains__['os'] in ['MacOS', 'Darwin']:
-                env_cmd = ['sudo']
-                # runas is optional if use_sudo is set.
-                if runas:
-                    env_cmd.extend(['-u', runas])
-                if group:
-                    env_cmd.extend(['-g', group])
-                if shell != DEFAULT_SHELL:
-                    env_cmd.extend(['-s', '--', shell, '-c'])
-                else:
-                    env_cmd.extend(['-i', '--'])
-                env_cmd.extend([sys.executable])
-            elif __grains__['os'] in ['FreeBSD']:
-                env_cmd = ('su', '-', runas, '-c',
-                           "{0} -c {1}".format(shell, sys.executable))
-            elif __grains__['os_family'] in ['Solaris']:
-                env_cmd = ('su', '-', runas, '-c', sys.executable)
-            elif __grains__['os_family'] in ['AIX']:
-                env_cmd = ('su', '-', runas, '-c', sys.executable)
-            else:
-                env_cmd = ('su', '-s', shell, '-', runas, '-c', sys.executable)
-            msg = 'env command: {0}'.format(env_cmd)
-            log.debug(log_callback(msg))
-
-            env_bytes, env_encoded_err = subprocess.Popen(
-                env_cmd,
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stdin=subprocess.PIPE
-            ).communicate(salt.utils.stringutils.to_bytes(py_code))
-            marker_count = env_bytes.count(marker_b)
-            if marker_count == 0:
-                # Possibly PAM prevented the login
-                log.error(
-                    'Environment could not be retrieved for user \'%s\': '
-                    'stderr=%r stdout=%r',
-                    runas, env_encoded_err, env_bytes
-                )
-                # Ensure that we get an empty env_runas dict below since we
-                # were not able to get the environment.
-                env_bytes = b''
-            elif marker_count != 2:
-                raise CommandExecutionError(
-                    'Environment could not be retrieved for user \'{0}\'',
-                    info={'stderr': repr(env_encoded_err),
-                          'stdout': repr(env_bytes)}
-                )
-            else:
-                # Strip the marker
-                env_bytes = env_bytes.split(marker_b)[1]
-
-            if six.PY2:
-                import itertools
-                env_runas = dict(itertools.izip(*[iter(env_bytes.split(b'\0'))]*2))
-            elif six.PY3:
-                env_runas = dict(list(zip(*[iter(env_bytes.split(b'\0'))]*2)))
-
-            env_runas = dict(
-                (salt.utils.stringutils.to_str(k),
-                 salt.utils.stringutils.to_str(v))
-                for k, v in six.iteritems(env_runas)
-            )
+            # Getting the environment for the runas user, cached in the
+            # context when the commands are run by the fork server
+            runas_env_key = (runas, group, shell, use_sudo)
+            runas_envs = {}
+            if _use_forkserver() and '__context__' in globals():
+                runas_envs = __context__.setdefault('cmd.runas_env', {})
+            if runas_env_key not in runas_envs:
+                runas_envs[runas_env_key] = _get_runas_env(
+                    runas, group, shell, use_sudo, log_callback)
+            env_runas = dict(runas_envs[runas_env_key])
             env_runas.update(env)
 
             # Fix platforms like Solaris that don't set a USER env var in the
@@ -680,7 +705,18 @@ def _run(cmd,
     if not use_vt:
         # This is where the magic happens
         try:
-            proc = salt.utils.timed_subprocess.TimedProc(cmd, **new_kwargs)
+            proc = None
+            if _use_forkserver() and salt.utils.forkserver.usable(**new_kwargs):
+                ids = None
+                if runas or group:
+                    ids = salt.utils.user.chugid_and_umask_ids(runas, group)
+                try:
+                    proc = salt.utils.forkserver.ForkServerProc(
+                        cmd, ids=ids, umask=_umask, **new_kwargs)
+                except salt.utils.forkserver.ForkServerError as exc:
+                    log.debug('Not using the fork server: %s', exc)
+            if proc is None:
+                proc = salt.utils.timed_subprocess.TimedProc(cmd, **new_kwargs)
         except (OSError, IOError) as exc:
             msg = (
                 'Unable to run command \'{0}\' with the context \'{1}\', '
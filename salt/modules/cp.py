@@ -691,6 +691,23 @@ def list_master(saltenv='base', prefix=''):
     return _client().file_list(saltenv, prefix)
 
 
+def list_master_manifest(saltenv='base', prefix=''):
+    '''
+    .. versionadded:: Neon
+
+    Return the hash, mode and size of the files stored on the master under
+    prefix. The files listed are then checked against it for the rest of the
+    job instead of asking the master for each of them.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.list_master_manifest prefix=nginx/
+    '''
+    return _client().file_manifest(saltenv, prefix)
+
+
 def list_master_dirs(saltenv='base', prefix=''):
     '''
     List all of the directories stored on the master
@@ -60,6 +60,9 @@ log = logging.getLogger(__name__)
 # Define the module's virtual name
 __virtualname__ = 'pkg'
 
+# The package database, whose changes invalidate the package snapshot
+DB_PATH = '/var/db/pkg/local.sqlite'
+
 
 def __virtual__():
     '''
@@ -141,6 +144,21 @@ def _contextkey(jail=None, chroot=None, root=None, prefix='pkg.list_pkgs'):
     return prefix
 
 
+def _db_paths(jail=None, chroot=None, root=None):
+    '''
+    Return the files of the package database of the passed jail/chroot/root.
+    The database of a jail can't be located from the host, so none is
+    returned for it.
+    '''
+    if jail:
+        return []
+    elif chroot:
+        return [os.path.join(chroot, DB_PATH.lstrip(os.sep))]
+    elif root:
+        return [os.path.join(root, DB_PATH.lstrip(os.sep))]
+    return [DB_PATH]
+
+
 def parse_config(file_name='/usr/local/etc/pkg.conf'):
     '''
     Return dict of uncommented global variables.
@@ -396,6 +414,15 @@ def list_pkgs(versions_as_list=False,
     contextkey_pkg = _contextkey(jail, chroot, root)
     contextkey_origins = _contextkey(jail, chroot, root, prefix='pkg.origin')
 
+    if contextkey_pkg not in __context__:
+        snapshot = salt.utils.pkg.read_snapshot(__opts__,
+                                                'pkgng',
+                                                _db_paths(jail, chroot, root),
+                                                key=contextkey_pkg)
+        if snapshot is not None:
+            __context__[contextkey_pkg] = snapshot['pkgs']
+            __context__[contextkey_origins] = snapshot['origins']
+
     if contextkey_pkg in __context__:
         ret = copy.deepcopy(__context__[contextkey_pkg])
         if not versions_as_list:
@@ -410,6 +437,7 @@ def list_pkgs(versions_as_list=False,
 
     ret = {}
     origins = {}
+    stamp = salt.utils.pkg.snapshot_stamp(_db_paths(jail, chroot, root))
     out = __salt__['cmd.run_stdout'](
         _pkg(jail, chroot, root) + ['info', '-ao'],
         output_loglevel='trace',
@@ -426,6 +454,12 @@ def list_pkgs(versions_as_list=False,
         origins[pkgname] = origin
 
     __salt__['pkg_resource.sort_pkglist'](ret)
+    salt.utils.pkg.write_snapshot(__opts__,
+                                  'pkgng',
+                                  _db_paths(jail, chroot, root),
+                                  stamp,
+                                  {'pkgs': ret, 'origins': origins},
+                                  key=contextkey_pkg)
     __context__[contextkey_pkg] = copy.deepcopy(ret)
     __context__[contextkey_origins] = origins
     if not versions_as_list:
@@ -897,6 +931,7 @@ def install(name=None,
 
     __context__.pop(_contextkey(jail, chroot, root), None)
     __context__.pop(_contextkey(jail, chroot, root, prefix='pkg.origin'), None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'pkgng')
     new = list_pkgs(jail=jail, chroot=chroot, root=root)
     ret = salt.utils.data.compare_dicts(old, new)
 
@@ -1074,6 +1109,7 @@ def remove(name=None,
 
     __context__.pop(_contextkey(jail, chroot, root), None)
     __context__.pop(_contextkey(jail, chroot, root, prefix='pkg.origin'), None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'pkgng')
     new = list_pkgs(jail=jail, chroot=chroot, root=root, with_origin=True)
     ret = salt.utils.data.compare_dicts(old, new)
 
@@ -1200,6 +1236,7 @@ def upgrade(*names, **kwargs):
                                      python_shell=False)
     __context__.pop(_contextkey(jail, chroot, root), None)
     __context__.pop(_contextkey(jail, chroot, root, prefix='pkg.origin'), None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'pkgng')
     new = list_pkgs()
     ret = salt.utils.data.compare_dicts(old, new)
 
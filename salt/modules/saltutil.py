@@ -1150,11 +1150,15 @@ def is_running(fun):
 
         salt '*' saltutil.is_running state.highstate
     '''
-    run = running()
+    running_jobs = salt.utils.minion.RunningJobs(running())
     ret = []
-    for data in run:
-        if fnmatch.fnmatch(data.get('fun', ''), fun):
-            ret.append(data)
+    found = set()
+    for name in fnmatch.filter(running_jobs.funs, fun):
+        for data in running_jobs.funs[name]:
+            # a compound job may match more than once
+            if id(data) not in found:
+                found.add(id(data))
+                ret.append(data)
     return ret
 
 
@@ -1279,10 +1283,7 @@ def find_job(jid):
         my-minion:
             ----------
     '''
-    for data in running():
-        if data['jid'] == jid:
-            return data
-    return {}
+    return salt.utils.minion.find_job(__opts__, jid) or {}
 
 
 def find_cached_job(jid):
@@ -35,6 +35,7 @@ import salt.utils.jid
 import salt.utils.json
 import salt.utils.msgpack
 import salt.utils.platform
+import salt.utils.profile
 import salt.utils.state
 import salt.utils.stringutils
 import salt.utils.url
@@ -120,6 +121,33 @@ def _get_pillar_errors(kwargs, pillar=None):
     return None if kwargs.get('force') else (pillar or {}).get('_errors', __pillar__.get('_errors')) or None
 
 
+def _start_profile(kwargs):
+    '''
+    Start profiling the state run if it was called with profile=True
+    '''
+    if not salt.utils.data.is_true(kwargs.get('profile', False)):
+        return None
+    return salt.utils.profile.start('state')
+
+
+def _stop_profile(profile, kwargs):
+    '''
+    Stop profiling the state run and write the profile to the cachedir
+    '''
+    if profile is None:
+        return
+    salt.utils.profile.stop(profile)
+    jid = kwargs.get('__pub_jid') or salt.utils.jid.gen_jid(__opts__)
+    path = os.path.join(__opts__['cachedir'], 'state_profile', '{0}.json'.format(jid))
+    try:
+        path, folded = profile.write(path)
+    except (IOError, OSError) as exc:
+        log.error('Unable to write the profile of the state run to %s: %s', path, exc)
+    else:
+        log.info('Wrote the profile of the state run to %s, and in the '
+                 'flamegraph folded format to %s', path, folded)
+
+
 def _wait(jid):
     '''
     Wait for all previously started state jobs to finish running
@@ -633,6 +661,12 @@ def apply_(mods=None, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Profile the state run, see :py:func:`state.highstate
+        <salt.modules.state.highstate>`.
+
+        .. versionadded:: Neon
+
     pillar
         Custom Pillar values, passed as a dictionary of key-value pairs
 
@@ -704,6 +738,12 @@ def apply_(mods=None, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Profile the state run, see :py:func:`state.highstate
+        <salt.modules.state.highstate>`.
+
+        .. versionadded:: Neon
+
     pillar
         Custom Pillar values, passed as a dictionary of key-value pairs
 
@@ -1003,6 +1043,18 @@ def highstate(test=None, queue=False, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Collect the time spent in each stage of the state run, like rendering,
+        compiling, requisite checks, ``onlyif``/``unless`` checks and state
+        execution, along with counters of the file fetches, requests to the
+        master, subprocesses and cache hits. Every state return gets the
+        timings of its own stages in a ``profile`` section, and the whole
+        profile is written as JSON to ``<cachedir>/state_profile/<jid>.json``
+        and in the folded stack format of ``flamegraph.pl`` to
+        ``<cachedir>/state_profile/<jid>.folded``.
+
+        .. versionadded:: Neon
+
     CLI Examples:
 
     .. code-block:: bash
@@ -1077,6 +1129,7 @@ def highstate(test=None, queue=False, **kwargs):
     st_.push_active()
     orchestration_jid = kwargs.get('orchestration_jid')
     snapper_pre = _snapper_pre(opts, kwargs.get('__pub_jid', 'called localy'))
+    profile = _start_profile(kwargs)
     try:
         ret = st_.call_highstate(
                 exclude=kwargs.get('exclude', []),
@@ -1087,6 +1140,7 @@ def highstate(test=None, queue=False, **kwargs):
                 orchestration_jid=orchestration_jid)
     finally:
         st_.pop_active()
+        _stop_profile(profile, kwargs)
 
     if isinstance(ret, dict) and (__salt__['config.option']('state_data', '') == 'terse' or
             kwargs.get('terse')):
@@ -1193,6 +1247,12 @@ def sls(mods, test=None, exclude=None, queue=False, sync_mods=None, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Profile the state run, see :py:func:`state.highstate
+        <salt.modules.state.highstate>`.
+
+        .. versionadded:: Neon
+
     sync_mods
         If specified, the desired custom module types will be synced prior to
         running the SLS files:
@@ -1334,6 +1394,7 @@ def sls(mods, test=None, exclude=None, queue=False, sync_mods=None, **kwargs):
     mods = salt.utils.args.split_input(mods)
 
     st_.push_active()
+    profile = _start_profile(kwargs)
     try:
         high_, errors = st_.render_highstate({opts['saltenv']: mods})
 
@@ -1351,6 +1412,7 @@ def sls(mods, test=None, exclude=None, queue=False, sync_mods=None, **kwargs):
         ret = st_.state.call_high(high_, orchestration_jid)
     finally:
         st_.pop_active()
+        _stop_profile(profile, kwargs)
     if __salt__['config.option']('state_data', '') == 'terse' or kwargs.get('terse'):
         ret = _filter_running(ret)
     cache_file = os.path.join(__opts__['cachedir'], 'sls.p')
@@ -664,8 +664,17 @@ def list_pkgs(versions_as_list=False, **kwargs):
 
     contextkey = 'pkg.list_pkgs'
 
+    if contextkey not in __context__:
+        ret = salt.utils.pkg.read_snapshot(__opts__,
+                                           'yumpkg',
+                                           salt.utils.pkg.rpm.DB_PATHS,
+                                           key=__grains__['osarch'])
+        if ret is not None:
+            __context__[contextkey] = ret
+
     if contextkey not in __context__:
         ret = {}
+        stamp = salt.utils.pkg.snapshot_stamp(salt.utils.pkg.rpm.DB_PATHS)
         cmd = ['rpm', '-qa', '--queryformat',
                salt.utils.pkg.rpm.QUERYFORMAT.replace('%{REPOID}', '(none)') + '\n']
         output = __salt__['cmd.run'](cmd,
@@ -698,6 +707,12 @@ def list_pkgs(versions_as_list=False, **kwargs):
         for pkgname in ret:
             ret[pkgname] = sorted(ret[pkgname], key=lambda d: d['version'])
 
+        salt.utils.pkg.write_snapshot(__opts__,
+                                      'yumpkg',
+                                      salt.utils.pkg.rpm.DB_PATHS,
+                                      stamp,
+                                      ret,
+                                      key=__grains__['osarch'])
         __context__[contextkey] = ret
 
     return __salt__['pkg_resource.format_pkg_list'](
@@ -1691,6 +1706,7 @@ def install(name=None,
                 errors.append(out['stdout'])
 
     __context__.pop('pkg.list_pkgs', None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'yumpkg')
     new = list_pkgs(versions_as_list=False, attr=diff_attr) if not downloadonly else list_downloaded()
 
     ret = salt.utils.data.compare_dicts(old, new)
@@ -1911,6 +1927,7 @@ def upgrade(name=None,
     cmd.extend(targets)
     result = _call_yum(cmd)
     __context__.pop('pkg.list_pkgs', None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'yumpkg')
     new = list_pkgs()
     ret = salt.utils.data.compare_dicts(old, new)
 
@@ -2021,6 +2038,7 @@ def remove(name=None, pkgs=None, **kwargs):  # pylint: disable=W0613
         errors = []
 
     __context__.pop('pkg.list_pkgs', None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'yumpkg')
     new = list_pkgs()
     ret = salt.utils.data.compare_dicts(old, new)
 
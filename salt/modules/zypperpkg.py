@@ -456,6 +456,7 @@ def _clean_cache():
 
     for key in keys:
         __context__.pop(key, None)
+    salt.utils.pkg.clear_snapshot(__opts__, 'zypperpkg')
 
 
 def list_upgrades(refresh=True, root=None, **kwargs):
@@ -795,45 +796,63 @@ def list_pkgs(versions_as_list=False, root=None, includes=None, **kwargs):
     contextkey = 'pkg.list_pkgs_{}_{}'.format(root, includes)
 
     if contextkey not in __context__:
-        ret = {}
-        cmd = ['rpm']
-        if root:
-            cmd.extend(['--root', root])
-        cmd.extend(['-qa', '--queryformat',
-                    salt.utils.pkg.rpm.QUERYFORMAT.replace('%{REPOID}', '(none)') + '\n'])
-        output = __salt__['cmd.run'](cmd,
-                                     python_shell=False,
-                                     output_loglevel='trace')
-        for line in output.splitlines():
-            pkginfo = salt.utils.pkg.rpm.parse_pkginfo(
-                line,
-                osarch=__grains__['osarch']
-            )
-            if pkginfo:
-                # see rpm version string rules available at https://goo.gl/UGKPNd
-                pkgver = pkginfo.version
-                epoch = ''
-                release = ''
-                if ':' in pkgver:
-                    epoch, pkgver = pkgver.split(":", 1)
-                if '-' in pkgver:
-                    pkgver, release = pkgver.split("-", 1)
-                all_attr = {
-                    'epoch': epoch,
-                    'version': pkgver,
-                    'release': release,
-                    'arch': pkginfo.arch,
-                    'install_date': pkginfo.install_date,
-                    'install_date_time_t': pkginfo.install_date_time_t
-                }
-                __salt__['pkg_resource.add_pkg'](ret, pkginfo.name, all_attr)
-
-        _ret = {}
-        for pkgname in ret:
-            # Filter out GPG public keys packages
-            if pkgname.startswith('gpg-pubkey'):
-                continue
-            _ret[pkgname] = sorted(ret[pkgname], key=lambda d: d['version'])
+        dbpaths = [os.path.join(root, path.lstrip(os.sep)) if root else path
+                   for path in salt.utils.pkg.rpm.DB_PATHS]
+        snapshot_key = [root, __grains__['osarch']]
+        _ret = salt.utils.pkg.read_snapshot(__opts__,
+                                            'zypperpkg',
+                                            dbpaths,
+                                            key=snapshot_key)
+        if _ret is None:
+            ret = {}
+            stamp = salt.utils.pkg.snapshot_stamp(dbpaths)
+            cmd = ['rpm']
+            if root:
+                cmd.extend(['--root', root])
+            cmd.extend(['-qa', '--queryformat',
+                        salt.utils.pkg.rpm.QUERYFORMAT.replace('%{REPOID}', '(none)') + '\n'])
+            output = __salt__['cmd.run'](cmd,
+                                         python_shell=False,
+                                         output_loglevel='trace')
+            for line in output.splitlines():
+                pkginfo = salt.utils.pkg.rpm.parse_pkginfo(
+                    line,
+                    osarch=__grains__['osarch']
+                )
+                if pkginfo:
+                    # see rpm version string rules available at https://goo.gl/UGKPNd
+                    pkgver = pkginfo.version
+                    epoch = ''
+                    release = ''
+                    if ':' in pkgver:
+                        epoch, pkgver = pkgver.split(":", 1)
+                    if '-' in pkgver:
+                        pkgver, release = pkgver.split("-", 1)
+                    all_attr = {
+                        'epoch': epoch,
+                        'version': pkgver,
+                        'release': release,
+                        'arch': pkginfo.arch,
+                        'install_date': pkginfo.install_date,
+                        'install_date_time_t': pkginfo.install_date_time_t
+                    }
+                    __salt__['pkg_resource.add_pkg'](ret, pkginfo.name, all_attr)
+
+            _ret = {}
+            for pkgname in ret:
+                # Filter out GPG public keys packages
+                if pkgname.startswith('gpg-pubkey'):
+                    continue
+                _ret[pkgname] = sorted(ret[pkgname], key=lambda d: d['version'])
+
+            # The snapshot only holds the packages of the rpm database, the
+            # patterns and patches are still queried from zypper below
+            salt.utils.pkg.write_snapshot(__opts__,
+                                          'zypperpkg',
+                                          dbpaths,
+                                          stamp,
+                                          _ret,
+                                          key=snapshot_key)
 
         for include in includes:
             if include in ('pattern', 'patch'):
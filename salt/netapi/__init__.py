@@ -108,6 +108,23 @@ class NetapiClient(object):
         local = salt.client.get_local_client(mopts=self.opts)
         return local.cmd(*args, **kwargs)
 
+    def local_iter(self, *args, **kwargs):
+        '''
+        Run :ref:`execution modules <all-salt.modules>` and yield the return
+        of every minion as it comes in
+
+        .. versionadded:: Neon
+
+        Wraps :py:meth:`salt.client.LocalClient.cmd_iter`
+
+        :return: A generator yielding the individual minion returns, in the
+            same form as :py:meth:`local`
+        '''
+        local = salt.client.get_local_client(mopts=self.opts)
+        for ret in local.cmd_iter(*args, **kwargs):
+            for minion, data in six.iteritems(ret or {}):
+                yield {minion: data['ret'] if isinstance(data, dict) and 'ret' in data else data}
+
     def local_subset(self, *args, **kwargs):
         '''
         Run :ref:`execution modules <all-salt.modules>` against subsets of minions
@@ -847,9 +847,29 @@ ct_out_map = (
     ('application/json', salt.utils.json.dumps),
     ('application/x-yaml', functools.partial(
         salt.utils.yaml.safe_dump, default_flow_style=False)),
+    ('application/x-ndjson', salt.utils.json.dumps),
 )
 
 
+def ndjson_lines(items, out):
+    '''
+    Serialize each of the items as a line of its own while they are produced
+
+    :param items: An iterator of the data to send
+    :param out: The serialization function
+    '''
+    try:
+        for item in items:
+            yield salt.utils.stringutils.to_bytes(out(item) + '\n')
+    except Exception:
+        # The headers are already sent, so the best we can do is to end the
+        # stream with an error line
+        logger.debug('Error while streaming the response for: %s',
+                cherrypy.request.path_info, exc_info=True)
+        yield salt.utils.stringutils.to_bytes(
+            out({'return': 'An unexpected error occurred'}) + '\n')
+
+
 def hypermedia_handler(*args, **kwargs):
     '''
     Determine the best output format based on the Accept header, execute the
@@ -907,6 +927,13 @@ def hypermedia_handler(*args, **kwargs):
     # Transform the output from the handler into the requested output format
     cherrypy.response.headers['Content-Type'] = best
     out = cherrypy.response.processors[best]
+
+    # Handlers may return an iterator for the newline-delimited format, which
+    # is then sent as it is produced
+    if best == 'application/x-ndjson' and isinstance(ret, collections.Iterator):
+        cherrypy.response.stream = True
+        return ndjson_lines(ret, out)
+
     try:
         response = out(ret)
         if six.PY3:
@@ -1152,11 +1179,15 @@ class LowDataAdapter(object):
         self.apiopts = cherrypy.config['apiopts']
         self.api = salt.netapi.NetapiClient(self.opts)
 
-    def exec_lowstate(self, client=None, token=None):
+    def exec_lowstate(self, client=None, token=None, stream=False):
         '''
         Pull a Low State data structure from request and execute the low-data
         chunks through Salt. The low-data chunks will be updated to include the
         authorization token for the current session.
+
+        With ``stream`` every result is yielded as a line for the
+        newline-delimited output, tagged with the index of its chunk, and
+        ``local`` commands yield the return of every minion as it comes in.
         '''
         lowstate = cherrypy.request.lowstate
 
@@ -1172,7 +1203,7 @@ class LowDataAdapter(object):
 
         # Make any requested additions or modifications to each lowstate, then
         # execute each one and yield the result.
-        for chunk in lowstate:
+        for idx, chunk in enumerate(lowstate):
             if token:
                 chunk['token'] = token
 
@@ -1198,14 +1229,16 @@ class LowDataAdapter(object):
             if 'arg' in chunk and not isinstance(chunk['arg'], list):
                 chunk['arg'] = [chunk['arg']]
 
+            if stream and chunk.get('client') == 'local':
+                chunk['client'] = 'local_iter'
+
             ret = self.api.run(chunk)
 
             # Sometimes Salt gives us a return and sometimes an iterator
-            if isinstance(ret, collections.Iterator):
-                for i in ret:
-                    yield i
-            else:
-                yield ret
+            if not isinstance(ret, collections.Iterator):
+                ret = [ret]
+            for i in ret:
+                yield {'chunk': idx, 'return': i} if stream else i
 
     @cherrypy.config(**{'tools.sessions.on': False})
     def GET(self):
@@ -1303,7 +1336,31 @@ class LowDataAdapter(object):
               ms-2: true
               ms-3: true
               ms-4: true
+
+        With ``Accept: application/x-ndjson`` the response is streamed as one
+        JSON document per line, each carrying the index of its lowstate chunk.
+        Returns of ``local`` commands are sent one line per minion as they
+        arrive:
+
+        .. code-block:: text
+
+            HTTP/1.1 200 OK
+            Content-Type: application/x-ndjson
+
+            {"chunk": 0, "return": {"ms-0": true}}
+            {"chunk": 0, "return": {"ms-1": true}}
         '''
+        if cherrypy.lib.cptools.accept(
+                [i for (i, _) in ct_out_map]) == 'application/x-ndjson':
+            lines = self.exec_lowstate(
+                token=cherrypy.session.get('token'), stream=True)
+            # Run the first chunk right away so that errors like failed
+            # authentication still set the response status
+            first = next(lines, None)
+            if first is None:
+                return iter(())
+            return itertools.chain([first], lines)
+
         return {
             'return': list(self.exec_lowstate(
                 token=cherrypy.session.get('token')))
@@ -1437,7 +1494,7 @@ class Jobs(LowDataAdapter):
         'tools.salt_auth.on': True,
     })
 
-    def GET(self, jid=None, timeout=''):
+    def GET(self, jid=None, timeout='', limit=None, cursor=None):
         '''
         A convenience URL for getting lists of previously run jobs or getting
         the return from a single job
@@ -1520,12 +1577,23 @@ class Jobs(LowDataAdapter):
                 - 1
                 - 2
                 - 6.9141387939453125e-06
+
+        Both forms accept ``limit`` and ``cursor`` query parameters to page
+        through large results, e.g. ``/jobs?limit=100`` followed by
+        ``/jobs?limit=100&cursor=<oldest jid of the previous page>``, or
+        ``/jobs/<jid>?limit=1000&cursor=<last minion of the previous page>``.
+        See :py:func:`jobs.list_jobs <salt.runners.jobs.list_jobs>` and
+        :py:func:`jobs.list_job <salt.runners.jobs.list_job>`.
         '''
         lowstate = {'client': 'runner'}
         if jid:
             lowstate.update({'fun': 'jobs.list_job', 'jid': jid})
         else:
             lowstate.update({'fun': 'jobs.list_jobs'})
+        if limit is not None:
+            lowstate['limit'] = limit
+        if cursor is not None:
+            lowstate['cursor'] = cursor
 
         cherrypy.request.lowstate = [lowstate]
         job_ret_info = list(self.exec_lowstate(
@@ -116,18 +116,62 @@ def start():
         kwargs['ssl_options'] = ssl_opts
 
     import tornado.httpserver
-    http_server = tornado.httpserver.HTTPServer(get_application(__opts__), **kwargs)
-    try:
-        http_server.bind(mod_opts['port'],
-                         address=mod_opts.get('address'),
-                         backlog=mod_opts.get('backlog', 128),
-                         )
-        http_server.start(mod_opts['num_processes'])
-    except Exception:
-        log.error('Rest_tornado unable to bind to port %s', mod_opts['port'], exc_info=True)
-        raise SystemExit(1)
+    if mod_opts['num_processes'] != 1 and (mod_opts.get('reuse_port') or mod_opts.get('event_fanout')):
+        http_server = _start_workers(mod_opts, kwargs)
+    else:
+        http_server = tornado.httpserver.HTTPServer(get_application(__opts__), **kwargs)
+        try:
+            http_server.bind(mod_opts['port'],
+                             address=mod_opts.get('address'),
+                             backlog=mod_opts.get('backlog', 128),
+                             )
+            http_server.start(mod_opts['num_processes'])
+        except Exception:
+            log.error('Rest_tornado unable to bind to port %s', mod_opts['port'], exc_info=True)
+            raise SystemExit(1)
 
     try:
         tornado.ioloop.IOLoop.current().start()
     except KeyboardInterrupt:
         raise SystemExit(0)
+
+
+def _start_workers(mod_opts, kwargs):
+    '''
+    Fork the worker processes and return the HTTP server of this worker
+
+    With ``reuse_port`` every worker binds a socket of its own with
+    SO_REUSEPORT, so that the kernel balances the connections between them.
+    With ``event_fanout`` a single process listens to the master event bus
+    and forwards each worker only the events it waits for.
+    '''
+    import tornado.httpserver
+    import tornado.netutil
+    import tornado.process
+
+    num_processes = mod_opts['num_processes'] or tornado.process.cpu_count()
+    listen = dict(address=mod_opts.get('address'),
+                  backlog=mod_opts.get('backlog', 128))
+    try:
+        sockets = None
+        if not mod_opts.get('reuse_port'):
+            sockets = tornado.netutil.bind_sockets(mod_opts['port'], **listen)
+
+        if mod_opts.get('event_fanout'):
+            from . import fanout
+            fanout.EventFanoutManager(__opts__, num_processes).start()
+
+        worker = tornado.process.fork_processes(num_processes)
+
+        if sockets is None:
+            sockets = tornado.netutil.bind_sockets(mod_opts['port'], reuse_port=True, **listen)
+    except Exception:
+        log.error('Rest_tornado unable to bind to port %s', mod_opts['port'], exc_info=True)
+        raise SystemExit(1)
+
+    application = get_application(__opts__)
+    if mod_opts.get('event_fanout'):
+        application.event_fanout = fanout.FanoutEvent(__opts__, worker)
+    http_server = tornado.httpserver.HTTPServer(application, **kwargs)
+    http_server.add_sockets(sockets)
+    return http_server
@@ -0,0 +1,419 @@
+# encoding: utf-8
+'''
+Share a single subscription to the master event bus between the worker
+processes of rest_tornado
+
+.. versionadded:: Neon
+
+The :py:class:`EventFanout` runs in a process of its own and is the only one
+listening to the master event bus. Every worker tells it which tag prefixes it
+is waiting for through a :py:class:`FanoutEvent`, and only receives the
+events matching them. The fanout acknowledges every subscription change on the
+event stream of the worker, and is restarted by the
+:py:class:`EventFanoutManager` if it dies, after which the workers send their
+subscriptions again.
+'''
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import datetime
+import logging
+import os
+import time
+
+# Import 3rd-party libs
+import tornado.concurrent
+import tornado.gen
+import tornado.ioloop
+import tornado.iostream
+
+# Import Salt libs
+import salt.payload
+import salt.transport.ipc
+import salt.utils.event
+import salt.utils.process
+import salt.utils.stringutils
+from salt.ext import six
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
+
+log = logging.getLogger(__name__)
+
+# tag of the events acknowledging a subscription change to a worker
+ACK_TAG = 'salt/netapi/fanout/ack'
+
+
+def subscription_path(opts):
+    '''
+    Return the path of the socket the workers send their subscriptions to
+    '''
+    return os.path.join(opts['sock_dir'], 'rest_tornado_fanout.ipc')
+
+
+def worker_path(opts, worker):
+    '''
+    Return the path of the socket the events of a worker are published on
+    '''
+    return os.path.join(opts['sock_dir'], 'rest_tornado_fanout_{0}.ipc'.format(worker))
+
+
+class EventFanout(object):
+    '''
+    Forward the events of the master event bus to the workers which subscribed
+    to a prefix of their tag
+    '''
+    # seconds between checks that the parent process is still alive
+    parent_check_interval = 5
+
+    def __init__(self, opts, workers, io_loop=None):
+        self.opts = opts
+        self.workers = workers
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.tries = [salt.utils.event.TagTrie() for _ in range(workers)]
+        self.publishers = []
+        self.server = None
+        self.event = None
+        self.serial = salt.payload.Serial(opts)
+        self.tagend = salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND)
+
+    def start(self):
+        '''
+        Bind the sockets of the workers and subscribe to the master event bus
+        '''
+        self.server = salt.transport.ipc.IPCMessageServer(
+            self.opts,
+            subscription_path(self.opts),
+            io_loop=self.io_loop,
+            payload_handler=self.handle_subscription)
+        self.server.start()
+        for worker in range(self.workers):
+            publisher = salt.transport.ipc.IPCMessagePublisher(
+                self.opts,
+                worker_path(self.opts, worker),
+                io_loop=self.io_loop)
+            publisher.start()
+            self.publishers.append(publisher)
+        self.event = salt.utils.event.get_event(
+            'master',
+            self.opts['sock_dir'],
+            self.opts['transport'],
+            opts=self.opts,
+            listen=True,
+            io_loop=self.io_loop)
+        self.event.set_event_handler(self.handle_event)
+
+    @tornado.gen.coroutine
+    def handle_subscription(self, msg, reply=None):  # pylint: disable=unused-argument
+        '''
+        Update the tag prefixes a worker subscribed to, and acknowledge the
+        change on the event stream of the worker
+        '''
+        try:
+            trie = self.tries[msg['worker']]
+        except (KeyError, IndexError, TypeError):
+            log.error('Invalid event fanout subscription: %s', msg)
+            return
+        if msg.get('reset'):
+            trie = self.tries[msg['worker']] = salt.utils.event.TagTrie()
+        for tag in msg.get('subscribe', ()):
+            trie.add(tag)
+        for tag in msg.get('unsubscribe', ()):
+            trie.remove(tag)
+        if 'seq' in msg and msg['worker'] < len(self.publishers):
+            self.publishers[msg['worker']].publish(b''.join([
+                salt.utils.stringutils.to_bytes(ACK_TAG),
+                self.tagend,
+                self.serial.dumps({'seq': msg['seq']})]))
+
+    def handle_event(self, raw):
+        '''
+        Publish an event to the workers waiting for it
+        '''
+        if six.PY2:
+            mtag = raw.partition(salt.utils.event.TAGEND)[0]
+        else:
+            mtag = salt.utils.stringutils.to_str(raw.partition(self.tagend)[0])
+        for trie, publisher in zip(self.tries, self.publishers):
+            if trie.match(mtag):
+                publisher.publish(raw)
+
+    def close(self):
+        if self.event is not None:
+            self.event.destroy()
+            self.event = None
+        for publisher in self.publishers:
+            publisher.close()
+        self.publishers = []
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+class EventFanoutProcess(salt.utils.process.SignalHandlingMultiprocessingProcess):
+    '''
+    Run the :py:class:`EventFanout` of the workers of rest_tornado
+    '''
+    def __init__(self, opts, workers, **kwargs):
+        super(EventFanoutProcess, self).__init__(**kwargs)
+        self.opts = opts
+        self.workers = workers
+        self.parent_pid = os.getpid()
+
+    # __setstate__ and __getstate__ are only used on Windows.
+    def __setstate__(self, state):
+        self._is_child = True
+        self.__init__(
+            state['opts'],
+            state['workers'],
+            log_queue=state['log_queue'],
+            log_queue_level=state['log_queue_level']
+        )
+
+    def __getstate__(self):
+        return {
+            'opts': self.opts,
+            'workers': self.workers,
+            'log_queue': self.log_queue,
+            'log_queue_level': self.log_queue_level
+        }
+
+    def _check_parent(self):
+        if os.getppid() != self.parent_pid:
+            log.debug('rest_tornado is gone, stopping the event fanout')
+            tornado.ioloop.IOLoop.current().stop()
+
+    def run(self):
+        io_loop = tornado.ioloop.IOLoop()
+        io_loop.make_current()
+        fanout = EventFanout(self.opts, self.workers, io_loop=io_loop)
+        fanout.start()
+        tornado.ioloop.PeriodicCallback(
+            self._check_parent,
+            EventFanout.parent_check_interval * 1000).start()
+        try:
+            io_loop.start()
+        finally:
+            fanout.close()
+
+
+class EventFanoutManager(salt.utils.process.SignalHandlingMultiprocessingProcess):
+    '''
+    Restart the :py:class:`EventFanoutProcess` whenever it dies
+    '''
+    def __init__(self, opts, workers, **kwargs):
+        super(EventFanoutManager, self).__init__(**kwargs)
+        self.opts = opts
+        self.workers = workers
+        self.parent_pid = os.getpid()
+
+    # __setstate__ and __getstate__ are only used on Windows.
+    def __setstate__(self, state):
+        self._is_child = True
+        self.__init__(
+            state['opts'],
+            state['workers'],
+            log_queue=state['log_queue'],
+            log_queue_level=state['log_queue_level']
+        )
+
+    def __getstate__(self):
+        return {
+            'opts': self.opts,
+            'workers': self.workers,
+            'log_queue': self.log_queue,
+            'log_queue_level': self.log_queue_level
+        }
+
+    def run(self):
+        process_manager = salt.utils.process.ProcessManager(name='EventFanoutManager')
+        process_manager.add_process(EventFanoutProcess, args=[self.opts, self.workers])
+        try:
+            while os.getppid() == self.parent_pid:
+                process_manager.check_children()
+                time.sleep(EventFanout.parent_check_interval)
+            log.debug('rest_tornado is gone, stopping the event fanout')
+        finally:
+            process_manager.stop_restarting()
+            process_manager.kill_children()
+
+
+class FanoutEvent(object):
+    '''
+    The events forwarded to a worker by the :py:class:`EventFanout`
+
+    Stands in for the master event object of the
+    :py:class:`~salt.netapi.rest_tornado.saltnado.EventListener` and of the
+    :py:class:`~salt.client.ReturnListener`, which call :py:meth:`subscribe`
+    and :py:meth:`unsubscribe` with the tag prefixes they are waiting for.
+    '''
+    # seconds to wait for the event fanout to acknowledge a subscription change
+    # before sending all of the subscriptions again
+    ack_timeout = 5
+
+    def __init__(self, opts, worker, io_loop=None):
+        self.opts = opts
+        self.worker = worker
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.serial = salt.payload.Serial(opts)
+        self.subscriber = None
+        self.client = salt.transport.ipc.IPCMessageClient(
+            subscription_path(opts), io_loop=self.io_loop)
+        self.handlers = set()
+        self.ack_prefix = b''.join([
+            salt.utils.stringutils.to_bytes(ACK_TAG),
+            salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND)])
+        # tag prefix -> number of subscriptions
+        self.tags = {}
+        # (subscription change, future resolved once it is acknowledged)
+        self._queue = []
+        self._sending = False
+        self._closed = False
+        self._seq = 0
+        self._acked = None
+        self._connected = tornado.concurrent.Future()
+        # replace whatever a previous process of this worker subscribed to
+        self._resync = True
+        self._send({})
+        self._reading = self._read_events()
+
+    unpack = staticmethod(salt.utils.event.SaltEvent.unpack)
+
+    def set_event_handler(self, event_handler):
+        '''
+        Invoke the event_handler callback each time an event arrives
+        '''
+        self.handlers.add(event_handler)
+        return self._reading
+
+    def remove_event_handler(self, event_handler):
+        '''
+        Stop invoking the event_handler callback
+        '''
+        self.handlers.discard(event_handler)
+
+    def subscribe(self, tag):
+        '''
+        Start receiving the events whose tag starts with tag
+
+        :return: A future resolved once the event fanout applied the
+                 subscription
+        '''
+        self.tags[tag] = self.tags.get(tag, 0) + 1
+        return self._send({'subscribe': [tag]})
+
+    def unsubscribe(self, tag):
+        '''
+        Drop one subscription to tag
+
+        :return: A future resolved once the event fanout applied the change
+        '''
+        if tag not in self.tags:
+            future = tornado.concurrent.Future()
+            future.set_result(True)
+            return future
+        self.tags[tag] -= 1
+        if not self.tags[tag]:
+            del self.tags[tag]
+        return self._send({'unsubscribe': [tag]})
+
+    def _send(self, msg):
+        future = tornado.concurrent.Future()
+        self._queue.append((msg, future))
+        if not self._sending:
+            self._sending = True
+            self.io_loop.spawn_callback(self._flush)
+        return future
+
+    @tornado.gen.coroutine
+    def _flush(self):
+        '''
+        Send the queued subscription changes in order and wait for the event
+        fanout to acknowledge them. Changes queued meanwhile are merged into one
+        message, and after a failure all of the subscriptions are sent again.
+        '''
+        try:
+            while self._queue and not self._closed:
+                futures = [future for _, future in self._queue]
+                if self._resync:
+                    msg = {'reset': True, 'subscribe': [], 'unsubscribe': []}
+                    for tag, count in six.iteritems(self.tags):
+                        msg['subscribe'].extend([tag] * count)
+                else:
+                    msg = {'subscribe': [], 'unsubscribe': []}
+                    for queued, _ in self._queue:
+                        msg['subscribe'].extend(queued.get('subscribe', ()))
+                        msg['unsubscribe'].extend(queued.get('unsubscribe', ()))
+                self._seq += 1
+                msg['worker'] = self.worker
+                msg['seq'] = self._seq
+                self._queue = []
+                self._acked = tornado.concurrent.Future()
+                try:
+                    # the acknowledgement is lost unless the events are read
+                    yield self._connected
+                    yield self.client.send(msg)
+                    acked = yield tornado.gen.with_timeout(
+                        datetime.timedelta(seconds=self.ack_timeout), self._acked)
+                    if not acked:
+                        raise tornado.iostream.StreamClosedError()
+                    self._resync = False
+                except Exception as exc:
+                    log.debug('Failed to send the subscriptions of worker %s to the '
+                              'event fanout: %s', self.worker, exc)
+                    self._resync = True
+                    self._queue[:0] = [({}, future) for future in futures]
+                    yield tornado.gen.sleep(1)
+                    continue
+                for future in futures:
+                    if not future.done():
+                        future.set_result(True)
+        finally:
+            self._sending = False
+
+    @tornado.gen.coroutine
+    def _read_events(self):
+        '''
+        Read the events published to this worker, and subscribe again after
+        connecting to a restarted event fanout
+        '''
+        while not self._closed:
+            self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
+                worker_path(self.opts, self.worker), io_loop=self.io_loop)
+            self.subscriber.callbacks.add(self._handle_raw)
+            try:
+                yield self.subscriber.connect(timeout=5)
+                self._connected.set_result(True)
+                yield self.subscriber.read_async()
+            except Exception as exc:
+                log.trace('Worker %s is not connected to the event fanout: %s',
+                          self.worker, exc)
+            finally:
+                self.subscriber.close()
+            if self._closed:
+                break
+            if self._connected.done():
+                log.debug('Worker %s lost the event fanout, reconnecting', self.worker)
+                self._connected = tornado.concurrent.Future()
+                # the subscription socket went away with the fanout
+                self.client.close()
+                self.client = salt.transport.ipc.IPCMessageClient(
+                    subscription_path(self.opts), io_loop=self.io_loop)
+                if self._acked is not None and not self._acked.done():
+                    self._acked.set_result(False)
+                self._resync = True
+                self._send({})
+            yield tornado.gen.sleep(1)
+
+    def _handle_raw(self, raw):
+        if raw.startswith(self.ack_prefix):
+            data = self.unpack(raw, self.serial)[1]
+            if (isinstance(data, dict) and data.get('seq') == self._seq and
+                    self._acked is not None and not self._acked.done()):
+                self._acked.set_result(True)
+            return
+        for handler in self.handlers:
+            self.io_loop.spawn_callback(handler, raw)
+
+    def destroy(self):
+        self._closed = True
+        if self.subscriber is not None:
+            self.subscriber.close()
+        self.client.close()
@@ -32,6 +32,13 @@ add the following to the Salt master config file.
         disable_ssl: False
         webhook_disable_auth: False
         cors_origin: null
+        # number of worker processes, 0 for one per CPU
+        num_processes: 1
+        # one socket per worker, balanced by the kernel with SO_REUSEPORT
+        reuse_port: False
+        # a single process listens to the master event bus and forwards
+        # each worker only the events it waits for
+        event_fanout: False
 
 .. _rest_tornado-auth:
 
@@ -187,6 +194,7 @@ a return like::
 '''
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import datetime
 import time
 import fnmatch
 import logging
@@ -212,7 +220,6 @@ import salt.utils.json
 import salt.utils.minions
 import salt.utils.yaml
 import salt.utils.zeromq
-from salt.utils.event import tagify
 import salt.client
 import salt.runner
 import salt.auth
@@ -274,23 +281,35 @@ class EventListener(object):
     Class responsible for listening to the salt master event bus and updating
     futures. This is the core of what makes this asynchronous, this allows us to do
     non-blocking work in the main processes and "wait" for an event to happen
+
+    The events may come from a shared ``event`` source instead, such as the
+    :py:class:`~salt.netapi.rest_tornado.fanout.FanoutEvent` of a worker
+    process, which is told about the tags waited for.
     '''
 
-    def __init__(self, mod_opts, opts):
+    def __init__(self, mod_opts, opts, event=None):
         self.mod_opts = mod_opts
         self.opts = opts
-        self.event = salt.utils.event.get_event(
-            'master',
-            opts['sock_dir'],
-            opts['transport'],
-            opts=opts,
-            listen=True,
-            io_loop=tornado.ioloop.IOLoop.current()
-        )
+        if event is None:
+            event = salt.utils.event.get_event(
+                'master',
+                opts['sock_dir'],
+                opts['transport'],
+                opts=opts,
+                listen=True,
+                io_loop=tornado.ioloop.IOLoop.current()
+            )
+        self.event = event
 
         # tag -> list of futures
         self.tag_map = defaultdict(list)
 
+        # The prefix_matcher tags of tag_map in a trie and the tags of any
+        # other matcher but exact_matcher, so an event is only run through
+        # the matchers which can match it
+        self.prefix_tags = salt.utils.event.TagTrie()
+        self.other_tags = set()
+
         # request_obj -> list of (tag, future)
         self.request_map = defaultdict(list)
 
@@ -350,6 +369,8 @@ class EventListener(object):
                 tornado.ioloop.IOLoop.current().add_callback(callback, future)
             future.add_done_callback(handle_future)
         # add this tag and future to the callbacks
+        if (tag, matcher) not in self.tag_map:
+            self._index_tag(tag, matcher)
         self.tag_map[(tag, matcher)].append(future)
         self.request_map[request].append((tag, matcher, future))
 
@@ -359,6 +380,28 @@ class EventListener(object):
 
         return future
 
+    def subscribe(self, tag):
+        '''
+        Have an event source which only delivers subscribed tags deliver the
+        events whose tag starts with tag, before anything waits for them
+
+        :return: A future resolved once it does
+        '''
+        future = None
+        if hasattr(self.event, 'subscribe'):
+            future = self.event.subscribe(tag)
+        if future is None:
+            future = Future()
+            future.set_result(True)
+        return future
+
+    def unsubscribe(self, tag):
+        '''
+        Drop a subscription made with :py:meth:`subscribe`
+        '''
+        if hasattr(self.event, 'unsubscribe'):
+            self.event.unsubscribe(tag)
+
     def _timeout_future(self, tag, matcher, future):
         '''
         Timeout a specific future
@@ -370,29 +413,65 @@ class EventListener(object):
             self.tag_map[(tag, matcher)].remove(future)
         if not self.tag_map[(tag, matcher)]:
             del self.tag_map[(tag, matcher)]
+            self._unindex_tag(tag, matcher)
 
-    def _handle_event_socket_recv(self, raw):
+    def _index_tag(self, tag, matcher):
+        if matcher is self.prefix_matcher:
+            self.prefix_tags.add(tag)
+        elif matcher is not self.exact_matcher:
+            self.other_tags.add((tag, matcher))
+        if hasattr(self.event, 'subscribe'):
+            self.event.subscribe(self._subscription(tag, matcher))
+
+    def _unindex_tag(self, tag, matcher):
+        if matcher is self.prefix_matcher:
+            self.prefix_tags.remove(tag)
+        elif matcher is not self.exact_matcher:
+            self.other_tags.discard((tag, matcher))
+        if hasattr(self.event, 'unsubscribe'):
+            self.event.unsubscribe(self._subscription(tag, matcher))
+
+    def _subscription(self, tag, matcher):
         '''
-        Callback for events on the event sub socket
+        Return the tag prefix of the events a tag and matcher can match
         '''
-        mtag, data = self.event.unpack(raw, self.event.serial)
+        if matcher in (self.prefix_matcher, self.exact_matcher):
+            return tag
+        return ''
 
-        # see if we have any futures that need this info:
-        for (tag, matcher), futures in six.iteritems(self.tag_map):
+    def _matching_tags(self, mtag):
+        '''
+        Yield the keys of tag_map which match the event tag
+        '''
+        for tag in self.prefix_tags.prefixes(mtag):
+            yield (tag, self.prefix_matcher)
+        if (mtag, self.exact_matcher) in self.tag_map:
+            yield (mtag, self.exact_matcher)
+        for tag, matcher in list(self.other_tags):
             try:
                 is_matched = matcher(mtag, tag)
             except Exception:
                 log.error('Failed to run a matcher.', exc_info=True)
                 is_matched = False
+            if is_matched:
+                yield (tag, matcher)
 
-            if not is_matched:
-                continue
+    def _handle_event_socket_recv(self, raw):
+        '''
+        Callback for events on the event sub socket
+        '''
+        mtag, data = self.event.unpack(raw, self.event.serial)
 
-            for future in futures:
+        # see if we have any futures that need this info:
+        for key in list(self._matching_tags(mtag)):
+            futures = self.tag_map.get(key)
+            if not futures:
+                continue
+            for future in list(futures):
                 if future.done():
                     continue
                 future.set_result({'data': data, 'tag': mtag})
-                self.tag_map[(tag, matcher)].remove(future)
+                futures.remove(future)
                 if future in self.timeout_map:
                     tornado.ioloop.IOLoop.current().remove_timeout(self.timeout_map[future])
                     del self.timeout_map[future]
@@ -402,6 +481,7 @@ class BaseSaltAPIHandler(tornado.web.RequestHandler):  # pylint: disable=W0223
     ct_out_map = (
         ('application/json', _json_dumps),
         ('application/x-yaml', salt.utils.yaml.safe_dump),
+        ('application/x-ndjson', _json_dumps),
     )
 
     def _verify_client(self, low):
@@ -424,10 +504,14 @@ class BaseSaltAPIHandler(tornado.web.RequestHandler):  # pylint: disable=W0223
             self.application.event_listener = EventListener(
                 self.application.mod_opts,
                 self.application.opts,
+                event=getattr(self.application, 'event_fanout', None),
             )
 
         if not hasattr(self, 'saltclients'):
             local_client = salt.client.get_local_client(mopts=self.application.opts)
+            if not hasattr(self.application, 'return_listener'):
+                self.application.return_listener = local_client.return_listener(
+                    event=getattr(self.application, 'event_fanout', None))
             self.saltclients = {
                 'local': local_client.run_job_async,
                 # not the actual client we'll use.. but its what we'll use to get args
@@ -511,6 +595,17 @@ class BaseSaltAPIHandler(tornado.web.RequestHandler):  # pylint: disable=W0223
         '''
         self.finish()
 
+    def write_line(self, data):
+        '''
+        Write data as one line of a newline-delimited response and send it to
+        the client right away
+        '''
+        if self._finished:
+            return
+        self.set_header('Content-Type', self.content_type)
+        self.write(self.dumper(data) + '\n')
+        self.flush()
+
     def serialize(self, data):
         '''
         Serlialize the output based on the Accept header
@@ -900,6 +995,18 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
             of a previous job. If you need to have commands executed in order and
             stop on failure please use compound-command-execution.
 
+        .. admonition:: streaming
+
+            With ``Accept: application/x-ndjson`` the response is streamed as
+            one JSON document per line, each carrying the index of its
+            lowstate chunk. Returns of ``local`` commands are sent one line
+            per minion as they arrive:
+
+            .. code-block:: text
+
+                {"chunk": 0, "return": {"ms-0": true}}
+                {"chunk": 0, "return": {"ms-1": true}}
+
         '''
         # if you aren't authenticated, redirect to login
         if not self._verify_auth():
@@ -913,6 +1020,10 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
         '''
         Disbatch all lowstates to the appropriate clients
         '''
+        if self.content_type == 'application/x-ndjson':
+            yield self.disbatch_stream()
+            return
+
         ret = []
 
         # check clients before going, we want to throw 400 if one is bad
@@ -946,169 +1057,121 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
             self.finish()
 
     @tornado.gen.coroutine
-    def _disbatch_local(self, chunk):
+    def disbatch_stream(self):
+        '''
+        Disbatch all lowstates, writing each return as a line of its own as
+        soon as it is available instead of collecting them all first
+        '''
+        for low in self.lowstate:
+            if not self._verify_client(low):
+                return
+
+        for idx, low in enumerate(self.lowstate):
+            if self.token is not None and 'token' not in low:
+                low['token'] = self.token
+
+            if not (('token' in low)
+                    or ('username' in low and 'password' in low and 'eauth' in low)):
+                self.write_line({'chunk': idx, 'return': 'Failed to authenticate'})
+                break
+
+            try:
+                if low['client'] == 'local':
+                    def _write_minion(ret, idx=idx):
+                        self.write_line({'chunk': idx, 'return': ret})
+                    chunk_ret = yield self._disbatch_local(low, on_return=_write_minion)
+                else:
+                    chunk_ret = yield getattr(self, '_disbatch_{0}'.format(low['client']))(low)
+                if chunk_ret is not None:
+                    self.write_line({'chunk': idx, 'return': chunk_ret})
+            except (AuthenticationError, AuthorizationError, EauthAuthenticationError):
+                self.write_line({'chunk': idx, 'return': 'Failed to authenticate'})
+                break
+            except Exception as ex:
+                self.write_line({'chunk': idx,
+                                 'return': 'Unexpected exception while handling request: {0}'.format(ex)})
+                log.error('Unexpected exception while handling request:', exc_info=True)
+
+        if not self._finished:
+            self.finish()
+
+    @tornado.gen.coroutine
+    def _disbatch_local(self, chunk, on_return=None):
         '''
         Dispatch local client commands
+
+        If ``on_return`` is given every minion's return is passed to it as a
+        single item mapping when it arrives, and the returns are not collected.
         '''
-        # Generate jid and find all minions before triggering a job to subscribe all returns from minions
+        # Generate jid before triggering a job to collect all returns from minions
         full_return = chunk.pop('full_return', False)
         chunk['jid'] = salt.utils.jid.gen_jid(self.application.opts) if not chunk.get('jid', None) else chunk['jid']
-        minions = set(self.ckminions.check_minions(chunk['tgt'], chunk.get('tgt_type', 'glob')))
-
-        def subscribe_minion(minion):
-            salt_evt = self.application.event_listener.get_event(
-                     self,
-                     tag='salt/job/{}/ret/{}'.format(chunk['jid'], minion),
-                     matcher=EventListener.exact_matcher)
-            syndic_evt = self.application.event_listener.get_event(
-                    self,
-                    tag='syndic/job/{}/ret/{}'.format(chunk['jid'], minion),
-                    matcher=EventListener.exact_matcher)
-            return salt_evt, syndic_evt
-
-        # start listening for the event before we fire the job to avoid races
-        events = []
-        for minion in minions:
-            salt_evt, syndic_evt = subscribe_minion(minion)
-            events.append(salt_evt)
-            events.append(syndic_evt)
 
         f_call = self._format_call_run_job_async(chunk)
+
+        # start listening for the returns before we fire the job to avoid races.
+        # This follows the behavior of LocalClient.get_iter_returns, namely
+        # waiting at least syndic_wait (assuming we are a syndic) and until
+        # the job is no longer running on the minions which did not return.
+        return_listener = self.application.return_listener
+
+        def _minion_return(event):
+            # minions which did not return show up as {'failed': True}
+            if 'data' not in event:
+                return event
+            return event if full_return else event['data']['return']
+
+        def _stream(ret):
+            if 'tag' in ret and 'data' in ret:
+                ret = {ret['data']['id']: _minion_return(ret)}
+            on_return(ret)
+
+        job = return_listener.watch(
+            chunk['jid'],
+            timeout=f_call['kwargs'].get('timeout') or self.application.opts['timeout'],
+            callback=None if on_return is None else _stream,
+            raw=True,
+            store=on_return is None)
+
+        # the returns of a fast minion are lost unless the events of the job
+        # are delivered before it is published
+        if job.subscribed is not None:
+            yield self._wait_subscribed(job.subscribed, 'job {0}'.format(chunk['jid']))
+
         # fire a job off
-        pub_data = yield self.saltclients['local'](*f_call.get('args', ()), **f_call.get('kwargs', {}))
+        try:
+            pub_data = yield self.saltclients['local'](*f_call.get('args', ()), **f_call.get('kwargs', {}))
+        except Exception:
+            return_listener.forget(chunk['jid'])
+            raise
 
         # if the job didn't publish, lets not wait around for nothing
         # TODO: set header??
         if 'jid' not in pub_data:
-            for future in events:
-                try:
-                    future.set_result(None)
-                except Exception:
-                    pass
+            return_listener.forget(chunk['jid'])
             raise tornado.gen.Return('No minions matched the target. No command was sent, no jid was assigned.')
 
-        # get_event for missing minion
-        for minion in list(set(pub_data['minions']) - set(minions)):
-            salt_evt, syndic_evt = subscribe_minion(minion)
-            events.append(salt_evt)
-            events.append(syndic_evt)
-
-        # Map of minion_id -> returned for all minions we think we need to wait on
-        minions = {m: False for m in pub_data['minions']}
-
-        # minimum time required for return to complete. By default no waiting, if
-        # we are a syndic then we must wait syndic_wait at a minimum
-        min_wait_time = Future()
-        min_wait_time.set_result(True)
-
-        # wait syndic a while to avoid missing published events
-        if self.application.opts['order_masters']:
-            min_wait_time = tornado.gen.sleep(self.application.opts['syndic_wait'])
-
-        # To ensure job_not_running and all_return are terminated by each other, communicate using a future
-        is_timed_out = tornado.gen.sleep(self.application.opts['gather_job_timeout'])
-        is_finished = Future()
-
-        # ping until the job is not running, while doing so, if we see new minions returning
-        # that they are running the job, add them to the list
-        tornado.ioloop.IOLoop.current().spawn_callback(self.job_not_running, pub_data['jid'],
-                                                      chunk['tgt'],
-                                                      f_call['kwargs']['tgt_type'],
-                                                      minions,
-                                                      is_finished)
-
-        def more_todo():
-            '''
-            Check if there are any more minions we are waiting on returns from
-            '''
-            return any(x is False for x in six.itervalues(minions))
-
-        # here we want to follow the behavior of LocalClient.get_iter_returns
-        # namely we want to wait at least syndic_wait (assuming we are a syndic)
-        # and that there are no more jobs running on minions. We are allowed to exit
-        # early if gather_job_timeout has been exceeded
-        chunk_ret = {}
-        while True:
-            to_wait = events+[is_finished, is_timed_out]
-            if not min_wait_time.done():
-                to_wait += [min_wait_time]
-
-            def cancel_inflight_futures():
-                for event in to_wait:
-                    if not event.done() and event is not is_timed_out:
-                        event.set_result(None)
-            f = yield Any(to_wait)
-            try:
-                # When finished entire routine, cleanup other futures and return result
-                if f is is_finished or f is is_timed_out:
-                    cancel_inflight_futures()
-                    raise tornado.gen.Return(chunk_ret)
-                elif f is min_wait_time:
-                    if not more_todo():
-                        cancel_inflight_futures()
-                        raise tornado.gen.Return(chunk_ret)
-                    continue
-
-                f_result = f.result()
-                if f in events:
-                    events.remove(f)
-                # if this is a start, then we need to add it to the pile
-                if f_result['tag'].endswith('/new'):
-                    for minion_id in f_result['data']['minions']:
-                        if minion_id not in minions:
-                            minions[minion_id] = False
-                else:
-                    chunk_ret[f_result['data']['id']] = f_result if full_return else f_result['data']['return']
-                    # clear finished event future
-                    minions[f_result['data']['id']] = True
-                    # if there are no more minions to wait for, then we are done
-                    if not more_todo() and min_wait_time.done():
-                        cancel_inflight_futures()
-                        raise tornado.gen.Return(chunk_ret)
-
-            except TimeoutException:
-                break
+        job.expect(pub_data['minions'])
+        returns = yield job.done
+        if on_return is not None:
+            raise tornado.gen.Return(None)
+        raise tornado.gen.Return(dict(
+            (minion, _minion_return(event))
+            for minion, event in six.iteritems(returns)))
 
     @tornado.gen.coroutine
-    def job_not_running(self, jid, tgt, tgt_type, minions, is_finished):
+    def _wait_subscribed(self, subscribed, what):
         '''
-        Return a future which will complete once jid (passed in) is no longer
-        running on tgt
+        Wait for the event source to acknowledge a subscription, made before
+        publishing what
         '''
-        ping_pub_data = yield self.saltclients['local'](tgt,
-                                                        'saltutil.find_job',
-                                                        [jid],
-                                                        tgt_type=tgt_type)
-        ping_tag = tagify([ping_pub_data['jid'], 'ret'], 'job')
-
-        minion_running = False
-        while True:
-            try:
-                event = self.application.event_listener.get_event(self,
-                                                                  tag=ping_tag,
-                                                                  timeout=self.application.opts['gather_job_timeout'])
-                event = yield event
-            except TimeoutException:
-                if not event.done():
-                    event.set_result(None)
-
-                if not minion_running or is_finished.done():
-                    raise tornado.gen.Return(True)
-                else:
-                    ping_pub_data = yield self.saltclients['local'](tgt,
-                                                                    'saltutil.find_job',
-                                                                    [jid],
-                                                                    tgt_type=tgt_type)
-                    ping_tag = tagify([ping_pub_data['jid'], 'ret'], 'job')
-                    minion_running = False
-                    continue
-
-            # Minions can return, we want to see if the job is running...
-            if event['data'].get('return', {}) == {}:
-                continue
-            if event['data']['id'] not in minions:
-                minions[event['data']['id']] = False
-            minion_running = True
+        try:
+            yield tornado.gen.with_timeout(
+                datetime.timedelta(seconds=self.application.opts['timeout']),
+                subscribed)
+        except tornado.gen.TimeoutError:
+            log.warning('The event fanout did not acknowledge the subscription '
+                        'to %s, publishing it anyway', what)
 
     @tornado.gen.coroutine
     def _disbatch_local_async(self, chunk):
@@ -1127,10 +1190,19 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
         Disbatch runner client commands
         '''
         full_return = chunk.pop('full_return', False)
-        pub_data = self.saltclients['runner'](chunk)
-        tag = pub_data['tag'] + '/ret'
+        event_listener = self.application.event_listener
+        # The jid of the runner is only known once it is published, the events
+        # of all runners are delivered until its return is waited for so that
+        # the return of a fast runner is not lost
+        yield self._wait_subscribed(event_listener.subscribe('salt/run/'), 'the runners')
+        try:
+            pub_data = self.saltclients['runner'](chunk)
+            tag = pub_data['tag'] + '/ret'
+            future = event_listener.get_event(self, tag=tag)
+        finally:
+            event_listener.unsubscribe('salt/run/')
         try:
-            event = yield self.application.event_listener.get_event(self, tag=tag)
+            event = yield future
 
             # only return the return data
             ret = event if full_return else event['data']['return']
@@ -1371,6 +1443,13 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                 - 1
                 - 2
                 - 6.9141387939453125e-06
+
+        Both forms accept ``limit`` and ``cursor`` query parameters to page
+        through large results, e.g. ``/jobs?limit=100`` followed by
+        ``/jobs?limit=100&cursor=<oldest jid of the previous page>``, or
+        ``/jobs/<jid>?limit=1000&cursor=<last minion of the previous page>``.
+        See :py:func:`jobs.list_jobs <salt.runners.jobs.list_jobs>` and
+        :py:func:`jobs.list_job <salt.runners.jobs.list_job>`.
         '''
         # if you aren't authenticated, redirect to login
         if not self._verify_auth():
@@ -1389,6 +1468,11 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                 'client': 'runner',
             }]
 
+        for arg in ('limit', 'cursor'):
+            value = self.get_query_argument(arg, None)
+            if value is not None:
+                self.lowstate[0][arg] = value
+
         self.disbatch()
 
 
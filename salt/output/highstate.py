@@ -344,6 +344,9 @@ def _format_host(host, data, indent_level=1):
                     '    {tcolor} Started: {ret[start_time]!s}{colors[ENDC]}',
                     '    {tcolor}Duration: {ret[duration]!s}{colors[ENDC]}',
                 ])
+                if 'check_duration' in ret:
+                    state_lines.append(
+                        '    {tcolor}  Checks: {ret[check_duration]!s} ms{colors[ENDC]}')
             # This isn't the prettiest way of doing this, but it's readable.
             if comps[1] != comps[2]:
                 state_lines.insert(
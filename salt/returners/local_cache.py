@@ -348,29 +348,62 @@ def get_jid(jid):
         if fn_.startswith('.'):
             continue
         if fn_ not in ret:
-            retp = os.path.join(jid_dir, fn_, RETURN_P)
-            outp = os.path.join(jid_dir, fn_, OUT_P)
-            if not os.path.isfile(retp):
-                continue
-            while fn_ not in ret:
-                try:
-                    with salt.utils.files.fopen(retp, 'rb') as rfh:
-                        ret_data = serial.load(rfh)
-                    if not isinstance(ret_data, dict) or 'return' not in ret_data:
-                        # Convert the old format in which return.p contains the only return data to
-                        # the new that is dict containing 'return' and optionally 'retcode' and
-                        # 'success'.
-                        ret_data = {'return': ret_data}
-                    ret[fn_] = ret_data
-                    if os.path.isfile(outp):
-                        with salt.utils.files.fopen(outp, 'rb') as rfh:
-                            ret[fn_]['out'] = serial.load(rfh)
-                except Exception as exc:
-                    if 'Permission denied:' in six.text_type(exc):
-                        raise
+            _load_minion_return(jid_dir, fn_, serial, ret)
+    return ret
+
+
+def get_jid_page(jid, limit, cursor=None):
+    '''
+    Return the information returned by at most ``limit`` minions for the
+    specified job id, in the order of their IDs and starting after the minion
+    ``cursor``. Only the returns of those minions are loaded.
+
+    .. versionadded:: Neon
+    '''
+    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__['hash_type'])
+    serial = salt.payload.Serial(__opts__)
+
+    ret = {}
+    if not os.path.isdir(jid_dir):
+        return ret
+    if cursor is not None:
+        cursor = six.text_type(cursor)
+    minions = sorted(fn_ for fn_ in os.listdir(jid_dir)
+                     if not fn_.startswith('.')
+                     and (cursor is None or fn_ > cursor))
+    for fn_ in minions:
+        if len(ret) >= limit:
+            break
+        _load_minion_return(jid_dir, fn_, serial, ret)
     return ret
 
 
+def _load_minion_return(jid_dir, minion, serial, ret):
+    '''
+    Load the return of a minion from the job directory into ``ret``
+    '''
+    retp = os.path.join(jid_dir, minion, RETURN_P)
+    outp = os.path.join(jid_dir, minion, OUT_P)
+    if not os.path.isfile(retp):
+        return
+    while minion not in ret:
+        try:
+            with salt.utils.files.fopen(retp, 'rb') as rfh:
+                ret_data = serial.load(rfh)
+            if not isinstance(ret_data, dict) or 'return' not in ret_data:
+                # Convert the old format in which return.p contains the only return data to
+                # the new that is dict containing 'return' and optionally 'retcode' and
+                # 'success'.
+                ret_data = {'return': ret_data}
+            ret[minion] = ret_data
+            if os.path.isfile(outp):
+                with salt.utils.files.fopen(outp, 'rb') as rfh:
+                    ret[minion]['out'] = serial.load(rfh)
+        except Exception as exc:
+            if 'Permission denied:' in six.text_type(exc):
+                raise
+
+
 def get_jids():
     '''
     Return a dict mapping all job ids to job information
@@ -387,6 +420,54 @@ def get_jids():
     return ret
 
 
+def get_jids_page(limit, cursor=None):
+    '''
+    Return a dict mapping at most ``limit`` job ids to job information, newest
+    first and starting with the jobs older than the job id ``cursor``. Only
+    the jid files of the other jobs are read, not their load.
+
+    .. versionadded:: Neon
+    '''
+    job_dir = _job_dir()
+    serial = salt.payload.Serial(__opts__)
+    if cursor is not None:
+        cursor = six.text_type(cursor)
+    jids = []
+    for top in os.listdir(job_dir):
+        t_path = os.path.join(job_dir, top)
+        if not os.path.isdir(t_path):
+            continue
+        for final in os.listdir(t_path):
+            try:
+                with salt.utils.files.fopen(os.path.join(t_path, final, 'jid'), 'rb') as rfh:
+                    jid = salt.utils.stringutils.to_unicode(rfh.read()).strip()
+            except (IOError, OSError):
+                continue
+            if cursor is None or jid < cursor:
+                jids.append((jid, os.path.join(t_path, final, LOAD_P)))
+
+    ret = {}
+    for jid, load_path in sorted(jids, reverse=True):
+        if len(ret) >= limit:
+            break
+        if not os.path.isfile(load_path):
+            continue
+        with salt.utils.files.fopen(load_path, 'rb') as rfh:
+            try:
+                job = serial.load(rfh)
+            except Exception:
+                log.exception('Failed to deserialize %s', load_path)
+                continue
+        if not job:
+            continue
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+        if __opts__.get('job_cache_store_endtime'):
+            endtime = get_endtime(jid)
+            if endtime:
+                ret[jid]['EndTime'] = endtime
+    return ret
+
+
 def get_jids_filter(count, filter_find_job=True):
     '''
     Return a list of all jobs information filtered by the given criteria.
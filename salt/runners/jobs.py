@@ -168,7 +168,7 @@ def lookup_jid(jid,
         return ret
 
 
-def list_job(jid, ext_source=None, display_progress=False):
+def list_job(jid, ext_source=None, display_progress=False, limit=None, cursor=None):
     '''
     List a specific job given by its jid
 
@@ -180,12 +180,26 @@ def list_job(jid, ext_source=None, display_progress=False):
 
         .. versionadded:: 2015.8.8
 
+    limit
+        Only include the returns of this many minions, in the order of their
+        IDs. Returners providing ``get_jid_page`` then only load those returns.
+
+        .. versionadded:: Neon
+
+    cursor
+        Only include the returns of the minions whose IDs sort after this one.
+        Pass the last minion of a page to get the next page, the last page is
+        the one with fewer than ``limit`` returns.
+
+        .. versionadded:: Neon
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run jobs.list_job 20130916125524463507
         salt-run jobs.list_job 20130916125524463507 --out=pprint
+        salt-run jobs.list_job 20130916125524463507 limit=1000 cursor=web0999
     '''
     ret = {'jid': jid}
     mminion = salt.minion.MasterMinion(__opts__)
@@ -202,7 +216,15 @@ def list_job(jid, ext_source=None, display_progress=False):
 
     job = mminion.returners['{0}.get_load'.format(returner)](jid)
     ret.update(_format_jid_instance(jid, job))
-    ret['Result'] = mminion.returners['{0}.get_jid'.format(returner)](jid)
+    if limit is None:
+        ret['Result'] = mminion.returners['{0}.get_jid'.format(returner)](jid)
+    elif '{0}.get_jid_page'.format(returner) in mminion.returners:
+        ret['Result'] = mminion.returners['{0}.get_jid_page'.format(returner)](
+            jid, int(limit), cursor=cursor)
+    else:
+        ret['Result'] = _page(
+            mminion.returners['{0}.get_jid'.format(returner)](jid),
+            int(limit), cursor)
 
     fstr = '{0}.get_endtime'.format(__opts__['master_job_cache'])
     if (__opts__.get('job_cache_store_endtime')
@@ -221,13 +243,29 @@ def list_jobs(ext_source=None,
               search_target=None,
               start_time=None,
               end_time=None,
-              display_progress=False):
+              display_progress=False,
+              limit=None,
+              cursor=None):
     '''
     List all detectable jobs and associated functions
 
     ext_source
         If provided, specifies which external job cache to use.
 
+    limit
+        Only return this many of the matching jobs, newest first. Returners
+        providing ``get_jids_page`` then only load the jobs of the pages
+        needed.
+
+        .. versionadded:: Neon
+
+    cursor
+        Only return the jobs older than this jid. Pass the oldest jid of a page
+        to get the next page, the last page is the one with fewer than
+        ``limit`` jobs.
+
+        .. versionadded:: Neon
+
     **FILTER OPTIONS**
 
     .. note::
@@ -296,6 +334,7 @@ def list_jobs(ext_source=None,
         salt-run jobs.list_jobs
         salt-run jobs.list_jobs search_function='test.*' search_target='localhost' search_metadata='{"bar": "foo"}'
         salt-run jobs.list_jobs start_time='2015, Mar 16 19:00' end_time='2015, Mar 18 22:00'
+        salt-run jobs.list_jobs limit=100 cursor=20130916125524463507
 
     '''
     returner = _get_returner((
@@ -310,68 +349,30 @@ def list_jobs(ext_source=None,
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners['{0}.get_jids'.format(returner)]()
-
+    filters = (search_metadata, search_target, search_function,
+               start_time, end_time)
+    jids_page = '{0}.get_jids_page'.format(returner)
     mret = {}
-    for item in ret:
-        _match = True
-        if search_metadata:
-            _match = False
-            if 'Metadata' in ret[item]:
-                if isinstance(search_metadata, dict):
-                    for key in search_metadata:
-                        if key in ret[item]['Metadata']:
-                            if ret[item]['Metadata'][key] == search_metadata[key]:
-                                _match = True
-                else:
-                    log.info('The search_metadata parameter must be specified'
-                             ' as a dictionary.  Ignoring.')
-        if search_target and _match:
-            _match = False
-            if 'Target' in ret[item]:
-                targets = ret[item]['Target']
-                if isinstance(targets, six.string_types):
-                    targets = [targets]
-                for target in targets:
-                    for key in salt.utils.args.split_input(search_target):
-                        if fnmatch.fnmatch(target, key):
-                            _match = True
-
-        if search_function and _match:
-            _match = False
-            if 'Function' in ret[item]:
-                for key in salt.utils.args.split_input(search_function):
-                    if fnmatch.fnmatch(ret[item]['Function'], key):
-                        _match = True
-
-        if start_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_start_time = dateutil_parser.parse(start_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
-                if _start_time >= parsed_start_time:
-                    _match = True
-            else:
-                log.error(
-                    '\'dateutil\' library not available, skipping start_time '
-                    'comparison.'
-                )
-
-        if end_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_end_time = dateutil_parser.parse(end_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
-                if _start_time <= parsed_end_time:
-                    _match = True
-            else:
-                log.error(
-                    '\'dateutil\' library not available, skipping end_time '
-                    'comparison.'
-                )
-
-        if _match:
-            mret[item] = ret[item]
+    if limit is not None and jids_page in mminion.returners:
+        # Let the returner page through the jobs, asking for more of them
+        # until enough match the filters
+        limit = int(limit)
+        while True:
+            ret = mminion.returners[jids_page](limit, cursor=cursor)
+            for item in ret:
+                if _match_job(ret[item], *filters):
+                    mret[item] = ret[item]
+            if len(ret) < limit or len(mret) >= limit:
+                break
+            cursor = min(ret)
+        mret = _page(mret, limit, reverse=True)
+    else:
+        ret = mminion.returners['{0}.get_jids'.format(returner)]()
+        for item in ret:
+            if _match_job(ret[item], *filters):
+                mret[item] = ret[item]
+        if limit is not None:
+            mret = _page(mret, int(limit), cursor, reverse=True)
 
     if outputter:
         return {'outputter': outputter, 'data': mret}
@@ -539,6 +540,87 @@ def last_run(ext_source=None,
         return False
 
 
+def _match_job(job,
+               search_metadata=None,
+               search_target=None,
+               search_function=None,
+               start_time=None,
+               end_time=None):
+    '''
+    Return whether a job listed by list_jobs matches all of the given filters
+    '''
+    _match = True
+    if search_metadata:
+        _match = False
+        if 'Metadata' in job:
+            if isinstance(search_metadata, dict):
+                for key in search_metadata:
+                    if key in job['Metadata']:
+                        if job['Metadata'][key] == search_metadata[key]:
+                            _match = True
+            else:
+                log.info('The search_metadata parameter must be specified'
+                         ' as a dictionary.  Ignoring.')
+    if search_target and _match:
+        _match = False
+        if 'Target' in job:
+            targets = job['Target']
+            if isinstance(targets, six.string_types):
+                targets = [targets]
+            for target in targets:
+                for key in salt.utils.args.split_input(search_target):
+                    if fnmatch.fnmatch(target, key):
+                        _match = True
+
+    if search_function and _match:
+        _match = False
+        if 'Function' in job:
+            for key in salt.utils.args.split_input(search_function):
+                if fnmatch.fnmatch(job['Function'], key):
+                    _match = True
+
+    if start_time and _match:
+        _match = False
+        if DATEUTIL_SUPPORT:
+            parsed_start_time = dateutil_parser.parse(start_time)
+            _start_time = dateutil_parser.parse(job['StartTime'])
+            if _start_time >= parsed_start_time:
+                _match = True
+        else:
+            log.error(
+                '\'dateutil\' library not available, skipping start_time '
+                'comparison.'
+            )
+
+    if end_time and _match:
+        _match = False
+        if DATEUTIL_SUPPORT:
+            parsed_end_time = dateutil_parser.parse(end_time)
+            _start_time = dateutil_parser.parse(job['StartTime'])
+            if _start_time <= parsed_end_time:
+                _match = True
+        else:
+            log.error(
+                '\'dateutil\' library not available, skipping end_time '
+                'comparison.'
+            )
+
+    return _match
+
+
+def _page(data, limit, cursor=None, reverse=False):
+    '''
+    Return the first ``limit`` items of a dict in the order of its keys,
+    starting after the ``cursor`` key
+    '''
+    keys = sorted(data, reverse=reverse)
+    if cursor is not None:
+        cursor = six.text_type(cursor)
+        keys = [key for key in keys
+                if (key < cursor if reverse else key > cursor)]
+    return dict((key, data[key]) for key in keys[:limit])
+
+
 def _get_returner(returner_types):
     '''
     Helper to iterate over returner_types and pick the first one
@@ -33,6 +33,7 @@ import salt.minion
 import salt.pillar
 import salt.fileclient
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.decorators.state
@@ -41,9 +42,11 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.immutabletypes as immutabletypes
+import salt.utils.json
 import salt.utils.msgpack as msgpack
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.profile
 import salt.utils.url
 import salt.syspaths as syspaths
 import salt.transport.client
@@ -204,6 +207,14 @@ def get_accumulator_dir(cachedir):
     return fn_
 
 
+def get_check_cache_path(cachedir):
+    '''
+    Return the path of the file keeping the return codes of the onlyif and
+    unless commands between state runs
+    '''
+    return os.path.join(cachedir, 'state_check_cache.p')
+
+
 def trim_req(req):
     '''
     Trim any function off of a requisite
@@ -763,6 +774,10 @@ class State(object):
         self.instance_id = six.text_type(id(self))
         self.inject_globals = {}
         self.mocked = mocked
+        # The return codes of the onlyif and unless commands, loaded when first
+        # used
+        self.check_cache = None
+        self._check_cache_dirty = False
 
     def _gather_pillar(self):
         '''
@@ -836,7 +851,13 @@ class State(object):
         if agg_opt is True:
             agg_opt = [low['state']]
         elif not isinstance(agg_opt, list):
-            return low
+            agg_opt = []
+        if low['state'] == 'pkg' and 'aggregate' not in low \
+                and self.functions['config.option']('state_pkg_batch'):
+            # The pkg states are batched together unless disabled, as every
+            # one of them queries the package manager. mod_aggregate only
+            # merges the states no requisite refers to.
+            agg_opt = agg_opt + ['pkg']
         if low['state'] in agg_opt and not low.get('__agg__'):
             agg_fun = '{0}.mod_aggregate'.format(low['state'])
             if agg_fun in self.states:
@@ -896,8 +917,7 @@ class State(object):
 
         for entry in low_data_onlyif:
             if isinstance(entry, six.string_types):
-                cmd = self.functions['cmd.retcode'](
-                    entry, ignore_retcode=True, python_shell=True, **cmd_opts)
+                cmd = self._run_check_retcode(entry, cmd_opts)
                 log.debug('Last command return code: %s', cmd)
                 _check_cmd(cmd)
             elif isinstance(entry, dict):
@@ -945,7 +965,7 @@ class State(object):
 
         for entry in low_data_unless:
             if isinstance(entry, six.string_types):
-                cmd = self.functions['cmd.retcode'](entry, ignore_retcode=True, python_shell=True, **cmd_opts)
+                cmd = self._run_check_retcode(entry, cmd_opts)
                 log.debug('Last command return code: %s', cmd)
                 _check_cmd(cmd)
             elif isinstance(entry, dict):
@@ -973,6 +993,82 @@ class State(object):
         # No reason to stop, return ret
         return ret
 
+    def _run_check_retcode(self, cmd, cmd_opts):
+        '''
+        Return the return code of an onlyif or unless command. When
+        state_check_cache is enabled, the return code of the same command run
+        with the same options less than state_check_cache_ttl seconds ago is
+        reused.
+        '''
+        if not self.opts.get('state_check_cache', False):
+            return self.functions['cmd.retcode'](
+                cmd, ignore_retcode=True, python_shell=True, **cmd_opts)
+        cache = self._load_check_cache()
+        key = salt.utils.json.dumps(
+            [cmd, self.state_con.get('runas'), cmd_opts], sort_keys=True)
+        now = time.time()
+        if key in cache and now - cache[key]['time'] < self.opts.get('state_check_cache_ttl', 300):
+            log.debug('Using the cached return code of command: %s', cmd)
+            salt.utils.profile.count('check_cache_hits')
+            return cache[key]['retcode']
+        retcode = self.functions['cmd.retcode'](
+            cmd, ignore_retcode=True, python_shell=True, **cmd_opts)
+        cache[key] = {'time': now, 'retcode': retcode}
+        self._check_cache_dirty = True
+        return retcode
+
+    def _load_check_cache(self):
+        '''
+        Return the cached return codes of the onlyif and unless commands, read
+        from the cachedir when state_check_cache_persist is enabled
+        '''
+        if self.check_cache is not None:
+            return self.check_cache
+        self.check_cache = {}
+        if not self.opts.get('state_check_cache_persist', False):
+            return self.check_cache
+        path = get_check_cache_path(self.opts['cachedir'])
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                cache = msgpack_deserialize(fp_.read())
+        except (IOError, OSError):
+            return self.check_cache
+        except Exception as exc:
+            log.debug('Failed to read the state check cache %s: %s', path, exc)
+            return self.check_cache
+        if isinstance(cache, dict):
+            expire = time.time() - self.opts.get('state_check_cache_ttl', 300)
+            for key, entry in six.iteritems(cache):
+                if isinstance(entry, dict) and entry.get('time', 0) > expire:
+                    self.check_cache[key] = entry
+        return self.check_cache
+
+    def _clear_check_cache(self):
+        '''
+        Forget the return codes of the onlyif and unless commands, once a state
+        changed something they may depend on
+        '''
+        if self.check_cache:
+            log.debug('Clearing the return codes of the onlyif and unless commands')
+            self.check_cache.clear()
+            self._check_cache_dirty = True
+
+    def _save_check_cache(self):
+        '''
+        Write the return codes of the onlyif and unless commands to the cachedir
+        when state_check_cache_persist is enabled
+        '''
+        if not self._check_cache_dirty \
+                or not self.opts.get('state_check_cache_persist', False):
+            return
+        path = get_check_cache_path(self.opts['cachedir'])
+        try:
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                fp_.write(msgpack_serialize(self.check_cache))
+            self._check_cache_dirty = False
+        except (IOError, OSError) as exc:
+            log.debug('Failed to write the state check cache %s: %s', path, exc)
+
     def _run_check_cmd(self, low_data):
         '''
         Alter the way a successful state run is determined
@@ -1943,6 +2039,9 @@ class State(object):
         if low.get('__prereq__'):
             test = sys.modules[self.states[cdata['full']].__module__].__opts__['test']
             sys.modules[self.states[cdata['full']].__module__].__opts__['test'] = True
+        # The time spent in the onlyif, unless and check_cmd checks
+        check_duration = 0.0
+        tag = _gen_tag(low)
         try:
             # Let's get a reference to the salt environment to use within this
             # state call.
@@ -1954,7 +2053,10 @@ class State(object):
             # not found we default to 'base'
             if ('unless' in low and '{0[state]}.mod_run_check'.format(low) not in self.states) or \
                     ('onlyif' in low and '{0[state]}.mod_run_check'.format(low) not in self.states):
-                ret.update(self._run_check(low))
+                check_start = time.time()
+                with salt.utils.profile.timer(tag, 'checks'):
+                    ret.update(self._run_check(low))
+                check_duration += (time.time() - check_start) * 1000.0
 
             if not self.opts.get('lock_saltenv', False):
                 # NOTE: Overriding the saltenv when lock_saltenv is blocked in
@@ -1987,18 +2089,24 @@ class State(object):
                     # Execute the state function
                     if not low.get('__prereq__') and low.get('parallel'):
                         # run the state call in parallel, but only if not in a prereq
-                        ret = self.call_parallel(cdata, low)
+                        with salt.utils.profile.timer(tag, 'execute'):
+                            ret = self.call_parallel(cdata, low)
                     else:
-                        self.format_slots(cdata)
-                        if cdata['full'].split('.')[-1] == '__call__':
-                            # __call__ requires OrderedDict to preserve state order
-                            # kwargs are also invalid overall
-                            ret = self.states[cdata['full']](cdata['args'], module=None, state=cdata['kwargs'])
-                        else:
-                            ret = self.states[cdata['full']](*cdata['args'], **cdata['kwargs'])
+                        with salt.utils.profile.timer(tag, 'format_slots'):
+                            self.format_slots(cdata)
+                        with salt.utils.profile.timer(tag, 'execute'):
+                            if cdata['full'].split('.')[-1] == '__call__':
+                                # __call__ requires OrderedDict to preserve state order
+                                # kwargs are also invalid overall
+                                ret = self.states[cdata['full']](cdata['args'], module=None, state=cdata['kwargs'])
+                            else:
+                                ret = self.states[cdata['full']](*cdata['args'], **cdata['kwargs'])
                 self.states.inject_globals = {}
             if 'check_cmd' in low and '{0[state]}.mod_run_check_cmd'.format(low) not in self.states:
-                ret.update(self._run_check_cmd(low))
+                check_start = time.time()
+                with salt.utils.profile.timer(tag, 'checks'):
+                    ret.update(self._run_check_cmd(low))
+                check_duration += (time.time() - check_start) * 1000.0
         except Exception as exc:
             log.debug('An exception occurred in this state: %s', exc,
                       exc_info_on_loglevel=logging.DEBUG)
@@ -2044,6 +2152,8 @@ class State(object):
         self.__run_num += 1
         format_log(ret)
         self.check_refresh(low, ret)
+        if ret.get('changes'):
+            self._clear_check_cache()
         if use_uptime:
             with salt.utils.files.fopen('/proc/uptime', 'r') as fp_:
                 finish_uptime = float(fp_.readline().split()[0])
@@ -2059,6 +2169,11 @@ class State(object):
             # duration in milliseconds.microseconds
             duration = (delta.seconds * 1000000 + delta.microseconds) / 1000.0
         ret['duration'] = duration
+        if check_duration:
+            ret['check_duration'] = check_duration
+        profile_stage = salt.utils.profile.current()
+        if profile_stage is not None and tag in profile_stage.children:
+            ret['profile'] = profile_stage.children[tag].to_dict()
         ret['__id__'] = low['__id__']
         log.info(
             'Completed state [%s] at time %s (duration_in_ms=%s)',
@@ -2637,11 +2752,12 @@ class State(object):
                       'onfail_any',
                       'onchanges',
                       'onchanges_any']
-        if not low.get('__prereq__'):
-            requisites.append('prerequired')
-            status, reqs = self.check_requisite(low, running, chunks, pre=True)
-        else:
-            status, reqs = self.check_requisite(low, running, chunks)
+        with salt.utils.profile.timer(tag, 'requisites'):
+            if not low.get('__prereq__'):
+                requisites.append('prerequired')
+                status, reqs = self.check_requisite(low, running, chunks, pre=True)
+            else:
+                status, reqs = self.check_requisite(low, running, chunks)
         if status == 'unmet':
             lost = {}
             reqs = []
@@ -2950,26 +3066,34 @@ class State(object):
         self.inject_default_call(high)
         errors = []
         # If there is extension data reconcile it
-        high, ext_errors = self.reconcile_extend(high)
+        with salt.utils.profile.timer('reconcile_extend'):
+            high, ext_errors = self.reconcile_extend(high)
         errors.extend(ext_errors)
-        errors.extend(self.verify_high(high))
+        with salt.utils.profile.timer('verify_high'):
+            errors.extend(self.verify_high(high))
         if errors:
             return errors
-        high, req_in_errors = self.requisite_in(high)
+        with salt.utils.profile.timer('requisite_in'):
+            high, req_in_errors = self.requisite_in(high)
         errors.extend(req_in_errors)
-        high = self.apply_exclude(high)
+        with salt.utils.profile.timer('apply_exclude'):
+            high = self.apply_exclude(high)
         # Verify that the high data is structurally sound
         if errors:
             return errors
         # Compile and verify the raw chunks
-        chunks = self.compile_high_data(high, orchestration_jid)
+        with salt.utils.profile.timer('compile_high_data'):
+            chunks = self.compile_high_data(high, orchestration_jid)
 
         # If there are extensions in the highstate, process them and update
         # the low data chunks
         if errors:
             return errors
-        ret = self.call_chunks(chunks)
-        ret = self.call_listen(chunks, ret)
+        with salt.utils.profile.timer('call_chunks'):
+            ret = self.call_chunks(chunks)
+        with salt.utils.profile.timer('call_listen'):
+            ret = self.call_listen(chunks, ret)
+        self._save_check_cache()
 
         def _cleanup_accumulator_data():
             accum_data_path = os.path.join(
@@ -3635,7 +3759,8 @@ class BaseHighState(object):
         '''
         errors = []
         if not local:
-            state_data = self.client.get_state(sls, saltenv)
+            with salt.utils.profile.timer('fetch'):
+                state_data = self.client.get_state(sls, saltenv)
             fn_ = state_data.get('dest', False)
         else:
             fn_ = sls
@@ -3653,15 +3778,16 @@ class BaseHighState(object):
             )
         else:
             try:
-                state = compile_template(fn_,
-                                         self.state.rend,
-                                         self.state.opts['renderer'],
-                                         self.state.opts['renderer_blacklist'],
-                                         self.state.opts['renderer_whitelist'],
-                                         saltenv,
-                                         sls,
-                                         rendered_sls=mods
-                                         )
+                with salt.utils.profile.timer('template'):
+                    state = compile_template(fn_,
+                                             self.state.rend,
+                                             self.state.opts['renderer'],
+                                             self.state.opts['renderer_blacklist'],
+                                             self.state.opts['renderer_whitelist'],
+                                             saltenv,
+                                             sls,
+                                             rendered_sls=mods
+                                             )
             except SaltRenderError as exc:
                 msg = 'Rendering SLS \'{0}:{1}\' failed: {2}'.format(
                     saltenv, sls, exc
@@ -3779,12 +3905,13 @@ class BaseHighState(object):
                             r_env = resolved_envs[0] if len(resolved_envs) == 1 else saltenv
                             mod_tgt = '{0}:{1}'.format(r_env, sls_target)
                             if mod_tgt not in mods:
-                                nstate, err = self.render_state(
-                                    sls_target,
-                                    r_env,
-                                    mods,
-                                    matches
-                                )
+                                with salt.utils.profile.timer(mod_tgt):
+                                    nstate, err = self.render_state(
+                                        sls_target,
+                                        r_env,
+                                        mods,
+                                        matches
+                                    )
                                 if nstate:
                                     self.merge_included_states(state, nstate, errors)
                                     state.update(nstate)
@@ -3984,8 +4111,9 @@ class BaseHighState(object):
                     r_env = '{0}:{1}'.format(saltenv, sls)
                     if r_env in mods:
                         continue
-                    state, errors = self.render_state(
-                        sls, saltenv, mods, matches)
+                    with salt.utils.profile.timer('render', r_env):
+                        state, errors = self.render_state(
+                            sls, saltenv, mods, matches)
                     if state:
                         self.merge_included_states(highstate, state, errors)
                     for i, error in enumerate(errors[:]):
@@ -4165,13 +4293,18 @@ class BaseHighState(object):
 
         return high
 
-    def compile_low_chunks(self):
+    def compile_low_chunks(self, matches=None):
         '''
         Compile the highstate but don't run it, return the low chunks to
         see exactly what the highstate will execute
+
+        matches
+            The top matches of the minion, rendered from the top file if not
+            given
         '''
-        top = self.get_top()
-        matches = self.top_matches(top)
+        if matches is None:
+            top = self.get_top()
+            matches = self.top_matches(top)
         high, errors = self.render_highstate(matches)
 
         # If there is extension data reconcile it
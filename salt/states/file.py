@@ -488,7 +488,10 @@ def _gen_recurse_managed_files(
     if not srcpath.endswith(posixpath.sep):
         # we're searching for things that start with this *directory*.
         srcpath = srcpath + posixpath.sep
-    fns_ = __salt__['cp.list_master'](senv, srcpath)
+    # The manifest lets the files be checked against the master without a
+    # request for each of them
+    fns_ = sorted(__salt__['cp.list_master_manifest'](senv, srcpath)) \
+        or __salt__['cp.list_master'](senv, srcpath)
 
     # If we are instructed to keep symlinks, then process them.
     if keep_symlinks:
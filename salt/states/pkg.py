@@ -91,6 +91,8 @@ from salt.exceptions import (
     CommandExecutionError, MinionError, SaltInvocationError
 )
 from salt.modules.pkg_resource import _repack_pkgs
+from salt.state import STATE_REQUISITE_KEYWORDS as _STATE_REQUISITE_KEYWORDS
+from salt.state import STATE_REQUISITE_IN_KEYWORDS as _STATE_REQUISITE_IN_KEYWORDS
 
 # Import 3rd-party libs
 from salt.ext import six
@@ -98,6 +100,17 @@ from salt.ext import six
 # pylint: disable=invalid-name
 _repack_pkgs = _namespaced_function(_repack_pkgs, globals())
 
+# Chunks with one of these are ordered by requisites or conditions of their
+# own, and are never merged into another pkg state
+_AGGREGATE_SKIP_KEYWORDS = _STATE_REQUISITE_KEYWORDS.union(
+    _STATE_REQUISITE_IN_KEYWORDS).union(
+    ['onlyif', 'unless', 'check_cmd', '__prereq__'])
+
+# Arguments which may differ between the merged pkg states
+_AGGREGATE_MERGED_KEYWORDS = _STATE_REQUISITE_KEYWORDS.union(
+    _STATE_REQUISITE_IN_KEYWORDS).union(
+    ['name', 'names', 'pkgs', 'sources', 'version', 'order'])
+
 if salt.utils.platform.is_windows():
     # pylint: disable=import-error,no-name-in-module,unused-import
     from salt.ext.six.moves.urllib.parse import urlparse as _urlparse
@@ -3266,13 +3279,73 @@ def mod_init(low):
     return False
 
 
+def _aggregate_args(chunk):
+    '''
+    Return the arguments of a low chunk which must be the same for it to be
+    merged into another pkg state
+    '''
+    return dict(
+        (key, val) for key, val in six.iteritems(chunk)
+        if key not in _AGGREGATE_MERGED_KEYWORDS and not key.startswith('__')
+    )
+
+
+def _aggregate_order(chunk):
+    '''
+    Return the order of a low chunk, leaving out its position in a names list
+    '''
+    order = chunk.get('order')
+    if isinstance(order, float):
+        return int(order)
+    return order
+
+
+def _aggregate_refs(chunks):
+    '''
+    Return the names, IDs and SLS files referenced by the requisites of the
+    low chunks
+    '''
+    refs = set()
+    for chunk in chunks:
+        for key in _STATE_REQUISITE_KEYWORDS.union(_STATE_REQUISITE_IN_KEYWORDS):
+            reqs = chunk.get(key)
+            if not reqs:
+                continue
+            if not isinstance(reqs, list):
+                reqs = [reqs]
+            for req in reqs:
+                if isinstance(req, dict):
+                    refs.update(val for val in six.itervalues(req)
+                                if isinstance(val, six.string_types))
+                elif isinstance(req, six.string_types):
+                    refs.add(req)
+    return refs
+
+
+def _aggregate_referenced(chunk, refs):
+    '''
+    Return whether the requisites of a state may reference a low chunk
+    '''
+    for key in ('name', '__id__', '__sls__'):
+        val = chunk.get(key)
+        if not isinstance(val, six.string_types):
+            continue
+        if val in refs or any(fnmatch.fnmatch(val, ref) for ref in refs if '*' in ref):
+            return True
+    return False
+
+
 def mod_aggregate(low, chunks, running):
     '''
     The mod_aggregate function which looks up all packages in the available
     low chunks and merges them into a single pkgs ref in the present low data
+
+    Only the pkg states which directly follow the present low data in the run,
+    with the same order, function and arguments, and which have no requisites
+    or conditions of their own are merged. Neither the present state nor the
+    merged ones may be referenced by the requisites of another state, as the
+    changes of the merged states are reported by the present state.
     '''
-    pkgs = []
-    pkg_type = None
     agg_enabled = [
         'installed',
         'latest',
@@ -3281,48 +3354,51 @@ def mod_aggregate(low, chunks, running):
     ]
     if low.get('fun') not in agg_enabled:
         return low
-    for chunk in chunks:
-        tag = __utils__['state.gen_tag'](chunk)
+    # Don't aggregate pkgs and sources together
+    pkg_type = 'sources' if 'sources' in low else 'pkgs'
+    low_tag = __utils__['state.gen_tag'](low)
+    low_args = _aggregate_args(low)
+    low_order = _aggregate_order(low)
+    refs = _aggregate_refs(chunks)
+    if _aggregate_referenced(low, refs):
+        return low
+    tags = [__utils__['state.gen_tag'](chunk) for chunk in chunks]
+    if low_tag not in tags:
+        return low
+    start = tags.index(low_tag) + 1
+    merged = []
+    for chunk, tag in zip(chunks[start:], tags[start:]):
         if tag in running:
             # Already ran the pkg state, skip aggregation
             continue
-        if chunk.get('state') == 'pkg':
-            if '__agg__' in chunk:
-                continue
-            # Check for the same function
-            if chunk.get('fun') != low.get('fun'):
-                continue
-            # Check for the same repo
-            if chunk.get('fromrepo') != low.get('fromrepo'):
-                continue
-            # Check first if 'sources' was passed so we don't aggregate pkgs
-            # and sources together.
-            if 'sources' in chunk:
-                if pkg_type is None:
-                    pkg_type = 'sources'
-                if pkg_type == 'sources':
-                    pkgs.extend(chunk['sources'])
-                    chunk['__agg__'] = True
+        # Stop at the first state which has to run on its own
+        if chunk.get('state') != 'pkg' or '__agg__' in chunk:
+            break
+        if ('sources' in chunk) != (pkg_type == 'sources'):
+            break
+        if any(chunk.get(key) for key in _AGGREGATE_SKIP_KEYWORDS):
+            break
+        if _aggregate_order(chunk) != low_order or _aggregate_args(chunk) != low_args:
+            break
+        if _aggregate_referenced(chunk, refs):
+            break
+        merged.append(chunk)
+    if not merged:
+        return low
+
+    pkgs = []
+    for chunk in [low] + merged:
+        if pkg_type in chunk:
+            pkgs.extend(chunk[pkg_type])
+        elif 'name' in chunk:
+            # Pull out the pkg names!
+            version = chunk.pop('version', None)
+            if version is not None:
+                pkgs.append({chunk['name']: version})
             else:
-                if pkg_type is None:
-                    pkg_type = 'pkgs'
-                if pkg_type == 'pkgs':
-                    # Pull out the pkg names!
-                    if 'pkgs' in chunk:
-                        pkgs.extend(chunk['pkgs'])
-                        chunk['__agg__'] = True
-                    elif 'name' in chunk:
-                        version = chunk.pop('version', None)
-                        if version is not None:
-                            pkgs.append({chunk['name']: version})
-                        else:
-                            pkgs.append(chunk['name'])
-                        chunk['__agg__'] = True
-    if pkg_type is not None and pkgs:
-        if pkg_type in low:
-            low[pkg_type].extend(pkgs)
-        else:
-            low[pkg_type] = pkgs
+                pkgs.append(chunk['name'])
+        chunk['__agg__'] = True
+    low[pkg_type] = pkgs
     return low
 
 
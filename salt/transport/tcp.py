@@ -26,6 +26,7 @@ import salt.utils.files
 import salt.utils.msgpack
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.profile
 import salt.utils.verify
 import salt.payload
 import salt.exceptions
@@ -401,6 +402,7 @@ class AsyncTCPReqChannel(salt.transport.client.ReqChannel):
         '''
         Send a request, return a future which will complete when we send the message
         '''
+        salt.utils.profile.count('req_round_trips')
         try:
             if self.crypt == 'clear':
                 ret = yield self._uncrypted_transfer(load, tries=tries, timeout=timeout)
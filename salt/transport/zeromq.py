@@ -25,6 +25,7 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.minions
 import salt.utils.process
+import salt.utils.profile
 import salt.utils.stringutils
 import salt.utils.verify
 import salt.utils.zeromq
@@ -377,6 +378,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         '''
         Send a request, return a future which will complete when we send the message
         '''
+        salt.utils.profile.count('req_round_trips')
         if self.crypt == 'clear':
             ret = yield self._uncrypted_transfer(load, tries=tries, timeout=timeout)
         else:
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+'''
+Utilities shared by the beacons
+
+.. versionadded:: Neon
+'''
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import contextlib
+
+# The sample shared by the beacons evaluated by salt.beacons.Beacon.process
+_SAMPLE = None
+
+
+class Sample(object):
+    '''
+    The data sampled from the system during one evaluation of the beacons
+
+    Beacons reading the same source, like the process table or the memory
+    statistics, get it from the sample so that it is only read once.
+    '''
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, func, *args, **kwargs):
+        '''
+        Return the data sampled under key, calling func with the given
+        arguments to sample it the first time
+        '''
+        try:
+            return self.data[key]
+        except KeyError:
+            ret = self.data[key] = func(*args, **kwargs)
+            return ret
+
+
+@contextlib.contextmanager
+def shared_sample():
+    '''
+    Share a sample between the beacons evaluated within the block
+    '''
+    global _SAMPLE  # pylint: disable=global-statement
+    previous = _SAMPLE
+    _SAMPLE = Sample()
+    try:
+        yield _SAMPLE
+    finally:
+        _SAMPLE = previous
+
+
+def sample():
+    '''
+    Return the sample shared by the beacons being evaluated, or a sample of
+    its own to a beacon called on its own
+    '''
+    if _SAMPLE is None:
+        return Sample()
+    return _SAMPLE
@@ -7,6 +7,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 import os
 import re
 import time
+import fnmatch
 import logging
 try:
     import salt.utils.msgpack as msgpack
@@ -309,11 +310,25 @@ class CacheRegex(object):
             pass
         if len(self.cache) > self.size:
             self.sweep()
-        regex = re.compile('{0}{1}{2}'.format(
-            self.prepend, pattern, self.append))
+        regex = self._compile(pattern)
         self.cache[pattern] = [1, regex, pattern, time.time()]
         return regex
 
+    def _compile(self, pattern):
+        return re.compile('{0}{1}{2}'.format(
+            self.prepend, pattern, self.append))
+
+
+class CacheFnmatch(CacheRegex):
+    '''
+    Create a cache of the regular expression objects that shell-style
+    wildcard patterns translate to, so that matching against the same
+    pattern does not need to translate and compile it over and over again
+    '''
+    def _compile(self, pattern):
+        return re.compile('{0}{1}{2}'.format(
+            self.prepend, fnmatch.translate(pattern), self.append))
+
 
 class ContextCache(object):
     def __init__(self, opts, name):
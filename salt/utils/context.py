@@ -117,6 +117,12 @@ class ContextDict(MutableMapping):
         else:
             return self.global_data[key]
 
+    def __contains__(self, key):
+        if self.active:
+            return key in self._state.data
+        else:
+            return key in self.global_data
+
     def __len__(self):
         if self.active:
             return len(self._state.data)
@@ -157,13 +163,14 @@ class ChildContextDict(MutableMapping):
 
         # merge self.global_data into self._data
         if threadsafe:
-            for k, v in six.iteritems(self.parent.global_data):
-                if k not in self._data:
-                    # A deepcopy is necessary to avoid using the same
-                    # objects in globals as we do in thread local storage.
-                    # Otherwise, changing one would automatically affect
-                    # the other.
-                    self._data[k] = copy.deepcopy(v)
+            # A deepcopy is necessary to avoid using the same objects in
+            # globals as we do in thread local storage. Otherwise, changing
+            # one would automatically affect the other. The values are only
+            # copied when they are first accessed, so that a thread does not
+            # pay for copying the whole grains and pillar if it never uses
+            # them. The global values must therefore be replaced rather than
+            # modified in place while the children are alive.
+            self._data = CopyOnAccessDict(self.parent.global_data, self._data)
         else:
             for k, v in six.iteritems(self.parent.global_data):
                 if k not in self._data:
@@ -194,6 +201,59 @@ class ChildContextDict(MutableMapping):
         self.parent._state.data = self._old_data
 
 
+class CopyOnAccessDict(MutableMapping):
+    '''
+    A dict holding the values of data, and deep copies of the values of
+    source which are not in data. A value of source is only copied when it
+    is first accessed.
+
+    The keys of source are bound when the dict is created, so keys set or
+    replaced in source afterwards are not seen. The values themselves are
+    only copied later, so they must not be modified in place while the dict
+    is alive, or the copy may include the changes. A new value has to be
+    set in source instead, as the minion does for the grains and pillar when
+    they are refreshed.
+    '''
+    def __init__(self, source, data=None):
+        self._source = dict(source)
+        self._data = {} if data is None else data
+        for key in self._data:
+            self._source.pop(key, None)
+
+    def __setitem__(self, key, val):
+        self._source.pop(key, None)
+        self._data[key] = val
+
+    def __delitem__(self, key):
+        if key in self._source:
+            del self._source[key]
+        else:
+            del self._data[key]
+
+    def __getitem__(self, key):
+        if key in self._source:
+            self._data[key] = copy.deepcopy(self._source.pop(key))
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data or key in self._source
+
+    def __len__(self):
+        return len(self._data) + len(self._source)
+
+    def __iter__(self):
+        for key in list(self._data):
+            yield key
+        for key in list(self._source):
+            yield key
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+
 class NamespacedDictWrapper(MutableMapping, dict):
     '''
     Create a dict which wraps another dict with a specific prefix of key(s)
@@ -54,12 +54,15 @@ from __future__ import absolute_import, unicode_literals, print_function
 
 # Import python libs
 import os
+import re
 import time
 import fnmatch
 import hashlib
 import logging
 import datetime
 import sys
+import threading
+import collections
 
 try:
     from collections.abc import MutableMapping
@@ -71,8 +74,10 @@ from salt.ext.six.moves import range
 
 # Import third party libs
 from salt.ext import six
+import tornado.gen
 import tornado.ioloop
 import tornado.iostream
+import tornado.locks
 
 # Import salt libs
 import salt.config
@@ -118,7 +123,8 @@ TAGS = {
 
 def get_event(
         node, sock_dir=None, transport='zeromq',
-        opts=None, listen=True, io_loop=None, keep_loop=False, raise_errors=False):
+        opts=None, listen=True, io_loop=None, keep_loop=False, raise_errors=False,
+        tags=None):
     '''
     Return an event object suitable for the named transport
 
@@ -126,6 +132,9 @@ def get_event(
                            operation for obtaining events. Eg use of
                            set_event_handler() API. Otherwise, operation
                            will be synchronous.
+    :param list tags: The tag prefixes the master event object will listen
+                      to. When the master event bus is sharded, only the
+                      shards publishing these tags are connected to.
     '''
     sock_dir = sock_dir or opts['sock_dir']
     # TODO: AIO core is separate from transport
@@ -135,7 +144,8 @@ def get_event(
                            listen=listen,
                            io_loop=io_loop,
                            keep_loop=keep_loop,
-                           raise_errors=raise_errors)
+                           raise_errors=raise_errors,
+                           tags=tags)
     return SaltEvent(node,
                      sock_dir,
                      opts,
@@ -145,13 +155,39 @@ def get_event(
                      raise_errors=raise_errors)
 
 
-def get_master_event(opts, sock_dir, listen=True, io_loop=None, raise_errors=False, keep_loop=False):
+def get_master_event(opts, sock_dir, listen=True, io_loop=None, raise_errors=False, keep_loop=False, tags=None):
     '''
     Return an event object suitable for the named transport
     '''
     # TODO: AIO core is separate from transport
     if opts['transport'] in ('zeromq', 'tcp', 'detect'):
-        return MasterEvent(sock_dir, opts, listen=listen, io_loop=io_loop, raise_errors=raise_errors, keep_loop=keep_loop)
+        return MasterEvent(sock_dir, opts, listen=listen, io_loop=io_loop, raise_errors=raise_errors, keep_loop=keep_loop, tags=tags)
+
+
+def get_master_shards(opts):
+    '''
+    Return the list of tag prefixes the master event bus is sharded on. Each
+    prefix is served by its own EventPublisher process, events matching none
+    of the prefixes are served by the default EventPublisher.
+    '''
+    shards = opts.get('event_publisher_shards') or []
+    if shards and opts.get('ipc_mode') == 'tcp':
+        log.warning('event_publisher_shards is not supported with '
+                    'ipc_mode tcp, the master event bus is not sharded')
+        return []
+    return list(shards)
+
+
+def get_master_shard_uris(sock_dir, shard=None):
+    '''
+    Return the pub and pull socket paths of a master event bus shard. The
+    default shard, ``None``, uses the unsharded socket paths.
+    '''
+    if shard is None:
+        return (os.path.join(sock_dir, 'master_event_pub.ipc'),
+                os.path.join(sock_dir, 'master_event_pull.ipc'))
+    return (os.path.join(sock_dir, 'master_event_{0}_pub.ipc'.format(shard)),
+            os.path.join(sock_dir, 'master_event_{0}_pull.ipc'.format(shard)))
 
 
 def fire_args(opts, jid, tag_data, prefix=''):
@@ -227,6 +263,191 @@ def update_stats(stats, start_time, data):
     return stats
 
 
+class TagTrie(object):
+    '''
+    A character trie of tag prefixes.
+
+    Finding which of the stored prefixes an event tag starts with costs one
+    step per character of the tag, regardless of how many prefixes are
+    stored. Prefixes are reference counted so the same prefix may be added
+    more than once.
+    '''
+    def __init__(self):
+        self.root = {}
+
+    def add(self, prefix):
+        '''
+        Add a prefix to the trie
+        '''
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = node.get(None, 0) + 1
+
+    def remove(self, prefix):
+        '''
+        Remove one reference to a prefix from the trie
+        '''
+        path = []
+        node = self.root
+        for char in prefix:
+            if char not in node:
+                return
+            path.append((node, char))
+            node = node[char]
+        if None not in node:
+            return
+        node[None] -= 1
+        if node[None] > 0:
+            return
+        del node[None]
+        # Prune the branch that no longer leads to any prefix
+        while path and not node:
+            parent, char = path.pop()
+            del parent[char]
+            node = parent
+
+    def prefixes(self, tag):
+        '''
+        Yield every stored prefix that the tag starts with, shortest first
+        '''
+        node = self.root
+        if None in node:
+            yield ''
+        for idx, char in enumerate(tag):
+            node = node.get(char)
+            if node is None:
+                return
+            if None in node:
+                yield tag[:idx + 1]
+
+    def match(self, tag):
+        '''
+        Return True if the tag starts with any of the stored prefixes
+        '''
+        for _ in self.prefixes(tag):
+            return True
+        return False
+
+    def __bool__(self):
+        return bool(self.root)
+
+    __nonzero__ = __bool__
+
+
+class EventShardSubscriber(object):
+    '''
+    Receive events from a number of master event bus shards.
+
+    This provides the parts of the IPCMessageSubscriber interface used by
+    SaltEvent. Every shard is read asynchronously on the io_loop, events are
+    either handed to the registered callbacks or queued up for read_sync().
+    '''
+    def __init__(self, io_loop):
+        self.io_loop = io_loop
+        self.shards = {}
+        self.callbacks = set()
+        self._saved_data = collections.deque()
+        self._data_ready = tornado.locks.Event()
+        self._error = None
+        self._reading = False
+        self._closing = False
+
+    def add_shard(self, shard, socket_path):
+        '''
+        Add a shard to receive events from
+        '''
+        if shard in self.shards:
+            return
+        subscriber = salt.transport.ipc.IPCMessageSubscriber(
+            socket_path,
+            io_loop=self.io_loop
+        )
+        self.shards[shard] = subscriber
+        if self._reading:
+            self.io_loop.spawn_callback(self._read_shard, subscriber)
+
+    def connected(self):
+        return all(sub.connected() for sub in six.itervalues(self.shards))
+
+    @tornado.gen.coroutine
+    def connect(self, timeout=None):
+        '''
+        Connect to all shards which are not connected yet
+        '''
+        yield [sub.connect(timeout=timeout)
+               for sub in six.itervalues(self.shards) if not sub.connected()]
+
+    def _handle_raw(self, raw):
+        if self.callbacks:
+            for callback in self.callbacks:
+                self.io_loop.spawn_callback(callback, raw)
+        else:
+            self._saved_data.append(raw)
+            self._data_ready.set()
+
+    @tornado.gen.coroutine
+    def _read_shard(self, subscriber):
+        subscriber.callbacks.add(self._handle_raw)
+        try:
+            yield subscriber.read_async()
+        except tornado.iostream.StreamClosedError as exc:
+            if not self._closing:
+                self._error = exc
+                self._data_ready.set()
+        except Exception as exc:
+            log.error('Exception occurred while reading event shard %s: %s',
+                      subscriber.socket_path, exc)
+
+    def _start_reading(self):
+        if self._reading:
+            return
+        self._reading = True
+        for subscriber in six.itervalues(self.shards):
+            self.io_loop.spawn_callback(self._read_shard, subscriber)
+
+    @tornado.gen.coroutine
+    def _wait(self, timeout):
+        self._data_ready.clear()
+        try:
+            if timeout is None:
+                yield self._data_ready.wait()
+            else:
+                yield self._data_ready.wait(
+                    timeout=datetime.timedelta(seconds=timeout))
+        except tornado.gen.TimeoutError:
+            pass
+
+    def read_sync(self, timeout=None):
+        '''
+        Read an event from any of the shards. The associated IO Loop must NOT
+        be running.
+        '''
+        self._start_reading()
+        if not self._saved_data and self._error is None:
+            self.io_loop.run_sync(lambda: self._wait(timeout))
+        if self._saved_data:
+            return self._saved_data.popleft()
+        if self._error is not None:
+            exc, self._error = self._error, None
+            raise exc  # pylint: disable=E0702
+        return None
+
+    @tornado.gen.coroutine
+    def read_async(self):
+        '''
+        Start handing the events of all shards to the callbacks
+        '''
+        self._start_reading()
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        for subscriber in six.itervalues(self.shards):
+            subscriber.close()
+
+
 class SaltEvent(object):
     '''
     Warning! Use the get_event function or the code will not be
@@ -236,7 +457,7 @@ class SaltEvent(object):
     def __init__(
             self, node, sock_dir=None,
             opts=None, listen=True, io_loop=None,
-            keep_loop=False, raise_errors=False):
+            keep_loop=False, raise_errors=False, tags=None):
         '''
         :param IOLoop io_loop: Pass in an io_loop if you want asynchronous
                                operation for obtaining events. Eg use of
@@ -246,6 +467,11 @@ class SaltEvent(object):
                                the io loop or destroy it when the event handle
                                is destroyed. This is useful when using event
                                loops from within third party asynchronous code
+        :param list tags: The tag prefixes to listen to. When the master event
+                          bus is sharded, only the shards publishing these tags
+                          are connected to, and events of other shards are not
+                          received unless subscribed to with subscribe().
+                          Defaults to all shards.
         '''
         self.serial = salt.payload.Serial({'serial': 'msgpack'})
         self.keep_loop = keep_loop
@@ -277,8 +503,27 @@ class SaltEvent(object):
         if salt.utils.platform.is_windows() and 'ipc_mode' not in opts:
             self.opts['ipc_mode'] = 'tcp'
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
+        self.listen_tags = tags
+        self.shards = get_master_shards(self.opts) if node == 'master' else []
+        self._shard_prefixes = TagTrie()
+        for prefix in self.shards:
+            self._shard_prefixes.add(prefix)
+        self.shard_pushers = {}
         self.pending_tags = []
-        self.pending_events = []
+        # Subscriptions are indexed so that an event is only checked
+        # against the subscriptions which can match it: startswith
+        # subscriptions live in a trie, the other match types are
+        # checked one by one.
+        self._sub_counts = {}
+        self._sub_prefixes = TagTrie()
+        self._sub_others = []
+        # Cached events, in arrival order, keyed by a sequence number, and
+        # the sequence numbers of the cached events matching each
+        # subscription
+        self.pending_events = collections.OrderedDict()
+        self._pending_index = {}
+        self._pending_seq = 0
+        self._pending_stale = 0
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -298,6 +543,7 @@ class SaltEvent(object):
         # The prepend='^' is to reduce differences in behavior between
         # the default 'startswith' and the optional 'regex' match_type
         cls.cache_regex = salt.utils.cache.CacheRegex(prepend='^')
+        cls.cache_fnmatch = salt.utils.cache.CacheFnmatch()
 
     def __load_uri(self, sock_dir, node):
         '''
@@ -352,6 +598,22 @@ class SaltEvent(object):
             return
         match_func = self._get_match_func(match_type)
         self.pending_tags.append([tag, match_func])
+        self._connect_shards_for(tag, match_func)
+
+        key = (tag, match_func)
+        if key in self._sub_counts:
+            self._sub_counts[key] += 1
+            return
+        self._sub_counts[key] = 1
+        if match_func == self._match_tag_startswith:
+            self._sub_prefixes.add(tag)
+        else:
+            self._sub_others.append(key)
+        # Index the events that are already cached under the new subscription
+        self._pending_index[key] = collections.deque(
+            seq for seq, evt in six.iteritems(self.pending_events)
+            if match_func(evt['tag'], tag)
+        )
 
     def unsubscribe(self, tag, match_type=None):
         '''
@@ -363,11 +625,62 @@ class SaltEvent(object):
 
         self.pending_tags.remove([tag, match_func])
 
-        old_events = self.pending_events
-        self.pending_events = []
-        for evt in old_events:
-            if any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
-                self.pending_events.append(evt)
+        key = (tag, match_func)
+        self._sub_counts[key] -= 1
+        if self._sub_counts[key] > 0:
+            return
+        del self._sub_counts[key]
+        if match_func == self._match_tag_startswith:
+            self._sub_prefixes.remove(tag)
+        else:
+            self._sub_others.remove(key)
+        # Drop the cached events no other subscription is interested in
+        for seq in self._pending_index.pop(key, ()):
+            evt = self.pending_events.get(seq)
+            if evt is not None and not self._is_subscribed(evt['tag']):
+                del self.pending_events[seq]
+
+    def _is_subscribed(self, tag):
+        '''
+        Return True if any subscription matches the event tag
+        '''
+        if self._sub_prefixes.match(tag):
+            return True
+        return any(pmatch_func(tag, ptag) for ptag, pmatch_func in self._sub_others)
+
+    def _cache_event(self, evt):
+        '''
+        Cache an event under every subscription which matches it. Events
+        which match no subscription are discarded.
+        '''
+        tag = evt['tag']
+        keys = [(ptag, self._match_tag_startswith)
+                for ptag in self._sub_prefixes.prefixes(tag)]
+        keys.extend(key for key in self._sub_others if key[1](tag, key[0]))
+        if not keys:
+            return False
+        self._pending_seq += 1
+        self.pending_events[self._pending_seq] = evt
+        for key in keys:
+            self._pending_index[key].append(self._pending_seq)
+        return True
+
+    def _compact_pending_index(self):
+        '''
+        Remove the sequence numbers of events which were already handed out
+        from the subscription indexes
+        '''
+        for key, index in six.iteritems(self._pending_index):
+            self._pending_index[key] = collections.deque(
+                seq for seq in index if seq in self.pending_events
+            )
+        self._pending_stale = 0
+
+    def _clear_pending(self):
+        self.pending_events.clear()
+        for index in six.itervalues(self._pending_index):
+            index.clear()
+        self._pending_stale = 0
 
     def connect_pub(self, timeout=None):
         '''
@@ -376,6 +689,9 @@ class SaltEvent(object):
         if self.cpub:
             return True
 
+        if self.shards:
+            return self._connect_pub_shards(timeout)
+
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 if self.subscriber is None:
@@ -401,6 +717,89 @@ class SaltEvent(object):
             self.cpub = True
         return self.cpub
 
+    def _shard_for_tag(self, tag):
+        '''
+        Return the shard an event tag is published on, the shard of the
+        longest matching prefix or ``None`` for the default shard
+        '''
+        shard = None
+        for prefix in self._shard_prefixes.prefixes(tag):
+            shard = self.shards.index(prefix)
+        return shard
+
+    def _shards_for(self, tag, match_func=None):
+        '''
+        Return the shards which publish events that can match a tag
+        '''
+        if match_func is not None and match_func != self._match_tag_startswith:
+            return set(range(len(self.shards))) | set([None])
+        ret = set()
+        covered = False
+        for shard, prefix in enumerate(self.shards):
+            if tag.startswith(prefix):
+                # Every matching tag is published on this shard or on the
+                # shard of a longer prefix
+                ret.add(shard)
+                covered = True
+            elif prefix.startswith(tag):
+                ret.add(shard)
+        if not covered:
+            ret.add(None)
+        return ret
+
+    def _add_shards(self, shards):
+        '''
+        Add shards to the subscriber, return True if any were missing
+        '''
+        missing = False
+        for shard in shards:
+            if shard not in self.subscriber.shards:
+                missing = True
+                self.subscriber.add_shard(
+                    shard, get_master_shard_uris(self.opts['sock_dir'], shard)[0])
+        return missing
+
+    def _connect_pub_shards(self, timeout=None):
+        '''
+        Establish the publish connections to the shards of the master event
+        bus this event object listens to
+        '''
+        if self.subscriber is None:
+            self.subscriber = EventShardSubscriber(self.io_loop)
+        if self.listen_tags is None:
+            shards = set(range(len(self.shards))) | set([None])
+        else:
+            shards = set()
+            for tag in self.listen_tags:
+                shards |= self._shards_for(tag)
+        self._add_shards(shards)
+        if self._run_io_loop_sync:
+            with salt.utils.asynchronous.current_ioloop(self.io_loop):
+                try:
+                    self.io_loop.run_sync(
+                        lambda: self.subscriber.connect(timeout=timeout))
+                    self.cpub = True
+                except Exception:
+                    pass
+        else:
+            # For the asynchronous case, the shards are connected to when
+            # they are read from
+            self.cpub = True
+        return self.cpub
+
+    def _connect_shards_for(self, tag, match_func=None):
+        '''
+        Make sure the shards publishing events matching a tag are connected
+        '''
+        if not self.shards or not self.cpub:
+            return
+        if self._add_shards(self._shards_for(tag, match_func)) and self._run_io_loop_sync:
+            with salt.utils.asynchronous.current_ioloop(self.io_loop):
+                try:
+                    self.io_loop.run_sync(self.subscriber.connect)
+                except Exception as exc:
+                    log.error('Failed to connect to master event shard: %s', exc)
+
     def close_pub(self):
         '''
         Close the publish connection (if established)
@@ -410,7 +809,7 @@ class SaltEvent(object):
 
         self.subscriber.close()
         self.subscriber = None
-        self.pending_events = []
+        self._clear_pending()
         self.cpub = False
 
     def connect_pull(self, timeout=1):
@@ -445,6 +844,31 @@ class SaltEvent(object):
             self.cpush = True
         return self.cpush
 
+    def connect_shard_pull(self, shard, timeout=1):
+        '''
+        Establish a connection with the pull socket of a master event bus
+        shard and return the client, or None if the connection failed
+        '''
+        pusher = self.shard_pushers.get(shard)
+        if pusher is not None:
+            return pusher
+        pusher = salt.transport.ipc.IPCMessageClient(
+            get_master_shard_uris(self.opts['sock_dir'], shard)[1],
+            io_loop=self.io_loop
+        )
+        if self._run_io_loop_sync:
+            with salt.utils.asynchronous.current_ioloop(self.io_loop):
+                try:
+                    self.io_loop.run_sync(
+                        lambda: pusher.connect(timeout=timeout))
+                except Exception:
+                    pusher.close()
+                    return None
+        # For the asynchronous case, the connect will be deferred to when
+        # fire_event() is invoked.
+        self.shard_pushers[shard] = pusher
+        return pusher
+
     @classmethod
     def unpack(cls, raw, serial=None):
         if serial is None:
@@ -465,30 +889,42 @@ class SaltEvent(object):
         return getattr(self, '_match_tag_{0}'.format(match_type), None)
 
     def _check_pending(self, tag, match_func=None):
-        """Check the pending_events list for events that match the tag
+        """Check the pending_events cache for an event that matches the tag
+
+        Events cached for a subscription equal to the searched tag are
+        looked up through the subscription index, otherwise the cached
+        events are checked in the order they arrived.
 
         :param tag: The tag to search for
         :type tag: str
-        :param tags_regex: List of re expressions to search for also
-        :type tags_regex: list[re.compile()]
+        :param match_func: The function used to match the tag
         :return:
         """
         if match_func is None:
             match_func = self._get_match_func()
-        old_events = self.pending_events
-        self.pending_events = []
+        if not self.pending_events:
+            return None
         ret = None
-        for evt in old_events:
-            if match_func(evt['tag'], tag):
-                if ret is None:
+        index = self._pending_index.get((tag, match_func))
+        if index is not None:
+            while index:
+                ret = self.pending_events.pop(index.popleft(), None)
+                if ret is not None:
+                    break
+        else:
+            for seq, evt in six.iteritems(self.pending_events):
+                if match_func(evt['tag'], tag):
                     ret = evt
-                    log.trace('get_event() returning cached event = %s', ret)
-                else:
-                    self.pending_events.append(evt)
-            elif any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
-                self.pending_events.append(evt)
-            else:
-                log.trace('get_event() discarding cached event that no longer has any subscriptions = %s', evt)
+                    break
+            if ret is not None:
+                del self.pending_events[seq]
+        if ret is not None:
+            log.trace('get_event() returning cached event = %s', ret)
+            # Other subscriptions may still reference the returned event,
+            # compact their indexes once enough of those have piled up
+            self._pending_stale += 1
+            if self._pending_stale > len(self.pending_events) + 64:
+                self._compact_pending_index()
         return ret
 
     @staticmethod
@@ -532,7 +968,8 @@ class SaltEvent(object):
         Uses fnmatch to check.
         Return True (matches) or False (no match)
         '''
-        return fnmatch.fnmatch(event_tag, search_tag)
+        return self.cache_fnmatch.get(os.path.normcase(search_tag)).match(
+            os.path.normcase(event_tag)) is not None
 
     def _get_event(self, wait, tag, match_func=None, no_block=False):
         if match_func is None:
@@ -575,9 +1012,8 @@ class SaltEvent(object):
 
             if not match_func(ret['tag'], tag):
                 # tag not match
-                if any(pmatch_func(ret['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
+                if self._cache_event(ret):
                     log.trace('get_event() caching unwanted event = %s', ret)
-                    self.pending_events.append(ret)
                 if wait:  # only update the wait timeout if we had one
                     wait = timeout_at - time.time()
                 continue
@@ -723,12 +1159,19 @@ class SaltEvent(object):
                 'Dict object expected, not \'{0}\'.'.format(data)
             )
 
-        if not self.cpush:
-            if timeout is not None:
-                timeout_s = float(timeout) / 1000
-            else:
-                timeout_s = None
-            if not self.connect_pull(timeout=timeout_s):
+        if timeout is not None:
+            timeout_s = float(timeout) / 1000
+        else:
+            timeout_s = None
+        shard = self._shard_for_tag(tag) if self.shards else None
+        if shard is None:
+            if not self.cpush:
+                if not self.connect_pull(timeout=timeout_s):
+                    return False
+            pusher = self.pusher
+        else:
+            pusher = self.connect_shard_pull(shard, timeout=timeout_s)
+            if pusher is None:
                 return False
 
         data['_stamp'] = datetime.datetime.utcnow().isoformat()
@@ -758,12 +1201,12 @@ class SaltEvent(object):
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 try:
-                    self.io_loop.run_sync(lambda: self.pusher.send(msg))
+                    self.io_loop.run_sync(lambda: pusher.send(msg))
                 except Exception as ex:
                     log.debug(ex)
                     raise
         else:
-            self.io_loop.spawn_callback(self.pusher.send, msg)
+            self.io_loop.spawn_callback(pusher.send, msg)
         return True
 
     def fire_master(self, data, tag, timeout=1000):
@@ -786,6 +1229,8 @@ class SaltEvent(object):
             self.subscriber.close()
         if self.pusher is not None:
             self.pusher.close()
+        for pusher in six.itervalues(self.shard_pushers):
+            pusher.close()
         if self._run_io_loop_sync and not self.keep_loop:
             self.io_loop.close()
 
@@ -918,7 +1363,8 @@ class MasterEvent(SaltEvent):
             listen=True,
             io_loop=None,
             keep_loop=False,
-            raise_errors=False):
+            raise_errors=False,
+            tags=None):
         super(MasterEvent, self).__init__(
             'master',
             sock_dir,
@@ -926,7 +1372,8 @@ class MasterEvent(SaltEvent):
             listen=listen,
             io_loop=io_loop,
             keep_loop=keep_loop,
-            raise_errors=raise_errors)
+            raise_errors=raise_errors,
+            tags=tags)
 
 
 class LocalClientEvent(MasterEvent):
@@ -1086,12 +1533,20 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
     '''
     The interface that takes master events and republishes them out to anyone
     who wants to listen
+
+    When the master event bus is sharded with ``event_publisher_shards``, one
+    EventPublisher is run per shard, ``shard`` being the index of its tag
+    prefix. The default EventPublisher handles the events matching none of
+    the prefixes.
     '''
-    def __init__(self, opts, **kwargs):
+    def __init__(self, opts, shard=None, **kwargs):
         super(EventPublisher, self).__init__(**kwargs)
         self.opts = salt.config.DEFAULT_MASTER_OPTS.copy()
         self.opts.update(opts)
+        self.shard = shard
         self._closing = False
+        self.stats = {'events': 0, 'bytes': 0}
+        self.stat_clock = time.time()
 
     # __setstate__ and __getstate__ are only used on Windows.
     # We do this so that __init__ will be invoked on Windows in the child
@@ -1100,6 +1555,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self._is_child = True
         self.__init__(
             state['opts'],
+            shard=state['shard'],
             log_queue=state['log_queue'],
             log_queue_level=state['log_queue_level']
         )
@@ -1107,29 +1563,30 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
     def __getstate__(self):
         return {
             'opts': self.opts,
+            'shard': self.shard,
             'log_queue': self.log_queue,
             'log_queue_level': self.log_queue_level
         }
 
+    @property
+    def shard_name(self):
+        if self.shard is None:
+            return self.__class__.__name__
+        return '{0}-{1}'.format(self.__class__.__name__, self.shard)
+
     def run(self):
         '''
         Bind the pub and pull sockets for events
         '''
-        salt.utils.process.appendproctitle(self.__class__.__name__)
+        salt.utils.process.appendproctitle(self.shard_name)
         self.io_loop = tornado.ioloop.IOLoop()
         with salt.utils.asynchronous.current_ioloop(self.io_loop):
             if self.opts['ipc_mode'] == 'tcp':
                 epub_uri = int(self.opts['tcp_master_pub_port'])
                 epull_uri = int(self.opts['tcp_master_pull_port'])
             else:
-                epub_uri = os.path.join(
-                    self.opts['sock_dir'],
-                    'master_event_pub.ipc'
-                )
-                epull_uri = os.path.join(
-                    self.opts['sock_dir'],
-                    'master_event_pull.ipc'
-                )
+                epub_uri, epull_uri = get_master_shard_uris(
+                    self.opts['sock_dir'], self.shard)
 
             self.publisher = salt.transport.ipc.IPCMessagePublisher(
                 self.opts,
@@ -1151,8 +1608,16 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
                 if (self.opts['ipc_mode'] != 'tcp' and (
                         self.opts['publisher_acl'] or
                         self.opts['external_auth'])):
-                    os.chmod(os.path.join(
-                        self.opts['sock_dir'], 'master_event_pub.ipc'), 0o666)
+                    os.chmod(epub_uri, 0o666)
+
+            if self.opts['master_stats']:
+                self.event = get_master_event(
+                    self.opts, self.opts['sock_dir'], listen=False,
+                    io_loop=self.io_loop)
+                tornado.ioloop.PeriodicCallback(
+                    self._post_stats,
+                    self.opts['master_stats_event_iter'] * 1000
+                ).start()
 
             # Make sure the IO loop and respective sockets are closed and
             # destroyed
@@ -1166,6 +1631,8 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         '''
         try:
             self.publisher.publish(package)
+            self.stats['events'] += 1
+            self.stats['bytes'] += len(package)
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:
@@ -1173,6 +1640,31 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
                          exc_info=True)
             return None
 
+    def _post_stats(self):
+        '''
+        Fire an event with the throughput of this publisher and reset the
+        counters
+        '''
+        end_time = time.time()
+        elapsed = end_time - self.stat_clock
+        stats = dict(self.stats)
+        stats['rate'] = stats['events'] / elapsed if elapsed > 0 else 0
+        stats['prefix'] = self.shard_prefix()
+        self.event.fire_event(
+            {'time': elapsed, 'worker': self.shard_name, 'stats': stats},
+            tagify(self.shard_name, 'stats'))
+        self.stats = {'events': 0, 'bytes': 0}
+        self.stat_clock = end_time
+
+    def shard_prefix(self):
+        '''
+        Return the tag prefix served by this publisher, None for the default
+        shard
+        '''
+        if self.shard is None:
+            return None
+        return get_master_shards(self.opts)[self.shard]
+
     def close(self):
         if self._closing:
             return
@@ -1192,6 +1684,238 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.close()
 
 
+class EventReturnQueue(object):
+    '''
+    A bounded queue of events destined for a single event returner.
+
+    Events are flushed to the returner from a dedicated thread once
+    ``event_return_queue`` events have been queued, or as many as the queue
+    holds if ``event_return_max_queue_size`` is smaller, or once the oldest
+    queued event is older than ``event_return_queue_max_seconds``. A slow
+    returner therefore does not hold up the other returners or the reading of
+    the event bus. Failed flushes are retried and, if ``event_return_spill`` is
+    enabled, spilled to disk to be replayed once the returner recovers.
+    '''
+    def __init__(self, opts, returner, func):
+        self.opts = opts
+        self.returner = returner
+        self.func = func
+        self.serial = salt.payload.Serial(self.opts)
+        self.batch_size = self.opts['event_return_queue']
+        self.max_seconds = self.opts.get('event_return_queue_max_seconds', 0)
+        self.max_size = self.opts.get('event_return_max_queue_size', 0)
+        if self.max_size and self.batch_size > self.max_size:
+            log.warning('event_return_queue (%s) is larger than '
+                        'event_return_max_queue_size (%s), the events of '
+                        'returner \'%s\' are flushed every %s events',
+                        self.batch_size, self.max_size, returner, self.max_size)
+            self.batch_size = self.max_size
+        self.retries = self.opts.get('event_return_retries', 0)
+        self.retry_interval = self.opts.get('event_return_retry_interval', 1)
+        self.spill = self.opts.get('event_return_spill', False)
+        self.spill_dir = os.path.join(
+            self.opts['cachedir'], 'event_return_spill', returner)
+        self.events = collections.deque()
+        self.oldest = None
+        self.stats = {'queued': 0,
+                      'flushed': 0,
+                      'failed': 0,
+                      'dropped': 0,
+                      'spilled': 0}
+        self.stop = False
+        self.closed = False
+        self._spill_seq = 0
+        self._cond = threading.Condition()
+        # The stats are updated from both the flush thread and the thread
+        # putting the events
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        '''
+        Start the flush thread
+        '''
+        self._thread = threading.Thread(target=self._flush_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, event):
+        '''
+        Queue an event, applying backpressure if the queue is full
+        '''
+        with self._cond:
+            if self.max_size and len(self.events) >= self.max_size:
+                if self.spill:
+                    self._spill(list(self.events))
+                    self.events.clear()
+                else:
+                    dropped = self.events.popleft()
+                    self._count('dropped', 1)
+                    log.warning('The queue of returner \'%s\' is full, '
+                                'dropping event %s',
+                                self.returner, dropped.get('tag'))
+            if not self.events:
+                self.oldest = time.time()
+            self.events.append(event)
+            self._count('queued', 1)
+            if self._ready():
+                self._cond.notify()
+
+    def depth(self):
+        '''
+        Return the number of events waiting to be flushed
+        '''
+        return len(self.events)
+
+    def get_stats(self):
+        '''
+        Return a copy of the counters and the queue depth
+        '''
+        with self._stats_lock:
+            ret = dict(self.stats)
+        ret['depth'] = self.depth()
+        return ret
+
+    def _count(self, key, count):
+        with self._stats_lock:
+            self.stats[key] += count
+
+    def _ready(self):
+        if not self.events:
+            return False
+        if len(self.events) >= self.batch_size:
+            return True
+        if self.max_seconds > 0 and time.time() - self.oldest >= self.max_seconds:
+            return True
+        return False
+
+    def _wait_time(self):
+        '''
+        Return how long to wait for the queue to be ready to flush
+        '''
+        if self.max_seconds <= 0:
+            return 1
+        if self.oldest is None:
+            return self.max_seconds
+        return max(self.oldest + self.max_seconds - time.time(), 0.01)
+
+    def _take(self):
+        with self._cond:
+            batch = list(self.events)
+            self.events.clear()
+            self.oldest = None
+        return batch
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self.stop and not self._ready():
+                    # Wake up when the oldest event is due so aged events are
+                    # flushed even when no new events arrive
+                    self._cond.wait(self._wait_time())
+                if self.stop:
+                    return
+            self._send(self._take())
+
+    def flush(self):
+        '''
+        Synchronously flush everything that is currently queued
+        '''
+        batch = self._take()
+        if batch:
+            self._send(batch)
+
+    def close(self):
+        '''
+        Stop the flush thread and flush what is left in the queue, only the
+        first call does anything
+        '''
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.stop = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.retry_interval * (self.retries + 1) + 5)
+        self.flush()
+
+    def _call(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                self.func(batch)
+                return True
+            except Exception as exc:
+                log.error('Could not store events - returner \'%s\' raised '
+                          'exception: %s', self.returner, exc)
+                # don't waste processing power unnecessarily on converting a
+                # potentially huge dataset to a string
+                if log.level <= logging.DEBUG:
+                    log.debug('Event data that caused an exception: %s', batch)
+                if attempt < self.retries and not self.stop:
+                    time.sleep(self.retry_interval)
+        return False
+
+    def _send(self, batch):
+        log.debug('Flushing %s events to returner %s.', len(batch), self.returner)
+        if self._call(batch):
+            self._count('flushed', len(batch))
+            if self.spill:
+                self._replay()
+            return
+        self._count('failed', len(batch))
+        if self.spill:
+            self._spill(batch)
+        else:
+            self._count('dropped', len(batch))
+            log.warning('Dropped %s events which returner \'%s\' failed to '
+                        'store', len(batch), self.returner)
+
+    def _spill(self, batch):
+        '''
+        Write a batch of events to the spill directory
+        '''
+        try:
+            if not os.path.isdir(self.spill_dir):
+                os.makedirs(self.spill_dir)
+            self._spill_seq += 1
+            path = os.path.join(
+                self.spill_dir,
+                '{0:.6f}_{1}.p'.format(time.time(), self._spill_seq))
+            with salt.utils.files.fopen(path, 'w+b') as fp_:
+                self.serial.dump(batch, fp_)
+            self._count('spilled', len(batch))
+        except (IOError, OSError) as exc:
+            log.error('Could not spill events for returner \'%s\', '
+                      'dropping %s events: %s', self.returner, len(batch), exc)
+            self._count('dropped', len(batch))
+
+    def _replay(self):
+        '''
+        Send spilled batches to the returner, oldest first
+        '''
+        try:
+            fns = sorted(os.listdir(self.spill_dir))
+        except OSError:
+            return
+        for fn_ in fns:
+            path = os.path.join(self.spill_dir, fn_)
+            try:
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    batch = self.serial.load(fp_)
+            except Exception as exc:
+                log.error('Could not read spilled events from %s: %s', path, exc)
+                os.remove(path)
+                continue
+            log.debug('Replaying %s spilled events to returner %s.',
+                      len(batch), self.returner)
+            if not self._call(batch):
+                return
+            os.remove(path)
+            self._count('spilled', -len(batch))
+            self._count('flushed', len(batch))
+
+
 class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
     '''
     A dedicated process which listens to the master event bus and queues
@@ -1216,12 +1940,13 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
         super(EventReturn, self).__init__(**kwargs)
 
         self.opts = opts
-        self.event_return_queue = self.opts['event_return_queue']
-        self.event_return_queue_max_seconds = self.opts.get('event_return_queue_max_seconds', 0)
+        self.stats_interval = self.opts.get('event_return_stats_interval', 0)
         local_minion_opts = self.opts.copy()
         local_minion_opts['file_client'] = 'local'
         self.minion = salt.minion.MasterMinion(local_minion_opts)
-        self.event_queue = []
+        self.whitelist = self._compile_filter(self.opts['event_return_whitelist'])
+        self.blacklist = self._compile_filter(self.opts['event_return_blacklist'])
+        self.queues = {}
         self.stop = False
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -1243,101 +1968,101 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
         }
 
     def _handle_signals(self, signum, sigframe):
-        # Flush and terminate
-        if self.event_queue:
-            self.flush_events()
+        # Terminate, the queues are flushed on the way out of run(), not from
+        # within the signal handler
         self.stop = True
         super(EventReturn, self)._handle_signals(signum, sigframe)
 
-    def flush_events(self):
+    @staticmethod
+    def _compile_filter(patterns):
+        '''
+        Compile a list of glob patterns into a single regular expression
+        '''
+        if not patterns:
+            return None
+        return re.compile('|'.join(
+            '(?:{0})'.format(fnmatch.translate(pattern)) for pattern in patterns))
+
+    def _returners(self):
         if isinstance(self.opts['event_return'], list):
-            # Multiple event returners
-            for r in self.opts['event_return']:
-                log.debug('Calling event returner %s, one of many.', r)
-                event_return = '{0}.event_return'.format(r)
-                self._flush_event_single(event_return)
-        else:
-            # Only a single event returner
-            log.debug('Calling event returner %s, only one configured.',
-                      self.opts['event_return'])
-            event_return = '{0}.event_return'.format(
-                self.opts['event_return']
-                )
-            self._flush_event_single(event_return)
-        del self.event_queue[:]
+            return self.opts['event_return']
+        return [self.opts['event_return']]
 
-    def _flush_event_single(self, event_return):
-        if event_return in self.minion.returners:
-            try:
-                self.minion.returners[event_return](self.event_queue)
-            except Exception as exc:
-                log.error('Could not store events - returner \'%s\' raised '
-                          'exception: %s', event_return, exc)
-                # don't waste processing power unnecessarily on converting a
-                # potentially huge dataset to a string
-                if log.level <= logging.DEBUG:
-                    log.debug('Event data that caused an exception: %s',
-                              self.event_queue)
-        else:
-            log.error('Could not store return for event(s) - returner '
-                      '\'%s\' not found.', event_return)
+    def _load_queues(self):
+        '''
+        Create one queue, with its own flush thread, per configured returner
+        '''
+        for returner in self._returners():
+            event_return = '{0}.event_return'.format(returner)
+            if event_return not in self.minion.returners:
+                log.error('Could not store return for event(s) - returner '
+                          '\'%s\' not found.', event_return)
+                continue
+            queue = EventReturnQueue(
+                self.opts, returner, self.minion.returners[event_return])
+            queue.start()
+            self.queues[returner] = queue
+
+    def flush_events(self):
+        '''
+        Synchronously flush the queues of all returners
+        '''
+        for returner, queue in six.iteritems(self.queues):
+            log.debug('Calling event returner %s.', returner)
+            queue.flush()
+
+    def close_queues(self):
+        '''
+        Stop the flush threads and flush whatever is left in the queues. The
+        queues which are already closed are left alone.
+        '''
+        for queue in six.itervalues(self.queues):
+            queue.close()
+
+    def get_stats(self):
+        '''
+        Return the queue depth and counters of each returner queue
+        '''
+        ret = {}
+        for returner, queue in six.iteritems(self.queues):
+            ret[returner] = queue.get_stats()
+        return ret
+
+    def _fire_stats(self):
+        self.event.fire_event(self.get_stats(), tagify('stats', 'event_return'))
 
     def run(self):
         '''
         Spin up the multiprocess event returner
         '''
         salt.utils.process.appendproctitle(self.__class__.__name__)
+        self._load_queues()
         self.event = get_event('master', opts=self.opts, listen=True)
         events = self.event.iter_events(full=True)
         self.event.fire_event({}, 'salt/event_listen/start')
+        last_stats = time.time()
         try:
             # events below is a generator, we will iterate until we get the salt/event/exit tag
-            oldestevent = None
             for event in events:
 
                 if event['tag'] == 'salt/event/exit':
                     # We're done eventing
                     self.stop = True
                 if self._filter(event):
-                    # This event passed the filter, add it to the queue
-                    self.event_queue.append(event)
-                too_long_in_queue = False
-
-                # if max_seconds is >0, then we want to make sure we flush the queue
-                # every event_return_queue_max_seconds seconds,  If it's 0, don't
-                # apply any of this logic
-                if self.event_return_queue_max_seconds > 0:
-                    rightnow = datetime.datetime.now()
-                    if not oldestevent:
-                        oldestevent = rightnow
-                    age_in_seconds = (rightnow - oldestevent).seconds
-                    if age_in_seconds > 0:
-                        log.debug('Oldest event in queue is %s seconds old.', age_in_seconds)
-                    if age_in_seconds >= self.event_return_queue_max_seconds:
-                        too_long_in_queue = True
-                        oldestevent = None
-                    else:
-                        too_long_in_queue = False
-
-                    if too_long_in_queue:
-                        log.debug('Oldest event has been in queue too long, will flush queue')
+                    # This event passed the filter, hand it to every returner
+                    for queue in six.itervalues(self.queues):
+                        queue.put(event)
 
-                # If we are over the max queue size or the oldest item in the queue has been there too long
-                # then flush the queue
-                if len(self.event_queue) >= self.event_return_queue or too_long_in_queue:
-                    log.debug('Flushing %s events.', len(self.event_queue))
-                    self.flush_events()
-                    oldestevent = None
+                if self.stats_interval > 0 and time.time() - last_stats >= self.stats_interval:
+                    self._fire_stats()
+                    last_stats = time.time()
                 if self.stop:
                     # We saw the salt/event/exit tag, we can stop eventing
                     break
-        finally:  # flush all we have at this moment
-            # No matter what, make sure we flush the queue even when we are exiting
-            # and there will be no more events.
-            if self.event_queue:
-                log.debug('Flushing %s events.', len(self.event_queue))
-
-                self.flush_events()
+        finally:
+            # No matter what, make sure we flush the queues even when we are
+            # exiting and there will be no more events.
+            self.close_queues()
 
     def _filter(self, event):
         '''
@@ -1346,19 +2071,11 @@ class EventReturn(salt.utils.process.SignalHandlingMultiprocessingProcess):
         Returns True if event should be stored, else False
         '''
         tag = event['tag']
-        if self.opts['event_return_whitelist']:
-            ret = False
-        else:
-            ret = True
-        for whitelist_match in self.opts['event_return_whitelist']:
-            if fnmatch.fnmatch(tag, whitelist_match):
-                ret = True
-                break
-        for blacklist_match in self.opts['event_return_blacklist']:
-            if fnmatch.fnmatch(tag, blacklist_match):
-                ret = False
-                break
-        return ret
+        if self.whitelist is not None and not self.whitelist.match(tag):
+            return False
+        if self.blacklist is not None and self.blacklist.match(tag):
+            return False
+        return True
 
 
 class StateFire(object):
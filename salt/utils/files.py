@@ -54,6 +54,10 @@ HASHES = {
 }
 HASHES_REVMAP = dict([(y, x) for x, y in six.iteritems(HASHES)])
 
+# The ioctl cloning a file on the filesystems sharing data blocks between
+# files, like btrfs or xfs, from linux/fs.h
+FICLONE = 0x40049409
+
 
 def __clean_tmp(tmp):
     '''
@@ -118,6 +122,21 @@ def recursive_copy(source, dest):
             shutil.copyfile(file_path_from_source, target_path)
 
 
+def clonefile(source, dest):
+    '''
+    Copy the content of source to dest, sharing the data blocks of source
+    instead of copying them when the filesystem supports it
+    '''
+    if HAS_FCNTL and salt.utils.platform.is_linux():
+        try:
+            with fopen(source, 'rb') as src_, fopen(dest, 'wb') as dst_:
+                fcntl.ioctl(dst_.fileno(), FICLONE, src_.fileno())
+            return
+        except (IOError, OSError):
+            pass
+    shutil.copyfile(source, dest)
+
+
 def copyfile(source, dest, backup_mode='', cachedir=''):
     '''
     Copy files from a source to a destination in an atomic way, and if
@@ -134,7 +153,7 @@ def copyfile(source, dest, backup_mode='', cachedir=''):
     bname = os.path.basename(dest)
     dname = os.path.dirname(os.path.abspath(dest))
     tgt = mkstemp(prefix=bname, dir=dname)
-    shutil.copyfile(source, tgt)
+    clonefile(source, tgt)
     bkroot = ''
     if cachedir:
         bkroot = os.path.join(cachedir, 'file_backup')
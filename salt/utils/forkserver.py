@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+'''
+Spawn commands from a small helper process instead of the minion
+
+.. versionadded:: Neon
+
+Forking the minion to run a command copies its whole address space, which
+gets slow and memory hungry when thousands of commands are run, like the
+``onlyif`` and ``unless`` checks of a highstate. The :py:class:`ForkServer`
+starts the :py:mod:`~salt.utils.forkserver_helper`, which only imports the
+standard library, once per process and asks it to spawn the commands.
+:py:class:`ForkServerProc` gives it the interface of
+:py:class:`~salt.utils.timed_subprocess.TimedProc`.
+'''
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import threading
+
+# Import Salt libs
+import salt.utils.data
+import salt.utils.forkserver_helper
+import salt.utils.platform
+import salt.utils.profile
+import salt.utils.stringutils
+from salt.exceptions import CommandExecutionError, TimedProcTimeoutError
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+# Run the helper without the current directory in its path
+_BOOTSTRAP = (
+    'import sys; del sys.path[0]; import runpy; '
+    'runpy.run_path(sys.argv[1], run_name="__main__")'
+)
+
+# The fork server of the current process
+_FORKSERVER = None
+
+
+class ForkServerError(Exception):
+    '''
+    The fork server could not be started or sent a request. The command was
+    not run.
+    '''
+
+
+class ForkServer(object):
+    '''
+    The helper process spawning the commands of the current process
+    '''
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.proc = None
+
+    def start(self):
+        '''
+        Start the helper process
+        '''
+        path = os.path.splitext(salt.utils.forkserver_helper.__file__)[0] + '.py'
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, '-E', '-s', '-c', _BOOTSTRAP, path],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd='/',
+                close_fds=True)
+        except (OSError, IOError) as exc:
+            raise ForkServerError('Failed to start the fork server: {0}'.format(exc))
+        log.debug('Started the fork server with pid %s', self.proc.pid)
+
+    def call(self, request, blocking=True):
+        '''
+        Send a request to the helper process and return its reply
+
+        Raises :py:class:`ForkServerError` if the request was not sent, or if
+        blocking is False and another thread is using the helper.
+        '''
+        if not self.lock.acquire(blocking):
+            raise ForkServerError('The fork server is busy')
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                self.start()
+            try:
+                salt.utils.forkserver_helper.write_message(self.proc.stdin, request)
+            except (OSError, IOError) as exc:
+                self.close()
+                raise ForkServerError('Failed to send the command to the fork server: {0}'.format(exc))
+            try:
+                reply = salt.utils.forkserver_helper.read_message(self.proc.stdout)
+            except (OSError, IOError, EOFError):
+                reply = None
+            if reply is None:
+                self.close()
+                raise CommandExecutionError('The fork server stopped while running the command')
+            return reply
+        finally:
+            self.lock.release()
+
+    def close(self):
+        '''
+        Stop the helper process
+        '''
+        if self.proc is None:
+            return
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except (OSError, IOError):
+                pass
+        try:
+            self.proc.wait()
+        except OSError:
+            pass
+        self.proc = None
+
+
+def get_forkserver():
+    '''
+    Return the fork server of the current process. A forked process gets its
+    own, it does not share the one of its parent.
+    '''
+    global _FORKSERVER  # pylint: disable=global-statement
+    if _FORKSERVER is None or _FORKSERVER.pid != os.getpid():
+        _FORKSERVER = ForkServer()
+    return _FORKSERVER
+
+
+def usable(**kwargs):
+    '''
+    Return whether a command run with the keyword arguments of
+    :py:class:`~salt.utils.timed_subprocess.TimedProc` can be run by the fork
+    server
+    '''
+    if salt.utils.platform.is_windows() or getattr(sys, 'frozen', False):
+        return False
+    if kwargs.get('bg') or not kwargs.get('with_communicate', True):
+        return False
+    if kwargs.get('stdout', subprocess.PIPE) != subprocess.PIPE:
+        return False
+    return kwargs.get('stderr', subprocess.PIPE) in (subprocess.PIPE, subprocess.STDOUT)
+
+
+class ForkServerProc(object):
+    '''
+    Run a command from the fork server, with the interface of
+    :py:class:`~salt.utils.timed_subprocess.TimedProc`
+
+    The command is run when the object is created, :py:meth:`run` raises
+    :py:class:`~salt.exceptions.TimedProcTimeoutError` if it timed out. The
+    uid, gid and supplemental gids returned by
+    :py:func:`salt.utils.user.chugid_and_umask_ids` and the umask replace the
+    ``preexec_fn``.
+    '''
+    def __init__(self, args, ids=None, umask=None, **kwargs):
+        self.timeout = kwargs.get('timeout')
+        if self.timeout and not isinstance(self.timeout, (int, float)):
+            raise TimedProcTimeoutError('Error: timeout {0} must be a number'.format(self.timeout))
+        stdin = kwargs.get('stdin')
+        if stdin is not None:
+            if not kwargs.get('stdin_raw_newlines', False):
+                # Translate a newline submitted as '\n' on the CLI to an actual
+                # newline character.
+                stdin = stdin.replace('\\n', '\n')
+            stdin = salt.utils.stringutils.to_bytes(stdin)
+
+        # The arguments TimedProc would end up passing to subprocess.Popen
+        shell = kwargs.get('shell', False)
+        if shell:
+            if not isinstance(args, (list, tuple, six.string_types)):
+                args = six.text_type(args)
+            args = salt.utils.data.decode(args, to_str=True)
+        else:
+            if isinstance(args, six.string_types):
+                args = [args]
+            elif not isinstance(args, (list, tuple)):
+                args = shlex.split(six.text_type(args))
+            args = [arg if isinstance(arg, six.string_types) else six.text_type(arg)
+                    for arg in args]
+        env = kwargs.get('env')
+        if env is not None:
+            env = dict((six.text_type(key) if not isinstance(key, six.string_types) else key,
+                        six.text_type(val) if not isinstance(val, six.string_types) else val)
+                       for key, val in six.iteritems(env))
+            if six.PY2:
+                env = salt.utils.data.encode_dict(env)
+
+        self.command = args
+        salt.utils.profile.count('forkserver_spawns')
+        reply = get_forkserver().call({
+            'args': args,
+            'shell': shell,
+            'executable': kwargs.get('executable'),
+            'cwd': kwargs.get('cwd'),
+            'env': env,
+            'stdin': stdin,
+            'redirect_stderr': kwargs.get('stderr') == subprocess.STDOUT,
+            'timeout': self.timeout,
+            'ids': ids,
+            'umask': umask,
+        }, blocking=False)
+        if 'error' in reply:
+            raise OSError(*reply['error'])
+        if 'exception' in reply:
+            raise CommandExecutionError(
+                'Unable to run command with the fork server: {0}'.format(reply['exception']))
+        self.process = _Process(reply['pid'], reply.get('returncode'))
+        self.timed_out = reply.get('timeout', False)
+        self.stdout = reply.get('stdout')
+        self.stderr = reply.get('stderr')
+
+    def run(self):
+        '''
+        Return the return code of the command, raise TimedProcTimeoutError if
+        it timed out
+        '''
+        if self.timed_out:
+            raise TimedProcTimeoutError(
+                '{0} : Timed out after {1} seconds'.format(
+                    self.command,
+                    six.text_type(self.timeout),
+                )
+            )
+        return self.process.returncode
+
+
+class _Process(object):
+    '''
+    The pid and return code of a command run by the fork server
+    '''
+    def __init__(self, pid, returncode):
+        self.pid = pid
+        self.returncode = returncode
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+'''
+The helper process of :py:mod:`salt.utils.forkserver`
+
+.. versionadded:: Neon
+
+This script is run on its own by the Python interpreter of the minion and
+only imports the standard library, so that the commands it spawns are forked
+from a small address space instead of the one of the minion. It reads the
+requests from stdin and writes the replies to stdout, each of them a pickled
+dict preceded by its length.
+
+Do not import Salt libs here.
+'''
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Python libs
+import os
+import pickle
+import signal
+import struct
+import subprocess
+import sys
+import threading
+
+HEADER = struct.Struct(b'!I')
+PROTOCOL = 2
+
+
+def read_message(stream):
+    '''
+    Read a message from stream, return None at the end of the stream
+    '''
+    header = _read(stream, HEADER.size)
+    if header is None:
+        return None
+    size = HEADER.unpack(header)[0]
+    data = _read(stream, size)
+    if data is None:
+        raise EOFError('Truncated message')
+    return pickle.loads(data)
+
+
+def _read(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def write_message(stream, msg):
+    '''
+    Write a message to stream
+    '''
+    data = pickle.dumps(msg, PROTOCOL)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _preexec(ids, umask):
+    '''
+    Apply the uid, gid and umask of the request to the new process, like
+    salt.utils.user.chugid_and_umask does
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if ids is not None:
+        uid, gid, supgroups = ids
+        if os.getgid() != gid:
+            os.setgid(gid)
+        if sorted(os.getgroups()) != sorted(supgroups):
+            os.setgroups(supgroups)
+        if os.getuid() != uid:
+            os.setuid(uid)
+    if umask is not None:
+        os.umask(umask)
+
+
+def run(request):
+    '''
+    Run the command of a request and return the reply
+    '''
+    kwargs = {
+        'shell': request['shell'],
+        'cwd': request['cwd'],
+        'env': request['env'],
+        'stdin': subprocess.PIPE if request['stdin'] is not None else None,
+        'stdout': subprocess.PIPE,
+        'stderr': subprocess.STDOUT if request['redirect_stderr'] else subprocess.PIPE,
+        'close_fds': True,
+        'preexec_fn': lambda: _preexec(request['ids'], request['umask']),
+    }
+    if request.get('executable'):
+        kwargs['executable'] = request['executable']
+    try:
+        process = subprocess.Popen(request['args'], **kwargs)
+    except (OSError, IOError) as exc:
+        return {'error': (exc.errno, exc.strerror, getattr(exc, 'filename', None))}
+    except Exception as exc:  # pylint: disable=broad-except
+        return {'exception': '{0}: {1}'.format(type(exc).__name__, exc)}
+
+    output = {}
+
+    def receive():
+        output['stdout'], output['stderr'] = process.communicate(input=request['stdin'])
+
+    if not request['timeout']:
+        receive()
+    else:
+        # Reap the process in the background on timeout, its output may be
+        # held open by its own children
+        thread = threading.Thread(target=receive)
+        thread.daemon = True
+        thread.start()
+        thread.join(request['timeout'])
+        if thread.is_alive():
+            process.kill()
+            return {'pid': process.pid, 'timeout': True}
+    return {'pid': process.pid,
+            'returncode': process.returncode,
+            'stdout': output['stdout'],
+            'stderr': output['stderr']}
+
+
+def main():
+    '''
+    Serve the requests until stdin is closed
+    '''
+    # Ctrl-C is for the minion, which closes stdin when it stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+    stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+    while True:
+        request = read_message(stdin)
+        if request is None:
+            break
+        write_message(stdout, run(request))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ Utility functions for minions
 from __future__ import absolute_import, unicode_literals
 import os
 import logging
+import multiprocessing
 import threading
 
 # Import Salt Libs
@@ -14,21 +15,37 @@ import salt.payload
 import salt.utils.files
 import salt.utils.platform
 import salt.utils.process
+from salt.ext import six
+
+try:
+    import setproctitle
+    HAS_SETPROCTITLE = True
+except ImportError:
+    HAS_SETPROCTITLE = False
 
 log = logging.getLogger(__name__)
 
 
+# path -> (stat signature, data) of the proc files read by this process. This
+# only saves the reads of long lived processes, like the scheduler of the
+# minion, the stat and the checks of the job process are still made each time.
+_PROC_FILES = {}
+
+
 def running(opts):
     '''
-    Return the running jobs on this minion
+    Return the running jobs on this minion. The proc directory is listed and
+    the process of every proc file is checked on each call.
     '''
 
     ret = []
     proc_dir = os.path.join(opts['cachedir'], 'proc')
     if not os.path.isdir(proc_dir):
         return ret
+    paths = set()
     for fn_ in os.listdir(proc_dir):
         path = os.path.join(proc_dir, fn_)
+        paths.add(path)
         try:
             data = _read_proc_file(path, opts)
             if data is not None:
@@ -38,9 +55,53 @@ def running(opts):
             # the minion process that is executing the JID in question, so
             # we must ignore ENOENT during this process
             pass
+    # Forget the proc files of the jobs which are over
+    for path in list(_PROC_FILES):
+        if path not in paths and os.path.dirname(path) == proc_dir:
+            _PROC_FILES.pop(path, None)
     return ret
 
 
+def find_job(opts, jid):
+    '''
+    Return the data of a running job on this minion, or None. Only the proc
+    file of the job is read and its process checked, the proc directory is
+    not listed.
+    '''
+    jid = six.text_type(jid)
+    if not jid or os.path.basename(jid) != jid or jid in (os.curdir, os.pardir):
+        return None
+    path = os.path.join(opts['cachedir'], 'proc', jid)
+    try:
+        return _read_proc_file(path, opts)
+    except (IOError, OSError):
+        return None
+
+
+class RunningJobs(object):
+    '''
+    The running jobs returned by :py:func:`running`, indexed by jid, by
+    function and by the name of the scheduled job which started them.
+
+    This is a snapshot, it does not learn about the jobs which start or end
+    after it was built.
+    '''
+    def __init__(self, jobs):
+        self.jids = {}
+        self.funs = {}
+        self.schedules = {}
+        for job in jobs:
+            self.jids[job.get('jid')] = job
+            funs = job.get('fun')
+            if not isinstance(funs, list):
+                funs = [funs]
+            for fun in funs:
+                if isinstance(fun, six.string_types):
+                    self.funs.setdefault(fun, []).append(job)
+            if 'schedule' in job:
+                self.schedules.setdefault(job['schedule'], []).append(job)
+
+
 def cache_jobs(opts, jid, ret):
     '''
     Write job information to cache
@@ -59,6 +120,34 @@ def cache_jobs(opts, jid, ret):
         fp_.write(serial.dumps(ret))
 
 
+def _load_proc_file(path, serial):
+    '''
+    Return the data of a proc file, or None if it is empty. The file is only
+    read and deserialized again when it changed since the last call.
+    '''
+    stat = os.stat(path)
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime)
+    cached = _PROC_FILES.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with salt.utils.files.fopen(path, 'rb') as fp_:
+        buf = fp_.read()
+    data = serial.loads(buf) if buf else None
+    _PROC_FILES[path] = (signature, data)
+    return data
+
+
+def _remove_proc_file(path):
+    '''
+    Remove a proc file which does not belong to a running job
+    '''
+    _PROC_FILES.pop(path, None)
+    try:
+        os.remove(path)
+    except (IOError, OSError):
+        log.debug('Unable to remove proc file %s.', path)
+
+
 def _read_proc_file(path, opts):
     '''
     Return a dict of JID metadata, or None
@@ -66,46 +155,30 @@ def _read_proc_file(path, opts):
     serial = salt.payload.Serial(opts)
     current_thread = threading.currentThread().name
     pid = os.getpid()
-    with salt.utils.files.fopen(path, 'rb') as fp_:
-        buf = fp_.read()
-        fp_.close()
-        if buf:
-            data = serial.loads(buf)
-        else:
-            # Proc file is empty, remove
-            try:
-                os.remove(path)
-            except IOError:
-                log.debug('Unable to remove proc file %s.', path)
-            return None
+    data = _load_proc_file(path, serial)
+    if data is None:
+        # Proc file is empty, remove
+        _remove_proc_file(path)
+        return None
     if not isinstance(data, dict):
         # Invalid serial object
         return None
     if not salt.utils.process.os_is_running(data['pid']):
         # The process is no longer running, clear out the file and
         # continue
-        try:
-            os.remove(path)
-        except IOError:
-            log.debug('Unable to remove proc file %s.', path)
+        _remove_proc_file(path)
         return None
     if opts.get('multiprocessing'):
         if data.get('pid') == pid:
             return None
     else:
         if data.get('pid') != pid:
-            try:
-                os.remove(path)
-            except IOError:
-                log.debug('Unable to remove proc file %s.', path)
+            _remove_proc_file(path)
             return None
         if data.get('jid') == current_thread:
             return None
         if not data.get('jid') in [x.name for x in threading.enumerate()]:
-            try:
-                os.remove(path)
-            except IOError:
-                log.debug('Unable to remove proc file %s.', path)
+            _remove_proc_file(path)
             return None
 
     if not _check_cmdline(data):
@@ -114,12 +187,10 @@ def _read_proc_file(path, opts):
             log.warning(
                 'PID %s exists but does not appear to be a salt process.', pid
             )
-        try:
-            os.remove(path)
-        except IOError:
-            log.debug('Unable to remove proc file %s.', path)
+        _remove_proc_file(path)
         return None
-    return data
+    # The data is shared with the next calls
+    return dict(data)
 
 
 def _check_cmdline(data):
@@ -147,3 +218,166 @@ def _check_cmdline(data):
                 return True
     except (OSError, IOError):
         return False
+
+
+class JobWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
+    '''
+    A process of the :py:class:`JobWorkerPool`, running the jobs it is sent
+    one after the other
+    '''
+    # seconds between checks that the minion is still alive
+    parent_check_interval = 5
+
+    def __init__(self, target, conn, max_jobs=0, **kwargs):
+        super(JobWorker, self).__init__(**kwargs)
+        self.target = target
+        self.conn = conn
+        self.max_jobs = max_jobs
+        self.parent_pid = os.getpid()
+
+    def run(self):
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        title = setproctitle.getproctitle() if HAS_SETPROCTITLE else None
+        jobs = 0
+        while not self.max_jobs or jobs < self.max_jobs:
+            # Tell the pool that we are ready for the next job
+            try:
+                self.conn.send(jobs)
+            except (IOError, OSError):
+                break
+            data = self._recv()
+            if data is None:
+                break
+            try:
+                self.target(data)
+            except Exception:
+                log.exception('Job %s failed in the job worker', data.get('jid'))
+            if title is not None:
+                # Drop the jid appended by the job
+                setproctitle.setproctitle(title)
+            jobs += 1
+
+    def _recv(self):
+        '''
+        Wait for the next job, return None when the worker should stop
+        '''
+        while not self.conn.poll(self.parent_check_interval):
+            if os.getppid() != self.parent_pid:
+                log.debug('The minion is gone, stopping the job worker')
+                return None
+        try:
+            return self.conn.recv()
+        except EOFError:
+            return None
+
+
+class _JobWorkerSlot(object):
+    '''
+    A worker of the :py:class:`JobWorkerPool` and its state
+    '''
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        # the worker is waiting for a job
+        self.ready = False
+        # the worker must be replaced after its current job
+        self.stale = False
+
+
+class JobWorkerPool(object):
+    '''
+    Pre-forked processes running the jobs of the minion
+
+    Each :py:class:`JobWorker` is forked from the minion with its modules
+    loaded, and runs up to max_jobs jobs sent over a pipe before it is
+    replaced. A job is sent to a worker waiting for one, and
+    :py:meth:`dispatch` returns False when all of them are busy. The minion
+    has to call :py:meth:`check` periodically to replace the workers which
+    stopped.
+    '''
+    def __init__(self, target, workers, max_jobs=0):
+        self.target = target
+        self.max_jobs = max_jobs
+        self.slots = [_JobWorkerSlot() for _ in range(workers)]
+
+    def check(self):
+        '''
+        Collect the workers waiting for a job, and replace the workers which
+        stopped
+        '''
+        for slot in self.slots:
+            if slot.process is not None:
+                try:
+                    while slot.conn.poll():
+                        slot.conn.recv()
+                        slot.ready = True
+                except (EOFError, IOError, OSError):
+                    slot.ready = False
+                if slot.ready and slot.stale:
+                    self._stop(slot)
+                if not slot.process.is_alive():
+                    log.debug('The job worker with pid %s stopped with exit status %s',
+                              slot.process.pid, slot.process.exitcode)
+                    slot.process.join()
+                    slot.conn.close()
+                    slot.process = None
+            if slot.process is None:
+                self._start(slot)
+
+    def _start(self, slot):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        slot.process = JobWorker(self.target, child_conn, self.max_jobs)
+        slot.process.start()
+        child_conn.close()
+        slot.conn = parent_conn
+        slot.ready = False
+        slot.stale = False
+        log.debug('Started a job worker with pid %s', slot.process.pid)
+
+    def _stop(self, slot):
+        slot.ready = False
+        try:
+            slot.conn.send(None)
+        except (IOError, OSError):
+            pass
+
+    def dispatch(self, data):
+        '''
+        Send a job to a worker waiting for one. Return False if all of the
+        workers are busy.
+        '''
+        self.check()
+        for slot in self.slots:
+            if not slot.ready or slot.stale:
+                continue
+            slot.ready = False
+            try:
+                slot.conn.send(data)
+            except (IOError, OSError):
+                continue
+            log.debug('Sent job %s to the job worker with pid %s',
+                      data.get('jid'), slot.process.pid)
+            return True
+        return False
+
+    def recycle(self):
+        '''
+        Replace the workers once they are done with their current job, like
+        after the modules of the minion were reloaded
+        '''
+        for slot in self.slots:
+            if slot.process is None:
+                continue
+            slot.stale = True
+            if slot.ready:
+                self._stop(slot)
+
+    def close(self):
+        '''
+        Stop the workers once they are done with their current job
+        '''
+        for slot in self.slots:
+            if slot.process is not None:
+                self._stop(slot)
+                slot.conn.close()
+                slot.process = None
@@ -2100,6 +2100,44 @@ class SaltCMDOptionParser(six.with_metaclass(OptionParserMeta,
             dest='batch_safe_size',
             help=('Batch size to use for batch jobs created by batch-safe-limit.')
         )
+        self.add_option(
+            '--batch-adaptive',
+            default=False,
+            dest='batch_adaptive',
+            action='store_true',
+            help=('Size the batch from how the minions return, starting '
+                  'from the batch size: grow it while minions return fine '
+                  'and in time, and halve it when they fail or slow down.')
+        )
+        self.add_option(
+            '--batch-max',
+            default=0,
+            dest='batch_max',
+            type=int,
+            help=('The maximum size of an adaptive batch.')
+        )
+        self.add_option(
+            '--batch-max-failures',
+            default='',
+            dest='batch_max_failures',
+            help=('Stop starting minions once this number, or percentage, '
+                  'of the minions in the batch run failed.')
+        )
+        self.add_option(
+            '--batch-group-by',
+            default='',
+            dest='batch_group_by',
+            help=('Group the minions in the batch run by the value of this '
+                  'grain, to be used with --batch-group-size.')
+        )
+        self.add_option(
+            '--batch-group-size',
+            default=0,
+            dest='batch_group_size',
+            type=int,
+            help=('The maximum number of minions of the same group running '
+                  'at the same time.')
+        )
         self.add_option(
             '--return',
             default='',
@@ -10,8 +10,11 @@ import os
 import re
 
 # Import Salt libs
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
+import salt.utils.profile
 import salt.utils.versions
 
 log = logging.getLogger(__name__)
@@ -67,6 +70,106 @@ def check_refresh(opts, refresh=None):
     )
 
 
+def snapshot_path(opts, name):
+    '''
+    Return the location of the package snapshot of a pkg provider
+    '''
+    return os.path.join(opts['cachedir'], 'pkg_snapshot', '{0}.p'.format(name))
+
+
+def snapshot_stamp(dbpaths):
+    '''
+    Return the mtime and size of the package database files which exist, or
+    None if none of them do. It has to be taken before querying the package
+    database, and passed to :py:func:`write_snapshot`.
+    '''
+    stamp = []
+    for path in dbpaths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stamp.append([path, st.st_mtime, st.st_size])
+    return stamp or None
+
+
+def read_snapshot(opts, name, dbpaths, key=None):
+    '''
+    Return the package list stored in the snapshot of a pkg provider, or None
+    if there is none or if the package database or the key changed since it
+    was written.
+
+    dbpaths
+        The files of the package database, whose mtime and size invalidate
+        the snapshot
+
+    key
+        The options the package list was computed for, like the root or the
+        architecture of the system
+    '''
+    if not opts.get('pkg_snapshot_cache') or 'cachedir' not in opts:
+        return None
+    stamp = snapshot_stamp(dbpaths)
+    if stamp is None:
+        return None
+    try:
+        with salt.utils.files.fopen(snapshot_path(opts, name), 'rb') as fp_:
+            snapshot = salt.payload.Serial(opts).load(fp_)
+    except (IOError, OSError):
+        return None
+    except Exception as exc:
+        log.warning('Failed to read the %s package snapshot: %s', name, exc)
+        return None
+    if not isinstance(snapshot, dict) \
+            or snapshot.get('stamp') != stamp \
+            or snapshot.get('key') != key:
+        return None
+    salt.utils.profile.count('pkg_snapshot_hits')
+    return snapshot.get('data')
+
+
+def write_snapshot(opts, name, dbpaths, stamp, data, key=None):
+    '''
+    Store the package list of a pkg provider in its snapshot, so that the
+    next jobs don't need to query the package database again until it
+    changes.
+
+    stamp
+        The stamp of the package database returned by
+        :py:func:`snapshot_stamp` before it was queried. Nothing is stored if
+        the database changed during the query, since the package list may
+        not match the database anymore.
+    '''
+    if not opts.get('pkg_snapshot_cache') or 'cachedir' not in opts:
+        return
+    if stamp is None or snapshot_stamp(dbpaths) != stamp:
+        return
+    path = snapshot_path(opts, name)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        salt.payload.Serial(opts).dump(
+            {'stamp': stamp, 'key': key, 'data': data},
+            salt.utils.atomicfile.atomic_open(path, 'wb'))
+    except (IOError, OSError) as exc:
+        log.warning('Failed to write the %s package snapshot: %s', name, exc)
+
+
+def clear_snapshot(opts, name):
+    '''
+    Remove the snapshot of a pkg provider, after installing or removing
+    packages
+    '''
+    if 'cachedir' not in opts:
+        return
+    try:
+        os.remove(snapshot_path(opts, name))
+    except OSError as exc:
+        if exc.errno != errno.ENOENT:
+            log.warning('Encountered error removing the %s package snapshot: %s',
+                        name, exc.__str__())
+
+
 def split_comparison(version):
     match = re.match(r'^(<=>|!=|>=|<=|>>|<<|<>|>|<|=)?\s?([^<>=]+)$', version)
     if match:
@@ -10,6 +10,9 @@ from __future__ import absolute_import, print_function, unicode_literals
 from salt.ext import six
 from salt.ext.six.moves import range  # pylint: disable=redefined-builtin
 
+# The files of the dpkg database, whose changes invalidate the package snapshot
+DB_PATHS = ('/var/lib/dpkg/status',)
+
 
 def combine_comments(comments):
     '''
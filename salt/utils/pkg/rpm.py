@@ -18,6 +18,18 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# The files of the rpm database, whose changes invalidate the package snapshot
+DB_PATHS = (
+    '/var/lib/rpm/Packages',
+    '/var/lib/rpm/Packages.db',
+    '/var/lib/rpm/rpmdb.sqlite',
+    '/var/lib/rpm/rpmdb.sqlite-wal',
+    '/usr/lib/sysimage/rpm/Packages',
+    '/usr/lib/sysimage/rpm/Packages.db',
+    '/usr/lib/sysimage/rpm/rpmdb.sqlite',
+    '/usr/lib/sysimage/rpm/rpmdb.sqlite-wal',
+)
+
 # These arches compiled from the rpmUtils.arch python module source
 ARCHES_64 = ('x86_64', 'athlon', 'amd64', 'ia32e', 'ia64', 'geode')
 ARCHES_32 = ('i386', 'i486', 'i586', 'i686')
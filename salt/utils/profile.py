@@ -1,22 +1,31 @@
 # -*- coding: utf-8 -*-
 '''
-Decorator and functions to profile Salt using cProfile
+Decorator and functions to profile Salt using cProfile, and the hierarchical
+timings and counters of a state run
 '''
 
 from __future__ import absolute_import, print_function, unicode_literals
 
 # Import Python libs
+import contextlib
 import datetime
 import logging
 import os
 import pstats
 import subprocess
+import threading
+import time
 
 # Import Salt libs
 import salt.utils.files
 import salt.utils.hashutils
+import salt.utils.json
 import salt.utils.path
 import salt.utils.stringutils
+from salt.utils.odict import OrderedDict
+
+# Import 3rd-party libs
+from salt.ext import six
 
 log = logging.getLogger(__name__)
 
@@ -26,6 +35,18 @@ try:
 except ImportError:
     HAS_CPROFILE = False
 
+# The profile of the run being profiled, per thread so that the runs of the
+# other threads, like the jobs of a minion with multiprocessing disabled,
+# don't add their stages to it
+_STATE = threading.local()
+
+
+def _active():
+    '''
+    Return the active profile of the current thread, or None
+    '''
+    return getattr(_STATE, 'profile', None)
+
 
 def profile_func(filename=None):
     '''
@@ -101,3 +122,199 @@ def output_profile(pr, stats_path='/tmp/stats', stop=False, id_=None):
             if not stop:
                 pr.enable()
     return pr
+
+
+class ProfileNode(object):
+    '''
+    The time spent in a stage of a profiled run, the counters incremented
+    during it and its sub-stages
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.duration = 0.0
+        self.calls = 0
+        self.counters = {}
+        self.children = {}
+        self.order = []
+
+    def child(self, name):
+        '''
+        Return the sub-stage called name, adding it on first use
+        '''
+        try:
+            return self.children[name]
+        except KeyError:
+            node = self.children[name] = ProfileNode(name)
+            self.order.append(name)
+            return node
+
+    def totals(self):
+        '''
+        Return the counters of this stage and of its sub-stages added together
+        '''
+        ret = dict(self.counters)
+        for name in self.order:
+            for counter, value in six.iteritems(self.children[name].totals()):
+                ret[counter] = ret.get(counter, 0) + value
+        return ret
+
+    def to_dict(self):
+        '''
+        Return the stage as a dict, with its durations in milliseconds
+        '''
+        ret = {'duration': round(self.duration * 1000.0, 3),
+               'calls': self.calls,
+               'counters': self.totals()}
+        if self.order:
+            ret['stages'] = OrderedDict(
+                (name, self.children[name].to_dict()) for name in self.order)
+        return ret
+
+    def folded(self, prefix=()):
+        '''
+        Yield the lines of the stage and of its sub-stages in the folded stack
+        format of flamegraph.pl, weighted by their own time in microseconds
+        '''
+        stack = prefix + (self.name.replace(';', ':').replace(' ', '_'),)
+        own = self.duration - sum(child.duration for child in six.itervalues(self.children))
+        if own > 0:
+            yield '{0} {1}'.format(';'.join(stack), int(own * 1000000))
+        for name in self.order:
+            for line in self.children[name].folded(stack):
+                yield line
+
+
+class Profile(object):
+    '''
+    The hierarchical timings and counters of a run, like a state run
+
+    The stages are timed with :py:func:`timer` and the counters incremented
+    with :py:func:`count` while the profile is active, see :py:func:`start`
+    and :py:func:`profiling`.
+    '''
+    def __init__(self, name='total'):
+        self.root = ProfileNode(name)
+        self.stack = [self.root]
+        self.started = None
+        self.previous = None
+
+    @contextlib.contextmanager
+    def timer(self, *names):
+        '''
+        Time the block as the sub-stage called name of the current stage. With
+        several names, as the sub-stage of the sub-stage and so on.
+        '''
+        nodes = []
+        for name in names:
+            nodes.append(self.stack[-1].child(name))
+            self.stack.append(nodes[-1])
+        start = time.time()
+        try:
+            yield nodes[-1]
+        finally:
+            elapsed = time.time() - start
+            for node in nodes:
+                node.duration += elapsed
+                self.stack.pop()
+            nodes[-1].calls += 1
+
+    def count(self, name, num=1):
+        '''
+        Increment the counter called name of the current stage
+        '''
+        counters = self.stack[-1].counters
+        counters[name] = counters.get(name, 0) + num
+
+    def to_dict(self):
+        return self.root.to_dict()
+
+    def folded(self):
+        '''
+        Return the profile in the folded stack format of flamegraph.pl
+        '''
+        return '\n'.join(self.root.folded()) + '\n'
+
+    def write(self, path):
+        '''
+        Write the profile as JSON to path, and in the folded stack format of
+        flamegraph.pl to path with the .folded extension. Return the paths.
+        '''
+        folded = os.path.splitext(path)[0] + '.folded'
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            salt.utils.json.dump(self.to_dict(), fp_, indent=2)
+        with salt.utils.files.fopen(folded, 'w') as fp_:
+            fp_.write(self.folded())
+        return path, folded
+
+
+def start(name='total'):
+    '''
+    Start a :py:class:`Profile` and make it the active one until it is passed
+    to :py:func:`stop`
+    '''
+    profile = Profile(name)
+    profile.previous = _active()
+    profile.started = time.time()
+    _STATE.profile = profile
+    return profile
+
+
+def stop(profile):
+    '''
+    Stop a profile started by :py:func:`start`, the profile which was active
+    before it becomes active again
+    '''
+    profile.root.duration += time.time() - profile.started
+    profile.root.calls += 1
+    if _active() is profile:
+        _STATE.profile = profile.previous
+    profile.previous = None
+
+
+@contextlib.contextmanager
+def profiling(name='total'):
+    '''
+    Profile the block, yield the :py:class:`Profile`
+    '''
+    profile = start(name)
+    try:
+        yield profile
+    finally:
+        stop(profile)
+
+
+@contextlib.contextmanager
+def _no_timer():
+    yield None
+
+
+def timer(*names):
+    '''
+    Time the block as a stage of the active profile, if any
+    '''
+    profile = _active()
+    if profile is None:
+        return _no_timer()
+    return profile.timer(*names)
+
+
+def count(name, num=1):
+    '''
+    Increment a counter of the active profile, if any
+    '''
+    profile = _active()
+    if profile is not None:
+        profile.count(name, num)
+
+
+def current():
+    '''
+    Return the stage being timed by the active profile, or None
+    '''
+    profile = _active()
+    if profile is None:
+        return None
+    return profile.stack[-1]
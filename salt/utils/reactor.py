@@ -6,10 +6,17 @@ Functions which implement running reactor jobs
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import calendar
 import collections
+import copy
+import datetime
 import fnmatch
 import glob
+import hashlib
 import logging
+import math
+import os
+import threading
 import time
 
 # Import salt libs
@@ -21,8 +28,10 @@ import salt.utils.cache
 import salt.utils.data
 import salt.utils.event
 import salt.utils.files
+import salt.utils.json
 import salt.utils.master
 import salt.utils.process
+import salt.utils.stringutils
 import salt.utils.yaml
 import salt.wheel
 import salt.defaults.exitcodes
@@ -43,6 +52,33 @@ REACTOR_INTERNAL_KEYWORDS = frozenset([
     'state',
 ])
 
+# Renderers which, when given a file without any template markup, produce
+# the same output regardless of the event being reacted to
+STATIC_RENDERERS = frozenset(['jinja', 'yaml', 'yamlex', 'json'])
+TEMPLATE_MARKERS = ('{{', '{%', '{#')
+
+# The number of rendered reactions kept by the render cache
+RENDER_CACHE_SIZE = 1000
+
+
+def _percentile(samples, percent):
+    '''
+    Return the nearest-rank percentile of a sorted list of samples
+    '''
+    idx = int(math.ceil(percent / 100.0 * len(samples))) - 1
+    return samples[min(max(idx, 0), len(samples) - 1)]
+
+
+def _event_time(data):
+    '''
+    Return the time an event was fired, from its ``_stamp``
+    '''
+    try:
+        stamp = datetime.datetime.strptime(data['_stamp'], '%Y-%m-%dT%H:%M:%S.%f')
+    except (KeyError, TypeError, ValueError):
+        return None
+    return calendar.timegm(stamp.utctimetuple()) + stamp.microsecond / 1e6
+
 
 class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.state.Compiler):
     '''
@@ -65,6 +101,12 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         self.stats = collections.defaultdict(lambda: {'mean': 0, 'latency': 0, 'runs': 0})
         self.stat_clock = time.time()
         self.is_leader = True
+        # fn -> (mtime, is static, rendered reaction if static)
+        self.static_reactions = {}
+        # key of an event -> (expiry time, rendered reaction), the least
+        # recently used first, up to RENDER_CACHE_SIZE of them
+        self.render_cache_ttl = opts.get('reactor_render_cache_ttl', 0)
+        self.render_cache = collections.OrderedDict()
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -93,7 +135,11 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         end_time = time.time()
         if end_time - self.stat_clock > self.opts['master_stats_event_iter']:
             # Fire the event with the stats and wipe the tracker
-            self.event.fire_event({'time': end_time - self.stat_clock, 'worker': self.name, 'stats': stats}, tagify(self.name, 'stats'))
+            self.event.fire_event({'time': end_time - self.stat_clock,
+                                   'worker': self.name,
+                                   'stats': stats,
+                                   'dispatch_latency': self.wrap.latency_stats()},
+                                  tagify(self.name, 'stats'))
             self.stats = collections.defaultdict(lambda: {'mean': 0, 'latency': 0, 'runs': 0})
             self.stat_clock = end_time
 
@@ -111,21 +157,76 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
             log.error('Can not render SLS %s for tag %s. File missing or not found.', glob_ref, tag)
         for fn_ in globbed_ref:
             try:
-                res = self.render_template(
-                    fn_,
-                    tag=tag,
-                    data=data)
-
-                # for #20841, inject the sls name here since verify_high()
-                # assumes it exists in case there are any errors
-                for name in res:
-                    res[name]['__sls__'] = fn_
-
-                react.update(res)
+                react.update(self._render_cached(fn_, tag, data))
             except Exception:
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
+    def _is_static(self, fn_):
+        '''
+        Return True if rendering the reactor file does not depend on the
+        event, that is it is only run through plain data renderers and does
+        not contain any template markup
+        '''
+        with salt.utils.files.fopen(fn_, 'r') as fp_:
+            content = salt.utils.stringutils.to_unicode(fp_.read())
+        first_line = content.split('\n', 1)[0].strip()
+        if first_line.startswith('#!'):
+            pipe = first_line[2:]
+        else:
+            pipe = self.opts['renderer']
+        renderers = set(rend.strip().split(' ')[0] for rend in pipe.split('|'))
+        if not renderers.issubset(STATIC_RENDERERS):
+            return False
+        return not any(marker in content for marker in TEMPLATE_MARKERS)
+
+    def _render_cached(self, fn_, tag, data):
+        '''
+        Render a reactor file, reusing a previous render when the file has
+        not changed and either does not depend on the event or was rendered
+        for an identical event within ``reactor_render_cache_ttl`` seconds
+        '''
+        try:
+            mtime = os.path.getmtime(fn_)
+        except OSError:
+            mtime = None
+
+        static = self.static_reactions.get(fn_)
+        if static is not None and static[0] == mtime and static[1]:
+            return copy.deepcopy(static[2])
+
+        key = None
+        if self.render_cache_ttl > 0 and mtime is not None:
+            event_data = dict((k, v) for k, v in six.iteritems(data) if k != '_stamp')
+            key = (fn_, mtime, tag, hashlib.sha1(salt.utils.stringutils.to_bytes(
+                salt.utils.json.dumps(event_data, sort_keys=True, default=repr))).hexdigest())
+            cached = self.render_cache.pop(key, None)
+            if cached is not None and cached[0] > time.time():
+                # Move it to the end, as the most recently used
+                self.render_cache[key] = cached
+                return copy.deepcopy(cached[1])
+
+        res = self.render_template(
+            fn_,
+            tag=tag,
+            data=data)
+
+        # for #20841, inject the sls name here since verify_high()
+        # assumes it exists in case there are any errors
+        for name in res:
+            res[name]['__sls__'] = fn_
+
+        if mtime is not None and (static is None or static[0] != mtime):
+            is_static = self._is_static(fn_)
+            self.static_reactions[fn_] = (mtime, is_static, copy.deepcopy(res) if is_static else None)
+            if is_static:
+                return res
+        if key is not None:
+            self.render_cache[key] = (time.time() + self.render_cache_ttl, copy.deepcopy(res))
+            while len(self.render_cache) > RENDER_CACHE_SIZE:
+                self.render_cache.popitem(last=False)
+        return res
+
     def list_reactors(self, tag):
         '''
         Take in the tag from an event and return a list of the reactors to
@@ -240,12 +341,15 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         self.resolve_aliases(chunks)
         return chunks
 
-    def call_reactions(self, chunks):
+    def call_reactions(self, chunks, start=None):
         '''
         Execute the reaction state
+
+        start is the time the event being reacted to was fired, used to
+        measure the event to dispatch latency of the reactions
         '''
         for chunk in chunks:
-            self.wrap.run(chunk)
+            self.wrap.run(chunk, start=start)
 
     def run(self):
         '''
@@ -307,6 +411,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 if not self.is_leader:
                     continue
                 else:
+                    received = time.time()
                     reactors = self.list_reactors(data['tag'])
                     if not reactors:
                         continue
@@ -316,7 +421,9 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                             _data = data['data']
                             start = time.time()
                         try:
-                            self.call_reactions(chunks)
+                            self.call_reactions(
+                                chunks,
+                                start=_event_time(data['data']) or received)
                         except SystemExit:
                             log.warning('Exit ignored by reactor')
 
@@ -349,6 +456,91 @@ class ReactWrap(object):
             self.opts['reactor_worker_threads'],  # number of workers for runner/wheel
             queue_size=self.opts['reactor_worker_hwm']  # queue size for those workers
         )
+        # Dedicated pools for the reaction types configured in
+        # reactor_worker_pools, so one type of reaction can not starve the
+        # others. Runner and wheel reactions which do not have their own pool
+        # use the shared pool above, local and caller reactions run inline.
+        self.pools = {}
+        for reaction_type, pool_opts in six.iteritems(self.opts.get('reactor_worker_pools') or {}):
+            if reaction_type not in self.reaction_class:
+                log.error('Unknown reaction type \'%s\' in reactor_worker_pools', reaction_type)
+                continue
+            pool_opts = pool_opts or {}
+            self.pools[reaction_type] = salt.utils.process.ThreadPool(
+                pool_opts.get('threads', self.opts['reactor_worker_threads']),
+                queue_size=pool_opts.get('hwm', self.opts['reactor_worker_hwm'])
+            )
+        # reaction type -> event to dispatch latencies, in seconds
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=1000))
+        self.event_start = None
+        # The local and caller clients of the threads of the pools, these
+        # clients are not thread-safe
+        self.thread_clients = threading.local()
+
+    def dispatch(self, reaction_type, func, args=(), kwargs=None):
+        '''
+        Run a reaction through the pool of its type, or inline if it has none.
+        Returns False if the pool's queue is full.
+        '''
+        if self.event_start is not None:
+            self.latencies[reaction_type].append(time.time() - self.event_start)
+        pool = self.pools.get(reaction_type)
+        if pool is None and reaction_type in ('runner', 'wheel'):
+            pool = self.pool
+        if pool is None:
+            return func(*args, **(kwargs or {}))
+        if kwargs:
+            return pool.fire_async(func, args=args, kwargs=kwargs)
+        return pool.fire_async(func, args=args)
+
+    def thread_client(self, reaction_type):
+        '''
+        Return the client of reaction_type of the current pool thread, for the
+        local and caller clients which can not be shared between threads
+        '''
+        clients = self.thread_clients.__dict__
+        if reaction_type not in clients:
+            log.debug('Reactor is creating a %s client for thread %s',
+                      reaction_type, threading.current_thread().name)
+            clients[reaction_type] = self.reaction_class[reaction_type](self.opts['conf_file'])
+        return clients[reaction_type]
+
+    def _pooled_call(self, reaction_type, method, *args, **kwargs):
+        '''
+        Call a method of the client of reaction_type of the current pool thread
+        '''
+        return getattr(self.thread_client(reaction_type), method)(*args, **kwargs)
+
+    def _client_call(self, reaction_type, method, args=(), kwargs=None):
+        '''
+        Dispatch a call of a method of the local or caller client, made with
+        the client of the pool thread running it if the type has a pool
+        '''
+        if reaction_type in self.pools:
+            return self.dispatch(reaction_type, self._pooled_call,
+                                 args=(reaction_type, method) + tuple(args), kwargs=kwargs)
+        return self.dispatch(reaction_type, getattr(self.client_cache[reaction_type], method),
+                             args=args, kwargs=kwargs)
+
+    def latency_stats(self):
+        '''
+        Return the event to dispatch latency percentiles of each reaction type
+        since the last call, and reset them
+        '''
+        ret = {}
+        for reaction_type, latencies in six.iteritems(self.latencies):
+            samples = sorted(latencies)
+            latencies.clear()
+            if not samples:
+                continue
+            ret[reaction_type] = {
+                'count': len(samples),
+                'p50': _percentile(samples, 50),
+                'p90': _percentile(samples, 90),
+                'p99': _percentile(samples, 99),
+                'max': samples[-1],
+            }
+        return ret
 
     def populate_client_cache(self, low):
         '''
@@ -375,10 +567,13 @@ class ReactWrap(object):
                 self.client_cache[reaction_type] = \
                     self.reaction_class[reaction_type](self.opts['conf_file'])
 
-    def run(self, low):
+    def run(self, low, start=None):
         '''
         Execute a reaction by invoking the proper wrapper func
+
+        start is the time the event being reacted to was fired
         '''
+        self.event_start = start
         self.populate_client_cache(low)
         try:
             l_fun = getattr(self, low['state'])
@@ -493,22 +688,27 @@ class ReactWrap(object):
         '''
         Wrap RunnerClient for executing :ref:`runner modules <all-salt.runners>`
         '''
-        return self.pool.fire_async(self.client_cache['runner'].low, args=(fun, kwargs))
+        return self.dispatch('runner', self.client_cache['runner'].low, args=(fun, kwargs))
 
     def wheel(self, fun, **kwargs):
         '''
         Wrap Wheel to enable executing :ref:`wheel modules <all-salt.wheel>`
         '''
-        return self.pool.fire_async(self.client_cache['wheel'].low, args=(fun, kwargs))
+        return self.dispatch('wheel', self.client_cache['wheel'].low, args=(fun, kwargs))
 
     def local(self, fun, tgt, **kwargs):
         '''
         Wrap LocalClient for running :ref:`execution modules <all-salt.modules>`
         '''
-        self.client_cache['local'].cmd_async(tgt, fun, **kwargs)
+        ret = self._client_call('local', 'cmd_async', args=(tgt, fun), kwargs=kwargs)
+        if ret is False:
+            return False
 
     def caller(self, fun, **kwargs):
         '''
         Wrap LocalCaller to execute remote exec functions locally on the Minion
         '''
-        self.client_cache['caller'].cmd(fun, *kwargs['arg'], **kwargs['kwarg'])
+        ret = self._client_call('caller', 'cmd',
+                                args=(fun,) + tuple(kwargs['arg']), kwargs=kwargs['kwarg'])
+        if ret is False:
+            return False
@@ -140,6 +140,9 @@ class Schedule(object):
         self.skip_during_range = None
         self.splay = None
         self.enabled = True
+        # the running jobs, while the schedule is evaluated
+        self._evaluating = False
+        self._running_jobs = None
         if isinstance(intervals, dict):
             self.intervals = intervals
         else:
@@ -153,6 +156,13 @@ class Schedule(object):
         self.schedule_returner = self.option('schedule_returner')
         # Keep track of the lowest loop interval needed in this variable
         self.loop_interval = six.MAXSIZE
+        # job name -> (job data, time before which evaluating the job can
+        # neither run it nor change its state)
+        self.deadlines = {}
+        self._deadlines_for = None
+        # date string -> datetime parsed by dateutil on _parsed_day
+        self._parsed_datetimes = {}
+        self._parsed_day = None
         if not self.standalone:
             clean_proc_dir(opts)
         if cleanup:
@@ -215,37 +225,49 @@ class Schedule(object):
             return data
         if 'jid_include' not in data or data['jid_include']:
             jobcount = 0
-            if self.opts['__role'] == 'master':
-                current_jobs = salt.utils.master.get_running_jobs(self.opts)
-            else:
-                current_jobs = salt.utils.minion.running(self.opts)
-            for job in current_jobs:
-                if 'schedule' in job:
+            running_jobs = self._get_running_jobs()
+            for job in running_jobs.schedules.get(data['name'], []):
+                log.debug(
+                    'schedule.handle_func: Checking job against fun '
+                    '%s: %s', func, job
+                )
+                if salt.utils.process.os_is_running(job['pid']):
+                    jobcount += 1
                     log.debug(
-                        'schedule.handle_func: Checking job against fun '
-                        '%s: %s', func, job
+                        'schedule.handle_func: Incrementing jobcount, '
+                        'now %s, maxrunning is %s',
+                        jobcount, data['maxrunning']
                     )
-                    if data['name'] == job['schedule'] \
-                            and salt.utils.process.os_is_running(job['pid']):
-                        jobcount += 1
+                    if jobcount >= data['maxrunning']:
                         log.debug(
-                            'schedule.handle_func: Incrementing jobcount, '
-                            'now %s, maxrunning is %s',
-                            jobcount, data['maxrunning']
+                            'schedule.handle_func: The scheduled job '
+                            '%s was not started, %s already running',
+                            data['name'], data['maxrunning']
                         )
-                        if jobcount >= data['maxrunning']:
-                            log.debug(
-                                'schedule.handle_func: The scheduled job '
-                                '%s was not started, %s already running',
-                                data['name'], data['maxrunning']
-                            )
-                            data['_skip_reason'] = 'maxrunning'
-                            data['_skipped'] = True
-                            data['_skipped_time'] = now
-                            data['run'] = False
-                            return data
+                        data['_skip_reason'] = 'maxrunning'
+                        data['_skipped'] = True
+                        data['_skipped_time'] = now
+                        data['run'] = False
+                        return data
         return data
 
+    def _get_running_jobs(self):
+        '''
+        Return the running jobs indexed by jid and by scheduled job. They are
+        only listed once during an evaluation of the schedule, instead of
+        once for each job checking its maxrunning.
+        '''
+        if self._running_jobs is not None:
+            return self._running_jobs
+        if self.opts['__role'] == 'master':
+            current_jobs = salt.utils.master.get_running_jobs(self.opts)
+        else:
+            current_jobs = salt.utils.minion.running(self.opts)
+        running_jobs = salt.utils.minion.RunningJobs(current_jobs)
+        if self._evaluating:
+            self._running_jobs = running_jobs
+        return running_jobs
+
     def persist(self):
         '''
         Persist the modified schedule into <<configdir>>/<<default_include>>/_schedule.conf
@@ -285,6 +307,7 @@ class Schedule(object):
         '''
         Deletes a job from the scheduler. Ignore jobs from pillar
         '''
+        self.deadlines = {}
         # ensure job exists, then delete it
         if name in self.opts['schedule']:
             del self.opts['schedule'][name]
@@ -308,6 +331,7 @@ class Schedule(object):
         '''
         Reset the scheduler to defaults
         '''
+        self.deadlines = {}
         self.skip_function = None
         self.skip_during_range = None
         self.enabled = True
@@ -318,6 +342,7 @@ class Schedule(object):
         '''
         Deletes a job from the scheduler. Ignores jobs from pillar
         '''
+        self.deadlines = {}
         # ensure job exists, then delete it
         for job in list(self.opts['schedule'].keys()):
             if job.startswith(name):
@@ -353,6 +378,7 @@ class Schedule(object):
             raise ValueError('Scheduled jobs have to be of type dict.')
         if not len(data) == 1:
             raise ValueError('You can only schedule one new job at a time.')
+        self.deadlines = {}
 
         # if enabled is not included in the job,
         # assume job is enabled.
@@ -386,6 +412,7 @@ class Schedule(object):
         '''
         Enable a job in the scheduler. Ignores jobs from pillar
         '''
+        self.deadlines = {}
         # ensure job exists, then enable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = True
@@ -406,6 +433,7 @@ class Schedule(object):
         '''
         Disable a job in the scheduler. Ignores jobs from pillar
         '''
+        self.deadlines = {}
         # ensure job exists, then disable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = False
@@ -426,6 +454,7 @@ class Schedule(object):
         '''
         Modify a job in the scheduler. Ignores jobs from pillar
         '''
+        self.deadlines = {}
         # ensure job exists, then replace it
         if name in self.opts['schedule']:
             self.delete_job(name, persist)
@@ -478,6 +507,7 @@ class Schedule(object):
         '''
         Enable the scheduler.
         '''
+        self.deadlines = {}
         self.opts['schedule']['enabled'] = True
 
         # Fire the complete event back along with updated list of schedule
@@ -490,6 +520,7 @@ class Schedule(object):
         '''
         Disable the scheduler.
         '''
+        self.deadlines = {}
         self.opts['schedule']['enabled'] = False
 
         # Fire the complete event back along with updated list of schedule
@@ -502,6 +533,7 @@ class Schedule(object):
         '''
         Reload the schedule from saved schedule file.
         '''
+        self.deadlines = {}
         # Remove all jobs from self.intervals
         self.intervals = {}
 
@@ -541,6 +573,7 @@ class Schedule(object):
         Postpone a job in the scheduler.
         Ignores jobs from pillar
         '''
+        self.deadlines = {}
         time = data['time']
         new_time = data['new_time']
         time_fmt = data.get('time_fmt', '%Y-%m-%dT%H:%M:%S')
@@ -571,6 +604,7 @@ class Schedule(object):
         Skip a job at a specific time in the scheduler.
         Ignores jobs from pillar
         '''
+        self.deadlines = {}
         time = data['time']
         time_fmt = data.get('time_fmt', '%Y-%m-%dT%H:%M:%S')
 
@@ -630,17 +664,11 @@ class Schedule(object):
         # in case the `run` value is not present.
         running = False
         if 'jid_include' not in data or data['jid_include']:
-            if self.opts['__role'] == 'master':
-                current_jobs = salt.utils.master.get_running_jobs(self.opts)
-            else:
-                current_jobs = salt.utils.minion.running(self.opts)
-            for job in current_jobs:
-                if 'schedule' in job:
-                    log.info('=== data %s ===', data)
-                    log.info('=== job %s ===', job)
-                    if data['name'] in job['schedule'] \
-                            and salt.utils.process.os_is_running(job['pid']):
-                        running = True
+            running_jobs = self._get_running_jobs()
+            for job in running_jobs.schedules.get(data['name'], []):
+                if salt.utils.process.os_is_running(job['pid']):
+                    running = True
+                    break
         return running
 
     def handle_func(self, multiprocessing_enabled, func, data):
@@ -1014,7 +1042,7 @@ class Schedule(object):
 
                 if not isinstance(when_, datetime.datetime):
                     try:
-                        when_ = dateutil_parser.parse(when_)
+                        when_ = self._parse_datetime(when_)
                     except ValueError:
                         data['_error'] = ('Invalid date string {0}. '
                                           'Ignoring job {1}.'.format(i, data['name']))
@@ -1023,6 +1051,8 @@ class Schedule(object):
 
                 _when.append(when_)
 
+            when_times[id(data)] = list(_when)
+
             if data['_splay']:
                 _when.append(data['_splay'])
 
@@ -1176,7 +1206,7 @@ class Schedule(object):
             end = data['skip_during_range']['end']
             if not isinstance(start, datetime.datetime):
                 try:
-                    start = dateutil_parser.parse(start)
+                    start = self._parse_datetime(start)
                 except ValueError:
                     data['_error'] = ('Invalid date string for start in '
                                       'skip_during_range. Ignoring '
@@ -1186,7 +1216,7 @@ class Schedule(object):
 
             if not isinstance(end, datetime.datetime):
                 try:
-                    end = dateutil_parser.parse(end)
+                    end = self._parse_datetime(end)
                 except ValueError:
                     data['_error'] = ('Invalid date string for end in '
                                       'skip_during_range. Ignoring '
@@ -1246,7 +1276,7 @@ class Schedule(object):
             end = data['range']['end']
             if not isinstance(start, datetime.datetime):
                 try:
-                    start = dateutil_parser.parse(start)
+                    start = self._parse_datetime(start)
                 except ValueError:
                     data['_error'] = ('Invalid date string for start. '
                                       'Ignoring job {0}.'.format(data['name']))
@@ -1255,7 +1285,7 @@ class Schedule(object):
 
             if not isinstance(end, datetime.datetime):
                 try:
-                    end = dateutil_parser.parse(end)
+                    end = self._parse_datetime(end)
                 except ValueError:
                     data['_error'] = ('Invalid date string for end.'
                                       ' Ignoring job {0}.'.format(data['name']))
@@ -1297,7 +1327,7 @@ class Schedule(object):
 
             after = data['after']
             if not isinstance(after, datetime.datetime):
-                after = dateutil_parser.parse(after)
+                after = self._parse_datetime(after)
 
             if after >= now:
                 log.debug(
@@ -1323,7 +1353,7 @@ class Schedule(object):
 
             until = data['until']
             if not isinstance(until, datetime.datetime):
-                until = dateutil_parser.parse(until)
+                until = self._parse_datetime(until)
 
             if until <= now:
                 log.debug(
@@ -1359,12 +1389,36 @@ class Schedule(object):
                    'skip_function',
                    'skip_during_range',
                    'splay']
+
+        if not now:
+            now = datetime.datetime.now()
+
+        # Jobs are only evaluated again once their deadline has passed, as
+        # long as neither they nor what they depend on changed
+        state = (self.opts.get('schedule'), self.opts.get('pillar'),
+                 self.opts.get('grains'), self.enabled, self.standalone)
+        if self._deadlines_for is None or \
+                any(a is not b for a, b in zip(state, self._deadlines_for[0])) or \
+                now < self._deadlines_for[1]:
+            self.deadlines = {}
+        self._deadlines_for = (state, now)
+        # id(data) -> the times parsed from the "when" of a job
+        when_times = {}
+        evaluated = []
+        self._evaluating = True
+        self._running_jobs = None
+
         for job, data in six.iteritems(schedule):
 
             # Skip anything that is a global setting
             if job in _hidden:
                 continue
 
+            deadline = self.deadlines.get(job)
+            if deadline is not None and deadline[0] is data and now < deadline[1]:
+                continue
+            evaluated.append((job, data))
+
             # Clear these out between runs
             for item in ['_continue',
                          '_error',
@@ -1415,9 +1469,6 @@ class Schedule(object):
                     '_run_on_start' not in data:
                 data['_run_on_start'] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1675,6 +1726,77 @@ class Schedule(object):
                     elif run:
                         data['_next_fire_time'] = now + datetime.timedelta(seconds=data['_seconds'])
 
+        self._evaluating = False
+        self._running_jobs = None
+
+        for job, data in evaluated:
+            deadline = self._deadline(data, now, loop_interval, when_times.get(id(data)))
+            if deadline is None:
+                self.deadlines.pop(job, None)
+            else:
+                self.deadlines[job] = (data, deadline)
+
+    def _deadline(self, data, now, loop_interval, when_times=None):
+        '''
+        Return the time before which evaluating a job can neither run it nor
+        change its state, or None if the job has to be evaluated on every loop
+        '''
+        if not isinstance(data, dict) or self.standalone or not self.enabled:
+            return None
+        for key in ('_error', '_run_on_start', 'run_explicit'):
+            if data.get(key):
+                return None
+        if not data.get('enabled', True):
+            return None
+        if data.get('splay') and not data.get('_splay'):
+            # a new splay is drawn on the next loop
+            return None
+
+        next_fire_time = data.get('_next_fire_time')
+        if '_seconds' in data or 'cron' in data:
+            if data.get('_splay'):
+                return data['_splay']
+            if next_fire_time is None:
+                return None
+            return next_fire_time - datetime.timedelta(microseconds=next_fire_time.microsecond)
+        if data.get('_splay'):
+            return None
+        if 'once' in data:
+            if next_fire_time is None:
+                return None
+            if next_fire_time < now - loop_interval:
+                return datetime.datetime.max
+            if next_fire_time > now:
+                return next_fire_time
+            return None
+        if 'when' in data and when_times is not None:
+            # the handling of a "when" changes when its time comes, and
+            # again once it is over
+            boundaries = [boundary
+                          for when in when_times
+                          for boundary in (when,
+                                           when + loop_interval,
+                                           when + loop_interval + datetime.timedelta(seconds=1))
+                          if boundary > now]
+            # times without a date are for the current day
+            boundaries.append(datetime.datetime.combine(
+                now.date() + datetime.timedelta(days=1), datetime.time()))
+            return min(boundaries)
+        return None
+
+    def _parse_datetime(self, value):
+        '''
+        Parse a date string with dateutil, once a day as the date of the
+        strings without one is the current day
+        '''
+        today = datetime.date.today()
+        if self._parsed_day != today:
+            self._parsed_datetimes = {}
+            self._parsed_day = today
+        if value not in self._parsed_datetimes:
+            self._parsed_datetimes[value] = dateutil_parser.parse(value)
+        return self._parsed_datetimes[value]
+
     def _run_job(self, func, data):
         job_dry_run = data.get('dry_run', False)
         if job_dry_run:
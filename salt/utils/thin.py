@@ -7,8 +7,12 @@ Generate the salt thin tarball from the installed python files
 from __future__ import absolute_import, print_function, unicode_literals
 
 import copy
+import gzip
+import hashlib
+import io
 import logging
 import os
+import re
 import shutil
 import subprocess
 import sys
@@ -69,6 +73,7 @@ except ImportError:
 
 # Import salt libs
 import salt
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.json
@@ -589,6 +594,108 @@ def thin_sum(cachedir, form='sha1'):
     return code_checksum, salt.utils.hashutils.get_hash(thintar, form)
 
 
+# (thin tarball, checksum, hash form) -> its components, see thin_components
+_THIN_COMPONENTS = {}
+
+
+def _thin_component(name):
+    '''
+    Return the component of the thin an archive member belongs to, which is
+    the package or module it is part of, or "meta" for the files at the top
+    of the thin
+    '''
+    parts = name.split('/')
+    for idx, part in enumerate(parts[:2]):
+        if re.match(r'^py(all|\d+)$', part) and len(parts) > idx + 1:
+            return '/'.join(parts[:idx + 2])
+    return 'meta'
+
+
+def thin_components(cachedir, thin_checksum=None, form='sha1'):
+    '''
+    Split the salt-thin tarball into one archive per package it contains. The
+    archives are named by their checksum and built reproducibly, so a package
+    which did not change between two thin tarballs results in the same
+    archive, which targets that already have it do not need to be sent.
+
+    The components are only computed once per thin tarball by a process,
+    and the processes of the salt-ssh targets inherit them from the parent.
+
+    Returns a list of (component, checksum) pairs.
+    '''
+    thintar = gen_thin(cachedir)
+    thindir = os.path.dirname(thintar)
+    compdir = os.path.join(thindir, 'components')
+    manifest = os.path.join(thindir, 'components.json')
+    if thin_checksum is None:
+        thin_checksum = salt.utils.hashutils.get_hash(thintar, form)
+    key = (thintar, thin_checksum, form)
+    if key in _THIN_COMPONENTS:
+        return _THIN_COMPONENTS[key]
+
+    if os.path.isfile(manifest):
+        try:
+            with salt.utils.files.fopen(manifest, 'r') as fp_:
+                data = salt.utils.json.load(fp_)
+            components = [tuple(comp) for comp in data['components']]
+            if data['thin'] == thin_checksum and data['form'] == form and all(
+                    os.path.isfile(os.path.join(compdir, '{0}.tgz'.format(digest)))
+                    for _, digest in components):
+                _THIN_COMPONENTS[key] = components
+                return components
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+    if not os.path.isdir(compdir):
+        os.makedirs(compdir)
+    members = {}
+    components = []
+    tfp = tarfile.open(thintar, 'r:gz')
+    try:
+        for info in tfp.getmembers():
+            if info.isfile():
+                members.setdefault(_thin_component(info.name), []).append(info)
+        for name in sorted(members):
+            buff = io.BytesIO()
+            gzfp = gzip.GzipFile(filename='', mode='wb', fileobj=buff, mtime=0)
+            comp = tarfile.open(fileobj=gzfp, mode='w')
+            for info in sorted(members[name], key=lambda info: info.name):
+                # Only keep what matters on the target, so the archive of the
+                # same files is always the same
+                member = tarfile.TarInfo(info.name)
+                member.size = info.size
+                member.mode = info.mode
+                comp.addfile(member, tfp.extractfile(info))
+            comp.close()
+            gzfp.close()
+            digest = hashlib.new(form, buff.getvalue()).hexdigest()
+            path = os.path.join(compdir, '{0}.tgz'.format(digest))
+            if not os.path.isfile(path):
+                # Other salt-ssh processes may be writing the same archive
+                fd_, tmp_path = tempfile.mkstemp(dir=compdir, suffix='.tmp')
+                with os.fdopen(fd_, 'wb') as fp_:
+                    fp_.write(buff.getvalue())
+                salt.utils.atomicfile.atomic_rename(tmp_path, path)
+            components.append((name, digest))
+    finally:
+        tfp.close()
+
+    # Drop the archives of previous thin tarballs, leaving the temporary
+    # files of the other processes alone
+    current = set('{0}.tgz'.format(digest) for _, digest in components)
+    for fname in os.listdir(compdir):
+        if fname.endswith('.tgz') and fname not in current:
+            try:
+                os.remove(os.path.join(compdir, fname))
+            except OSError:
+                pass
+
+    with salt.utils.atomicfile.atomic_open(manifest, 'w') as fp_:
+        salt.utils.json.dump({'thin': thin_checksum, 'form': form, 'components': components}, fp_)
+    _THIN_COMPONENTS[key] = components
+    return components
+
+
 def gen_min(cachedir, extra_mods='', overwrite=False, so_mods='',
             python2_bin='python2', python3_bin='python3'):
     '''
@@ -9,6 +9,7 @@ import subprocess
 import threading
 import salt.exceptions
 import salt.utils.data
+import salt.utils.profile
 from salt.ext import six
 
 
@@ -45,6 +46,7 @@ class TimedProc(object):
         if kwargs.get('shell', False):
             args = salt.utils.data.decode(args, to_str=True)
 
+        salt.utils.profile.count('subprocess_forks')
         try:
             self.process = subprocess.Popen(args, **kwargs)
         except (AttributeError, TypeError):
@@ -157,10 +157,12 @@ def get_specific_user():
     return user
 
 
-def chugid(runas, group=None):
+def chugid_ids(runas, group=None):
     '''
-    Change the current process to belong to the specified user (and the groups
-    to which it belongs)
+    Return the uid, gid and supplemental gids :py:func:`chugid` switches the
+    current process to
+
+    .. versionadded:: Neon
     '''
     uinfo = pwd.getpwnam(runas)
     supgroups = []
@@ -197,13 +199,31 @@ def chugid(runas, group=None):
            and not supgroups_seen.add(gid)):
             supgroups.append(gid)
 
-    if os.getgid() != target_pw_gid:
+    return uinfo.pw_uid, target_pw_gid, supgroups
+
+
+def chugid(runas, group=None):
+    '''
+    Change the current process to belong to the specified user (and the groups
+    to which it belongs)
+    '''
+    chugid_to_ids(*chugid_ids(runas, group))
+
+
+def chugid_to_ids(uid, gid, supgroups):
+    '''
+    Change the current process to the uid, gid and supplemental gids returned
+    by :py:func:`chugid_ids`
+
+    .. versionadded:: Neon
+    '''
+    if os.getgid() != gid:
         try:
-            os.setgid(target_pw_gid)
+            os.setgid(gid)
         except OSError as err:
             raise CommandExecutionError(
                 'Failed to change from gid {0} to {1}. Error: {2}'.format(
-                    os.getgid(), target_pw_gid, err
+                    os.getgid(), gid, err
                 )
             )
 
@@ -218,21 +238,21 @@ def chugid(runas, group=None):
                 )
             )
 
-    if os.getuid() != uinfo.pw_uid:
+    if os.getuid() != uid:
         try:
-            os.setuid(uinfo.pw_uid)
+            os.setuid(uid)
         except OSError as err:
             raise CommandExecutionError(
                 'Failed to change from uid {0} to {1}. Error: {2}'.format(
-                    os.getuid(), uinfo.pw_uid, err
+                    os.getuid(), uid, err
                 )
             )
 
 
-def chugid_and_umask(runas, umask, group=None):
+def _chugid_target(runas, group=None):
     '''
-    Helper method for for subprocess.Popen to initialise uid/gid and umask
-    for the new process.
+    Return the user and group chugid_and_umask switches to, or None if it keeps
+    the current ones
     '''
     set_runas = False
     set_grp = False
@@ -252,11 +272,35 @@ def chugid_and_umask(runas, umask, group=None):
         runas_grp = current_grp
 
     if set_runas or set_grp:
-        chugid(runas_user, runas_grp)
+        return runas_user, runas_grp
+    return None
+
+
+def chugid_and_umask(runas, umask, group=None):
+    '''
+    Helper method for for subprocess.Popen to initialise uid/gid and umask
+    for the new process.
+    '''
+    target = _chugid_target(runas, group)
+    if target is not None:
+        chugid(*target)
     if umask is not None:
         os.umask(umask)  # pylint: disable=blacklisted-function
 
 
+def chugid_and_umask_ids(runas, group=None):
+    '''
+    Return the uid, gid and supplemental gids chugid_and_umask switches the
+    new process to, or None if it keeps the current ones
+
+    .. versionadded:: Neon
+    '''
+    target = _chugid_target(runas, group)
+    if target is None:
+        return None
+    return chugid_ids(*target)
+
+
 def get_default_group(user):
     '''
     Returns the specified user's default group. If the user doesn't exist, a
@@ -7,7 +7,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 # Import Salt Libs
-from salt.cli.batch import Batch
+from salt.cli.batch import Batch, BatchWindow, batch_failed
 
 # Import Salt Testing Libs
 from tests.support.unit import skipIf, TestCase
@@ -73,3 +73,82 @@ class BatchTestCase(TestCase):
         '''
         ret = Batch.get_bnum(self.batch)
         self.assertEqual(ret, None)
+
+
+class BatchWindowTestCase(TestCase):
+    '''
+    Unit Tests for the window of batch runs
+    '''
+    def test_fixed_size(self):
+        '''
+        Tests the window keeps the batch size when not adaptive
+        '''
+        window = BatchWindow({}, 3, 10)
+        window.start(['foo', 'bar'])
+        window.finish('foo', failed=True)
+        window.finish('bar')
+        self.assertEqual(window.size, 3)
+        self.assertEqual(window.stats()['failed'], 1)
+
+    def test_adaptive_size(self):
+        '''
+        Tests the window doubles every round until a minion fails, then is
+        halved once for the round
+        '''
+        window = BatchWindow({'batch_adaptive': True}, 2, 100)
+        with patch('time.time', MagicMock(return_value=10)):
+            window.start(['foo', 'bar'])
+            window.finish('foo')
+            window.finish('bar')
+        self.assertEqual(window.size, 4)
+
+        with patch('time.time', MagicMock(return_value=20)):
+            window.start(['a', 'b', 'c', 'd'])
+        with patch('time.time', MagicMock(return_value=20.1)):
+            window.finish('a', failed=True)
+            window.finish('b', failed=True)
+        self.assertEqual(window.size, 2)
+        with patch('time.time', MagicMock(return_value=20.1)):
+            window.finish('c')
+        self.assertEqual(window.size, 2)
+
+    def test_adaptive_max(self):
+        '''
+        Tests the window does not grow past batch_max
+        '''
+        window = BatchWindow({'batch_adaptive': True, 'batch_max': 3}, 2, 100)
+        window.start(['foo', 'bar'])
+        window.finish('foo')
+        window.finish('bar')
+        self.assertEqual(window.size, 3)
+
+    def test_max_failures(self):
+        '''
+        Tests the window trips once enough minions failed
+        '''
+        window = BatchWindow({'batch_max_failures': '10%'}, 2, 20)
+        window.start(['foo', 'bar', 'baz'])
+        window.finish('foo', failed=True)
+        self.assertFalse(window.tripped)
+        window.finish('bar', failed=True)
+        self.assertTrue(window.tripped)
+
+    def test_select_groups(self):
+        '''
+        Tests no more than batch_group_size minions of a group are selected
+        '''
+        window = BatchWindow({'batch_group_by': 'dc', 'batch_group_size': 1}, 4, 4)
+        window.groups = {'a1': 'a', 'a2': 'a', 'b1': 'b', 'b2': 'b'}
+        window.start(['b2'])
+        to_run = ['a1', 'a2', 'b1']
+        self.assertEqual(window.select(to_run, 3), ['a2'])
+        self.assertEqual(to_run, ['a1', 'b1'])
+
+    def test_batch_failed(self):
+        '''
+        Tests telling failed returns apart
+        '''
+        self.assertFalse(batch_failed({'ret': True, 'retcode': 0}))
+        self.assertTrue(batch_failed({'ret': False, 'retcode': 1}))
+        self.assertTrue(batch_failed({'ret': {}}))
+        self.assertTrue(batch_failed({'data': {'id': 'foo', 'retcode': 2}}))
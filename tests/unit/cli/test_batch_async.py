@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 
 # Import Salt Libs
+from salt.cli.batch import BatchWindow
 from salt.cli.batch_async import BatchAsync
 
 import tornado
@@ -363,3 +364,28 @@ class AsyncBatchTestCase(AsyncTestCase, TestCase):
             self.batch.event.io_loop.add_callback.call_args[0],
             (self.batch.find_job, {'foo'})
         )
+
+    def test_batch__event_handler_batch_run_progress(self):
+        self.batch.event = MagicMock(
+            unpack=MagicMock(return_value=('salt/job/1235/ret/foo', {'id': 'foo', 'retcode': 0})))
+        self.batch.start()
+        self.batch.opts['batch_adaptive'] = True
+        self.batch.window = BatchWindow(self.batch.opts, 1, 10)
+        self.batch.window.start(['foo'])
+        self.batch.active = {'foo'}
+        self.batch._BatchAsync__event_handler(MagicMock())
+        self.assertEqual(self.batch.batch_size, 2)
+        data, tag = self.batch.event.fire_event.call_args[0]
+        self.assertEqual(tag, 'salt/batch/1235/progress')
+        self.assertEqual(data['done'], 1)
+        self.assertEqual(data['size'], 2)
+
+    def test_next_batch_tripped(self):
+        self.batch.minions = {'foo', 'bar', 'baz'}
+        self.batch.batch_size = 2
+        self.batch.window = BatchWindow({'batch_max_failures': 1}, 2, 3)
+        self.batch.window.start(['baz'])
+        self.batch.window.finish('baz', True)
+        self.batch.done_minions = {'baz'}
+        self.assertEqual(self.batch._get_next(), set())
+        self.assertEqual(self.batch.skipped_minions, {'foo', 'bar'})
@@ -5,9 +5,11 @@
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import copy
 import os
 import shutil
 import tempfile
+import threading
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -17,6 +19,8 @@ from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
 
 # Import Salt libs
 import salt.config
+import salt.defaults.exitcodes
+import salt.loader
 import salt.roster
 import salt.utils.files
 import salt.utils.path
@@ -24,6 +28,8 @@ import salt.utils.thin
 import salt.utils.yaml
 
 from salt.client import ssh
+import salt.client.ssh.state
+import salt.client.ssh.wrapper.state
 
 ROSTER = '''
 localhost:
@@ -150,3 +156,261 @@ class SSHSingleTests(TestCase):
                          'PasswordAuthentication=yes -o ConnectTimeout=65 -o Port=22 '
                          '-o IdentityFile=/etc/salt/pki/master/ssh/salt-ssh.rsa '
                          '-o User=root  date +%s')
+
+    def test_single_mux_opts(self):
+        '''
+        Check the ssh options sharing the connection to the target
+        '''
+        opts = {
+            'argv': ['test.ping'],
+            '__role': 'master',
+            'cachedir': self.tmp_cachedir,
+            'extension_modules': os.path.join(self.tmp_cachedir, 'extmods'),
+            'ssh_multiplex': True,
+            '_ssh_version': (7, 4),
+        }
+        single = ssh.Single(
+                opts,
+                opts['argv'],
+                'localhost',
+                mods={},
+                fsclient=None,
+                thin=salt.utils.thin.thin_path(opts['cachedir']),
+                host='login1',
+                timeout=65)
+
+        control_path = os.path.join(self.tmp_cachedir, 'ssh_mux', '%C')
+        self.assertEqual(single.shell._cmd_str('date +%s'),
+                         'ssh login1 -o ControlMaster=auto -o ControlPath={0} '
+                         '-o ControlPersist=60 date +%s'.format(control_path))
+
+        opts['_ssh_version'] = (5, 3)
+        self.assertEqual(single.shell._cmd_str('date +%s'), 'ssh login1 date +%s')
+
+    def test_cmd_block_thin_components(self):
+        '''
+        Test the component archives the shim asks for are deployed
+        '''
+        opts = {
+            'argv': ['test.ping'],
+            '__role': 'master',
+            'cachedir': self.tmp_cachedir,
+            'extension_modules': os.path.join(self.tmp_cachedir, 'extmods'),
+            'ssh_thin_components': True,
+        }
+        single = ssh.Single(
+                opts,
+                opts['argv'],
+                'localhost',
+                mods={},
+                fsclient=None,
+                thin=salt.utils.thin.thin_path(opts['cachedir']),
+                host='login1',
+                timeout=65)
+
+        shim_cmd = MagicMock(side_effect=[
+            ('{0}\ncomponents\nabc123 def456\n'.format(ssh.RSTR), '',
+             salt.defaults.exitcodes.EX_THIN_COMPONENTS),
+            ('{0}\ntrue'.format(ssh.RSTR), ssh.RSTR, 0),
+        ])
+        deploy_components = MagicMock(return_value=True)
+        with patch.object(single, '_cmd_str', MagicMock(return_value='')), \
+                patch.object(single, 'shim_cmd', shim_cmd), \
+                patch.object(single, 'deploy_components', deploy_components):
+            self.assertEqual(single.cmd_block(), ('true', '', 0))
+        deploy_components.assert_called_once_with(['abc123', 'def456'])
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class SSHThreadEngineTests(TestCase):
+    def test_handle_ssh_threads(self):
+        '''
+        Test running the targets from a pool of threads
+        '''
+        client = ssh.SSH.__new__(ssh.SSH)
+        client.opts = {'ssh_engine': 'thread', 'ssh_max_procs': 2}
+        client.defaults = {'user': 'root'}
+        client.targets = dict(('minion{0}'.format(idx), {}) for idx in range(5))
+
+        def handle_routine(que, opts, host, target, mine=False, fsclient=None):
+            if host == 'minion3':
+                raise Exception('boom')
+            que.put({'id': host, 'ret': target['user']})
+
+        with patch('salt.fileclient.FSClient', MagicMock()), \
+                patch.object(client, 'handle_routine', handle_routine):
+            rets = {}
+            for ret in client.handle_ssh():
+                rets.update(ret)
+
+        self.assertEqual(sorted(rets), sorted(client.targets))
+        self.assertEqual(rets['minion0'], 'root')
+        self.assertIn('did not return any data', rets['minion3'])
+        self.assertEqual(client.targets['minion1']['host'], 'minion1')
+
+    def test_handle_ssh_threads_isolation(self):
+        '''
+        Test the targets run at the same time in the threads do not see the
+        grains of one another, nor share a file client
+        '''
+        minion_opts = salt.config.minion_config(
+            os.path.join(RUNTIME_VARS.TMP_CONF_DIR, 'minion'))
+        client = ssh.SSH.__new__(ssh.SSH)
+        client.opts = dict(minion_opts, ssh_engine='thread', ssh_max_procs=2)
+        client.defaults = {}
+        client.targets = {'web1': {}, 'db1': {}}
+        loaded = threading.Condition()
+        fsclients = {}
+
+        def handle_routine(que, opts, host, target, mine=False, fsclient=None):
+            opts = dict(opts, grains={'id': host})
+            wfuncs = salt.loader.ssh_wrapper(opts, None, {})
+            wfuncs['grains.get']('id')
+            # Wait for the other target to be loaded before reading the grains
+            with loaded:
+                fsclients[host] = fsclient
+                loaded.notify_all()
+                while len(fsclients) < len(client.targets):
+                    loaded.wait(10)
+            que.put({'id': host, 'ret': wfuncs['grains.get']('id')})
+
+        with patch('salt.fileclient.FSClient', side_effect=lambda opts: object()), \
+                patch.object(client, 'handle_routine', handle_routine):
+            rets = {}
+            for ret in client.handle_ssh():
+                rets.update(ret)
+
+        self.assertEqual(rets, {'web1': 'web1', 'db1': 'db1'})
+        self.assertIsNot(fsclients['web1'], fsclients['db1'])
+
+
+class SSHCompileCacheTests(TestCase):
+    def setUp(self):
+        self.tmp_cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_cachedir, ignore_errors=True)
+
+    def test_grains_tracker(self):
+        '''
+        Test the grains read are recorded, through copies as well
+        '''
+        grains = salt.client.ssh.state.GrainsTracker({'os': 'Debian', 'id': 'web1', 'mem': 1024})
+        self.assertEqual(grains.read(), [])
+        opts = copy.deepcopy({'grains': grains})
+        self.assertEqual(opts['grains']['os'], 'Debian')
+        self.assertEqual(grains.get('mem'), 1024)
+        self.assertEqual(grains.read(), ['mem', 'os'])
+        list(opts['grains'].items())
+        self.assertIsNone(grains.read())
+        grains.reset()
+        self.assertEqual(grains.read(), [])
+
+    def test_compile_cache(self):
+        '''
+        Test the compiled states are shared between targets with the same
+        values of the grains read
+        '''
+        trans_tar = os.path.join(self.tmp_cachedir, 'salt_state.tgz')
+        with salt.utils.files.fopen(trans_tar, 'w') as fp_:
+            fp_.write('state')
+        cache = salt.client.ssh.state.CompileCache(self.tmp_cachedir, ['sls', ['web']])
+        web1 = {'os': 'Debian', 'id': 'web1'}
+        self.assertIsNone(cache.fetch(web1))
+        cache.store(web1, ['os'], [{'state': 'pkg'}], trans_tar, 'abc')
+
+        chunks, path, trans_tar_sum = cache.fetch({'os': 'Debian', 'id': 'web2'})
+        self.assertEqual(chunks, [{'state': 'pkg'}])
+        self.assertEqual(trans_tar_sum, 'abc')
+        with salt.utils.files.fopen(path) as fp_:
+            self.assertEqual(fp_.read(), 'state')
+        os.remove(path)
+        self.assertIsNone(cache.fetch({'os': 'RedHat', 'id': 'web3'}))
+
+        other = salt.client.ssh.state.CompileCache(self.tmp_cachedir, ['sls', ['db']])
+        self.assertIsNone(other.fetch(web1))
+
+    def _compile_state_targets(self, render):
+        '''
+        Compile the state rendered by render(grains, opts, salt_) for two
+        targets which only differ by their id and mem grain, return how many
+        times it was compiled and the returns
+        '''
+        wrapper = salt.client.ssh.wrapper.state
+        compiled = MagicMock()
+        chunks = [{'state': 'pkg', 'fun': 'installed', 'name': 'vim',
+                   '__id__': 'vim', '__sls__': 'web', '__env__': 'base'}]
+
+        def _prep_trans_tar(*args, **kwargs):
+            path = salt.utils.files.mkstemp(dir=self.tmp_cachedir)
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write('state')
+            return path
+
+        rets = []
+        for id_, mem in (('web1', 1024), ('web2', 2048)):
+            grains = salt.client.ssh.state.GrainsTracker({'id': id_, 'os': 'Debian', 'mem': mem})
+            target_opts = salt.client.ssh.state.OptsTracker(
+                {'id': id_, 'hash_type': 'sha256', 'saltenv': 'base',
+                 'file_roots': {'base': ['/srv/salt']}, 'grains': grains})
+            salt_ = ssh.wrapper.FunctionWrapper(target_opts, id_, id_)
+            opts = copy.deepcopy(target_opts)
+
+            def _compile():
+                compiled()
+                render(grains, opts, salt_)
+                return copy.deepcopy(chunks)
+
+            context = {'master_opts': {'_ssh_compile_dir': self.tmp_cachedir},
+                       'fileclient': MagicMock()}
+            with patch.multiple(wrapper, create=True, __context__=context,
+                                __grains__=grains, __pillar__={'role': 'web'},
+                                __opts__=target_opts.copy(), __salt__=salt_), \
+                    patch('salt.client.ssh.state.prep_trans_tar', _prep_trans_tar), \
+                    patch('salt.client.ssh.Single.cmd_block',
+                          MagicMock(return_value=('{"local": {"return": "up"}}', '', 0))):
+                rets.append(wrapper._compile_state(
+                    _compile, ['sls', ['web'], 'base'], opts, {}, {}))
+        for ret in rets:
+            self.assertEqual(ret[0], chunks)
+        return compiled.call_count, rets
+
+    def test_compile_state_targets(self):
+        '''
+        Test the state is compiled once for two targets which only differ by
+        their id and by grains the states do not read
+        '''
+        def render(grains, opts, salt_):
+            return grains['os'], opts['hash_type']
+
+        count, rets = self._compile_state_targets(render)
+        self.assertEqual(count, 1)
+        self.assertEqual(rets[0][2], rets[1][2])
+        self.assertNotEqual(rets[0][1], rets[1][1])
+
+    def test_compile_state_targets_opts(self):
+        '''
+        Test the state is compiled for each target when the states read opts
+        specific to the target
+        '''
+        def render(grains, opts, salt_):
+            return grains['os'], opts['id']
+
+        count, rets = self._compile_state_targets(render)
+        self.assertEqual(count, 2)
+
+    def test_compile_state_targets_remote(self):
+        '''
+        Test the state is compiled for each target when the states run
+        functions on the target
+        '''
+        def render(grains, opts, salt_):
+            with patch('salt.client.ssh.Single.__init__', MagicMock(return_value=None)):
+                return grains['os'], salt_['cmd.run']('uptime')
+
+        count, rets = self._compile_state_targets(render)
+        self.assertEqual(count, 2)
+        # Nothing was stored
+        profiles = [fname for _, _, fnames in os.walk(self.tmp_cachedir)
+                    for fname in fnames if fname.endswith('.json')]
+        self.assertEqual(profiles, [])
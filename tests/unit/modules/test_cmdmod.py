@@ -449,3 +449,33 @@ class CMDMODTestCase(TestCase, LoaderModuleMockMixin):
             ret = cmdmod.run_all('some command', output_encoding='latin1')
 
         self.assertEqual(ret['stdout'], stdout)
+
+    @skipIf(salt.utils.platform.is_windows(), 'Do not run on Windows')
+    def test_run_all_forkserver(self):
+        '''
+        Test that the commands run by the fork server return the same results
+        as the ones forked from the minion
+        '''
+        cmds = [
+            ('echo foo; echo bar >&2; exit 3', {'python_shell': True}),
+            ('cat', {'stdin': 'foo\\nbar'}),
+            ('echo $FOO', {'python_shell': True, 'env': {'FOO': 'bar'}}),
+            ('sh -c "echo foo; echo bar >&2"', {'redirect_stderr': True}),
+            ('sleep 5', {'timeout': 0.1}),
+        ]
+        for cmd, kwargs in cmds:
+            with patch.dict(cmdmod.__opts__, {'cmd_forkserver': False}):
+                expected = cmdmod.run_all(cmd, cwd=tempfile.gettempdir(), **kwargs)
+            with patch.dict(cmdmod.__opts__, {'cmd_forkserver': True}), \
+                    patch('salt.utils.timed_subprocess.TimedProc') as timed_proc:
+                ret = cmdmod.run_all(cmd, cwd=tempfile.gettempdir(), **kwargs)
+            timed_proc.assert_not_called()
+            expected.pop('pid')
+            ret.pop('pid')
+            self.assertEqual(ret, expected)
+
+        with patch.dict(cmdmod.__opts__, {'cmd_forkserver': True}):
+            self.assertRaises(CommandExecutionError,
+                              cmdmod.run_all,
+                              '/nonexistent/command',
+                              cwd=tempfile.gettempdir())
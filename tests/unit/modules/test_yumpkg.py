@@ -3,9 +3,12 @@
 # Import Python Libs
 from __future__ import absolute_import, unicode_literals, print_function
 import os
+import shutil
+import tempfile
 
 # Import Salt Testing Libs
 from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import (
     Mock,
@@ -20,6 +23,8 @@ from salt.exceptions import CommandExecutionError
 import salt.modules.rpm_lowpkg as rpm
 import salt.modules.yumpkg as yumpkg
 import salt.modules.pkg_resource as pkg_resource
+import salt.utils.files
+import salt.utils.pkg
 
 try:
     import pytest
@@ -126,6 +131,44 @@ class YumTestCase(TestCase, LoaderModuleMockMixin):
                 self.assertTrue(pkgs.get(pkg_name))
                 self.assertEqual(pkgs[pkg_name], [pkg_version])
 
+    def test_list_pkgs_snapshot(self):
+        '''
+        Test that the package list is read from the snapshot by later jobs
+        until packages are removed
+        '''
+        def _add_data(data, key, value):
+            data.setdefault(key, []).append(value)
+
+        rpm_out = [
+            'alsa-lib_|-(none)_|-1.1.1_|-1.el7_|-x86_64_|-(none)_|-1487838475',
+            'shadow-utils_|-2_|-4.1.5.1_|-24.el7_|-x86_64_|-(none)_|-1487838481',
+        ]
+        tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmpdir)
+        dbpath = os.path.join(tmpdir, 'Packages')
+        with salt.utils.files.fopen(dbpath, 'w') as fp_:
+            fp_.write('db')
+        opts = {'cachedir': tmpdir, 'pkg_snapshot_cache': True}
+        cmd_run = MagicMock(return_value=os.linesep.join(rpm_out))
+        with patch.dict(yumpkg.__opts__, opts), \
+             patch.dict(yumpkg.__grains__, {'osarch': 'x86_64'}), \
+             patch('salt.utils.pkg.rpm.DB_PATHS', (dbpath,)), \
+             patch.dict(yumpkg.__salt__, {'cmd.run': cmd_run}), \
+             patch.dict(yumpkg.__salt__, {'pkg_resource.add_pkg': _add_data}), \
+             patch.dict(yumpkg.__salt__, {'pkg_resource.format_pkg_list': pkg_resource.format_pkg_list}), \
+             patch.dict(yumpkg.__salt__, {'pkg_resource.stringify': MagicMock()}):
+            for _ in range(2):
+                yumpkg.__context__.pop('pkg.list_pkgs', None)
+                pkgs = yumpkg.list_pkgs(versions_as_list=True)
+                self.assertEqual(pkgs, {'alsa-lib': ['1.1.1-1.el7'],
+                                        'shadow-utils': ['2:4.1.5.1-24.el7']})
+            self.assertEqual(cmd_run.call_count, 1)
+
+            salt.utils.pkg.clear_snapshot(yumpkg.__opts__, 'yumpkg')
+            yumpkg.__context__.pop('pkg.list_pkgs', None)
+            yumpkg.list_pkgs(versions_as_list=True)
+            self.assertEqual(cmd_run.call_count, 2)
+
     def test_list_pkgs_with_attr(self):
         '''
         Test packages listing with the attr parameter
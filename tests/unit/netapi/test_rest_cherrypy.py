@@ -42,6 +42,12 @@ class TestOutFormats(BaseToolsTest):
         ))
         self.assertEqual(response.headers['Content-type'], 'application/x-yaml')
 
+    def test_ndjson_out(self):
+        request, response = self.request('/', headers=(
+            ('Accept', 'application/x-ndjson'),
+        ))
+        self.assertEqual(response.headers['Content-type'], 'application/x-ndjson')
+
 
 class TestInFormats(BaseToolsTest):
     def __get_cp_config__(self):
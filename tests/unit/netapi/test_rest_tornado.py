@@ -16,8 +16,11 @@ from tests.support.events import eventpublisher_process
 
 # Import Salt libs
 import salt.auth
+import salt.config
+import salt.payload
 import salt.utils.event
 import salt.utils.json
+import salt.utils.stringutils
 import salt.utils.yaml
 from salt.ext.six.moves import map, range  # pylint: disable=import-error
 try:
@@ -29,13 +32,14 @@ except ImportError:
 # pylint: disable=import-error
 try:
     import tornado.escape
+    import tornado.gen
     import tornado.testing
     import tornado.concurrent
     from tornado.testing import AsyncTestCase, AsyncHTTPTestCase, gen_test
     from tornado.httpclient import HTTPRequest, HTTPError
     from tornado.websocket import websocket_connect
     import salt.netapi.rest_tornado as rest_tornado
-    from salt.netapi.rest_tornado import saltnado
+    from salt.netapi.rest_tornado import fanout, saltnado
     HAS_TORNADO = True
 except ImportError:
     HAS_TORNADO = False
@@ -62,6 +66,7 @@ class SaltnadoTestCase(TestCase, AdaptedConfigurationTestCaseMixin, AsyncHTTPTes
     content_type_map = {'json': 'application/json',
                         'json-utf8': 'application/json; charset=utf-8',
                         'yaml': 'application/x-yaml',
+                        'ndjson': 'application/x-ndjson',
                         'text': 'text/plain',
                         'form': 'application/x-www-form-urlencoded',
                         'xml': 'application/xml',
@@ -655,6 +660,35 @@ class TestSaltRunHandler(SaltnadoTestCase):
 
             self.assertEqual(valid_response, salt.utils.json.loads(response.body))
 
+    def test_stream(self):
+        '''
+        Test that every return is sent on a line of its own
+        '''
+        @tornado.gen.coroutine
+        def _disbatch_local(handler, chunk, on_return=None):
+            on_return({'m1': True})
+            on_return({'m2': True})
+
+        @tornado.gen.coroutine
+        def _disbatch_runner(handler, chunk):
+            raise tornado.gen.Return({'jobs': []})
+
+        lowstate = [dict(self.auth_creds, client='local', tgt='*', fun='test.ping'),
+                    dict(self.auth_creds, client='runner', fun='jobs.list_jobs')]
+        with patch.object(saltnado.SaltAPIHandler, '_disbatch_local', _disbatch_local), \
+                patch.object(saltnado.SaltAPIHandler, '_disbatch_runner', _disbatch_runner):
+            response = self.fetch('/run',
+                                  method='POST',
+                                  body=salt.utils.json.dumps(lowstate),
+                                  headers={'Accept': self.content_type_map['ndjson'],
+                                           'Content-Type': self.content_type_map['json']})
+
+        self.assertEqual(response.headers['Content-Type'], self.content_type_map['ndjson'])
+        self.assertEqual([salt.utils.json.loads(line) for line in response.body.splitlines()],
+                         [{'chunk': 0, 'return': {'m1': True}},
+                          {'chunk': 0, 'return': {'m2': True}},
+                          {'chunk': 1, 'return': {'jobs': []}}])
+
 
 @skipIf(not HAS_TORNADO, 'The tornado package needs to be installed')  # pylint: disable=W0223
 class TestWebsocketSaltAPIHandler(SaltnadoTestCase):
@@ -831,6 +865,39 @@ class TestEventListener(AsyncTestCase):
             self.assertEqual(event_future.result()['tag'], 'evt1')
             self.assertEqual(event_future.result()['data']['data'], 'foo1')
 
+    def test_multiple_waiters(self):
+        '''
+        Test that every future waiting on a matching tag gets the event
+        '''
+        cnt = [0]
+
+        def stop(future):
+            cnt[0] += 1
+            if cnt[0] == 3:
+                self.stop()
+
+        with eventpublisher_process(self.sock_dir):
+            me = salt.utils.event.MasterEvent(self.sock_dir)
+            event_listener = saltnado.EventListener({},  # we don't use mod_opts, don't save?
+                                                    {'sock_dir': self.sock_dir,
+                                                     'transport': 'zeromq'})
+            self._finished = False  # fit to event_listener's behavior
+            futures = [
+                event_listener.get_event(self, 'salt/job/1', callback=stop),
+                event_listener.get_event(self, 'salt/job/1', callback=stop),
+                event_listener.get_event(self, 'salt/job/1/ret/foo',
+                                         matcher=saltnado.EventListener.exact_matcher,
+                                         callback=stop),
+                event_listener.get_event(self, 'salt/job/2', callback=stop),
+            ]
+            me.fire_event({'data': 'foo'}, 'salt/job/1/ret/foo')
+            self.wait()
+
+            for future in futures[:3]:
+                self.assertTrue(future.done())
+                self.assertEqual(future.result()['tag'], 'salt/job/1/ret/foo')
+            self.assertFalse(futures[3].done())
+
     def test_set_event_handler(self):
         '''
         Test subscribing events using set_event_handler
@@ -951,3 +1018,147 @@ class TestEventListener(AsyncTestCase):
 
             self.assertEqual(0, len(event_listener.tag_map))
             self.assertEqual(0, len(event_listener.request_map))
+
+    def test_subscribe_shared_event(self):
+        '''
+        Test that the tags waited for are subscribed to on a shared event
+        '''
+        event = MagicMock()
+        event_listener = saltnado.EventListener({}, {}, event=event)
+        self._finished = False
+        event_listener.get_event(self, 'salt/job/1/ret/', matcher=event_listener.prefix_matcher)
+        event_listener.get_event(self, 'evt1')
+        event_listener.get_event(self, 'evt', matcher=lambda mtag, tag: tag in mtag)
+        self.assertEqual(
+            [call[0][0] for call in event.subscribe.call_args_list],
+            ['salt/job/1/ret/', 'evt1', ''])
+
+        event_listener.clean_by_request(self)
+        self.assertEqual(
+            sorted(call[0][0] for call in event.unsubscribe.call_args_list),
+            ['', 'evt1', 'salt/job/1/ret/'])
+
+    def test_subscribe_before_waiting(self):
+        '''
+        Test that tags can be subscribed to before waiting for them, and that
+        the subscription resolves at once without a shared event
+        '''
+        event = MagicMock()
+        event_listener = saltnado.EventListener({}, {}, event=event)
+        self.assertIs(event_listener.subscribe('salt/run/'), event.subscribe.return_value)
+        event_listener.unsubscribe('salt/run/')
+        event.unsubscribe.assert_called_once_with('salt/run/')
+
+        event = MagicMock(spec=['get_event', 'set_event_handler'])
+        event_listener = saltnado.EventListener({}, {}, event=event)
+        self.assertTrue(event_listener.subscribe('salt/run/').done())
+        event_listener.unsubscribe('salt/run/')
+
+
+@skipIf(not HAS_TORNADO, 'The tornado package needs to be installed')
+class TestEventFanout(AsyncTestCase):
+    def setUp(self):
+        super(TestEventFanout, self).setUp()
+        self.sock_dir = os.path.join(RUNTIME_VARS.TMP, 'test-fanout-socks')
+        if not os.path.exists(self.sock_dir):
+            os.makedirs(self.sock_dir)
+        self.addCleanup(shutil.rmtree, self.sock_dir, ignore_errors=True)
+        self.opts = copy.deepcopy(salt.config.DEFAULT_MASTER_OPTS)
+        self.opts['sock_dir'] = self.sock_dir
+
+    def _raw(self, tag):
+        return b''.join([
+            salt.utils.stringutils.to_bytes(tag),
+            salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND),
+            salt.payload.Serial(self.opts).dumps({'data': tag})])
+
+    def test_handle_event(self):
+        '''
+        Test that events are only published to the workers subscribed to them
+        '''
+        event_fanout = fanout.EventFanout(self.opts, 2, io_loop=self.io_loop)
+        event_fanout.publishers = [MagicMock(), MagicMock()]
+        event_fanout.handle_subscription({'worker': 0, 'subscribe': ['salt/job/1/']})
+        event_fanout.handle_subscription({'worker': 1, 'subscribe': ['salt/job/', 'evt1']})
+
+        event_fanout.handle_event(self._raw('salt/job/1/ret/minion'))
+        event_fanout.handle_event(self._raw('salt/job/2/ret/minion'))
+        event_fanout.handle_event(self._raw('evt2'))
+        self.assertEqual(event_fanout.publishers[0].publish.call_count, 1)
+        self.assertEqual(event_fanout.publishers[1].publish.call_count, 2)
+
+        event_fanout.handle_subscription({'worker': 1, 'unsubscribe': ['salt/job/']})
+        event_fanout.handle_subscription({'worker': 0, 'reset': True, 'subscribe': ['evt2']})
+        event_fanout.handle_event(self._raw('salt/job/1/ret/minion'))
+        event_fanout.handle_event(self._raw('evt2'))
+        self.assertEqual(event_fanout.publishers[0].publish.call_count, 2)
+        self.assertEqual(event_fanout.publishers[1].publish.call_count, 2)
+
+        # changes carrying a sequence number are acknowledged to the worker
+        event_fanout.handle_subscription({'worker': 1, 'seq': 7, 'subscribe': ['evt3']})
+        self.assertEqual(event_fanout.publishers[0].publish.call_count, 2)
+        self.assertEqual(
+            salt.utils.event.SaltEvent.unpack(event_fanout.publishers[1].publish.call_args[0][0]),
+            (fanout.ACK_TAG, {'seq': 7}))
+
+    def test_handle_invalid_subscription(self):
+        '''
+        Test that subscriptions of unknown workers are ignored
+        '''
+        event_fanout = fanout.EventFanout(self.opts, 1, io_loop=self.io_loop)
+        event_fanout.handle_subscription({'worker': 3, 'subscribe': ['evt1']})
+        event_fanout.handle_subscription({'subscribe': ['evt1']})
+        self.assertFalse(event_fanout.tries[0].match('evt1'))
+
+    @gen_test
+    def test_fanout_event(self):
+        '''
+        Test that a worker receives the events it subscribed to
+        '''
+        with patch('salt.utils.event.get_event', MagicMock()):
+            event_fanout = fanout.EventFanout(self.opts, 2, io_loop=self.io_loop)
+            event_fanout.start()
+        self.addCleanup(event_fanout.close)
+        event = fanout.FanoutEvent(self.opts, 1, io_loop=self.io_loop)
+        self.addCleanup(event.destroy)
+
+        received = []
+        done = tornado.concurrent.Future()
+
+        def handler(raw):
+            received.append(event.unpack(raw)[0])
+            if not done.done():
+                done.set_result(True)
+
+        event.set_event_handler(handler)
+        event.subscribe('evt1')
+        event.subscribe('evt1')
+        yield event.unsubscribe('evt1')
+        self.assertTrue(event_fanout.tries[1].match('evt1'))
+        self.assertEqual(event.tags, {'evt1': 1})
+
+        event_fanout.handle_event(self._raw('evt2'))
+        event_fanout.handle_event(self._raw('evt1'))
+        yield done
+        self.assertEqual(received, ['evt1'])
+
+    @gen_test(timeout=30)
+    def test_fanout_event_reconnect(self):
+        '''
+        Test that a worker subscribes again to a restarted event fanout
+        '''
+        with patch('salt.utils.event.get_event', MagicMock()):
+            event_fanout = fanout.EventFanout(self.opts, 1, io_loop=self.io_loop)
+            event_fanout.start()
+        event = fanout.FanoutEvent(self.opts, 0, io_loop=self.io_loop)
+        self.addCleanup(event.destroy)
+        yield event.subscribe('evt1')
+        event_fanout.close()
+
+        with patch('salt.utils.event.get_event', MagicMock()):
+            event_fanout = fanout.EventFanout(self.opts, 1, io_loop=self.io_loop)
+            event_fanout.start()
+        self.addCleanup(event_fanout.close)
+        yield event.subscribe('evt2')
+        self.assertTrue(event_fanout.tries[0].match('evt1'))
+        self.assertTrue(event_fanout.tries[0].match('evt2'))
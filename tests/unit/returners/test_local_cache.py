@@ -28,6 +28,7 @@ from tests.support.mock import (
 )
 
 # Import Salt libs
+import salt.payload
 import salt.utils.files
 import salt.utils.jid
 import salt.utils.job
@@ -353,3 +354,70 @@ class Local_CacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleM
         self._check_dir_files('new_jid_dir was not removed',
                               self.EMPTY_JID_DIR,
                               status='removed')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class LocalCacheGetJidPageTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the local_cache.get_jid_page function.
+    '''
+    JID = '20190603132323715452'
+
+    def setup_loader_modules(self):
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        return {local_cache: {'__opts__': {'cachedir': self.cachedir,
+                                           'hash_type': 'sha256'}}}
+
+    def _add_returns(self, minions):
+        serial = salt.payload.Serial('msgpack')
+        jid_dir = salt.utils.jid.jid_dir(
+            self.JID, os.path.join(self.cachedir, 'jobs'), 'sha256')
+        for minion in minions:
+            os.makedirs(os.path.join(jid_dir, minion))
+            with salt.utils.files.fopen(os.path.join(jid_dir, minion, 'return.p'), 'w+b') as fp_:
+                serial.dump({'return': minion, 'retcode': 0}, fp_)
+
+    def test_get_jid_page(self):
+        self._add_returns(['web3', 'web1', 'web2', 'db1'])
+
+        self.assertEqual(local_cache.get_jid_page(self.JID, 2),
+                         {'db1': {'return': 'db1', 'retcode': 0},
+                          'web1': {'return': 'web1', 'retcode': 0}})
+        self.assertEqual(sorted(local_cache.get_jid_page(self.JID, 2, cursor='web1')),
+                         ['web2', 'web3'])
+        self.assertEqual(local_cache.get_jid_page(self.JID, 2, cursor='web3'), {})
+        self.assertEqual(local_cache.get_jid(self.JID),
+                         local_cache.get_jid_page(self.JID, 10))
+
+    def test_get_jid_page_missing_jid(self):
+        self.assertEqual(local_cache.get_jid_page(self.JID, 2), {})
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class LocalCacheGetJidsPageTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the local_cache.get_jids_page function.
+    '''
+    JIDS = ['20190603132323715450', '20190603132323715451',
+            '20190603132323715452', '20190603132323715453']
+
+    def setup_loader_modules(self):
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        return {local_cache: {'__opts__': {'cachedir': self.cachedir,
+                                           'hash_type': 'sha256'}}}
+
+    def test_get_jids_page(self):
+        for jid in self.JIDS:
+            local_cache.prep_jid(passed_jid=jid)
+            local_cache.save_load(jid, {'jid': jid, 'fun': 'test.ping',
+                                        'arg': [], 'tgt': '*', 'user': 'root'})
+
+        ret = local_cache.get_jids_page(2)
+        self.assertEqual(sorted(ret), self.JIDS[2:])
+        self.assertEqual(ret[self.JIDS[3]]['Function'], 'test.ping')
+        self.assertEqual(sorted(local_cache.get_jids_page(2, cursor=self.JIDS[2])),
+                         self.JIDS[:2])
+        self.assertEqual(local_cache.get_jids_page(2, cursor=self.JIDS[0]), {})
+        self.assertEqual(local_cache.get_jids_page(10), local_cache.get_jids())
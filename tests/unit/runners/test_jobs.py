@@ -10,6 +10,8 @@ from __future__ import absolute_import, print_function, unicode_literals
 from tests.support.mixins import LoaderModuleMockMixin
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
+    call,
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON,
     patch
@@ -78,3 +80,92 @@ class JobsTest(TestCase, LoaderModuleMockMixin):
 
             self.assertEqual(jobs.list_jobs(search_target='non-existant'),
                              returns['non-existant'])
+
+    def test_list_jobs_pages(self):
+        '''
+        test jobs.list_jobs runner with limit and cursor args
+        '''
+        mock_jobs_cache = dict(
+            ('2016052403550{0}086853'.format(idx), {'Function': 'test.ping'})
+            for idx in range(5))
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.get_jids': lambda: mock_jobs_cache}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(sorted(jobs.list_jobs(limit=2)),
+                             ['20160524035503086853', '20160524035504086853'])
+            self.assertEqual(sorted(jobs.list_jobs(limit='2', cursor='20160524035503086853')),
+                             ['20160524035501086853', '20160524035502086853'])
+            self.assertEqual(sorted(jobs.list_jobs(limit=2, cursor='20160524035501086853')),
+                             ['20160524035500086853'])
+
+    def test_list_jobs_returner_pages(self):
+        '''
+        test jobs.list_jobs runner with a returner paging through the jobs
+        '''
+        mock_jobs_cache = dict(
+            ('2016052403550{0}086853'.format(idx),
+             {'Function': 'test.ping' if idx % 2 else 'state.apply'})
+            for idx in range(5))
+
+        def get_jids_page(limit, cursor=None):
+            jids = sorted((jid for jid in mock_jobs_cache
+                           if cursor is None or jid < cursor), reverse=True)
+            return dict((jid, mock_jobs_cache[jid]) for jid in jids[:limit])
+
+        get_jids_page = MagicMock(side_effect=get_jids_page)
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.get_jids': MagicMock(),
+                         'local_cache.get_jids_page': get_jids_page}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(sorted(jobs.list_jobs(limit=2, search_function='test.ping')),
+                             ['20160524035501086853', '20160524035503086853'])
+            self.assertEqual(get_jids_page.call_args_list,
+                             [call(2, cursor=None), call(2, cursor='20160524035503086853')])
+            get_jids_page.reset_mock()
+            self.assertEqual(sorted(jobs.list_jobs(limit=2, cursor='20160524035501086853')),
+                             ['20160524035500086853'])
+            get_jids_page.assert_called_once_with(2, cursor='20160524035501086853')
+        MockMasterMinion.returners['local_cache.get_jids'].assert_not_called()
+
+    def test_list_job_pages(self):
+        '''
+        test jobs.list_job runner with limit and cursor args
+        '''
+        returns = {'web1': {'return': True},
+                   'web2': {'return': True},
+                   'web3': {'return': True}}
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.get_load': lambda jid: {},
+                         'local_cache.get_jid': lambda jid: returns}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(jobs.list_job('20160524035503086853')['Result'], returns)
+            self.assertEqual(sorted(jobs.list_job('20160524035503086853', limit=2)['Result']),
+                             ['web1', 'web2'])
+            self.assertEqual(sorted(jobs.list_job('20160524035503086853', limit=2,
+                                                  cursor='web2')['Result']),
+                             ['web3'])
+
+        get_jid_page = MagicMock(return_value={'web1': {'return': True}})
+        MockMasterMinion.returners['local_cache.get_jid_page'] = get_jid_page
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(jobs.list_job('20160524035503086853', limit=1)['Result'],
+                             {'web1': {'return': True}})
+        get_jid_page.assert_called_once_with('20160524035503086853', 1, cursor=None)
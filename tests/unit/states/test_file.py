@@ -1036,6 +1036,7 @@ class TestFileState(TestCase, LoaderModuleMockMixin):
                                              'file.group_to_gid': mock_gid,
                                              'file.source_list': mock_lst,
                                              'cp.list_master_dirs': mock_emt,
+                                             'cp.list_master_manifest': MagicMock(return_value={}),
                                              'cp.list_master': mock_l}):
 
             # Group argument is ignored on Windows systems. Group is set to user
@@ -15,6 +15,7 @@ from tests.support.mock import (
 # Import Salt Libs
 from salt.ext import six
 import salt.states.pkg as pkg
+import salt.utils.state
 from salt.ext.six.moves import zip
 
 
@@ -235,3 +236,76 @@ class PkgTestCase(TestCase, LoaderModuleMockMixin):
         for installed_versions, operator, version, expected_result in test_parameters:
             msg = "installed_versions: {}, operator: {}, version: {}, expected_result: {}".format(installed_versions, operator, version, expected_result)
             self.assertEqual(expected_result, pkg._fulfills_version_spec(installed_versions, operator, version), msg)
+
+    def _aggregate(self, low, chunks, running=None):
+        with patch.dict(pkg.__utils__, {'state.gen_tag': salt.utils.state.gen_tag}):
+            return pkg.mod_aggregate(low, chunks, running or {})
+
+    @staticmethod
+    def _chunk(name, **kwargs):
+        chunk = {'state': 'pkg', 'fun': 'installed', 'name': name, 'order': 1,
+                 '__id__': name, '__sls__': 'pkgs', '__env__': 'base'}
+        chunk.update(kwargs)
+        return chunk
+
+    def test_mod_aggregate(self):
+        '''
+        Test pkg.mod_aggregate only merges the following states which aren't
+        ordered apart by requisites, conditions or their order
+        '''
+        low = self._chunk('pkga', version='1.0')
+        chunks = [
+            self._chunk('pkgz'),
+            low,
+            self._chunk('pkgb', order=1.0001),
+            self._chunk('pkgg', pkgs=['pkgh', {'pkgi': '2.0'}]),
+            self._chunk('pkgc', require=[{'file': 'conf'}]),
+            self._chunk('pkgd'),
+        ]
+        ret = self._aggregate(low, chunks, {salt.utils.state.gen_tag(chunks[0]): {}})
+        self.assertEqual(ret['pkgs'],
+                         [{'pkga': '1.0'}, 'pkgb', 'pkgh', {'pkgi': '2.0'}])
+        self.assertEqual([chunk['name'] for chunk in chunks if '__agg__' in chunk],
+                         ['pkga', 'pkgb', 'pkgg'])
+
+        # Each of these has to run on its own, and so do the states after it
+        for chunk in (self._chunk('pkgd', unless='true'),
+                      self._chunk('pkge', fromrepo='epel'),
+                      self._chunk('pkgf', fun='latest'),
+                      self._chunk('pkgg', order=10),
+                      self._chunk('pkgj', sources=[{'pkgj': 'salt://pkgj.rpm'}]),
+                      self._chunk('pkgk', watch_in=[{'service': 'svc'}]),
+                      {'state': 'pkgrepo', 'fun': 'managed', 'name': 'repo', 'order': 1,
+                       '__id__': 'repo', '__sls__': 'repos', '__env__': 'base'}):
+            low = self._chunk('pkga')
+            ret = self._aggregate(low, [low, chunk, self._chunk('pkgl')])
+            self.assertNotIn('pkgs', ret)
+            self.assertNotIn('__agg__', chunk)
+
+    def test_mod_aggregate_watched(self):
+        '''
+        Test that a pkg state referenced by requisites is not merged, so that
+        it still reports the changes its watchers act on
+        '''
+        low = self._chunk('pkga')
+        watched = self._chunk('pkgb')
+        chunks = [
+            low,
+            watched,
+            {'state': 'service', 'fun': 'running', 'name': 'svc', 'order': 2,
+             '__id__': 'svc', '__sls__': 'svc', '__env__': 'base',
+             'watch': [{'pkg': 'pkgb'}]},
+        ]
+        ret = self._aggregate(low, chunks)
+        self.assertNotIn('pkgs', ret)
+        self.assertNotIn('__agg__', watched)
+
+        # Neither is the running state, which would report its changes
+        ret = self._aggregate(watched, [watched, self._chunk('pkgc')] + chunks[2:])
+        self.assertNotIn('pkgs', ret)
+
+        # Nothing to merge, the state is left alone
+        low = self._chunk('pkgc', require=[{'pkg': 'pkga'}])
+        ret = self._aggregate(low, [low, self._chunk('pkgd', unless='true')])
+        self.assertNotIn('pkgs', ret)
+        self.assertNotIn('__agg__', ret)
@@ -5,6 +5,7 @@
 
 # Import pytohn libs
 from __future__ import absolute_import, print_function, unicode_literals
+import time
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -72,6 +73,51 @@ class LoadAuthTestCase(TestCase):
             self.lauth.get_groups(valid_eauth_load)
             format_call_mock.assert_has_calls((expected_ret,), any_order=True)
 
+    def test_token_cache(self):
+        '''
+        Test that validated tokens are read from the cache until removed
+        '''
+        self.addCleanup(auth.AUTH_CACHE.clear)
+        lauth = auth.LoadAuth({'eauth_tokens': 'localfs', 'eauth_cache_ttl': 60})
+        tdata = {'token': 'abc', 'name': 'saltdev', 'eauth': 'pam', 'expire': time.time() + 60}
+        get_token = MagicMock(return_value=tdata)
+        lauth.tokens = {'localfs.get_token': get_token,
+                        'localfs.rm_token': MagicMock()}
+
+        self.assertEqual(lauth.get_tok('abc'), tdata)
+        self.assertEqual(lauth.get_tok('abc'), tdata)
+        self.assertEqual(get_token.call_count, 1)
+
+        lauth.rm_token('abc')
+        self.assertEqual(lauth.get_tok('abc'), tdata)
+        self.assertEqual(get_token.call_count, 2)
+
+        # without a ttl every call reads the backend
+        lauth.cache_ttl = 0
+        lauth.get_tok('abc')
+        self.assertEqual(get_token.call_count, 3)
+
+    def test_auth_list_cache(self):
+        '''
+        Test that the auth list of a token is only calculated once
+        '''
+        self.addCleanup(auth.AUTH_CACHE.clear)
+        lauth = auth.LoadAuth({'eauth_cache_ttl': 60,
+                               'keep_acl_in_token': False,
+                               'eauth_acl_module': '',
+                               'external_auth': {'pam': {'saltdev': ['test.*']}}})
+        lauth.ckminions = MagicMock()
+        lauth.ckminions.fill_auth_list.return_value = ['test.*']
+        token = {'token': 'abc', 'name': 'saltdev', 'eauth': 'pam'}
+
+        self.assertEqual(lauth.get_auth_list({'token': 'abc'}, token), ['test.*'])
+        self.assertEqual(lauth.get_auth_list({'token': 'abc'}, token), ['test.*'])
+        self.assertEqual(lauth.ckminions.fill_auth_list.call_count, 1)
+
+        auth.AUTH_CACHE.invalidate('abc')
+        self.assertEqual(lauth.get_auth_list({'token': 'abc'}, token), ['test.*'])
+        self.assertEqual(lauth.ckminions.fill_auth_list.call_count, 2)
+
 
 class MasterACLTestCase(ModuleCase):
     '''
@@ -11,6 +11,7 @@ from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
     NO_MOCK,
     NO_MOCK_REASON,
+    MagicMock,
     patch)
 
 # Import Salt Libs
@@ -45,3 +46,72 @@ class BeaconsTestCase(TestCase, LoaderModuleMockMixin):
                           'data': {'id': u'minion', u'apache2': u'Stopped'},
                           'beacon_name': 'ps'}]
             self.assertEqual(ret, _expected)
+
+    def test_shared_sample(self):
+        '''
+        Test that beacons evaluated on the same loop sample the system once
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        mock_opts['__role'] = 'minion'
+        mock_opts['beacons'] = {'watch_apache': [{'processes': {'apache2': 'stopped'}},
+                                                 {'beacon_module': 'ps'}],
+                                'watch_mysql': [{'processes': {'mysql': 'stopped'}},
+                                                {'beacon_module': 'ps'}]}
+        with patch.dict(beacons.__opts__, mock_opts), \
+                patch('salt.utils.psutil_compat.process_iter', MagicMock(return_value=[])) as process_iter:
+            ret = salt.beacons.Beacon(mock_opts, []).process(mock_opts['beacons'], mock_opts['grains'])
+            self.assertEqual(sorted(event['tag'] for event in ret),
+                             ['salt/beacon/minion/watch_apache/', 'salt/beacon/minion/watch_mysql/'])
+            self.assertEqual(process_iter.call_count, 1)
+
+    def test_suppress_unchanged(self):
+        '''
+        Test that only the events which changed are fired with suppress_unchanged
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        mock_opts['__role'] = 'minion'
+        mock_opts['beacons'] = {'ps': [{'processes': {'apache2': 'stopped'}},
+                                       {'suppress_unchanged': True}]}
+        with patch.dict(beacons.__opts__, mock_opts), \
+                patch('salt.utils.psutil_compat.process_iter', MagicMock(return_value=[])):
+            beacon = salt.beacons.Beacon(mock_opts, [])
+            ret = beacon.process(mock_opts['beacons'], mock_opts['grains'])
+            self.assertEqual(ret, [{'tag': 'salt/beacon/minion/ps/',
+                                    'data': {'id': 'minion', 'apache2': 'Stopped'},
+                                    'beacon_name': 'ps'}])
+            self.assertEqual(beacon.process(mock_opts['beacons'], mock_opts['grains']), [])
+
+    def test_suppress_unchanged_several_events(self):
+        '''
+        Test that suppress_unchanged remembers all of the events a beacon fires
+        under the same tag
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        mock_opts['__role'] = 'minion'
+        mock_opts['beacons'] = {'ps': [{'processes': {'apache2': 'stopped',
+                                                      'mysql': 'stopped'}},
+                                       {'suppress_unchanged': True}]}
+        apache2 = MagicMock()
+        apache2.name.return_value = 'apache2'
+        process_iter = MagicMock(return_value=[])
+        with patch.dict(beacons.__opts__, mock_opts), \
+                patch('salt.utils.psutil_compat.process_iter', process_iter):
+            beacon = salt.beacons.Beacon(mock_opts, [])
+            ret = beacon.process(mock_opts['beacons'], mock_opts['grains'])
+            self.assertEqual(sorted(ret, key=lambda event: sorted(event['data'])),
+                             [{'tag': 'salt/beacon/minion/ps/',
+                               'data': {'id': 'minion', 'apache2': 'Stopped'},
+                               'beacon_name': 'ps'},
+                              {'tag': 'salt/beacon/minion/ps/',
+                               'data': {'id': 'minion', 'mysql': 'Stopped'},
+                               'beacon_name': 'ps'}])
+            self.assertEqual(beacon.process(mock_opts['beacons'], mock_opts['grains']), [])
+            process_iter.return_value = [apache2]
+            self.assertEqual(beacon.process(mock_opts['beacons'], mock_opts['grains']), [])
+            process_iter.return_value = []
+            ret = beacon.process(mock_opts['beacons'], mock_opts['grains'])
+            self.assertEqual([event['data'] for event in ret],
+                             [{'id': 'minion', 'apache2': 'Stopped'}])
@@ -9,8 +9,10 @@ from __future__ import absolute_import, print_function, unicode_literals
 # Import Salt Testing libs
 import tests.integration as integration
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 from tornado.concurrent import Future
+from tornado.testing import AsyncTestCase, gen_test
+import tornado.gen
 
 
 # Import Salt libs
@@ -170,3 +172,168 @@ class LocalClientTestCase(TestCase,
         self._test_parse_input('cmd_iter_no_block')
         self._test_parse_input('cmd_async')
         self._test_parse_input('run_job_async', asynchronous=True)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ReturnListenerTestCase(AsyncTestCase, TestCase):
+    '''
+    Tests for collecting job returns asynchronously
+    '''
+    def setUp(self):
+        super(ReturnListenerTestCase, self).setUp()
+        self.local = MagicMock()
+        self.local.opts = {'timeout': 5,
+                           'gather_job_timeout': 10,
+                           'syndic_wait': 5,
+                           'order_masters': False,
+                           'sock_dir': '',
+                           'transport': 'zeromq'}
+        self.event = MagicMock()
+        self.event.unpack = lambda raw, serial: raw
+        self.event.subscribe.return_value = None
+        with patch('salt.utils.event.get_event', MagicMock(return_value=self.event)):
+            self.listener = client.ReturnListener(self.local, self.io_loop)
+
+    def tearDown(self):
+        self.listener.destroy()
+        super(ReturnListenerTestCase, self).tearDown()
+
+    def _return(self, jid, minion, ret=True, **kwargs):
+        data = {'id': minion, 'jid': jid, 'return': ret}
+        data.update(kwargs)
+        self.listener._handle_event(('salt/job/{0}/ret/{1}'.format(jid, minion), data))
+
+    def _published(self, probe_jids):
+        def run_job_async(tgt, *args, **kwargs):
+            probe_jids.append(kwargs['jid'])
+            future = Future()
+            future.set_result({'jid': kwargs['jid'], 'minions': tgt})
+            return future
+        return run_job_async
+
+    @gen_test
+    def test_returns(self):
+        '''
+        Test that returns resolve as they arrive, and the job once all
+        minions returned
+        '''
+        returned = []
+        job = self.listener.watch('1', ['m1', 'm2'], callback=returned.append)
+        self._return('1', 'm1', retcode=0)
+        self._return('2', 'm2')
+        self.assertEqual(job.futures['m1'].result(), {'m1': {'ret': True, 'retcode': 0, 'jid': '1'}})
+        self.assertFalse(job.futures['m2'].done())
+        self.assertFalse(job.done.done())
+
+        # minions found by the master are added to the job
+        self.listener._handle_event(('salt/job/1/new', {'jid': '1', 'minions': ['m2', 'm3']}))
+        self._return('1', 'm2')
+        self.assertFalse(job.done.done())
+        self._return('1', 'm3', ret=False)
+        returns = yield job.done
+        self.assertEqual(sorted(returns), ['m1', 'm2', 'm3'])
+        self.assertEqual(returns['m3']['ret'], False)
+        self.assertEqual(len(returned), 3)
+        self.assertNotIn('1', self.listener.jobs)
+
+    @gen_test
+    def test_raw_returns(self):
+        '''
+        Test collecting the full return events
+        '''
+        job = self.listener.watch('1', ['m1'], raw=True)
+        self._return('1', 'm1')
+        returns = yield job.done
+        self.assertEqual(returns['m1']['tag'], 'salt/job/1/ret/m1')
+        self.assertEqual(returns['m1']['data']['return'], True)
+
+    @gen_test
+    def test_unstored_returns(self):
+        '''
+        Test that returns are only passed to the callback when not stored
+        '''
+        returned = []
+        job = self.listener.watch('1', ['m1', 'm2'], callback=returned.append, store=False)
+        self._return('1', 'm1')
+        self._return('1', 'm2')
+        self.assertIsNone(job.futures['m1'].result())
+        returns = yield job.done
+        self.assertEqual(returns, {})
+        self.assertEqual(returned, [{'m1': {'ret': True, 'jid': '1'}},
+                                    {'m2': {'ret': True, 'jid': '1'}}])
+
+    @gen_test
+    def test_subscriptions(self):
+        '''
+        Test that the returns of the watched jobs are subscribed to on a
+        shared event, which is left open on destroy
+        '''
+        event = MagicMock()
+        event.unpack = lambda raw, serial: raw
+        listener = client.ReturnListener(self.local, self.io_loop, event=event)
+        job = listener.watch('1', ['m1'])
+        event.subscribe.assert_called_once_with('salt/job/1/')
+        listener._handle_event(('salt/job/1/ret/m1', {'id': 'm1', 'jid': '1', 'return': True}))
+        yield job.done
+        event.unsubscribe.assert_called_once_with('salt/job/1/')
+        listener.destroy()
+        self.assertFalse(event.destroy.called)
+
+    @gen_test
+    def test_batched_probes(self):
+        '''
+        Test that the running checks of all jobs due are sent in one publish,
+        and that jobs end once they are no longer running
+        '''
+        probe_jids = []
+        self.local.run_job_async = MagicMock(side_effect=self._published(probe_jids))
+        job1 = self.listener.watch('1', ['m1', 'm2'], timeout=0)
+        job2 = self.listener.watch('2', ['m3'], timeout=0, expect_minions=True)
+        self._return('1', 'm1')
+
+        self.listener._check()
+        yield tornado.gen.moment
+        self.assertEqual(self.local.run_job_async.call_count, 1)
+        tgt, fun = self.local.run_job_async.call_args[0]
+        self.assertEqual(sorted(tgt), ['m2', 'm3'])
+        self.assertEqual(fun, 'saltutil.running')
+
+        # m2 is still running job 1, m3 is not running job 2
+        self._return(probe_jids[0], 'm2', ret=[{'jid': '1'}, {'jid': '3'}])
+        self._return(probe_jids[0], 'm3', ret=[])
+        self.listener.probes[probe_jids[0]] = (0, self.listener.probes[probe_jids[0]][1])
+        self.listener._check()
+        yield tornado.gen.moment
+
+        returns = yield job2.done
+        self.assertEqual(returns, {'m3': {'failed': True}})
+        self.assertFalse(job1.done.done())
+        self.assertEqual(self.local.run_job_async.call_count, 2)
+        self.assertEqual(self.local.run_job_async.call_args[0][0], ['m2'])
+
+        # m2 is no longer running job 1
+        self.listener.probes[probe_jids[1]] = (0, self.listener.probes[probe_jids[1]][1])
+        self.listener._check()
+        returns = yield job1.done
+        self.assertEqual(sorted(returns), ['m1'])
+        self.assertEqual(self.listener.jobs, {})
+
+    @gen_test
+    def test_probe_waits_for_subscription(self):
+        '''
+        Test that a probe is only published once the event source
+        acknowledged the subscription to its returns
+        '''
+        subscribed = Future()
+        self.event.subscribe.return_value = subscribed
+        probe_jids = []
+        self.local.run_job_async = MagicMock(side_effect=self._published(probe_jids))
+        self.listener.watch('1', ['m1'], timeout=0)
+
+        self.listener._check()
+        yield tornado.gen.moment
+        self.assertFalse(self.local.run_job_async.called)
+        subscribed.set_result(None)
+        yield tornado.gen.moment
+        yield tornado.gen.moment
+        self.assertEqual(self.local.run_job_async.call_count, 1)
@@ -343,6 +343,90 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
 
+    def test_cache_file_with_manifest(self):
+        '''
+        Ensure the files in a manifest are checked without asking the
+        fileserver for their hash
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(self.MOCKED_OPTS)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            manifest = client.file_manifest('base', SUBDIR + '/')
+            self.assertEqual(
+                sorted(manifest),
+                sorted('/'.join((SUBDIR, x)) for x in SUBDIR_FILES))
+            for subdir_file in SUBDIR_FILES:
+                entry = manifest['/'.join((SUBDIR, subdir_file))]
+                self.assertTrue(entry['hsum'])
+                self.assertEqual(entry['size'], os.path.getsize(
+                    os.path.join(self.FS_ROOT, 'base', SUBDIR, subdir_file)))
+
+            path = 'salt://{0}/{1}'.format(SUBDIR, SUBDIR_FILES[0])
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, 'send', send):
+                self.assertEqual(client.hash_file(path, 'base'),
+                                 {'hsum': manifest[path[7:]]['hsum'],
+                                  'hash_type': manifest[path[7:]]['hash_type']})
+                self.assertTrue(client.cache_file(path, 'base'))
+                self.assertTrue(client.cache_file(path, 'base'))
+                # Only the download of the file reached the fileserver, the
+                # hashes came from the manifest
+                self.assertEqual([x[0][0]['cmd'] for x in send.call_args_list],
+                                 ['_serve_file', '_serve_file'])
+
+    def test_cache_file_dedup(self):
+        '''
+        Ensure the content already in the cache is linked instead of being
+        downloaded again
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts['file_cache_dedup'] = True
+        for saltenv in SALTENVS:
+            with salt.utils.files.fopen(
+                    os.path.join(self.FS_ROOT, saltenv, 'same.txt'), 'w') as fp_:
+                fp_.write('The same content in every saltenv\n')
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            base = client.cache_file('salt://same.txt', 'base')
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, 'send', send):
+                dev = client.cache_file('salt://same.txt', 'dev')
+            self.assertNotIn('_serve_file',
+                             [x[0][0]['cmd'] for x in send.call_args_list])
+            self.assertNotEqual(base, dev)
+            if hasattr(os, 'link'):
+                self.assertTrue(os.path.samefile(base, dev))
+            with salt.utils.files.fopen(dev) as fp_:
+                self.assertEqual(fp_.read(), 'The same content in every saltenv\n')
+
+            # Replacing an entry leaves the content linked to the others alone
+            with salt.utils.files.fopen(
+                    os.path.join(self.FS_ROOT, 'dev', 'same.txt'), 'w'):
+                pass
+            dev = client.cache_file('salt://same.txt', 'dev')
+            self.assertEqual(os.path.getsize(dev), 0)
+            with salt.utils.files.fopen(base) as fp_:
+                self.assertEqual(fp_.read(), 'The same content in every saltenv\n')
+
+            # Content which no longer matches its hash is downloaded again
+            blob = client._blob_path(client.hash_file('salt://same.txt', 'base'))
+            with salt.utils.files.fopen(blob, 'w') as fp_:
+                fp_.write('Corrupted\n')
+            with salt.utils.files.fopen(
+                    os.path.join(self.FS_ROOT, 'base', 'copy.txt'), 'w') as fp_:
+                fp_.write('The same content in every saltenv\n')
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, 'send', send):
+                copy = client.cache_file('salt://copy.txt', 'base')
+            self.assertIn('_serve_file',
+                          [x[0][0]['cmd'] for x in send.call_args_list])
+            with salt.utils.files.fopen(copy) as fp_:
+                self.assertEqual(fp_.read(), 'The same content in every saltenv\n')
+
     def test_cache_file_with_alternate_cachedir_and_absolute_path(self):
         '''
         Ensure file is cached to correct location when an alternate cachedir is
@@ -7,15 +7,19 @@
 from __future__ import absolute_import
 import copy
 import os
+import shutil
+import tempfile
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.helpers import skip_if_not_root
+from tests.support.runtests import RUNTIME_VARS
 # Import salt libs
 import salt.minion
 import salt.utils.event as event
+import salt.utils.files
 from salt.exceptions import SaltSystemExit, SaltMasterUnresolvableError
 import salt.syspaths
 from tornado.concurrent import Future
@@ -35,6 +39,20 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         with patch.dict(self.opts, {'ipv6': False, 'master': float('127.0'), 'master_port': '4555', 'retry_dns': False}):
             self.assertRaises(SaltSystemExit, salt.minion.resolve_dns, self.opts)
 
+    def test_deepcopy_opts(self):
+        '''
+        Test that the copies of the opts of each master share the grains and
+        the pillar
+        '''
+        opts = {'master': ['master1', 'master2'],
+                'grains': {'os': 'Linux'},
+                'pillar': {'foo': {'bar': 'baz'}}}
+        s_opts = salt.minion._deepcopy_opts(opts)
+        self.assertEqual(s_opts, opts)
+        self.assertIsNot(s_opts['master'], opts['master'])
+        self.assertIs(s_opts['grains'], opts['grains'])
+        self.assertIs(s_opts['pillar'], opts['pillar'])
+
     def test_source_int_name_local(self):
         '''
         test when file_client local and
@@ -107,7 +125,7 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
                                                          'source_ip': '111.1.0.1',
                                                          'master_ip': '127.0.0.1'}
 
-    # Tests for _handle_decoded_payload in the salt.minion.Minion() class: 3
+    # Tests for _handle_decoded_payload in the salt.minion.Minion() class: 4
 
     def test_handle_decoded_payload_jid_match_in_jid_queue(self):
         '''
@@ -160,6 +178,83 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             finally:
                 minion.destroy()
 
+    def test_handle_decoded_payload_job_pool(self):
+        '''
+        Tests that the _handle_decoded_payload function sends the job to the
+        job pool, and forks a process when all of the job workers are busy
+        '''
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)) as start, \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True)):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_data = {'fun': 'foo.bar',
+                         'jid': 123}
+            minion = salt.minion.Minion(mock_opts, io_loop=tornado.ioloop.IOLoop())
+            minion.job_pool = MagicMock()
+            try:
+                minion.job_pool.dispatch.return_value = True
+                minion._handle_decoded_payload(mock_data).result()
+                minion.job_pool.dispatch.assert_called_once_with(mock_data)
+                start.assert_not_called()
+
+                minion.job_pool.dispatch.return_value = False
+                mock_data = {'fun': 'foo.bar',
+                             'jid': 456}
+                minion._handle_decoded_payload(mock_data).result()
+                start.assert_called_once_with()
+            finally:
+                minion.destroy()
+
+    def test_job_pool_recycled(self):
+        '''
+        Tests that the job workers are replaced when the connection to the
+        master or the environment of the minion changes
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['master'] = 'salt'
+        minion = salt.minion.Minion(mock_opts, io_loop=tornado.ioloop.IOLoop())
+        minion.job_pool = MagicMock()
+        minion.schedule = MagicMock()
+        try:
+            minion.connected = False
+            minion._handle_tag_master_connected(
+                salt.minion.master_event(type='connected'), {'master': 'salt'})
+            self.assertTrue(minion.connected)
+            self.assertEqual(minion.job_pool.recycle.call_count, 1)
+
+            with patch('salt.modules.environ.setenv', MagicMock(return_value={})):
+                minion.environ_setenv('environ_setenv', {'environ': {'FOO': 'bar'}})
+            self.assertEqual(minion.job_pool.recycle.call_count, 2)
+        finally:
+            minion.destroy()
+
+    def test_run_pooled_job(self):
+        '''
+        Tests that a job run by a job worker does not daemonize, and that its
+        proc file is removed once it is done
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_data = {'fun': 'foo.bar',
+                     'jid': '123'}
+        minion = salt.minion.Minion(mock_opts, io_loop=tornado.ioloop.IOLoop())
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        minion.proc_dir = tmpdir
+        minion.functions = minion.returners = minion.executors = MagicMock()
+
+        def _target(cls, minion_instance, opts, data, connected):
+            self.assertTrue(minion_instance.job_worker)
+            with salt.utils.files.fopen(os.path.join(tmpdir, data['jid']), 'w'):
+                pass
+
+        try:
+            with patch('salt.minion.Minion._target', classmethod(_target)):
+                minion._run_pooled_job(mock_data)
+            self.assertEqual(os.listdir(tmpdir), [])
+            self.assertTrue(minion.functions.context_dict._threadsafe)
+        finally:
+            minion.destroy()
+
     def test_handle_decoded_payload_jid_queue_reduced_minion_jid_queue_hwm(self):
         '''
         Tests that the _handle_decoded_payload function removes a jid from the minion's jid_queue when the
@@ -469,3 +564,78 @@ class MinionAsyncTestCase(TestCase, AdaptedConfigurationTestCaseMixin, tornado.t
 
             for _patch in patches:
                 _patch.stop()
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class SyndicManagerTestCase(TestCase, tornado.testing.AsyncTestCase):
+    '''
+    Tests for the aggregation of the returns forwarded by a syndic
+    '''
+    def setUp(self):
+        super(SyndicManagerTestCase, self).setUp()
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+        opts.update(copy.deepcopy(salt.config.DEFAULT_MASTER_OPTS))
+        opts['cachedir'] = self.cachedir
+        with patch('salt.minion.MasterMinion', MagicMock()):
+            self.syndic = salt.minion.SyndicManager(opts, io_loop=self.io_loop)
+        self.syndic.local = MagicMock()
+        self.syndic.local.event.unpack = lambda raw, serial: raw
+        self.get_load = MagicMock(return_value={'fun': 'test.ping'})
+        self.syndic.mminion.returners = {'local_cache.get_load': self.get_load}
+        self.syndic._return_pub_syndic = MagicMock(return_value=False)
+
+    def _return(self, jid, minion):
+        tag = 'salt/job/{0}/ret/{1}'.format(jid, minion)
+        self.syndic._process_event((tag, {'id': minion, 'jid': jid, 'fun': 'test.ping', 'return': True}))
+
+    def test_aggregate_returns(self):
+        '''
+        Test that the returns of a job are aggregated with its load fetched once
+        '''
+        self._return('20190101000000000000', 'm1')
+        self._return('20190101000000000000', 'm2')
+        self.assertEqual(self.syndic.job_rets, {None: {'20190101000000000000': {
+            '__fun__': 'test.ping',
+            '__jid__': '20190101000000000000',
+            '__load__': {'fun': 'test.ping'},
+            'm1': {'return': True},
+            'm2': {'return': True}}}})
+        self.get_load.assert_called_once_with('20190101000000000000')
+        self.assertEqual(self.syndic._buffered_returns(), 2)
+
+    def test_forward_full_batch(self):
+        '''
+        Test that a full batch of returns is forwarded without waiting
+        '''
+        self.syndic.opts['syndic_forward_batch_size'] = 2
+        self._return('20190101000000000000', 'm1')
+        self.assertFalse(self.syndic._forward_scheduled)
+        self._return('20190101000000000000', 'm2')
+        self.assertTrue(self.syndic._forward_scheduled)
+        self.syndic._forward_events()
+        self.assertFalse(self.syndic._forward_scheduled)
+        self.assertEqual(self.syndic.pending_returns, 0)
+
+    def test_spool_returns(self):
+        '''
+        Test that the returns are spilled to disk while the masters are busy,
+        and forwarded once they catch up
+        '''
+        self.syndic.opts['syndic_max_buffered_returns'] = 1
+        self._return('20190101000000000000', 'm1')
+        self._return('20190101000000000001', 'm2')
+        self.syndic._forward_events()
+        self.assertEqual(self.syndic.job_rets, {})
+        spooled = os.listdir(self.syndic.spool_dir)
+        self.assertEqual(len(spooled), 1)
+
+        self.syndic._return_pub_syndic.reset_mock()
+        self.syndic._return_pub_syndic.return_value = True
+        self.syndic._forward_events()
+        self.assertEqual(os.listdir(self.syndic.spool_dir), [])
+        values = self.syndic._return_pub_syndic.call_args[0][0]
+        self.assertEqual(sorted(value['__jid__'] for value in values),
+                         ['20190101000000000000', '20190101000000000001'])
+        self.assertEqual(self.syndic._return_pub_syndic.call_args[1], {'master_id': None})
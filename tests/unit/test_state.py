@@ -21,8 +21,10 @@ from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.runtests import RUNTIME_VARS
 
 # Import Salt libs
+import salt.config
 import salt.exceptions
 import salt.state
+import salt.utils.profile
 from salt.utils.odict import OrderedDict
 from salt.utils.decorators import state as statedecorators
 
@@ -129,6 +131,101 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             run_num = ret['test_|-step_one_|-step_one_|-succeed_with_changes']['__run_num__']
             self.assertEqual(run_num, 0)
 
+    def test_mod_aggregate_pkg_batch(self):
+        '''
+        Test that the pkg states are aggregated with state_pkg_batch, which
+        is the default, unless the state disables it
+        '''
+        self.assertTrue(salt.config.DEFAULT_MINION_OPTS['state_pkg_batch'])
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            state_obj = salt.state.State(minion_opts)
+        config = {'state_aggregate': False, 'state_pkg_batch': True}
+        mod_aggregate = MagicMock(side_effect=lambda low, chunks, running: low)
+        state_obj.functions = {'config.option': config.get}
+        state_obj.states = {'pkg.mod_aggregate': mod_aggregate,
+                            'file.mod_aggregate': mod_aggregate}
+
+        low = {'state': 'pkg', 'fun': 'installed', 'name': 'vim'}
+        self.assertTrue(state_obj._mod_aggregate(low, {}, [low])['__agg__'])
+        low = {'state': 'file', 'fun': 'managed', 'name': '/tmp/vim'}
+        self.assertNotIn('__agg__', state_obj._mod_aggregate(low, {}, [low]))
+        low = {'state': 'pkg', 'fun': 'installed', 'name': 'vim', 'aggregate': False}
+        self.assertNotIn('__agg__', state_obj._mod_aggregate(low, {}, [low]))
+        self.assertEqual(mod_aggregate.call_count, 1)
+
+        config['state_pkg_batch'] = False
+        low = {'state': 'pkg', 'fun': 'installed', 'name': 'vim'}
+        self.assertNotIn('__agg__', state_obj._mod_aggregate(low, {}, [low]))
+        config['state_aggregate'] = ['pkg']
+        self.assertTrue(state_obj._mod_aggregate(low, {}, [low])['__agg__'])
+        self.assertEqual(mod_aggregate.call_count, 2)
+
+    def test_run_check_cache(self):
+        '''
+        Test that the return codes of the onlyif and unless commands are
+        reused when state_check_cache is enabled
+        '''
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            minion_opts['state_check_cache'] = True
+            minion_opts['state_check_cache_persist'] = True
+            state_obj = salt.state.State(minion_opts)
+        retcode = MagicMock(return_value=0)
+        state_obj.functions = {'cmd.retcode': retcode}
+        low = {'state': 'test', 'fun': 'succeed_without_changes',
+               'name': 'foo', 'unless': 'test -f /foo', 'onlyif': 'test -f /foo'}
+
+        expected = {'result': True, 'skip_watch': True,
+                    'comment': 'unless condition is true'}
+        self.assertEqual(state_obj._run_check_unless(low, {}), expected)
+        self.assertEqual(state_obj._run_check_unless(low, {}), expected)
+        self.assertEqual(state_obj._run_check_onlyif(low, {})['result'], False)
+        self.assertEqual(retcode.call_count, 1)
+        state_obj.state_con['runas'] = 'foo'
+        state_obj._run_check_unless(low, {})
+        self.assertEqual(retcode.call_count, 2)
+
+        # The cache is kept for the next state runs
+        state_obj._save_check_cache()
+        with patch('salt.state.State._gather_pillar'):
+            state_obj = salt.state.State(minion_opts)
+        state_obj.functions = {'cmd.retcode': retcode}
+        state_obj._run_check_unless(low, {})
+        self.assertEqual(retcode.call_count, 2)
+
+        # until a state makes changes
+        state_obj._clear_check_cache()
+        state_obj._run_check_unless(low, {})
+        self.assertEqual(retcode.call_count, 3)
+
+        # or it expires
+        minion_opts['state_check_cache_ttl'] = 0
+        state_obj._run_check_unless(low, {})
+        self.assertEqual(retcode.call_count, 4)
+
+    def test_call_high_profile(self):
+        '''
+        Test that the stages of the states are timed while profiling
+        '''
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            state_obj = salt.state.State(minion_opts)
+        high = {'foo': {'test': ['succeed_without_changes'],
+                        '__sls__': 'foo', '__env__': 'base'}}
+        tag = 'test_|-foo_|-foo_|-succeed_without_changes'
+
+        ret = state_obj.call_high(high)
+        self.assertNotIn('profile', ret[tag])
+
+        with salt.utils.profile.profiling('state') as profile:
+            ret = state_obj.call_high(high)
+        self.assertEqual(list(ret[tag]['profile']['stages']),
+                         ['requisites', 'format_slots', 'execute'])
+        stages = profile.to_dict()['stages']
+        self.assertIn('compile_high_data', stages)
+        self.assertEqual(stages['call_chunks']['stages'][tag], ret[tag]['profile'])
+
     def test_verify_onlyif_parse(self):
         low_data = {
             "onlyif": [
@@ -54,6 +54,15 @@ class CacheDictTestCase(TestCase):
         self.assertRaises(KeyError, cd.__getitem__, 'foo')
 
 
+class CacheFnmatchTestCase(TestCase):
+
+    def test_match(self):
+        cfn = cache.CacheFnmatch()
+        self.assertTrue(cfn.get('salt/job/*/ret/*').match('salt/job/123/ret/foo'))
+        self.assertFalse(cfn.get('salt/job/*/ret/*').match('salt/job/123/new'))
+        self.assertIs(cfn.get('salt/job/*/ret/*'), cfn.get('salt/job/*/ret/*'))
+
+
 class CacheContextTestCase(TestCase):
 
     def setUp(self):
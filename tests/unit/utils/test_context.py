@@ -5,6 +5,7 @@
 '''
 # Import python libs
 from __future__ import absolute_import
+import copy
 import tornado.stack_context
 import tornado.gen
 from tornado.testing import AsyncTestCase, gen_test
@@ -168,6 +169,51 @@ class ContextDictTests(AsyncTestCase):
                 )
         self.assertNotIn('bar', self.cd)
 
+    def test_threadsafe(self):
+        '''
+        Test that a threadsafe clone only copies the global values it uses
+        '''
+        copies = []
+
+        class Pillar(dict):
+            def __deepcopy__(self, memo):
+                copies.append(self)
+                return Pillar(copy.deepcopy(dict(self), memo))
+
+        cd = ContextDict(threadsafe=True)
+        pillar = cd['pillar'] = Pillar(foo=['bar'])
+        grains = cd['grains'] = Pillar(os='Linux')
+        over = cd.clone(bar='baz')
+        with over:
+            self.assertIn('pillar', cd)
+            self.assertEqual(sorted(cd), ['bar', 'grains', 'pillar'])
+            self.assertEqual(len(cd), 3)
+            self.assertEqual(copies, [])
+            cd['pillar']['foo'].append('qux')
+            self.assertEqual(cd['pillar'], {'foo': ['bar', 'qux']})
+            self.assertEqual(copies, [pillar])
+            del cd['grains']
+            self.assertEqual(dict(cd), {'bar': 'baz', 'pillar': {'foo': ['bar', 'qux']}})
+        self.assertEqual(copies, [pillar])
+        self.assertEqual(cd['pillar'], {'foo': ['bar']})
+        self.assertIs(cd['pillar'], pillar)
+        self.assertIs(cd['grains'], grains)
+
+    def test_threadsafe_replaced(self):
+        '''
+        Test that a threadsafe clone keeps the global values it was created
+        with when they are replaced
+        '''
+        cd = ContextDict(threadsafe=True)
+        cd['pillar'] = {'foo': 'bar'}
+        over = cd.clone()
+        cd['pillar'] = {'foo': 'baz'}
+        cd['grains'] = {}
+        with over:
+            self.assertEqual(cd['pillar'], {'foo': 'bar'})
+            self.assertNotIn('grains', cd)
+        self.assertEqual(cd['pillar'], {'foo': 'baz'})
+
 
 class NamespacedDictWrapperTests(TestCase):
     PREFIX = 'prefix'
@@ -16,6 +16,7 @@ import shutil
 
 # Import Salt Testing libs
 from tests.support.unit import expectedFailure, skipIf, TestCase
+from tests.support.mock import MagicMock, patch
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.events import eventpublisher_process, eventsender_process
 
@@ -292,6 +293,59 @@ class TestSaltEvent(TestCase):
             evt = me.get_event(tag='fire_master')
             self.assertGotEvent(evt, {'data': data, 'tag': 'test_master', 'events': None, 'pretag': None})
 
+    def test_event_shards(self):
+        '''Test that events are routed to and read from the right shards'''
+        opts = {'event_publisher_shards': ['salt/job/', 'salt/auth']}
+        with eventpublisher_process(self.sock_dir, opts):
+            me_all = salt.utils.event.MasterEvent(self.sock_dir, opts=opts, listen=True)
+            me_job = salt.utils.event.MasterEvent(self.sock_dir, opts=opts, listen=True,
+                                                  tags=['salt/job/'])
+            self.assertEqual(sorted(me_all.subscriber.shards, key=str), [0, 1, None])
+            self.assertEqual(list(me_job.subscriber.shards), [0])
+
+            me_all.fire_event({'data': 'auth'}, 'salt/auth')
+            me_all.fire_event({'data': 'job'}, 'salt/job/1/ret/foo')
+            me_all.fire_event({'data': 'other'}, 'other')
+
+            evt = me_job.get_event(tag='', full=True)
+            self.assertEqual(evt['tag'], 'salt/job/1/ret/foo')
+            self.assertIsNone(me_job.get_event(tag='', wait=1))
+
+            tags = set()
+            for _ in range(3):
+                evt = me_all.get_event(tag='', full=True)
+                self.assertIsNotNone(evt)
+                tags.add(evt['tag'])
+            self.assertEqual(tags, set(['salt/auth', 'salt/job/1/ret/foo', 'other']))
+
+    def test_event_shards_subscribe(self):
+        '''Test that subscribing connects to the shards of the tag'''
+        opts = {'event_publisher_shards': ['salt/job/', 'salt/auth']}
+        with eventpublisher_process(self.sock_dir, opts):
+            me = salt.utils.event.MasterEvent(self.sock_dir, opts=opts, listen=True,
+                                              tags=['salt/job/'])
+            me.subscribe('salt/auth')
+            self.assertEqual(sorted(me.subscriber.shards, key=str), [0, 1])
+            me.subscribe('salt/')
+            self.assertEqual(sorted(me.subscriber.shards, key=str), [0, 1, None])
+            me.fire_event({'data': 'auth'}, 'salt/auth')
+            evt = me.get_event(tag='salt/auth')
+            self.assertGotEvent(evt, {'data': 'auth'})
+
+    def test_shards_for(self):
+        opts = {'event_publisher_shards': ['salt/job/', 'salt/job/1/', 'salt/auth']}
+        me = salt.utils.event.MasterEvent(self.sock_dir, opts=opts, listen=False)
+        self.assertEqual(me._shard_for_tag('salt/job/2/ret/foo'), 0)
+        self.assertEqual(me._shard_for_tag('salt/job/1/ret/foo'), 1)
+        self.assertIsNone(me._shard_for_tag('salt/key'))
+        self.assertEqual(me._shards_for('salt/job/'), set([0, 1]))
+        self.assertEqual(me._shards_for('salt/job'), set([0, 1, None]))
+        self.assertEqual(me._shards_for('salt/auth/x'), set([2]))
+        self.assertEqual(me._shards_for(''), set([0, 1, 2, None]))
+        self.assertEqual(
+            me._shards_for('salt/auth', me._match_tag_fnmatch),
+            set([0, 1, 2, None]))
+
 
 class TestAsyncEventPublisher(AsyncTestCase):
     def get_new_ioloop(self):
@@ -325,3 +379,205 @@ class TestAsyncEventPublisher(AsyncTestCase):
         self.assertEqual(self.tag, 'evt1')
         self.data.pop('_stamp')  # drop the stamp
         self.assertEqual(self.data, {'data': 'foo1'})
+
+
+class TestTagTrie(TestCase):
+    def test_prefixes(self):
+        trie = salt.utils.event.TagTrie()
+        for prefix in ('salt/job/', 'salt/job/123', 'salt/auth', 'salt/job/123'):
+            trie.add(prefix)
+        self.assertEqual(list(trie.prefixes('salt/job/123/ret/foo')),
+                         ['salt/job/', 'salt/job/123'])
+        self.assertTrue(trie.match('salt/auth'))
+        self.assertFalse(trie.match('salt/key'))
+
+        trie.remove('salt/job/123')
+        self.assertTrue(trie.match('salt/job/123/ret/foo'))
+        trie.remove('salt/job/123')
+        self.assertEqual(list(trie.prefixes('salt/job/123/ret/foo')), ['salt/job/'])
+        trie.remove('salt/job/')
+        trie.remove('salt/auth')
+        self.assertFalse(trie)
+
+    def test_empty_prefix(self):
+        trie = salt.utils.event.TagTrie()
+        trie.add('')
+        self.assertEqual(list(trie.prefixes('anything')), [''])
+
+
+class TestSaltEventPending(TestCase):
+    def setUp(self):
+        self.event = salt.utils.event.SaltEvent('master', listen=False)
+        self.addCleanup(self.event.destroy)
+
+    def _cache(self, tag):
+        return self.event._cache_event({'tag': tag, 'data': {}})
+
+    def test_cache_only_subscribed(self):
+        self.event.subscribe('salt/job/1')
+        self.event.subscribe('salt/job/*/ret/foo', match_type='fnmatch')
+        self.assertTrue(self._cache('salt/job/1/ret/bar'))
+        self.assertTrue(self._cache('salt/job/2/ret/foo'))
+        self.assertFalse(self._cache('salt/job/2/ret/bar'))
+        self.assertEqual(len(self.event.pending_events), 2)
+
+    def test_check_pending_order(self):
+        self.event.subscribe('salt/job/1')
+        self.event.subscribe('salt/job/')
+        for tag in ('salt/job/2/ret/a', 'salt/job/1/ret/a', 'salt/job/1/ret/b'):
+            self._cache(tag)
+        check = self.event._check_pending
+        match = self.event._match_tag_startswith
+        self.assertEqual(check('salt/job/1', match)['tag'], 'salt/job/1/ret/a')
+        self.assertEqual(check('salt/job/', match)['tag'], 'salt/job/2/ret/a')
+        # Not a subscription, falls back to scanning the cache
+        self.assertEqual(check('salt/job/1/ret', match)['tag'], 'salt/job/1/ret/b')
+        self.assertIsNone(check('salt/job/', match))
+        self.assertIsNone(check('salt/job/1', match))
+
+    def test_subscribe_indexes_cached_events(self):
+        self.event.subscribe('salt/job/')
+        self._cache('salt/job/1/ret/a')
+        self.event.subscribe('salt/job/1')
+        match = self.event._match_tag_startswith
+        self.assertEqual(
+            self.event._check_pending('salt/job/1', match)['tag'],
+            'salt/job/1/ret/a')
+
+    def test_unsubscribe_drops_events(self):
+        self.event.subscribe('salt/job/1')
+        self.event.subscribe('salt/job/2')
+        self._cache('salt/job/1/ret/a')
+        self._cache('salt/job/2/ret/a')
+        self.event.unsubscribe('salt/job/1')
+        self.assertEqual(
+            [evt['tag'] for evt in self.event.pending_events.values()],
+            ['salt/job/2/ret/a'])
+        self.assertFalse(self._cache('salt/job/1/ret/b'))
+
+    def test_compact_pending_index(self):
+        self.event.subscribe('salt/job/')
+        self.event.subscribe('salt/job/1')
+        match = self.event._match_tag_startswith
+        for idx in range(200):
+            self._cache('salt/job/1/ret/{0}'.format(idx))
+            self.event._check_pending('salt/job/1', match)
+        self.assertEqual(len(self.event.pending_events), 0)
+        self.assertLess(len(self.event._pending_index[('salt/job/', match)]), 100)
+
+
+class TestEventReturnQueue(TestCase):
+    def setUp(self):
+        self.cachedir = os.path.join(RUNTIME_VARS.TMP, 'test-event-return')
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.opts = {'cachedir': self.cachedir,
+                     'event_return_queue': 2,
+                     'event_return_queue_max_seconds': 0,
+                     'event_return_max_queue_size': 0,
+                     'event_return_retries': 0,
+                     'event_return_retry_interval': 0,
+                     'event_return_spill': False}
+
+    def test_flush(self):
+        func = MagicMock()
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        queue.put({'tag': 'a'})
+        queue.put({'tag': 'b'})
+        queue.flush()
+        func.assert_called_once_with([{'tag': 'a'}, {'tag': 'b'}])
+        self.assertEqual(queue.depth(), 0)
+        self.assertEqual(queue.stats['flushed'], 2)
+
+    def test_flush_thread(self):
+        func = MagicMock()
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        queue.start()
+        self.addCleanup(queue.close)
+        queue.put({'tag': 'a'})
+        queue.put({'tag': 'b'})
+        for _ in range(50):
+            if func.called:
+                break
+            time.sleep(0.1)
+        func.assert_called_once_with([{'tag': 'a'}, {'tag': 'b'}])
+
+    def test_overflow_drops_oldest(self):
+        self.opts['event_return_max_queue_size'] = 2
+        func = MagicMock()
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        for tag in ('a', 'b', 'c'):
+            queue.put({'tag': tag})
+        queue.flush()
+        func.assert_called_once_with([{'tag': 'b'}, {'tag': 'c'}])
+        self.assertEqual(queue.stats['dropped'], 1)
+        self.assertEqual(queue.get_stats()['dropped'], 1)
+
+    def test_overflow_flushes_at_max_size(self):
+        self.opts['event_return_queue'] = 5
+        self.opts['event_return_max_queue_size'] = 2
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', MagicMock())
+        self.assertEqual(queue.batch_size, 2)
+        queue.put({'tag': 'a'})
+        self.assertFalse(queue._ready())
+        queue.put({'tag': 'b'})
+        self.assertTrue(queue._ready())
+
+    def test_close_once(self):
+        func = MagicMock()
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        queue.start()
+        queue.put({'tag': 'a'})
+        queue.close()
+        queue.put({'tag': 'b'})
+        queue.close()
+        func.assert_called_once_with([{'tag': 'a'}])
+
+    def test_retry(self):
+        self.opts['event_return_retries'] = 2
+        func = MagicMock(side_effect=[Exception('busy'), None])
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        queue.put({'tag': 'a'})
+        queue.flush()
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(queue.stats['flushed'], 1)
+        self.assertEqual(queue.stats['failed'], 0)
+
+    def test_spill_and_replay(self):
+        self.opts['event_return_spill'] = True
+        func = MagicMock(side_effect=Exception('down'))
+        queue = salt.utils.event.EventReturnQueue(self.opts, 'foo', func)
+        queue.put({'tag': 'a'})
+        queue.flush()
+        self.assertEqual(queue.stats['spilled'], 1)
+        self.assertEqual(len(os.listdir(queue.spill_dir)), 1)
+
+        func.side_effect = None
+        func.reset_mock()
+        queue.put({'tag': 'b'})
+        queue.flush()
+        self.assertEqual(func.call_args_list[0][0][0], [{'tag': 'b'}])
+        self.assertEqual(func.call_args_list[1][0][0], [{'tag': 'a'}])
+        self.assertEqual(queue.stats['spilled'], 0)
+        self.assertEqual(queue.stats['flushed'], 2)
+        self.assertEqual(os.listdir(queue.spill_dir), [])
+
+
+class TestEventReturn(TestCase):
+    def test_filter(self):
+        opts = {'event_return_queue': 0,
+                'event_return_whitelist': ['salt/job/*', 'salt/run/*/ret'],
+                'event_return_blacklist': ['salt/job/*/new']}
+        with patch('salt.minion.MasterMinion', MagicMock()):
+            event_return = salt.utils.event.EventReturn(opts)
+        self.assertTrue(event_return._filter({'tag': 'salt/job/123/ret/foo'}))
+        self.assertTrue(event_return._filter({'tag': 'salt/run/123/ret'}))
+        self.assertFalse(event_return._filter({'tag': 'salt/job/123/new'}))
+        self.assertFalse(event_return._filter({'tag': 'salt/auth'}))
+
+    def test_filter_no_lists(self):
+        opts = {'event_return_queue': 0,
+                'event_return_whitelist': [],
+                'event_return_blacklist': []}
+        with patch('salt.minion.MasterMinion', MagicMock()):
+            event_return = salt.utils.event.EventReturn(opts)
+        self.assertTrue(event_return._filter({'tag': 'salt/auth'}))
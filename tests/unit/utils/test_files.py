@@ -146,3 +146,19 @@ class FilesTestCase(TestCase):
         self._validate_folder_structure_and_contents(
             dest,
             desired_structure)
+
+    @with_tempdir()
+    def test_clonefile(self, tmp):
+        '''
+        Test that clonefile copies the content whether or not the filesystem
+        can clone it
+        '''
+        src = os.path.join(tmp, 'src')
+        with salt.utils.files.fopen(src, 'wb') as fp_:
+            fp_.write(b'cloned content')
+        for has_fcntl in (True, False):
+            dest = os.path.join(tmp, 'dest{0}'.format(has_fcntl))
+            with patch('salt.utils.files.HAS_FCNTL', has_fcntl):
+                salt.utils.files.clonefile(src, dest)
+            with salt.utils.files.fopen(dest, 'rb') as fp_:
+                self.assertEqual(fp_.read(), b'cloned content')
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.forkserver
+'''
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import subprocess
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+
+# Import salt libs
+import salt.utils.forkserver as forkserver
+import salt.utils.platform
+from salt.exceptions import TimedProcTimeoutError
+
+
+@skipIf(salt.utils.platform.is_windows(), 'Do not run on Windows')
+class ForkServerTestCase(TestCase):
+
+    def test_run(self):
+        '''
+        Test running commands through the fork server
+        '''
+        proc = forkserver.ForkServerProc(
+            'echo $FOO; echo bar >&2; cat; exit 3',
+            shell=True,
+            executable='/bin/sh',
+            stdin='foo\\nbar',
+            stderr=subprocess.STDOUT,
+            env={'FOO': 1},
+            cwd=tempfile.gettempdir())
+        self.assertEqual(proc.run(), 3)
+        self.assertEqual(proc.stdout, b'1\nbar\nfoo\nbar')
+        self.assertIsNone(proc.stderr)
+        self.assertNotEqual(proc.process.pid, os.getpid())
+
+        proc = forkserver.ForkServerProc(
+            ['sh', '-c', 'umask; echo bar >&2'],
+            umask=0o77,
+            cwd=tempfile.gettempdir())
+        self.assertEqual(proc.run(), 0)
+        self.assertEqual(proc.stdout, b'0077\n')
+        self.assertEqual(proc.stderr, b'bar\n')
+
+    def test_errors(self):
+        '''
+        Test that the fork server raises the errors TimedProc would
+        '''
+        self.assertRaises(OSError,
+                          forkserver.ForkServerProc,
+                          ['/nonexistent/command'],
+                          cwd=tempfile.gettempdir())
+        proc = forkserver.ForkServerProc(['sleep', '5'],
+                                         timeout=0.1,
+                                         cwd=tempfile.gettempdir())
+        self.assertRaises(TimedProcTimeoutError, proc.run)
+
+    def test_per_process(self):
+        '''
+        Test that a forked process doesn't use the fork server of its parent
+        '''
+        server = forkserver.get_forkserver()
+        self.assertIs(forkserver.get_forkserver(), server)
+        server.pid = -1
+        self.assertIsNot(forkserver.get_forkserver(), server)
+        server.close()
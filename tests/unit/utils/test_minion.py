@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.minion
+'''
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import MagicMock, patch
+
+# Import salt libs
+import salt.payload
+import salt.utils.files
+import salt.utils.minion
+import salt.utils.platform
+
+
+class RunningTestCase(TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.proc_dir = os.path.join(self.cachedir, 'proc')
+        os.makedirs(self.proc_dir)
+        self.opts = {'cachedir': self.cachedir, 'multiprocessing': True}
+        serial = salt.payload.Serial(self.opts)
+        for jid in ('1', '2'):
+            with salt.utils.files.fopen(os.path.join(self.proc_dir, jid), 'w+b') as fp_:
+                fp_.write(serial.dumps({'jid': jid, 'pid': 15338, 'fun': 'test.sleep'}))
+        patcher = patch.multiple('salt.utils.minion',
+                                 _check_cmdline=MagicMock(return_value=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('salt.utils.process.os_is_running', MagicMock(return_value=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_running(self):
+        '''
+        Test that the proc files are only read again once they changed
+        '''
+        jobs = salt.utils.minion.running(self.opts)
+        self.assertEqual(sorted(job['jid'] for job in jobs), ['1', '2'])
+        with patch('salt.utils.files.fopen', MagicMock(side_effect=IOError)):
+            jobs = salt.utils.minion.running(self.opts)
+        self.assertEqual(sorted(job['jid'] for job in jobs), ['1', '2'])
+
+        os.remove(os.path.join(self.proc_dir, '2'))
+        jobs = salt.utils.minion.running(self.opts)
+        self.assertEqual([job['jid'] for job in jobs], ['1'])
+        self.assertNotIn(os.path.join(self.proc_dir, '2'), salt.utils.minion._PROC_FILES)
+
+    def test_find_job(self):
+        '''
+        Test that a job is found from its proc file
+        '''
+        with patch('os.listdir', MagicMock(side_effect=OSError)):
+            self.assertEqual(salt.utils.minion.find_job(self.opts, '2')['jid'], '2')
+            self.assertIsNone(salt.utils.minion.find_job(self.opts, '3'))
+            self.assertIsNone(salt.utils.minion.find_job(self.opts, '../proc'))
+
+    def test_running_jobs(self):
+        '''
+        Test the index of the running jobs
+        '''
+        jobs = [{'jid': '1', 'fun': 'test.ping', 'schedule': 'job1'},
+                {'jid': '2', 'fun': 'test.ping', 'schedule': 'job1'},
+                {'jid': '3', 'fun': ['test.ping', 'state.apply']}]
+        running_jobs = salt.utils.minion.RunningJobs(jobs)
+        self.assertEqual(running_jobs.jids['3'], jobs[2])
+        self.assertEqual(running_jobs.funs, {'test.ping': jobs, 'state.apply': jobs[2:]})
+        self.assertEqual(running_jobs.schedules, {'job1': jobs[:2]})
+
+
+@skipIf(salt.utils.platform.is_windows(), 'Do not run on Windows')
+class JobWorkerPoolTestCase(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.pool = salt.utils.minion.JobWorkerPool(self._run_job, 2, max_jobs=2)
+        self.addCleanup(self.pool.close)
+
+    def _run_job(self, data):
+        with salt.utils.files.fopen(os.path.join(self.tmpdir, data['jid']), 'w') as fp_:
+            fp_.write(str(os.getpid()))
+        time.sleep(data.get('sleep', 0))
+
+    def _wait(self, func, timeout=30):
+        end = time.time() + timeout
+        while time.time() < end:
+            self.pool.check()
+            if func():
+                return
+            time.sleep(0.05)
+        self.fail('Timed out waiting for the job workers')
+
+    def _pids(self):
+        return [slot.process.pid for slot in self.pool.slots]
+
+    def _job_pid(self, jid):
+        with salt.utils.files.fopen(os.path.join(self.tmpdir, jid)) as fp_:
+            return int(fp_.read())
+
+    def _all_ready(self):
+        return all(slot.ready for slot in self.pool.slots)
+
+    def test_dispatch(self):
+        '''
+        Test that the jobs are run by the workers, which are replaced after
+        max_jobs jobs
+        '''
+        self.assertFalse(self.pool.dispatch({'jid': '1'}))
+        self._wait(self._all_ready)
+        pids = self._pids()
+        self.assertTrue(self.pool.dispatch({'jid': '1', 'sleep': 1}))
+        self.assertTrue(self.pool.dispatch({'jid': '2', 'sleep': 1}))
+        # Both workers are busy
+        self.assertFalse(self.pool.dispatch({'jid': '3'}))
+        self._wait(self._all_ready)
+        self.assertEqual(sorted([self._job_pid('1'), self._job_pid('2')]), sorted(pids))
+        self.assertNotIn(os.getpid(), pids)
+
+        self.assertTrue(self.pool.dispatch({'jid': '3'}))
+        self.assertTrue(self.pool.dispatch({'jid': '4'}))
+        self._wait(lambda: self._all_ready() and not set(self._pids()) & set(pids))
+
+    def test_recycle(self):
+        '''
+        Test that the workers are replaced once they are done with their job
+        '''
+        self._wait(self._all_ready)
+        pids = self._pids()
+        self.assertTrue(self.pool.dispatch({'jid': '1', 'sleep': 1}))
+        self.pool.recycle()
+        self.assertFalse(self.pool.dispatch({'jid': '2'}))
+        self._wait(lambda: self._all_ready() and not set(self._pids()) & set(pids))
+        self.assertIn(self._job_pid('1'), pids)
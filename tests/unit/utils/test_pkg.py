@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import absolute_import, unicode_literals, print_function
+import os
+import shutil
+import tempfile
 
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+import salt.utils.files
 import salt.utils.pkg
 from salt.utils.pkg import rpm
 
@@ -47,6 +52,79 @@ class PkgUtilsTestCase(TestCase):
             self.assertEqual(test_parameter[2], verstr)
 
 
+class PkgSnapshotTestCase(TestCase):
+    '''
+    TestCase for the package snapshots of salt.utils.pkg
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.opts = {'cachedir': self.tmpdir, 'pkg_snapshot_cache': True}
+        self.dbpath = os.path.join(self.tmpdir, 'Packages')
+        with salt.utils.files.fopen(self.dbpath, 'w') as fp_:
+            fp_.write('db')
+        self.data = {'bash': [{'version': '4.4', 'arch': 'x86_64'}]}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_snapshot(self):
+        '''
+        Tests that a snapshot is read back until it is cleared
+        '''
+        self.assertIsNone(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath]))
+        stamp = salt.utils.pkg.snapshot_stamp([self.dbpath])
+        salt.utils.pkg.write_snapshot(self.opts, 'test', [self.dbpath], stamp, self.data,
+                                      key='x86_64')
+        self.assertEqual(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath], key='x86_64'),
+            self.data)
+        self.assertIsNone(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath], key='i686'))
+        salt.utils.pkg.clear_snapshot(self.opts, 'test')
+        self.assertIsNone(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath], key='x86_64'))
+
+    def test_snapshot_db_changed(self):
+        '''
+        Tests that a snapshot is invalidated by a change of the package database
+        '''
+        stamp = salt.utils.pkg.snapshot_stamp([self.dbpath])
+        salt.utils.pkg.write_snapshot(self.opts, 'test', [self.dbpath], stamp, self.data)
+        self.assertEqual(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath]),
+            self.data)
+        mtime = os.stat(self.dbpath).st_mtime
+        os.utime(self.dbpath, (mtime + 10, mtime + 10))
+        self.assertIsNone(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath]))
+
+    def test_snapshot_db_changed_during_query(self):
+        '''
+        Tests that no snapshot is written when the package database changed
+        while it was queried
+        '''
+        stamp = salt.utils.pkg.snapshot_stamp([self.dbpath])
+        mtime = os.stat(self.dbpath).st_mtime
+        os.utime(self.dbpath, (mtime + 10, mtime + 10))
+        salt.utils.pkg.write_snapshot(self.opts, 'test', [self.dbpath], stamp, self.data)
+        self.assertFalse(os.path.exists(salt.utils.pkg.snapshot_path(self.opts, 'test')))
+        self.assertIsNone(
+            salt.utils.pkg.read_snapshot(self.opts, 'test', [self.dbpath]))
+
+    def test_snapshot_disabled(self):
+        '''
+        Tests that no snapshot is kept when disabled or without a package database
+        '''
+        salt.utils.pkg.write_snapshot(self.opts, 'test', [], salt.utils.pkg.snapshot_stamp([]),
+                                      self.data)
+        self.assertFalse(os.path.exists(salt.utils.pkg.snapshot_path(self.opts, 'test')))
+        self.opts['pkg_snapshot_cache'] = False
+        salt.utils.pkg.write_snapshot(self.opts, 'test', [self.dbpath],
+                                      salt.utils.pkg.snapshot_stamp([self.dbpath]), self.data)
+        self.assertFalse(os.path.exists(salt.utils.pkg.snapshot_path(self.opts, 'test')))
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class PkgRPMTestCase(TestCase):
     '''
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for the state run profile of salt.utils.profile
+'''
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import threading
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import salt libs
+import salt.utils.files
+import salt.utils.json
+import salt.utils.profile
+
+
+class ProfileTestCase(TestCase):
+
+    def test_profiling(self):
+        '''
+        Test the timings and counters of the stages of a profile
+        '''
+        with salt.utils.profile.profiling('state') as profile:
+            with salt.utils.profile.timer('render'):
+                with salt.utils.profile.timer('template'):
+                    salt.utils.profile.count('file_fetches')
+                with salt.utils.profile.timer('template'):
+                    salt.utils.profile.count('file_fetches', 2)
+            with salt.utils.profile.timer('pkg_|-vim_|-vim_|-installed', 'execute'):
+                salt.utils.profile.count('req_round_trips')
+                self.assertEqual(salt.utils.profile.current().name, 'execute')
+        self.assertIsNone(salt.utils.profile.current())
+
+        ret = profile.to_dict()
+        self.assertEqual(ret['calls'], 1)
+        self.assertEqual(ret['counters'], {'file_fetches': 3, 'req_round_trips': 1})
+        self.assertEqual(list(ret['stages']), ['render', 'pkg_|-vim_|-vim_|-installed'])
+        render = ret['stages']['render']
+        self.assertEqual(render['calls'], 1)
+        self.assertEqual(render['counters'], {'file_fetches': 3})
+        self.assertEqual(render['stages']['template']['calls'], 2)
+        self.assertLessEqual(render['stages']['template']['duration'], render['duration'])
+        self.assertLessEqual(render['duration'], ret['duration'])
+        state = ret['stages']['pkg_|-vim_|-vim_|-installed']
+        self.assertEqual(state['calls'], 0)
+        self.assertEqual(state['stages']['execute']['counters'], {'req_round_trips': 1})
+
+        stacks = [line.rsplit(' ', 1)[0] for line in profile.folded().splitlines()]
+        self.assertIn('state;render;template', stacks)
+        self.assertIn('state;pkg_|-vim_|-vim_|-installed;execute', stacks)
+
+    def test_inactive(self):
+        '''
+        Test that the timers and counters do nothing without an active profile
+        '''
+        with salt.utils.profile.timer('render') as node:
+            salt.utils.profile.count('file_fetches')
+        self.assertIsNone(node)
+        self.assertIsNone(salt.utils.profile.current())
+
+    def test_nested(self):
+        '''
+        Test that the profile active before a profile is started is restored
+        '''
+        outer = salt.utils.profile.start('outer')
+        try:
+            with salt.utils.profile.profiling('inner'):
+                salt.utils.profile.count('file_fetches')
+            self.assertIs(salt.utils.profile.current(), outer.root)
+        finally:
+            salt.utils.profile.stop(outer)
+        self.assertEqual(outer.to_dict()['counters'], {})
+        self.assertIsNone(salt.utils.profile.current())
+
+    def test_threads(self):
+        '''
+        Test that the runs of the other threads are not added to the profile
+        '''
+        started = threading.Event()
+        done = threading.Event()
+        other = {}
+
+        def _run():
+            started.wait(10)
+            with salt.utils.profile.timer('render'):
+                salt.utils.profile.count('file_fetches')
+                other['current'] = salt.utils.profile.current()
+            done.set()
+
+        thread = threading.Thread(target=_run)
+        thread.start()
+        try:
+            with salt.utils.profile.profiling('state') as profile:
+                with salt.utils.profile.timer('execute'):
+                    started.set()
+                    done.wait(10)
+                    self.assertEqual(salt.utils.profile.current().name, 'execute')
+        finally:
+            started.set()
+            thread.join()
+        self.assertIsNone(other['current'])
+        ret = profile.to_dict()
+        self.assertEqual(list(ret['stages']), ['execute'])
+        self.assertEqual(ret['counters'], {})
+
+    def test_write(self):
+        '''
+        Test writing the profile as JSON and as folded stacks
+        '''
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        with salt.utils.profile.profiling('state') as profile:
+            with salt.utils.profile.timer('call chunks'):
+                pass
+        path, folded = profile.write(os.path.join(tmpdir, 'state_profile', '1.json'))
+        self.assertEqual(folded, os.path.join(tmpdir, 'state_profile', '1.folded'))
+        with salt.utils.files.fopen(path) as fp_:
+            self.assertEqual(salt.utils.json.load(fp_), profile.to_dict())
+        with salt.utils.files.fopen(folded) as fp_:
+            self.assertIn('state;call_chunks ', fp_.read())
@@ -5,7 +5,11 @@ import codecs
 import glob
 import logging
 import os
+import shutil
+import tempfile
 import textwrap
+import threading
+import time
 
 import salt.loader
 import salt.utils.data
@@ -13,6 +17,7 @@ import salt.utils.files
 import salt.utils.reactor as reactor
 import salt.utils.yaml
 
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import (
@@ -462,6 +467,104 @@ class TestReactor(TestCase, AdaptedConfigurationTestCaseMixin):
                                     self.assertEqual(reactions, LOW_CHUNKS[tag])
 
 
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestReactorRenderCache(TestCase, AdaptedConfigurationTestCaseMixin):
+    '''
+    Tests for reusing rendered reactions
+    '''
+    def setUp(self):
+        self.opts = self.get_temp_config('master')
+        self.tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        del self.opts
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(textwrap.dedent(content))
+        return path
+
+    def test_static_reaction(self):
+        '''
+        A reactor file without template markup is only rendered once
+        '''
+        path = self._write('static.sls', '''\
+            restart:
+              local.cmd.run:
+                - tgt: '*'
+                - arg:
+                  - service salt-minion restart
+            ''')
+        react = reactor.Reactor(self.opts)
+        render = MagicMock(side_effect=react.render_template)
+        with patch.object(react, 'render_template', render):
+            first = react.render_reaction(path, 'foo', {'id': 'a'})
+            second = react.render_reaction(path, 'bar', {'id': 'b'})
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first['restart']['__sls__'], path)
+
+        # The cached reaction must not be changed by its users
+        first['restart']['local'] = 'mutated'
+        with patch.object(react, 'render_template', render):
+            third = react.render_reaction(path, 'foo', {'id': 'a'})
+        self.assertEqual(third, second)
+
+        # A change of the file is picked up
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        with patch.object(react, 'render_template', render):
+            react.render_reaction(path, 'foo', {'id': 'a'})
+        self.assertEqual(render.call_count, 2)
+
+    def test_template_reaction(self):
+        '''
+        A templated reactor file is rendered for every event, unless
+        reactor_render_cache_ttl is set and the event is identical
+        '''
+        path = self._write('template.sls', '''\
+            restart:
+              local.cmd.run:
+                - tgt: {{ data['id'] }}
+                - arg:
+                  - service salt-minion restart
+            ''')
+        react = reactor.Reactor(self.opts)
+        render = MagicMock(side_effect=react.render_template)
+        with patch.object(react, 'render_template', render):
+            first = react.render_reaction(path, 'foo', {'id': 'a'})
+            react.render_reaction(path, 'foo', {'id': 'a'})
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual(first['restart']['local'][0], {'tgt': 'a'})
+
+        self.opts['reactor_render_cache_ttl'] = 60
+        react = reactor.Reactor(self.opts)
+        render = MagicMock(side_effect=react.render_template)
+        with patch.object(react, 'render_template', render):
+            first = react.render_reaction(path, 'foo', {'id': 'a', '_stamp': '1'})
+            second = react.render_reaction(path, 'foo', {'id': 'a', '_stamp': '2'})
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(first, second)
+            third = react.render_reaction(path, 'foo', {'id': 'b'})
+            self.assertEqual(render.call_count, 2)
+            self.assertEqual(third['restart']['local'][0], {'tgt': 'b'})
+
+            # Expired renders are not reused
+            with patch('time.time', MagicMock(return_value=time.time() + 120)):
+                react.render_reaction(path, 'foo', {'id': 'a'})
+            self.assertEqual(render.call_count, 3)
+
+            # The least recently used renders are evicted
+            with patch.object(reactor, 'RENDER_CACHE_SIZE', 2):
+                react.render_reaction(path, 'foo', {'id': 'b'})
+                react.render_reaction(path, 'foo', {'id': 'c'})
+                self.assertEqual(render.call_count, 4)
+                self.assertEqual(len(react.render_cache), 2)
+                react.render_reaction(path, 'foo', {'id': 'a'})
+                self.assertEqual(render.call_count, 5)
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
     '''
@@ -555,3 +658,63 @@ class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
                 *WRAPPER_CALLS[tag]['args'],
                 **WRAPPER_CALLS[tag]['kwargs']
             )
+
+    def test_worker_pools(self):
+        '''
+        Test that reactions are run through the pool of their type
+        '''
+        opts = self.get_temp_config('master')
+        opts['reactor_worker_pools'] = {'local': {'threads': 1, 'hwm': 5}}
+        wrap = reactor.ReactWrap(opts)
+        self.assertEqual(list(wrap.pools), ['local'])
+
+        chunk = LOW_CHUNKS['new_local'][0]
+        local_pool = Mock()
+        local_pool.fire_async = Mock(return_value=True)
+        client_cache = {'local': Mock()}
+        with patch.object(wrap, 'client_cache', client_cache), \
+                patch.dict(wrap.pools, {'local': local_pool}):
+            wrap.run(chunk, start=time.time())
+        local_pool.fire_async.assert_called_with(
+            wrap._pooled_call,
+            args=('local', 'cmd_async') + tuple(WRAPPER_CALLS['new_local']['args']),
+            kwargs=WRAPPER_CALLS['new_local']['kwargs']
+        )
+        client_cache['local'].cmd_async.assert_not_called()
+
+        stats = wrap.latency_stats()
+        self.assertEqual(list(stats), ['local'])
+        self.assertEqual(stats['local']['count'], 1)
+        self.assertEqual(wrap.latency_stats(), {})
+
+    def test_thread_clients(self):
+        '''
+        Test that each thread of a pool uses its own local client
+        '''
+        opts = self.get_temp_config('master')
+        wrap = reactor.ReactWrap(opts)
+        clients = {}
+
+        def _call():
+            wrap._pooled_call('local', 'cmd_async', 'minion', 'test.ping')
+            clients[threading.current_thread().name] = wrap.thread_client('local')
+
+        with patch.dict(wrap.reaction_class, {'local': MagicMock(side_effect=lambda conf: Mock())}):
+            threads = [threading.Thread(target=_call) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            _call()
+        self.assertEqual(len(set(id(client) for client in clients.values())), 3)
+        for client in clients.values():
+            client.cmd_async.assert_called_once_with('minion', 'test.ping')
+
+    def test_percentile(self):
+        '''
+        Test the nearest-rank percentile of the latency samples
+        '''
+        samples = list(range(1, 101))
+        self.assertEqual(reactor._percentile(samples, 50), 50)
+        self.assertEqual(reactor._percentile(samples, 99), 99)
+        self.assertEqual(reactor._percentile([7], 90), 7)
@@ -25,6 +25,12 @@ from salt.modules.status import time as status_time
 from salt.modules.cmdmod import run as cmd_run
 
 # pylint: disable=import-error,unused-import
+try:
+    import dateutil.parser as dateutil_parser
+    _WHEN_SUPPORTED = True
+except ImportError:
+    _WHEN_SUPPORTED = False
+
 try:
     import croniter
     _CRON_SUPPORTED = True
@@ -326,6 +332,82 @@ class ScheduleTestCase(TestCase):
         self.schedule.eval()
         self.assertTrue(self.schedule.opts['schedule']['testjob']['_splay'] - now > datetime.timedelta(seconds=60))
 
+    def test_eval_schedule_deadline(self):
+        '''
+        Tests eval only evaluates jobs again once their deadline has passed,
+        or when they are changed
+        '''
+        self.schedule.opts.update({'pillar': {'schedule': {}}})
+        self.schedule.opts.update({'schedule': {'testjob': {'function': 'test.true', 'seconds': 60}}})
+        now = datetime.datetime(2019, 1, 1, 12, 0, 0)
+        with patch.object(self.schedule, '_run_job') as run_job:
+            self.schedule.eval(now)
+            self.assertEqual(self.schedule.deadlines['testjob'][1], now + datetime.timedelta(seconds=60))
+
+            # a change made behind the back of the scheduler is not seen
+            self.schedule.opts['schedule']['testjob']['_next_fire_time'] = now
+            self.schedule.eval(now + datetime.timedelta(seconds=30))
+            self.assertFalse(run_job.called)
+
+            self.schedule.opts['schedule']['testjob']['_next_fire_time'] = now + datetime.timedelta(seconds=60)
+            self.schedule.eval(now + datetime.timedelta(seconds=60))
+            self.assertEqual(run_job.call_count, 1)
+            self.assertEqual(self.schedule.deadlines['testjob'][1], now + datetime.timedelta(seconds=120))
+
+        Schedule.disable_job(self.schedule, 'testjob', persist=False)
+        self.assertEqual(self.schedule.deadlines, {})
+        self.schedule.eval(now + datetime.timedelta(seconds=90))
+        self.assertNotIn('testjob', self.schedule.deadlines)
+
+    @skipIf(not _WHEN_SUPPORTED, 'dateutil module not installed')
+    def test_eval_schedule_when_deadline(self):
+        '''
+        Tests the deadline of a job with when is its next time
+        '''
+        self.schedule.opts.update({'pillar': {'schedule': {}}})
+        self.schedule.opts.update({'schedule': {'testjob': {'function': 'test.true',
+                                                            'when': ['2019-01-01 13:00', '2019-01-01 15:00']}}})
+        now = datetime.datetime(2019, 1, 1, 12, 0, 0)
+        with patch.object(self.schedule, '_run_job') as run_job:
+            self.schedule.eval(now)
+            self.assertEqual(self.schedule.deadlines['testjob'][1], datetime.datetime(2019, 1, 1, 13, 0, 0))
+            self.schedule.eval(datetime.datetime(2019, 1, 1, 13, 0, 0))
+            self.assertEqual(run_job.call_count, 1)
+
+    def test_eval_schedule_maxrunning(self):
+        '''
+        Tests the running jobs are listed once for all of the jobs checking
+        their maxrunning
+        '''
+        self.schedule.opts.update({'pillar': {'schedule': {}}})
+        self.schedule.opts.update({'schedule': {'job1': {'function': 'test.true', 'seconds': 60},
+                                                'job2': {'function': 'test.true', 'seconds': 60}}})
+        running_data = [{'jid': '20191001000000000000', 'schedule': 'job1',
+                         'pid': 15338, 'fun': 'test.true'}]
+        now = datetime.datetime(2019, 1, 1, 12, 0, 0)
+        with patch.object(self.schedule, '_run_job') as run_job, \
+                patch('salt.utils.minion.running', MagicMock(return_value=running_data)) as running, \
+                patch('salt.utils.process.os_is_running', MagicMock(return_value=True)):
+            self.schedule.eval(now)
+            self.schedule.eval(now + datetime.timedelta(seconds=60))
+            self.assertEqual(running.call_count, 1)
+            self.assertEqual(run_job.call_count, 1)
+            self.assertEqual(run_job.call_args[0][1]['name'], 'job2')
+            self.assertEqual(self.schedule.opts['schedule']['job1']['_skip_reason'], 'maxrunning')
+
+    def test_job_running(self):
+        '''
+        Tests job_running looks the scheduled job up by its name among the
+        running jobs
+        '''
+        running_data = [{'jid': '20191001000000000000', 'schedule': 'job1',
+                         'pid': 15338, 'fun': 'test.true'}]
+        with patch('salt.utils.minion.running', MagicMock(return_value=running_data)), \
+                patch('salt.utils.process.os_is_running', MagicMock(return_value=True)):
+            self.assertTrue(self.schedule.job_running({'name': 'job1'}))
+            self.assertFalse(self.schedule.job_running({'name': 'job'}))
+            self.assertFalse(self.schedule.job_running({'name': 'job1', 'jid_include': False}))
+
     @skipIf(not _CRON_SUPPORTED, 'croniter module not installed')
     def test_eval_schedule_cron(self):
         '''
@@ -5,6 +5,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 import os
+import shutil
 import sys
 from tests.support.unit import TestCase, skipIf
 from tests.support.helpers import TestsLoggingHandler
@@ -17,6 +18,7 @@ from tests.support.mock import (
 import salt.exceptions
 from salt.utils import thin
 from salt.utils import json
+import salt.utils.files
 import salt.utils.stringutils
 import salt.utils.platform
 from salt.utils.stringutils import to_bytes as bts
@@ -703,3 +705,70 @@ class SSHThinTestCase(TestCase):
             tops=tops, extended_cfg=ext_cfg)).strip().split(os.linesep)
         for t_line in ['second-system-effect:2:7', 'solar-interference:2:6']:
             self.assertIn(t_line, out)
+
+    def test_thin_component(self):
+        '''
+        Test archive members are grouped by the package they belong to.
+        :return:
+        '''
+        self.assertEqual(thin._thin_component('py3/salt/utils/thin.py'), 'py3/salt')
+        self.assertEqual(thin._thin_component('pyall/six.py'), 'pyall/six.py')
+        self.assertEqual(thin._thin_component('ext/py2/foo/__init__.py'), 'ext/py2/foo')
+        self.assertEqual(thin._thin_component('version'), 'meta')
+        self.assertEqual(thin._thin_component('py3'), 'meta')
+
+    def test_thin_components_reproducible(self):
+        '''
+        Test the component archives of a thin are named by their content and
+        are the same when rebuilt.
+        :return:
+        '''
+        import tarfile
+        import tempfile
+        tmp = tempfile.mkdtemp()
+        try:
+            thindir = os.path.join(tmp, 'thin')
+            os.makedirs(thindir)
+            thintar = os.path.join(thindir, 'thin.tgz')
+            tfp = tarfile.open(thintar, 'w:gz')
+            for name, content in (('version', b'2019.2'),
+                                  ('py3/salt/__init__.py', b'salt'),
+                                  ('py3/salt/utils.py', b'utils'),
+                                  ('pyall/six.py', b'six')):
+                fname = os.path.join(tmp, name.replace('/', '_'))
+                with salt.utils.files.fopen(fname, 'wb') as fp_:
+                    fp_.write(content)
+                tfp.add(fname, arcname=name)
+            tfp.close()
+
+            compdir = os.path.join(thindir, 'components')
+            os.makedirs(compdir)
+            # The archives of other processes being written are kept
+            in_flight = os.path.join(compdir, 'tmp1234.tmp')
+            with salt.utils.files.fopen(in_flight, 'wb') as fp_:
+                fp_.write(b'')
+            with patch('salt.utils.thin.gen_thin', MagicMock(return_value=thintar)), \
+                    patch.dict(thin._THIN_COMPONENTS, {}, clear=True):
+                components = thin.thin_components(tmp)
+                self.assertEqual([name for name, _ in components],
+                                 ['meta', 'py3/salt', 'pyall/six.py'])
+                self.assertTrue(os.path.isfile(in_flight))
+                os.remove(in_flight)
+                self.assertEqual(sorted(os.listdir(compdir)),
+                                 sorted('{0}.tgz'.format(digest) for _, digest in components))
+                comp = tarfile.open(os.path.join(compdir, '{0}.tgz'.format(components[1][1])))
+                self.assertEqual(comp.getnames(), ['py3/salt/__init__.py', 'py3/salt/utils.py'])
+                comp.close()
+
+                # The components are only computed once per thin
+                os.remove(os.path.join(thindir, 'components.json'))
+                self.assertEqual(thin.thin_components(tmp), components)
+                self.assertFalse(os.path.exists(os.path.join(thindir, 'components.json')))
+
+                # Rebuilding the components results in the same archives
+                thin._THIN_COMPONENTS.clear()
+                shutil.rmtree(compdir)
+                self.assertEqual(thin.thin_components(tmp), components)
+                self.assertTrue(os.path.isfile(os.path.join(thindir, 'components.json')))
+        finally:
+            shutil.rmtree(tmp)